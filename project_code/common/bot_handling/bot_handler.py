@@ -11,16 +11,30 @@ Apache license, version 2.0 (Apache-2.0 license)
 __all__: list[str] = [
     "create_dispatcher",
     "create_bot",
-    "run_bot"
+    "create_webhook_application",
+    "run_bot",
+    "run_webhook",
+    "logger"
 ]
 
 __author__ = "4-proxy"
-__version__ = "1.0.3"
+__version__ = "1.2.1"
 
 from aiogram import Dispatcher, Bot
+from aiogram.webhook.aiohttp_server import SimpleRequestHandler, setup_application
+from aiohttp import web
+
+import asyncio
+import logging
 
 from aiogram.enums.parse_mode import ParseMode
-from typing import Any
+from typing import Any, Optional
+
+from common.bot_handling.send_scheduler_handler import SendScheduler
+from common.external_handling.bot_config_handler import WebhookConfigDTO
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
 
 
 # -----------------------------------------------------------------------------
@@ -43,15 +57,18 @@ async def create_dispatcher(**kwargs: Any) -> Dispatcher:
 
 # ----------------------------------------------------------------------------
 async def create_bot(api_token: str,
-                     parse_mode: ParseMode = ParseMode.HTML) -> Bot:
+                     parse_mode: ParseMode = ParseMode.HTML,
+                     send_scheduler: Optional[SendScheduler] = None) -> Bot:
     """Create a bot object to interact with Telegram.
 
     This function initializes a bot instance using the provided API token and
     sets the default message parsing mode.
+    The messages sent by the bot are paced by the send scheduler, if given.
 
     Args:
         api_token (str): Bot API token received from @BotFather [https://t.me/BotFather].
         parse_mode (ParseMode): Message parsing mode. Defaults to `ParseMode.HTML`.
+        send_scheduler (Optional[SendScheduler]): The outbound rate limiter. Defaults to None, the messages are not paced.
 
     Returns:
         Bot: Configured instance of `aiogram.Bot`.
@@ -63,18 +80,123 @@ async def create_bot(api_token: str,
 
     bot.default.parse_mode = parse_mode
 
+    if send_scheduler is not None:
+        bot.session.middleware(send_scheduler)
+
     return bot
 
 
+# ----------------------------------------------------------------------------
+async def create_webhook_application(*, bot: Bot,
+                                     dispatcher: Dispatcher,
+                                     webhook_config: WebhookConfigDTO) -> web.Application:
+    """Create an aiohttp application receiving the updates by webhook.
+
+    The webhook route rejects requests without the secret token with `401`,
+    and acknowledges an update at once, processing it in the background,
+    so Telegram does not wait for the handlers.
+
+    The webhook is set on the application startup, after the dispatcher startup,
+    and deleted on the shutdown, before the dispatcher shutdown,
+    unless the config disables it.
+    The bot session is closed last, so the shutdown handlers can still send messages.
+
+    Args:
+        bot (Bot): Configured instance of `aiogram.Bot`.
+        dispatcher (Dispatcher): Configured instance of `aiogram.Dispatcher`.
+        webhook_config (WebhookConfigDTO): The webhook settings.
+
+    Returns:
+        web.Application: The configured application.
+    """
+    application = web.Application()
+
+    # The request handler closes the bot session on shutdown, so it goes after the dispatcher.
+    setup_application(application, dispatcher, bot=bot)
+
+    request_handler = SimpleRequestHandler(dispatcher=dispatcher,
+                                           bot=bot,
+                                           handle_in_background=True,
+                                           secret_token=webhook_config.secret_token)
+    request_handler.register(application, path=webhook_config.path)
+
+    async def set_webhook(_: web.Application) -> None:
+        await bot.set_webhook(url=webhook_config.url,
+                              secret_token=webhook_config.secret_token,
+                              allowed_updates=dispatcher.resolve_used_update_types(),
+                              drop_pending_updates=webhook_config.drop_pending_updates)
+
+        logger.info(msg=f"Webhook is set to {webhook_config.url}.")
+
+    async def delete_webhook(_: web.Application) -> None:
+        await bot.delete_webhook()
+
+        logger.info(msg="Webhook is deleted.")
+
+    application.on_startup.append(set_webhook)
+
+    if webhook_config.delete_on_shutdown:
+        # Telegram stops pushing updates before the bot session is closed.
+        application.on_shutdown.insert(0, delete_webhook)
+
+    return application
+
+
+# ----------------------------------------------------------------------------
+async def run_webhook(*, bot: Bot,
+                      dispatcher: Dispatcher,
+                      webhook_config: WebhookConfigDTO) -> None:
+    """Run the webhook server until the task is cancelled.
+
+    Args:
+        bot (Bot): Configured instance of `aiogram.Bot`.
+        dispatcher (Dispatcher): Configured instance of `aiogram.Dispatcher`.
+        webhook_config (WebhookConfigDTO): The webhook settings.
+    """
+    application: web.Application = await create_webhook_application(
+        bot=bot,
+        dispatcher=dispatcher,
+        webhook_config=webhook_config
+    )
+
+    runner = web.AppRunner(application)
+    await runner.setup()
+
+    try:
+        site = web.TCPSite(runner,
+                           host=webhook_config.host,
+                           port=webhook_config.port)
+        await site.start()
+
+        logger.info(
+            msg=f"Webhook server is listening on {webhook_config.host}:{webhook_config.port}."
+        )
+
+        await asyncio.Event().wait()
+
+    finally:
+        await runner.cleanup()
+
+
 # ----------------------------------------------------------------------------
 async def run_bot(*, bot: Bot,
-                  dispatcher: Dispatcher) -> None:
+                  dispatcher: Dispatcher,
+                  webhook_config: Optional[WebhookConfigDTO] = None) -> None:
     """Run the bot and start listening for updates.
 
-    This function initiates polling for updates using the provided bot and dispatcher instances.
+    This function initiates polling for updates using the provided bot and dispatcher instances,
+    or runs the webhook server if the webhook settings are given.
 
     Args:
         bot (Bot): Configured instance of `aiogram.Bot`.
         dispatcher (Dispatcher): Configured instance of `aiogram.Dispatcher`.
+        webhook_config (Optional[WebhookConfigDTO]): The webhook settings. Defaults to None, long polling is used.
     """
+    if webhook_config is not None:
+        await run_webhook(bot=bot,
+                          dispatcher=dispatcher,
+                          webhook_config=webhook_config)
+
+        return
+
     await dispatcher.start_polling(bot)  # type: ignore
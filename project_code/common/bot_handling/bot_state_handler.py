@@ -14,12 +14,13 @@ __all__: list[str] = [
 ]
 
 __author__ = "4-proxy"
-__version__ = "1.1.2"
+__version__ = "1.3.0"
 
 import aiogram
 
 import logging
 
+from common.bot_handling.send_scheduler_handler import SendPriority, send_priority
 from common.workflow_intermediary import WorkflowIntermediary
 
 
@@ -39,16 +40,27 @@ async def on_startup() -> None:
 
     logger.info(msg=startup_log_message)
 
-    await bot.send_message(chat_id=chat_id,
-                           text=startup_message)
+    with send_priority(priority=SendPriority.NOTIFICATION):
+        await bot.send_message(chat_id=chat_id,
+                               text=startup_message)
 
 
 # -----------------------------------------------------------------------------
 async def on_shutdown() -> None:
     """Handle actions to perform when the bot stops.
 
-    Sends a notification message to the owner's chat and logs the shutdown event.
+    Awaits the registered shutdown callbacks, e.g. flushing buffered database writes,
+    then sends a notification message to the owner's chat and logs the shutdown event.
+
+    *A failed callback is logged and does not prevent the others from running.
     """
+    for shutdown_callback in WorkflowIntermediary.shutdown_callbacks:
+        try:
+            await shutdown_callback()
+
+        except Exception:
+            logger.exception(msg="Shutdown callback failed!")
+
     bot: aiogram.Bot = WorkflowIntermediary.current_bot
     chat_id: str = WorkflowIntermediary.owner_chat_id
     shutdown_message = "I'am go to sleep!"
@@ -56,5 +68,6 @@ async def on_shutdown() -> None:
 
     logger.info(msg=shutdown_log_message)
 
-    await bot.send_message(chat_id=chat_id,
-                           text=shutdown_message)
+    with send_priority(priority=SendPriority.NOTIFICATION):
+        await bot.send_message(chat_id=chat_id,
+                               text=shutdown_message)
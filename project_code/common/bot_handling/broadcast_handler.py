@@ -0,0 +1,536 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `broadcast_handler` module sends a message to all users of the bot,
+within the flood limits of Telegram, resuming an interrupted broadcast from its checkpoint.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "BroadcastCheckpoint",
+    "BroadcastStorage",
+    "Broadcaster",
+    "format_broadcast_progress",
+    "logger"
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.1"
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramAPIError,
+    TelegramBadRequest,
+    TelegramForbiddenError,
+    TelegramRetryAfter
+)
+from aiogram.types import Message
+
+import asyncio
+import logging
+import re
+import time
+
+from dataclasses import dataclass
+from typing import Any, List, Optional, Pattern, Sequence, Tuple
+
+from common.bot_handling.send_scheduler_handler import SendPriority, send_priority
+from common.workflow_intermediary import WorkflowIntermediary
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Table and column names are put in the queries as is, so only plain identifiers are accepted.
+IDENTIFIER_PATTERN: Pattern[str] = re.compile(r"[A-Za-z_][A-Za-z0-9_]{0,63}")
+
+# Fragments of the `Bad Request` descriptions of the chats that no longer exist.
+UNREACHABLE_CHAT_DESCRIPTIONS: Tuple[str, ...] = ("chat not found", "user not found")
+
+
+# _____________________________________________________________________________
+@dataclass
+class BroadcastCheckpoint:
+    """Progress of a broadcast, saved after every chunk of recipients.
+
+    Attributes:
+        job_id (str): The name of the broadcast.
+        last_chat_id (int): The largest chat id of the finished chunks, the broadcast resumes after it.
+        sent (int): The number of messages delivered.
+        failed (int): The number of messages not delivered for other reasons.
+        unreachable (int): The number of users who blocked the bot or deleted the account.
+        is_finished (bool): True once every recipient got its turn.
+    """
+    job_id: str
+    last_chat_id: int = 0
+    sent: int = 0
+    failed: int = 0
+    unreachable: int = 0
+    is_finished: bool = False
+
+
+# -----------------------------------------------------------------------------
+def format_broadcast_progress(checkpoint: BroadcastCheckpoint,
+                              remaining: int,
+                              rate: float) -> str:
+    """Return the progress report of a broadcast for the owner chat.
+
+    Args:
+        checkpoint (BroadcastCheckpoint): The progress of the broadcast.
+        remaining (int): The number of recipients left.
+        rate (float): The messages handled per second.
+
+    Returns:
+        str: The counters, the throughput and the estimated time left.
+    """
+    state: str = "finished" if checkpoint.is_finished else "running"
+    eta: str = "unknown"
+
+    if checkpoint.is_finished:
+        eta = "0:00:00"
+
+    elif rate > 0:
+        seconds = int(remaining / rate)
+        eta = f"{seconds // 3600}:{seconds % 3600 // 60:02}:{seconds % 60:02}"
+
+    return (f"Broadcast {checkpoint.job_id} is {state}.\n"
+            f"Sent: {checkpoint.sent}, failed: {checkpoint.failed}, "
+            f"unreachable: {checkpoint.unreachable}, remaining: {remaining}.\n"
+            f"Throughput: {rate:.1f} msg/s, ETA: {eta}.")
+
+
+# _____________________________________________________________________________
+class BroadcastStorage:
+    """BroadcastStorage class reading the recipients and saving the checkpoints of the broadcasts.
+
+    The recipients are read by chat id order, a chunk after the last chat id of the previous one,
+    so every chunk is a short index range scan and the users joining during a broadcast get it too.
+    The chat ids of the users are positive, so a new broadcast starts after chat id 0.
+
+    *The database API is any API of the `database_prototypes` with the
+    `execute`, `fetch_one` and `fetch_all` methods and the `%s` placeholders,
+    e.g. `AsyncMySQLAPI` or `AsyncSQLiteAPI`.
+
+    Attributes:
+        database_api (Any): The API running the queries.
+        users_table (str): The table of the users.
+        chat_id_column (str): The chat id column of the users table.
+        reachable_column (str): The boolean column of the users table, false for the unreachable users.
+        jobs_table (str): The table of the broadcast checkpoints.
+    """
+
+    database_api: Any
+    users_table: str
+    chat_id_column: str
+    reachable_column: str
+    jobs_table: str
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 database_api: Any,
+                 users_table: str = "users",
+                 chat_id_column: str = "chat_id",
+                 reachable_column: str = "is_reachable",
+                 jobs_table: str = "broadcast_jobs") -> None:
+        """__init__ constructor.
+
+        Args:
+            database_api (Any): The API running the queries.
+            users_table (str): The table of the users. Defaults to "users".
+            chat_id_column (str): The chat id column of the users table. Defaults to "chat_id".
+            reachable_column (str): The boolean column of the users table, false for the unreachable users.
+                                    Defaults to "is_reachable".
+            jobs_table (str): The table of the broadcast checkpoints. Defaults to "broadcast_jobs".
+
+        Raises:
+            ValueError: If a table or column name is not a plain identifier.
+        """
+        for identifier in (users_table, chat_id_column, reachable_column, jobs_table):
+            if not IDENTIFIER_PATTERN.fullmatch(identifier):
+                raise ValueError(f"Invalid table or column name: {identifier!r}!")
+
+        self.database_api = database_api
+        self.users_table = users_table
+        self.chat_id_column = chat_id_column
+        self.reachable_column = reachable_column
+        self.jobs_table = jobs_table
+
+    # -------------------------------------------------------------------------
+    async def set_up(self) -> None:
+        """Create the table of the broadcast checkpoints if it does not exist."""
+        await self.database_api.execute(
+            query=f"CREATE TABLE IF NOT EXISTS {self.jobs_table} ("
+                  "job_id VARCHAR(64) PRIMARY KEY, "
+                  "last_chat_id BIGINT NOT NULL, "
+                  "sent INTEGER NOT NULL, "
+                  "failed INTEGER NOT NULL, "
+                  "unreachable INTEGER NOT NULL, "
+                  "is_finished BOOLEAN NOT NULL)"
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_recipients(self, after_chat_id: int, limit: int) -> List[int]:
+        """Return the next chunk of the reachable recipients.
+
+        Args:
+            after_chat_id (int): The chat id the chunk starts after.
+            limit (int): The maximum number of recipients in the chunk.
+
+        Returns:
+            List[int]: The chat ids of the chunk, in ascending order; empty after the last recipient.
+        """
+        rows: Sequence[Sequence[Any]] = await self.database_api.fetch_all(
+            query=f"SELECT {self.chat_id_column} FROM {self.users_table} "
+                  f"WHERE {self.reachable_column} AND {self.chat_id_column} > %s "
+                  f"ORDER BY {self.chat_id_column} LIMIT %s",
+            parameters=(after_chat_id, limit)
+        )
+
+        return [int(row[0]) for row in rows]
+
+    # -------------------------------------------------------------------------
+    async def count_recipients(self, after_chat_id: int) -> int:
+        """Return the number of the reachable recipients left.
+
+        Args:
+            after_chat_id (int): The chat id the count starts after.
+
+        Returns:
+            int: The number of recipients with a larger chat id.
+        """
+        row: Optional[Sequence[Any]] = await self.database_api.fetch_one(
+            query=f"SELECT COUNT(*) FROM {self.users_table} "
+                  f"WHERE {self.reachable_column} AND {self.chat_id_column} > %s",
+            parameters=(after_chat_id,)
+        )
+
+        return int(row[0]) if row else 0
+
+    # -------------------------------------------------------------------------
+    async def flag_unreachable(self, chat_ids: Sequence[int]) -> None:
+        """Mark the users who blocked the bot or deleted the account, with a single query.
+
+        Args:
+            chat_ids (Sequence[int]): The chat ids of the unreachable users.
+        """
+        if not chat_ids:
+            return
+
+        placeholders: str = ", ".join(["%s"] * len(chat_ids))
+
+        await self.database_api.execute(
+            query=f"UPDATE {self.users_table} SET {self.reachable_column} = %s "
+                  f"WHERE {self.chat_id_column} IN ({placeholders})",
+            parameters=(False, *chat_ids)
+        )
+
+    # -------------------------------------------------------------------------
+    async def load_checkpoint(self, job_id: str) -> Optional[BroadcastCheckpoint]:
+        """Return the saved progress of a broadcast.
+
+        Args:
+            job_id (str): The name of the broadcast.
+
+        Returns:
+            Optional[BroadcastCheckpoint]: The progress; None if the broadcast was never started.
+        """
+        row: Optional[Sequence[Any]] = await self.database_api.fetch_one(
+            query="SELECT last_chat_id, sent, failed, unreachable, is_finished "
+                  f"FROM {self.jobs_table} WHERE job_id = %s",
+            parameters=(job_id,)
+        )
+
+        if row is None:
+            return None
+
+        return BroadcastCheckpoint(job_id=job_id,
+                                   last_chat_id=int(row[0]),
+                                   sent=int(row[1]),
+                                   failed=int(row[2]),
+                                   unreachable=int(row[3]),
+                                   is_finished=bool(row[4]))
+
+    # -------------------------------------------------------------------------
+    async def create_checkpoint(self, checkpoint: BroadcastCheckpoint) -> None:
+        """Save the progress of a new broadcast.
+
+        Args:
+            checkpoint (BroadcastCheckpoint): The initial progress.
+        """
+        await self.database_api.execute(
+            query=f"INSERT INTO {self.jobs_table} "
+                  "(job_id, last_chat_id, sent, failed, unreachable, is_finished) "
+                  "VALUES (%s, %s, %s, %s, %s, %s)",
+            parameters=(checkpoint.job_id, checkpoint.last_chat_id, checkpoint.sent,
+                        checkpoint.failed, checkpoint.unreachable, checkpoint.is_finished)
+        )
+
+    # -------------------------------------------------------------------------
+    async def save_checkpoint(self, checkpoint: BroadcastCheckpoint) -> None:
+        """Save the progress of a running broadcast.
+
+        Args:
+            checkpoint (BroadcastCheckpoint): The progress after the last finished chunk.
+        """
+        await self.database_api.execute(
+            query=f"UPDATE {self.jobs_table} SET last_chat_id = %s, sent = %s, "
+                  "failed = %s, unreachable = %s, is_finished = %s WHERE job_id = %s",
+            parameters=(checkpoint.last_chat_id, checkpoint.sent, checkpoint.failed,
+                        checkpoint.unreachable, checkpoint.is_finished, checkpoint.job_id)
+        )
+
+
+# _____________________________________________________________________________
+class _ProgressReporter:
+    """_ProgressReporter class keeping the progress message of a broadcast in the owner chat.
+
+    Attributes:
+        bot (Bot): The bot sending the report.
+        checkpoint (BroadcastCheckpoint): The progress of the broadcast.
+        remaining (int): The number of recipients left.
+        __initial_remaining (int): The number of recipients left when the run started.
+        __started_at (float): The `time.monotonic` value the run started at.
+        __message (Optional[Message]): The report message, edited by the next reports.
+    """
+
+    bot: Bot
+    checkpoint: BroadcastCheckpoint
+    remaining: int
+    __initial_remaining: int
+    __started_at: float
+    __message: Optional[Message]
+
+    # -------------------------------------------------------------------------
+    def __init__(self, bot: Bot, checkpoint: BroadcastCheckpoint, remaining: int) -> None:
+        """__init__ constructor.
+
+        Args:
+            bot (Bot): The bot sending the report.
+            checkpoint (BroadcastCheckpoint): The progress of the broadcast.
+            remaining (int): The number of recipients left.
+        """
+        self.bot = bot
+        self.checkpoint = checkpoint
+        self.remaining = remaining
+        self.__initial_remaining = remaining
+        self.__started_at = time.monotonic()
+        self.__message = None
+
+    # -------------------------------------------------------------------------
+    async def run(self, interval: float) -> None:
+        """Report the progress every `interval` seconds until the task is cancelled.
+
+        Args:
+            interval (float): Seconds between the reports.
+        """
+        while True:
+            await self.report()
+            await asyncio.sleep(interval)
+
+    # -------------------------------------------------------------------------
+    async def report(self) -> None:
+        """Send the progress report, or edit the previous one."""
+        elapsed: float = time.monotonic() - self.__started_at
+        handled: int = self.__initial_remaining - self.remaining
+        rate: float = handled / elapsed if elapsed > 0 else 0.0
+        text: str = format_broadcast_progress(checkpoint=self.checkpoint,
+                                              remaining=max(self.remaining, 0),
+                                              rate=rate)
+
+        try:
+            with send_priority(priority=SendPriority.NOTIFICATION):
+                if self.__message is None:
+                    self.__message = await self.bot.send_message(
+                        chat_id=WorkflowIntermediary.owner_chat_id,
+                        text=text
+                    )
+
+                else:
+                    await self.bot.edit_message_text(text=text,
+                                                     chat_id=self.__message.chat.id,
+                                                     message_id=self.__message.message_id)
+
+        except TelegramAPIError as error:
+            # The broadcast goes on without its report, e.g. on "message is not modified".
+            logger.warning(msg=f"Broadcast progress report failed: {error}!")
+
+
+# _____________________________________________________________________________
+class Broadcaster:
+    """Broadcaster class sending a message to all reachable users of the bot.
+
+    The recipients are read in chunks, and the messages of a chunk are sent concurrently
+    in the `SendPriority.BULK` lane, so the send scheduler of the bot keeps them
+    within the flood limits and behind the interactive replies.
+    The users who blocked the bot or deleted the account are flagged with one query per chunk,
+    then the checkpoint is saved.
+
+    A broadcast started again with the same job id resumes after its last saved chunk,
+    so after a crash at most one chunk of recipients gets the message twice.
+
+    The progress, throughput and estimated time left are reported to the owner chat
+    in a single message, edited every `report_interval` seconds.
+
+    Attributes:
+        bot (Bot): The bot sending the messages.
+        storage (BroadcastStorage): The recipients and checkpoints of the broadcasts.
+        chunk_size (int): The number of recipients read and checkpointed at a time.
+        concurrency (int): The maximum number of messages being sent at a time.
+        report_interval (float): Seconds between the progress reports to the owner chat.
+    """
+
+    bot: Bot
+    storage: BroadcastStorage
+    chunk_size: int
+    concurrency: int
+    report_interval: float
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 bot: Bot,
+                 storage: BroadcastStorage,
+                 chunk_size: int = 500,
+                 concurrency: int = 30,
+                 report_interval: float = 10.0) -> None:
+        """__init__ constructor.
+
+        Args:
+            bot (Bot): The bot sending the messages.
+            storage (BroadcastStorage): The recipients and checkpoints of the broadcasts.
+            chunk_size (int): The number of recipients read and checkpointed at a time. Defaults to 500.
+            concurrency (int): The maximum number of messages being sent at a time. Defaults to 30,
+                               the global flood limit of Telegram per second.
+            report_interval (float): Seconds between the progress reports to the owner chat. Defaults to 10.0.
+        """
+        self.bot = bot
+        self.storage = storage
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.report_interval = report_interval
+
+    # -------------------------------------------------------------------------
+    async def run(self, job_id: str, text: str) -> BroadcastCheckpoint:
+        """Send the message to every reachable user, resuming the broadcast if it was interrupted.
+
+        Args:
+            job_id (str): The name of the broadcast, the key of its checkpoint.
+            text (str): The message text.
+
+        Returns:
+            BroadcastCheckpoint: The final progress of the broadcast.
+        """
+        checkpoint: Optional[BroadcastCheckpoint] = await self.storage.load_checkpoint(
+            job_id=job_id
+        )
+
+        if checkpoint is None:
+            checkpoint = BroadcastCheckpoint(job_id=job_id)
+            await self.storage.create_checkpoint(checkpoint=checkpoint)
+
+        elif checkpoint.is_finished:
+            logger.info(msg=f"Broadcast {job_id} is already finished.")
+
+            return checkpoint
+
+        else:
+            logger.info(msg=f"Broadcast {job_id} resumes after chat {checkpoint.last_chat_id}.")
+
+        remaining: int = await self.storage.count_recipients(
+            after_chat_id=checkpoint.last_chat_id
+        )
+        reporter = _ProgressReporter(bot=self.bot,
+                                     checkpoint=checkpoint,
+                                     remaining=remaining)
+        report_task: asyncio.Task[None] = asyncio.create_task(
+            reporter.run(interval=self.report_interval)
+        )
+
+        try:
+            with send_priority(priority=SendPriority.BULK):
+                await self.__send_chunks(checkpoint=checkpoint,
+                                         reporter=reporter,
+                                         text=text)
+
+        finally:
+            report_task.cancel()
+            await asyncio.gather(report_task, return_exceptions=True)
+            await reporter.report()
+
+        logger.info(msg=f"Broadcast {job_id} is finished: {checkpoint}.")
+
+        return checkpoint
+
+    # -------------------------------------------------------------------------
+    async def __send_chunks(self,
+                            checkpoint: BroadcastCheckpoint,
+                            reporter: "_ProgressReporter",
+                            text: str) -> None:
+        slots = asyncio.Semaphore(value=self.concurrency)
+
+        while True:
+            chat_ids: List[int] = await self.storage.fetch_recipients(
+                after_chat_id=checkpoint.last_chat_id,
+                limit=self.chunk_size
+            )
+
+            if not chat_ids:
+                checkpoint.is_finished = True
+                await self.storage.save_checkpoint(checkpoint=checkpoint)
+
+                return
+
+            unreachable_chat_ids: List[int] = []
+
+            async def send(chat_id: int) -> None:
+                async with slots:
+                    is_delivered: Optional[bool] = await self.__send_message(chat_id=chat_id,
+                                                                             text=text)
+
+                if is_delivered is None:
+                    unreachable_chat_ids.append(chat_id)
+
+                elif is_delivered:
+                    checkpoint.sent += 1
+
+                else:
+                    checkpoint.failed += 1
+
+                reporter.remaining -= 1
+
+            await asyncio.gather(*(send(chat_id=chat_id) for chat_id in chat_ids))
+
+            await self.storage.flag_unreachable(chat_ids=unreachable_chat_ids)
+
+            checkpoint.unreachable += len(unreachable_chat_ids)
+            checkpoint.last_chat_id = chat_ids[-1]
+            await self.storage.save_checkpoint(checkpoint=checkpoint)
+
+    # -------------------------------------------------------------------------
+    async def __send_message(self, chat_id: int, text: str) -> Optional[bool]:
+        while True:
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+
+                return True
+
+            except TelegramRetryAfter as error:
+                # The send scheduler gave up, or the bot has none, so the chat waits here.
+                await asyncio.sleep(error.retry_after)
+
+            except TelegramForbiddenError:
+                return None
+
+            except TelegramBadRequest as error:
+                if any(description in error.message.lower()
+                       for description in UNREACHABLE_CHAT_DESCRIPTIONS):
+                    return None
+
+                logger.warning(msg=f"Broadcast message to chat {chat_id} is rejected: {error}!")
+
+                return False
+
+            except TelegramAPIError as error:
+                logger.warning(msg=f"Broadcast message to chat {chat_id} failed: {error}!")
+
+                return False
@@ -0,0 +1,400 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `send_scheduler_handler` module paces the messages sent by the Telegram bot
+within the flood limits of Telegram, serving the interactive replies first.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "SendPriority",
+    "SendScheduler",
+    "SendSchedulerStatistics",
+    "TokenBucket",
+    "send_priority",
+    "logger"
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import (
+    BaseRequestMiddleware,
+    NextRequestMiddlewareType
+)
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import Response, TelegramMethod
+
+import asyncio
+import logging
+import time
+
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Prefixes of the API methods delivering a message to a chat.
+SENDING_METHOD_PREFIXES: Tuple[str, ...] = ("send", "copy", "forward")
+
+# Sending methods not counted by the flood limits.
+UNLIMITED_METHODS: Tuple[str, ...] = ("sendChatAction",)
+
+
+# _____________________________________________________________________________
+class SendPriority(IntEnum):
+    """Priority lane of an outgoing message, the lower value is sent first."""
+    INTERACTIVE = 0
+    NOTIFICATION = 1
+    BULK = 2
+
+
+# The lane of the messages sent by the current task, see `send_priority`.
+send_priority_context: ContextVar[SendPriority] = ContextVar(
+    "send_priority", default=SendPriority.INTERACTIVE
+)
+
+
+# -----------------------------------------------------------------------------
+@contextmanager
+def send_priority(priority: SendPriority) -> Iterator[None]:
+    """Send the messages of the block, and of the tasks it starts, in the priority lane.
+
+    Args:
+        priority (SendPriority): The lane of the messages, e.g. `SendPriority.BULK` for a broadcast.
+
+    Yields:
+        None: The block runs with the lane set.
+    """
+    token = send_priority_context.set(priority)
+
+    try:
+        yield
+
+    finally:
+        send_priority_context.reset(token)
+
+
+# _____________________________________________________________________________
+class TokenBucket:
+    """TokenBucket class of a rate limit with bursts.
+
+    Attributes:
+        rate (float): The tokens added per second.
+        capacity (float): The maximum number of tokens, the largest burst.
+        __tokens (float): The tokens available.
+        __updated_at (float): The `time.monotonic` value the tokens were last counted at.
+    """
+
+    rate: float
+    capacity: float
+    __tokens: float
+    __updated_at: float
+
+    # -------------------------------------------------------------------------
+    def __init__(self, rate: float, capacity: Optional[float] = None) -> None:
+        """__init__ constructor.
+
+        Args:
+            rate (float): The tokens added per second.
+            capacity (Optional[float]): The maximum number of tokens. Defaults to None, one second of tokens.
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.__tokens = self.capacity
+        self.__updated_at = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    def consume(self) -> float:
+        """Take a token if one is available.
+
+        Returns:
+            float: 0.0 if a token was taken; otherwise the seconds until the next token.
+        """
+        now: float = time.monotonic()
+
+        self.__tokens = min(self.capacity,
+                            self.__tokens + (now - self.__updated_at) * self.rate)
+        self.__updated_at = now
+
+        if self.__tokens >= 1.0:
+            self.__tokens -= 1.0
+
+            return 0.0
+
+        return (1.0 - self.__tokens) / self.rate
+
+
+# _____________________________________________________________________________
+@dataclass
+class SendSchedulerStatistics:
+    """Counters of the send scheduler.
+
+    Attributes:
+        sent (Dict[SendPriority, int]): The number of paced requests sent, by lane.
+        retry_afters (Dict[SendPriority, int]): The number of `RetryAfter` errors received, by lane.
+        total_wait_time (Dict[SendPriority, float]): The sum of the waits before sending, by lane, in seconds.
+        max_wait_time (Dict[SendPriority, float]): The longest wait before sending, by lane, in seconds.
+    """
+    sent: Dict[SendPriority, int] = field(
+        default_factory=lambda: dict.fromkeys(SendPriority, 0)
+    )
+    retry_afters: Dict[SendPriority, int] = field(
+        default_factory=lambda: dict.fromkeys(SendPriority, 0)
+    )
+    total_wait_time: Dict[SendPriority, float] = field(
+        default_factory=lambda: dict.fromkeys(SendPriority, 0.0)
+    )
+    max_wait_time: Dict[SendPriority, float] = field(
+        default_factory=lambda: dict.fromkeys(SendPriority, 0.0)
+    )
+
+
+# _____________________________________________________________________________
+class SendScheduler(BaseRequestMiddleware):
+    """SendScheduler request middleware pacing the messages sent by a bot.
+
+    Every message waits for the turn of its chat, at most `chat_rate` messages per second,
+    then for a token of the global bucket, at most `global_rate` messages per second.
+    The global tokens are given to the waiting lanes in the order of their priority:
+    interactive replies, then notifications, then bulk messages.
+
+    A `RetryAfter` error pauses only the lane of the failed message for the time asked by Telegram,
+    and the message is sent again once the lane resumes,
+    so the interactive replies keep flowing while a broadcast is throttled.
+
+    *The lane of a message is taken from `send_priority_context`,
+    `SendPriority.INTERACTIVE` unless the sending code runs in a `send_priority` block.
+
+    *The scheduler is registered as a middleware of the bot session:
+    `bot.session.middleware(SendScheduler())`.
+
+    Attributes:
+        global_rate (float): The maximum number of messages per second, over all chats.
+        chat_rate (float): The maximum number of messages per second, to a single chat.
+        max_retries (int): The number of times a message is sent again after `RetryAfter`.
+        statistics (SendSchedulerStatistics): The scheduler counters.
+        __global_bucket (TokenBucket): The tokens of the global limit.
+        __chat_turns (Dict[Any, float]): The `time.monotonic` value of the next turn of each chat.
+        __lanes (Dict[SendPriority, Deque[asyncio.Future]]): The messages waiting for a global token, by lane.
+        __paused_until (Dict[SendPriority, float]): The `time.monotonic` value each lane resumes at.
+        __lane_event (asyncio.Event): Set when a message joins a lane.
+        __grant_task (Optional[asyncio.Task]): Hands out the global tokens to the lanes.
+    """
+
+    global_rate: float
+    chat_rate: float
+    max_retries: int
+    statistics: SendSchedulerStatistics
+    __global_bucket: TokenBucket
+    __chat_turns: Dict[Any, float]
+    __lanes: Dict[SendPriority, Deque["asyncio.Future[None]"]]
+    __paused_until: Dict[SendPriority, float]
+    __lane_event: asyncio.Event
+    __grant_task: Optional["asyncio.Task[None]"]
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 global_rate: float = 30.0,
+                 chat_rate: float = 1.0,
+                 max_retries: int = 3) -> None:
+        """__init__ constructor.
+
+        Args:
+            global_rate (float): The maximum number of messages per second, over all chats. Defaults to 30.0.
+            chat_rate (float): The maximum number of messages per second, to a single chat. Defaults to 1.0.
+            max_retries (int): The number of times a message is sent again after `RetryAfter`. Defaults to 3.
+        """
+        self.global_rate = global_rate
+        self.chat_rate = chat_rate
+        self.max_retries = max_retries
+        self.statistics = SendSchedulerStatistics()
+        self.__global_bucket = TokenBucket(rate=global_rate)
+        self.__chat_turns = {}
+        self.__lanes = {priority: deque() for priority in SendPriority}
+        self.__paused_until = dict.fromkeys(SendPriority, 0.0)
+        self.__lane_event = asyncio.Event()
+        self.__grant_task = None
+
+    # -------------------------------------------------------------------------
+    async def __call__(self,
+                       make_request: NextRequestMiddlewareType[Any],
+                       bot: Bot,
+                       method: TelegramMethod[Any]) -> Response[Any]:
+        """Send the request once its chat and its lane get their turn.
+
+        Requests other than the sending methods are not paced.
+
+        Args:
+            make_request (NextRequestMiddlewareType): The next step of the middleware chain.
+            bot (Bot): The bot sending the request.
+            method (TelegramMethod): The request.
+
+        Returns:
+            Response: The response of Telegram.
+
+        Raises:
+            TelegramRetryAfter: If Telegram keeps asking to wait after the last retry.
+        """
+        chat_id: Any = getattr(method, "chat_id", None)
+        api_method: str = method.__api_method__
+
+        if (chat_id is None
+                or not api_method.startswith(SENDING_METHOD_PREFIXES)
+                or api_method in UNLIMITED_METHODS):
+            return await make_request(bot, method)
+
+        priority: SendPriority = send_priority_context.get()
+        attempt: int = 0
+
+        while True:
+            await self.__wait_for_turn(priority=priority, chat_id=chat_id)
+
+            try:
+                response: Response[Any] = await make_request(bot, method)
+
+            except TelegramRetryAfter as error:
+                self.statistics.retry_afters[priority] += 1
+                self.__pause_lane(priority=priority, delay=error.retry_after)
+
+                if attempt >= self.max_retries:
+                    raise
+
+                attempt += 1
+                continue
+
+            self.statistics.sent[priority] += 1
+
+            return response
+
+    # -------------------------------------------------------------------------
+    def get_statistics(self) -> SendSchedulerStatistics:
+        """Return the scheduler counters.
+
+        Returns:
+            SendSchedulerStatistics: The sent messages, the `RetryAfter` errors and the waits, by lane.
+        """
+        return self.statistics
+
+    # -------------------------------------------------------------------------
+    def get_lane_depths(self) -> Dict[SendPriority, int]:
+        """Return the number of messages waiting for a global token, by lane.
+
+        Returns:
+            Dict[SendPriority, int]: The number of waiting messages of each lane.
+        """
+        return {priority: len(lane) for priority, lane in self.__lanes.items()}
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """Stop handing out the global tokens, the waiting messages are cancelled."""
+        if self.__grant_task is not None:
+            self.__grant_task.cancel()
+            self.__grant_task = None
+
+        for lane in self.__lanes.values():
+            while lane:
+                lane.popleft().cancel()
+
+    # -------------------------------------------------------------------------
+    async def __wait_for_turn(self, priority: SendPriority, chat_id: Any) -> None:
+        started_at: float = time.monotonic()
+
+        # The turns of a chat are booked in order, so its messages keep their order.
+        chat_turn: float = max(started_at, self.__chat_turns.get(chat_id, 0.0))
+        self.__chat_turns[chat_id] = chat_turn + 1.0 / self.chat_rate
+        self.__forget_idle_chats(now=started_at)
+
+        if chat_turn > started_at:
+            await asyncio.sleep(chat_turn - started_at)
+
+        if self.__grant_task is None or self.__grant_task.done():
+            self.__grant_task = asyncio.create_task(self.__grant_tokens())
+
+        granted: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        self.__lanes[priority].append(granted)
+        self.__lane_event.set()
+
+        await granted
+
+        wait_time: float = time.monotonic() - started_at
+        self.statistics.total_wait_time[priority] += wait_time
+        self.statistics.max_wait_time[priority] = max(
+            self.statistics.max_wait_time[priority], wait_time
+        )
+
+    # -------------------------------------------------------------------------
+    def __pause_lane(self, priority: SendPriority, delay: float) -> None:
+        resume_at: float = time.monotonic() + delay
+
+        if resume_at > self.__paused_until[priority]:
+            self.__paused_until[priority] = resume_at
+
+            logger.warning(
+                msg=f"Lane {priority.name} is paused for {delay} s by RetryAfter!"
+            )
+
+    # -------------------------------------------------------------------------
+    def __forget_idle_chats(self, now: float) -> None:
+        # Pruned in bulk, once the booked turns outnumber the recent chats.
+        if len(self.__chat_turns) < 10_000:
+            return
+
+        idle_chats: List[Any] = [chat_id for chat_id, turn in self.__chat_turns.items()
+                                 if turn <= now]
+
+        for chat_id in idle_chats:
+            del self.__chat_turns[chat_id]
+
+    # -------------------------------------------------------------------------
+    async def __grant_tokens(self) -> None:
+        while True:
+            now: float = time.monotonic()
+            lane: Optional[Deque["asyncio.Future[None]"]] = None
+            next_resume_at: Optional[float] = None
+
+            for priority, waiting in self.__lanes.items():
+                # Cancelled senders do not take a token.
+                while waiting and waiting[0].done():
+                    waiting.popleft()
+
+                if not waiting:
+                    continue
+
+                if self.__paused_until[priority] > now:
+                    next_resume_at = min(next_resume_at or float("inf"),
+                                         self.__paused_until[priority])
+                    continue
+
+                lane = waiting
+                break
+
+            if lane is None:
+                self.__lane_event.clear()
+                timeout: Optional[float] = (
+                    next_resume_at - now if next_resume_at is not None else None
+                )
+
+                try:
+                    await asyncio.wait_for(self.__lane_event.wait(), timeout=timeout)
+
+                except asyncio.TimeoutError:
+                    pass
+
+                continue
+
+            delay: float = self.__global_bucket.consume()
+
+            if delay:
+                await asyncio.sleep(delay)
+                continue
+
+            lane.popleft().set_result(None)
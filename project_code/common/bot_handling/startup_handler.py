@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `startup_handler` module runs the initialization steps of the Telegram bot
+concurrently, with timeouts, and measures how long each of them takes.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "run_startup_step",
+    "run_startup_steps",
+    "validate_bot",
+    "track_first_update",
+    "logger"
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+from aiogram import Bot, Dispatcher
+
+import asyncio
+import logging
+import time
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+# -----------------------------------------------------------------------------
+async def run_startup_step(name: str,
+                           function: Callable[[], Awaitable[Any]],
+                           timeout: Optional[float] = None) -> Any:
+    """Run a single startup step and log how long it took.
+
+    Args:
+        name (str): The name of the step used in the logs.
+        function (Callable[[], Awaitable[Any]]): The coroutine function of the step.
+        timeout (Optional[float]): Seconds the step may take. Defaults to None, no limit.
+
+    Returns:
+        Any: The result of the step.
+
+    Raises:
+        asyncio.TimeoutError: If the step did not finish within the timeout.
+        Exception: Any exception raised by the step itself.
+    """
+    started_at: float = time.perf_counter()
+
+    try:
+        result: Any = await asyncio.wait_for(function(), timeout=timeout)
+
+    except asyncio.TimeoutError:
+        logger.error(msg=f"Startup step '{name}' timed out after {timeout} s!")
+
+        raise
+
+    except Exception:
+        elapsed_time: float = time.perf_counter() - started_at
+
+        logger.exception(
+            msg=f"Startup step '{name}' failed after {elapsed_time:.3f} s!"
+        )
+
+        raise
+
+    elapsed_time = time.perf_counter() - started_at
+
+    logger.info(msg=f"Startup step '{name}' finished in {elapsed_time:.3f} s.")
+
+    return result
+
+
+# -----------------------------------------------------------------------------
+async def run_startup_steps(steps: Dict[str, Callable[[], Awaitable[Any]]],
+                            timeout: Optional[float] = None,
+                            step_timeouts: Optional[Dict[str, Optional[float]]] = None) -> Dict[str, Any]:
+    """Run independent startup steps concurrently.
+
+    Every step gets its own timeout, and all of them are awaited
+    before an error is raised, so no step is left running in the background.
+
+    Args:
+        steps (Dict[str, Callable[[], Awaitable[Any]]]): The coroutine functions of the steps by their names.
+        timeout (Optional[float]): Seconds each step may take. Defaults to None, no limit.
+        step_timeouts (Optional[Dict[str, Optional[float]]]): Seconds the named steps may take
+                                                              instead of the `timeout`, None for no limit.
+                                                              Defaults to None.
+
+    Returns:
+        Dict[str, Any]: The results of the steps by their names.
+
+    Raises:
+        asyncio.TimeoutError: If a step did not finish within the timeout.
+        Exception: The first exception raised by a step, in the order of the steps.
+    """
+    started_at: float = time.perf_counter()
+    step_timeouts = step_timeouts or {}
+
+    results: List[Any] = await asyncio.gather(
+        *(run_startup_step(name=name,
+                           function=function,
+                           timeout=step_timeouts.get(name, timeout))
+          for name, function in steps.items()),
+        return_exceptions=True
+    )
+
+    elapsed_time: float = time.perf_counter() - started_at
+
+    logger.info(
+        msg=f"Startup steps {list(steps)} finished in {elapsed_time:.3f} s."
+    )
+
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return dict(zip(steps, results))
+
+
+# -----------------------------------------------------------------------------
+async def validate_bot(bot: Bot) -> None:
+    """Validate the bot token by requesting the bot account.
+
+    The request also opens the HTTP session of the bot,
+    so that the first update is not served over a cold connection.
+
+    Args:
+        bot (Bot): Configured instance of `aiogram.Bot`.
+
+    Raises:
+        TelegramUnauthorizedError: If the token is rejected by Telegram.
+    """
+    bot_user = await bot.get_me()
+
+    logger.info(msg=f"Bot is authorized as @{bot_user.username}.")
+
+
+# -----------------------------------------------------------------------------
+def track_first_update(dispatcher: Dispatcher,
+                       started_at: float,
+                       is_forwarding: bool = False) -> None:
+    """Log the time from the process start to the first served update.
+
+    Args:
+        dispatcher (Dispatcher): Configured instance of `aiogram.Dispatcher`.
+        started_at (float): The `time.perf_counter` value taken at the process start.
+        is_forwarding (bool): Whether the dispatcher only forwards the updates to the workers,
+                              so the logged time is when the first update was forwarded,
+                              not when it was served. Defaults to False.
+    """
+    is_served: bool = False
+
+    async def first_update_middleware(handler: Callable[..., Awaitable[Any]],
+                                      event: Any,
+                                      data: Dict[str, Any]) -> Any:
+        nonlocal is_served
+
+        result: Any = await handler(event, data)
+
+        if not is_served:
+            is_served = True
+            elapsed_time: float = time.perf_counter() - started_at
+
+            if is_forwarding:
+                logger.info(
+                    msg=f"First update forwarded to the workers in {elapsed_time:.3f} s after the start."
+                )
+
+            else:
+                logger.info(
+                    msg=f"First update served in {elapsed_time:.3f} s after the start."
+                )
+
+        return result
+
+    dispatcher.update.outer_middleware(first_update_middleware)
@@ -0,0 +1,308 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `update_scheduler_handler` module bounds the concurrent processing of the Telegram updates,
+serializes the updates of each chat, and sheds the low priority updates under a backlog.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "UpdatePriority",
+    "UpdateScheduler",
+    "UpdateSchedulerStatistics",
+    "resolve_update_priority",
+    "logger"
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.1"
+
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+import asyncio
+import logging
+import time
+
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Dict, FrozenSet, Optional
+
+from common.bot_handling.worker_pool_handler import resolve_chat_id
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Update types that can wait, or be dropped, while the bot is overloaded.
+LOW_PRIORITY_UPDATE_TYPES: FrozenSet[str] = frozenset({
+    "edited_message",
+    "edited_channel_post",
+    "edited_business_message",
+    "message_reaction",
+    "message_reaction_count",
+    "poll",
+    "poll_answer",
+    "chat_boost",
+    "removed_chat_boost"
+})
+
+
+# _____________________________________________________________________________
+class UpdatePriority(IntEnum):
+    """Priority of an update under a backlog."""
+    LOW = 0
+    NORMAL = 1
+
+
+# -----------------------------------------------------------------------------
+def resolve_update_priority(update: Update) -> UpdatePriority:
+    """Return the priority of the update by its type.
+
+    Args:
+        update (Update): The received update.
+
+    Returns:
+        UpdatePriority: `LOW` for the types of `LOW_PRIORITY_UPDATE_TYPES`, otherwise `NORMAL`.
+    """
+    if update.event_type in LOW_PRIORITY_UPDATE_TYPES:
+        return UpdatePriority.LOW
+
+    return UpdatePriority.NORMAL
+
+
+# _____________________________________________________________________________
+@dataclass
+class UpdateSchedulerStatistics:
+    """Counters of the update scheduler.
+
+    Attributes:
+        in_flight (int): The number of updates being handled.
+        queued (int): The number of updates waiting for their chat or for a free slot.
+        max_queued (int): The largest number of waiting updates seen.
+        handled (int): The number of updates handled.
+        deferred (int): The number of low priority updates held back by a backlog.
+        shed (int): The number of low priority updates dropped by a backlog.
+        total_wait_time (float): The sum of the waits before the handlers, in seconds.
+        max_wait_time (float): The longest wait before a handler, in seconds.
+    """
+    in_flight: int = 0
+    queued: int = 0
+    max_queued: int = 0
+    handled: int = 0
+    deferred: int = 0
+    shed: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+
+    # -------------------------------------------------------------------------
+    @property
+    def average_wait_time(self) -> float:
+        """average_wait_time returns the average wait before a handler."""
+        if not self.handled:
+            return 0.0
+
+        return self.total_wait_time / self.handled
+
+
+# _____________________________________________________________________________
+class UpdateScheduler(BaseMiddleware):
+    """UpdateScheduler outer middleware of the update processing of a dispatcher.
+
+    The scheduler runs at most `max_in_flight` handlers at a time,
+    and at most one handler per chat, in the order the updates of the chat arrived.
+    The lock of a chat is dropped as soon as no update of the chat is waiting or running,
+    so the locks of idle chats do not pile up.
+
+    While the number of waiting updates is at the backlog threshold or above,
+    a low priority update is held back for up to `defer_timeout` seconds,
+    and dropped if the backlog has not drained by then.
+    It is held back in the place of its chat, so the later updates of the chat
+    wait behind it and an edit is never handled before the message it edits.
+
+    *The scheduler is registered as an outer middleware of the updates:
+    `dispatcher.update.outer_middleware(UpdateScheduler())`.
+
+    Attributes:
+        max_in_flight (int): The maximum number of handlers running at a time.
+        backlog_threshold (int): The number of waiting updates the low priority updates are shed at.
+        defer_timeout (float): Seconds a low priority update waits for the backlog to drain.
+        priority_resolver (Callable[[Update], UpdatePriority]): Returns the priority of an update.
+        statistics (UpdateSchedulerStatistics): The scheduler counters.
+        __slots (asyncio.Semaphore): The free handler slots.
+        __chat_locks (Dict[int, asyncio.Lock]): The locks of the chats with waiting or running updates.
+        __chat_lock_users (Dict[int, int]): The number of waiting and running updates of each chat.
+        __backlog_drained (asyncio.Event): Set while the waiting updates are below the backlog threshold.
+    """
+
+    max_in_flight: int
+    backlog_threshold: int
+    defer_timeout: float
+    priority_resolver: Callable[[Update], UpdatePriority]
+    statistics: UpdateSchedulerStatistics
+    __slots: asyncio.Semaphore
+    __chat_locks: Dict[int, asyncio.Lock]
+    __chat_lock_users: Dict[int, int]
+    __backlog_drained: asyncio.Event
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 max_in_flight: int = 100,
+                 backlog_threshold: int = 1000,
+                 defer_timeout: float = 5.0,
+                 priority_resolver: Callable[[Update], UpdatePriority] = (
+                     resolve_update_priority
+                 )) -> None:
+        """__init__ constructor.
+
+        Args:
+            max_in_flight (int): The maximum number of handlers running at a time. Defaults to 100.
+            backlog_threshold (int): The number of waiting updates the low priority updates are shed at. Defaults to 1000.
+            defer_timeout (float): Seconds a low priority update waits for the backlog to drain. Defaults to 5.0,
+                                   0 drops it at once.
+            priority_resolver (Callable[[Update], UpdatePriority]): Returns the priority of an update.
+                                                                    Defaults to `resolve_update_priority`.
+        """
+        self.max_in_flight = max_in_flight
+        self.backlog_threshold = backlog_threshold
+        self.defer_timeout = defer_timeout
+        self.priority_resolver = priority_resolver
+        self.statistics = UpdateSchedulerStatistics()
+        self.__slots = asyncio.Semaphore(value=max_in_flight)
+        self.__chat_locks = {}
+        self.__chat_lock_users = {}
+        self.__backlog_drained = asyncio.Event()
+        self.__backlog_drained.set()
+
+    # -------------------------------------------------------------------------
+    async def __call__(self,
+                       handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject,
+                       data: Dict[str, Any]) -> Any:
+        """Run the handler of the update once its chat and a slot are free.
+
+        Args:
+            handler (Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]]): The next step of the middleware chain.
+            event (TelegramObject): The received update.
+            data (Dict[str, Any]): The context data of the update.
+
+        Returns:
+            Any: The result of the handler; None if the update was shed.
+        """
+        if not isinstance(event, Update):
+            return await handler(event, data)
+
+        chat_id: int = resolve_chat_id(update=event)
+        chat_lock: asyncio.Lock = self.__use_chat_lock(chat_id=chat_id)
+        queued_at: float = time.perf_counter()
+        is_queued: bool = True
+
+        self.__change_queued(delta=1)
+
+        try:
+            async with chat_lock:
+                if (self.priority_resolver(event) == UpdatePriority.LOW
+                        and not await self.__wait_for_backlog()):
+                    self.statistics.shed += 1
+
+                    logger.warning(msg=f"Update id={event.update_id} is shed by the backlog!")
+
+                    return None
+
+                async with self.__slots:
+                    wait_time: float = time.perf_counter() - queued_at
+
+                    is_queued = False
+                    self.__change_queued(delta=-1)
+
+                    self.statistics.total_wait_time += wait_time
+                    self.statistics.max_wait_time = max(self.statistics.max_wait_time,
+                                                        wait_time)
+                    self.statistics.in_flight += 1
+
+                    try:
+                        return await handler(event, data)
+
+                    finally:
+                        self.statistics.in_flight -= 1
+                        self.statistics.handled += 1
+
+        finally:
+            if is_queued:
+                self.__change_queued(delta=-1)
+
+            self.__release_chat_lock(chat_id=chat_id)
+
+    # -------------------------------------------------------------------------
+    def get_statistics(self) -> UpdateSchedulerStatistics:
+        """Return the scheduler counters.
+
+        Returns:
+            UpdateSchedulerStatistics: The queue depth, the handler waits and the shed counters.
+        """
+        return self.statistics
+
+    # -------------------------------------------------------------------------
+    @property
+    def chat_lock_count(self) -> int:
+        """chat_lock_count returns the number of chats with waiting or running updates."""
+        return len(self.__chat_locks)
+
+    # -------------------------------------------------------------------------
+    async def __wait_for_backlog(self) -> bool:
+        if self.__backlog_drained.is_set():
+            return True
+
+        self.statistics.deferred += 1
+
+        # The deferred update is not a part of the backlog it waits for.
+        self.__change_queued(delta=-1)
+
+        try:
+            await asyncio.wait_for(self.__backlog_drained.wait(),
+                                   timeout=self.defer_timeout)
+
+        except asyncio.TimeoutError:
+            return False
+
+        finally:
+            self.__change_queued(delta=1)
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def __change_queued(self, delta: int) -> None:
+        self.statistics.queued += delta
+        self.statistics.max_queued = max(self.statistics.max_queued,
+                                         self.statistics.queued)
+
+        if self.statistics.queued >= self.backlog_threshold:
+            self.__backlog_drained.clear()
+
+        else:
+            self.__backlog_drained.set()
+
+    # -------------------------------------------------------------------------
+    def __use_chat_lock(self, chat_id: int) -> asyncio.Lock:
+        chat_lock: Optional[asyncio.Lock] = self.__chat_locks.get(chat_id)
+
+        if chat_lock is None:
+            chat_lock = asyncio.Lock()
+            self.__chat_locks[chat_id] = chat_lock
+
+        self.__chat_lock_users[chat_id] = self.__chat_lock_users.get(chat_id, 0) + 1
+
+        return chat_lock
+
+    # -------------------------------------------------------------------------
+    def __release_chat_lock(self, chat_id: int) -> None:
+        users: int = self.__chat_lock_users[chat_id] - 1
+
+        if users:
+            self.__chat_lock_users[chat_id] = users
+
+            return
+
+        del self.__chat_lock_users[chat_id]
+        del self.__chat_locks[chat_id]
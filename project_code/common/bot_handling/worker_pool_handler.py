@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `worker_pool_handler` module spreads the processing of the Telegram updates
+over several worker processes, keeping the order of the updates of each chat.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "WorkerPool",
+    "resolve_chat_id",
+    "logger"
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from aiogram import Bot, Dispatcher
+from aiogram.dispatcher.middlewares.user_context import UserContextMiddleware
+from aiogram.types import Update
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.context
+import multiprocessing.process
+import time
+
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Annotation for the function preparing the bot and the dispatcher of a worker.
+WorkerFactoryType = Callable[[], Awaitable[Tuple[Bot, Dispatcher]]]
+
+# Annotation for an update sent to a worker, of its chat id and the raw update;
+# None stops the worker.
+QueuedUpdateType = Optional[Tuple[int, Dict[str, Any]]]
+
+
+# -----------------------------------------------------------------------------
+def resolve_chat_id(update: Update) -> int:
+    """Return the id the update is routed by.
+
+    Args:
+        update (Update): The received update.
+
+    Returns:
+        int: The id of the chat of the update, or of its user if it has no chat,
+             or the update id if it has neither.
+    """
+    event_context = UserContextMiddleware.resolve_event_context(event=update)
+
+    if event_context.chat is not None:
+        return event_context.chat.id
+
+    if event_context.user is not None:
+        return event_context.user.id
+
+    return update.update_id
+
+
+# _____________________________________________________________________________
+class WorkerPool:
+    """WorkerPool class of the worker processes handling the updates.
+
+    The front process receives the updates, by polling or by webhook,
+    and queues each of them for the worker chosen by its chat id,
+    so all updates of a chat are handled by the same worker.
+    A worker handles the updates of different chats concurrently,
+    and the updates of the same chat one after another, in the order received.
+
+    Every worker prepares its own bot, dispatcher, database pools and caches,
+    with the worker factory, which must be a module-level function,
+    as the workers are spawned processes.
+
+    *The queued updates are kept in the front process,
+    and sent to a worker in batches, over a pipe of its own.
+    A crashed worker is restarted on its own, over a new pipe,
+    so the other workers are not affected and its queued updates are kept.
+    The updates already sent to the worker but not handled at the crash are lost.
+
+    Attributes:
+        worker_count (int): The number of worker processes.
+        worker_factory (WorkerFactoryType): Prepares the bot and the dispatcher of a worker.
+        restart_delay (float): Seconds to wait before restarting a crashed worker.
+        check_interval (float): Seconds between the checks of the workers.
+        restarts (List[int]): The number of restarts of each worker.
+        __context (multiprocessing.context.SpawnContext): Creates the processes and the pipes.
+        __pending_updates (List[Deque[QueuedUpdateType]]): The updates not yet sent to each worker.
+        __update_events (List[asyncio.Event]): Set when updates are queued for each worker.
+        __processes (List[Optional[multiprocessing.process.BaseProcess]]): The worker processes.
+        __connections (List[Optional[multiprocessing.connection.Connection]]): The sending ends of the pipes.
+        __sender_tasks (List[Optional[asyncio.Task]]): Send the queued updates to each worker.
+        __supervisor_task (Optional[asyncio.Task]): Restarts the crashed workers.
+    """
+
+    worker_count: int
+    worker_factory: WorkerFactoryType
+    restart_delay: float
+    check_interval: float
+    restarts: List[int]
+    __context: multiprocessing.context.SpawnContext
+    __pending_updates: List[Deque[QueuedUpdateType]]
+    __update_events: List[asyncio.Event]
+    __processes: List[Optional[multiprocessing.process.BaseProcess]]
+    __connections: List[Optional[multiprocessing.connection.Connection]]
+    __sender_tasks: List[Optional["asyncio.Task[None]"]]
+    __supervisor_task: Optional["asyncio.Task[None]"]
+
+    # -------------------------------------------------------------------------
+    def __init__(self,
+                 worker_count: int,
+                 worker_factory: WorkerFactoryType,
+                 restart_delay: float = 1.0,
+                 check_interval: float = 1.0) -> None:
+        """__init__ constructor.
+
+        Args:
+            worker_count (int): The number of worker processes, e.g. the number of CPU cores.
+            worker_factory (WorkerFactoryType): Prepares the bot and the dispatcher of a worker.
+            restart_delay (float): Seconds to wait before restarting a crashed worker. Defaults to 1.0.
+            check_interval (float): Seconds between the checks of the workers. Defaults to 1.0.
+
+        Raises:
+            ValueError: If the number of workers is less than one.
+        """
+        if worker_count < 1:
+            raise ValueError("Worker pool needs at least one worker!")
+
+        self.worker_count = worker_count
+        self.worker_factory = worker_factory
+        self.restart_delay = restart_delay
+        self.check_interval = check_interval
+        self.restarts = [0] * worker_count
+        self.__context = multiprocessing.get_context("spawn")
+        self.__pending_updates = [deque() for _ in range(worker_count)]
+        self.__update_events = [asyncio.Event() for _ in range(worker_count)]
+        self.__processes = [None] * worker_count
+        self.__connections = [None] * worker_count
+        self.__sender_tasks = [None] * worker_count
+        self.__supervisor_task = None
+
+    # -------------------------------------------------------------------------
+    def attach(self, dispatcher: Dispatcher) -> None:
+        """Make the dispatcher of the front process forward the updates to the workers.
+
+        The workers are started on the dispatcher startup and stopped on its shutdown.
+
+        Args:
+            dispatcher (Dispatcher): The dispatcher receiving the updates in the front process.
+        """
+        async def forward_update_middleware(handler: Callable[..., Awaitable[Any]],
+                                            event: Update,
+                                            data: Dict[str, Any]) -> None:
+            self.submit(update=event)
+
+        dispatcher.update.outer_middleware(forward_update_middleware)
+        dispatcher.startup.register(self.start)
+        dispatcher.shutdown.register(self.stop)
+
+    # -------------------------------------------------------------------------
+    def submit(self, update: Update) -> None:
+        """Queue the update for the worker of its chat.
+
+        Args:
+            update (Update): The received update.
+        """
+        chat_id: int = resolve_chat_id(update=update)
+
+        self.__queue(worker_index=chat_id % self.worker_count,
+                     queued_update=(chat_id,
+                                    update.model_dump(mode="json", exclude_unset=True)))
+
+    # -------------------------------------------------------------------------
+    def get_queue_depths(self) -> List[int]:
+        """Return the number of updates not yet sent to each worker.
+
+        Returns:
+            List[int]: The number of queued updates, by worker.
+        """
+        return [len(pending_updates) for pending_updates in self.__pending_updates]
+
+    # -------------------------------------------------------------------------
+    async def start(self) -> None:
+        """Start the worker processes and their supervision."""
+        for worker_index in range(self.worker_count):
+            self.__start_worker(worker_index=worker_index)
+
+        self.__supervisor_task = asyncio.create_task(self.__supervise())
+
+        logger.info(msg=f"Worker pool started {self.worker_count} workers.")
+
+    # -------------------------------------------------------------------------
+    async def stop(self, timeout: float = 30.0) -> None:
+        """Stop the workers once they have handled their queued updates.
+
+        Args:
+            timeout (float): Seconds the workers are given to finish,
+                             before they are terminated. Defaults to 30.0.
+        """
+        if self.__supervisor_task is not None:
+            self.__supervisor_task.cancel()
+            self.__supervisor_task = None
+
+        for worker_index in range(self.worker_count):
+            self.__queue(worker_index=worker_index, queued_update=None)
+
+        deadline: float = time.monotonic() + timeout
+
+        for worker_index, process in enumerate(self.__processes):
+            if process is None:
+                continue
+
+            await asyncio.to_thread(process.join,
+                                    max(deadline - time.monotonic(), 0.0))
+
+            if process.is_alive():
+                logger.warning(
+                    msg=f"Worker {worker_index} did not stop in time, terminating!"
+                )
+                process.terminate()
+
+            self.__stop_sender(worker_index=worker_index)
+            self.__processes[worker_index] = None
+
+        logger.info(msg="Worker pool stopped.")
+
+    # -------------------------------------------------------------------------
+    def __queue(self, worker_index: int, queued_update: QueuedUpdateType) -> None:
+        self.__pending_updates[worker_index].append(queued_update)
+        self.__update_events[worker_index].set()
+
+    # -------------------------------------------------------------------------
+    def __start_worker(self, worker_index: int) -> None:
+        # A new pipe for every process, as a crash may leave a message half read.
+        receiving_connection, sending_connection = self.__context.Pipe(duplex=False)
+
+        process = self.__context.Process(
+            target=_run_worker,
+            args=(worker_index, receiving_connection, self.worker_factory),
+            name=f"update-worker-{worker_index}",
+            daemon=True
+        )
+        process.start()
+        receiving_connection.close()
+
+        self.__processes[worker_index] = process
+        self.__connections[worker_index] = sending_connection
+        self.__sender_tasks[worker_index] = asyncio.create_task(
+            self.__send_updates(worker_index=worker_index,
+                                connection=sending_connection)
+        )
+
+    # -------------------------------------------------------------------------
+    def __stop_sender(self, worker_index: int) -> None:
+        sender_task: Optional["asyncio.Task[None]"] = self.__sender_tasks[worker_index]
+        connection: Optional[multiprocessing.connection.Connection] = (
+            self.__connections[worker_index]
+        )
+
+        if sender_task is not None:
+            sender_task.cancel()
+
+        # Closing the pipe also fails a send blocked on a dead worker.
+        if connection is not None:
+            connection.close()
+
+        self.__sender_tasks[worker_index] = None
+        self.__connections[worker_index] = None
+
+    # -------------------------------------------------------------------------
+    async def __send_updates(self,
+                             worker_index: int,
+                             connection: multiprocessing.connection.Connection) -> None:
+        pending_updates: Deque[QueuedUpdateType] = self.__pending_updates[worker_index]
+        update_event: asyncio.Event = self.__update_events[worker_index]
+
+        while True:
+            while not pending_updates:
+                update_event.clear()
+                await update_event.wait()
+
+            batch: List[QueuedUpdateType] = list(pending_updates)
+
+            try:
+                await asyncio.to_thread(connection.send, batch)
+
+            except (OSError, ValueError):
+                # The batch stays queued for the restarted worker.
+                return
+
+            for _ in batch:
+                pending_updates.popleft()
+
+    # -------------------------------------------------------------------------
+    async def __supervise(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+
+            for worker_index, process in enumerate(self.__processes):
+                if process is None or process.is_alive():
+                    continue
+
+                logger.error(
+                    msg=(f"Worker {worker_index} exited with code {process.exitcode}, "
+                         f"restarting in {self.restart_delay} s!")
+                )
+
+                self.__stop_sender(worker_index=worker_index)
+
+                await asyncio.sleep(self.restart_delay)
+
+                self.restarts[worker_index] += 1
+                self.__start_worker(worker_index=worker_index)
+
+
+# -----------------------------------------------------------------------------
+def _run_worker(worker_index: int,
+                connection: multiprocessing.connection.Connection,
+                worker_factory: WorkerFactoryType) -> None:
+    asyncio.run(_serve_updates(worker_index=worker_index,
+                               connection=connection,
+                               worker_factory=worker_factory))
+
+
+# -----------------------------------------------------------------------------
+async def _serve_updates(worker_index: int,
+                         connection: multiprocessing.connection.Connection,
+                         worker_factory: WorkerFactoryType) -> None:
+    bot, dispatcher = await worker_factory()
+    # The last handling task of each chat, the next update of the chat waits for it.
+    chat_tails: Dict[int, "asyncio.Task[None]"] = {}
+
+    async def handle_update(raw_update: Dict[str, Any],
+                            previous_task: Optional["asyncio.Task[None]"]) -> None:
+        if previous_task is not None:
+            await asyncio.wait([previous_task])
+
+        try:
+            await dispatcher.feed_raw_update(bot, raw_update)
+
+        except Exception:
+            logger.exception(
+                msg=f"Worker {worker_index} failed to handle an update!"
+            )
+
+    def forget_tail(chat_id: int, task: "asyncio.Task[None]") -> None:
+        if chat_tails.get(chat_id) is task:
+            del chat_tails[chat_id]
+
+    await dispatcher.emit_startup(bot=bot, dispatcher=dispatcher)
+
+    logger.info(msg=f"Worker {worker_index} is ready.")
+
+    try:
+        is_stopped: bool = False
+
+        while not is_stopped:
+            try:
+                batch: List[QueuedUpdateType] = await asyncio.to_thread(connection.recv)
+
+            except EOFError:
+                break
+
+            for queued_update in batch:
+                if queued_update is None:
+                    is_stopped = True
+                    break
+
+                chat_id, raw_update = queued_update
+                task: "asyncio.Task[None]" = asyncio.create_task(
+                    handle_update(raw_update=raw_update,
+                                  previous_task=chat_tails.get(chat_id))
+                )
+                chat_tails[chat_id] = task
+                task.add_done_callback(functools.partial(forget_tail, chat_id))
+
+        if chat_tails:
+            await asyncio.wait(list(chat_tails.values()))
+
+    finally:
+        await dispatcher.emit_shutdown(bot=bot, dispatcher=dispatcher)
+        await bot.session.close()
@@ -8,12 +8,58 @@ Copyright 2024 4-proxy
 Apache license, version 2.0 (Apache-2.0 license)
 """
 
-__all__: list[str] = ["BotConfigDTO"]
+__all__: list[str] = [
+    "BotConfigDTO",
+    "WebhookConfigDTO"
+]
 
 __author__ = "4-proxy"
-__version__ = "1.1.1"
+__version__ = "1.6.1"
+
+import re
 
 from dataclasses import dataclass
+from typing import Optional, Pattern
+
+
+# Telegram accepts secret tokens of 1-256 letters, digits, `_` and `-`.
+SECRET_TOKEN_PATTERN: Pattern[str] = re.compile(r"[A-Za-z0-9_-]{1,256}")
+
+
+# _____________________________________________________________________________
+@dataclass(frozen=True)
+class WebhookConfigDTO:
+    """Data structure for storing the webhook settings of a Telegram bot.
+
+    *Every instance behind a load balancer sets the same webhook on its startup,
+    so only one of them should delete it on the shutdown, or none at all.
+
+    Attributes:
+        url (str): The public HTTPS URL Telegram sends the updates to.
+        secret_token (str): The secret Telegram sends in the `X-Telegram-Bot-Api-Secret-Token` header.
+        host (str): The interface the webhook server listens on.
+        port (int): The port the webhook server listens on.
+        path (str): The path of the webhook route on the server.
+        drop_pending_updates (bool): Whether to drop the updates queued by Telegram before the startup.
+        delete_on_shutdown (bool): Whether to delete the webhook on the shutdown.
+
+    Raises:
+        ValueError: If the secret token has a format Telegram does not accept.
+    """
+    url: str
+    secret_token: str
+    host: str = "0.0.0.0"
+    port: int = 8080
+    path: str = "/webhook"
+    drop_pending_updates: bool = False
+    delete_on_shutdown: bool = True
+
+    # -------------------------------------------------------------------------
+    def __post_init__(self) -> None:
+        if not SECRET_TOKEN_PATTERN.fullmatch(self.secret_token):
+            raise ValueError(
+                "Webhook secret token must be 1-256 letters, digits, _ or -!"
+            )
 
 
 # _____________________________________________________________________________
@@ -27,7 +73,31 @@ class BotConfigDTO:
         api_token (str): The API token used for authenticating the bot with the Telegram API.
         owner_chat_id (str): The unique identifier of the chat where the bot owner resides.
         debug (bool): A flag indicating whether the bot is running in debug mode, which may enable additional logging or features.
+        webhook (Optional[WebhookConfigDTO]): The webhook settings, if the bot receives updates by webhook; None if it uses long polling.
+        workers (int): The number of worker processes handling the updates; 0 if they are handled in the receiving process.
+        max_in_flight_updates (int): The maximum number of updates handled at a time, per process handling them.
+        update_backlog_threshold (int): The number of waiting updates the low priority updates are shed at.
+        global_send_rate (float): The maximum number of messages sent per second, over all chats.
+        chat_send_rate (float): The maximum number of messages sent per second, to a single chat.
     """
     api_token: str
     owner_chat_id: str
     debug: bool
+    webhook: Optional[WebhookConfigDTO] = None
+    workers: int = 0
+    max_in_flight_updates: int = 100
+    update_backlog_threshold: int = 1000
+    global_send_rate: float = 30.0
+    chat_send_rate: float = 1.0
+
+    # -------------------------------------------------------------------------
+    @property
+    def process_send_rate(self) -> float:
+        """process_send_rate returns the share of the global send rate of each process.
+
+        Every process has its own bot session and send scheduler,
+        so the global send rate is split evenly between the workers and the receiving process,
+        which still sends the bot state notifications to the owner.
+        The chats are pinned to the workers, so the chat send rate is not split.
+        """
+        return self.global_send_rate / (max(self.workers, 0) + 1)
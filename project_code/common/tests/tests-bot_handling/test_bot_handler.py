@@ -9,16 +9,18 @@ Apache license, version 2.0 (Apache-2.0 license)
 """
 
 __author__ = "4-proxy"
-__version__ = "1.1.1"
+__version__ = "1.2.1"
 
 import unittest
 
+import unittest.mock as UnitMock
+
 import aiogram
 import asyncio
 
 from common.bot_handling import bot_handler
 
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 
 # _____________________________________________________________________________
@@ -239,3 +241,104 @@ class TestRunBotNegative(unittest.IsolatedAsyncioTestCase):
             # Operate
             await self.tested_function(bot=test_bot,
                                        dispatcher=test_dispatcher)
+
+
+# _____________________________________________________________________________
+class TestCreateWebhookApplication(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        from aiohttp.test_utils import TestClient, TestServer
+        from common.external_handling.bot_config_handler import WebhookConfigDTO
+
+        await super().asyncSetUp()
+
+        self.test_bot = aiogram.Bot(token="0000:xxxx")
+        self.test_dispatcher = aiogram.Dispatcher()
+        self.webhook_config = WebhookConfigDTO(url="https://example.com/webhook",
+                                               secret_token="test_secret")
+
+        self.test_bot.set_webhook = UnitMock.AsyncMock(return_value=True)  # type: ignore
+        self.test_bot.delete_webhook = UnitMock.AsyncMock(return_value=True)  # type: ignore
+        self.test_dispatcher.feed_raw_update = UnitMock.AsyncMock()  # type: ignore
+
+        application = await bot_handler.create_webhook_application(
+            bot=self.test_bot,
+            dispatcher=self.test_dispatcher,
+            webhook_config=self.webhook_config
+        )
+
+        self.test_client = TestClient(TestServer(application))
+        await self.test_client.start_server()
+
+    # -------------------------------------------------------------------------
+    async def asyncTearDown(self) -> None:
+        await self.test_client.close()
+        await super().asyncTearDown()
+
+    # -------------------------------------------------------------------------
+    async def test_webhook_is_set_on_startup(self) -> None:
+        # Check
+        self.test_bot.set_webhook.assert_awaited_once()  # type: ignore
+
+        call_kwargs: Dict[str, Any] = self.test_bot.set_webhook.call_args.kwargs  # type: ignore
+
+        self.assertEqual(first=call_kwargs["url"],
+                         second=self.webhook_config.url)
+        self.assertEqual(first=call_kwargs["secret_token"],
+                         second=self.webhook_config.secret_token)
+
+    # -------------------------------------------------------------------------
+    async def test_request_without_secret_token_is_rejected(self) -> None:
+        # Operate
+        response = await self.test_client.post(path=self.webhook_config.path,
+                                                json={"update_id": 1})
+
+        # Check
+        self.assertEqual(first=response.status,
+                         second=401)
+        self.test_dispatcher.feed_raw_update.assert_not_awaited()  # type: ignore
+
+    # -------------------------------------------------------------------------
+    async def test_update_is_acknowledged_and_processed(self) -> None:
+        # Build
+        headers: Dict[str, str] = {
+            "X-Telegram-Bot-Api-Secret-Token": self.webhook_config.secret_token
+        }
+
+        # Operate
+        response = await self.test_client.post(path=self.webhook_config.path,
+                                                json={"update_id": 1},
+                                                headers=headers)
+        await asyncio.sleep(0)
+
+        # Check
+        self.assertEqual(first=response.status,
+                         second=200)
+        self.test_dispatcher.feed_raw_update.assert_awaited_once()  # type: ignore
+
+    # -------------------------------------------------------------------------
+    async def test_webhook_is_deleted_on_shutdown(self) -> None:
+        # Operate
+        await self.test_client.close()
+
+        # Check
+        self.test_bot.delete_webhook.assert_awaited_once_with()  # type: ignore
+
+    # -------------------------------------------------------------------------
+    async def test_session_is_closed_after_the_dispatcher_shutdown(self) -> None:
+        # Build
+        events: List[str] = []
+
+        async def on_shutdown() -> None:
+            events.append("dispatcher shutdown")
+
+        self.test_dispatcher.shutdown.register(on_shutdown)
+        self.test_bot.session.close = UnitMock.AsyncMock(  # type: ignore
+            side_effect=lambda: events.append("session closed")
+        )
+
+        # Operate
+        await self.test_client.close()
+
+        # Check
+        self.assertEqual(first=events,
+                         second=["dispatcher shutdown", "session closed"])
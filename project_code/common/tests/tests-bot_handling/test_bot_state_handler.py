@@ -9,7 +9,7 @@ Apache license, version 2.0 (Apache-2.0 license)
 """
 
 __author__ = "4-proxy"
-__version__ = "1.1.0"
+__version__ = "1.2.0"
 
 import unittest
 
@@ -122,3 +122,26 @@ class TestBotStateHandler(unittest.IsolatedAsyncioTestCase):
 
         # Check
         mock_logger_info.assert_called_once_with(expected_message_text)
+
+    # -------------------------------------------------------------------------
+    @UnitMock.patch("aiogram.Bot", new_callable=UnitMock.AsyncMock)
+    async def test_shutdown_callbacks_awaited_at_shutdown(self,
+                                                          MockBot: UnitMock.AsyncMock) -> None:
+        # Build
+        first_callback = UnitMock.AsyncMock(side_effect=RuntimeError("flush failed"))
+        second_callback = UnitMock.AsyncMock()
+
+        self._WorkflowData.current_bot = MockBot.return_value
+        self._WorkflowData.owner_chat_id = "987654321"
+        self._WorkflowData.shutdown_callbacks = [first_callback, second_callback]
+
+        # Operate
+        try:
+            await self.tested_function_shutdown()
+
+        finally:
+            self._WorkflowData.shutdown_callbacks = []
+
+        # Check
+        first_callback.assert_awaited_once_with()
+        second_callback.assert_awaited_once_with()
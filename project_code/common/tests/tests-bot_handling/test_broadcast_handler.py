@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_broadcast_handler`, a set of test cases used to control the performance
+and quality of the `broadcast_handler` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+import unittest.mock as UnitMock
+
+from aiogram.exceptions import TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+from common.bot_handling import broadcast_handler
+from common.bot_handling.broadcast_handler import BroadcastCheckpoint
+from common.workflow_intermediary import WorkflowIntermediary
+
+from typing import Any, Dict, List, Optional, Sequence
+
+
+# _____________________________________________________________________________
+class FakeBroadcastStorage(broadcast_handler.BroadcastStorage):
+    def __init__(self, chat_ids: List[int]) -> None:
+        super().__init__(database_api=None)
+        self.chat_ids = chat_ids
+        self.checkpoints: Dict[str, BroadcastCheckpoint] = {}
+        self.unreachable_chat_ids: List[int] = []
+        self.fetched_after: List[int] = []
+
+    # -------------------------------------------------------------------------
+    async def fetch_recipients(self, after_chat_id: int, limit: int) -> List[int]:
+        self.fetched_after.append(after_chat_id)
+
+        return [chat_id for chat_id in self.chat_ids
+                if chat_id > after_chat_id
+                and chat_id not in self.unreachable_chat_ids][:limit]
+
+    # -------------------------------------------------------------------------
+    async def count_recipients(self, after_chat_id: int) -> int:
+        return len(await self.fetch_recipients(after_chat_id=after_chat_id,
+                                               limit=len(self.chat_ids)))
+
+    # -------------------------------------------------------------------------
+    async def flag_unreachable(self, chat_ids: Sequence[int]) -> None:
+        self.unreachable_chat_ids.extend(chat_ids)
+
+    # -------------------------------------------------------------------------
+    async def load_checkpoint(self, job_id: str) -> Optional[BroadcastCheckpoint]:
+        return self.checkpoints.get(job_id)
+
+    # -------------------------------------------------------------------------
+    async def create_checkpoint(self, checkpoint: BroadcastCheckpoint) -> None:
+        self.checkpoints[checkpoint.job_id] = checkpoint
+
+    # -------------------------------------------------------------------------
+    async def save_checkpoint(self, checkpoint: BroadcastCheckpoint) -> None:
+        self.checkpoints[checkpoint.job_id] = checkpoint
+
+
+# _____________________________________________________________________________
+class TestBroadcaster(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.test_bot = UnitMock.AsyncMock()
+        self.sent_to: List[int] = []
+
+        async def send_message(chat_id: Any, text: str) -> Any:
+            if chat_id == 3:
+                raise TelegramForbiddenError(method=SendMessage(chat_id=chat_id, text=text),
+                                             message="Forbidden: bot was blocked by the user")
+
+            self.sent_to.append(chat_id)
+
+            return UnitMock.MagicMock()
+
+        self.test_bot.send_message.side_effect = send_message
+
+        owner_patcher = UnitMock.patch.object(target=WorkflowIntermediary,
+                                              attribute="owner_chat_id",
+                                              new="owner",
+                                              create=True)
+        owner_patcher.start()
+        self.addCleanup(owner_patcher.stop)
+
+    # -------------------------------------------------------------------------
+    async def test_all_recipients_are_sent_and_blocked_ones_flagged(self) -> None:
+        # Build
+        storage = FakeBroadcastStorage(chat_ids=[1, 2, 3, 4, 5])
+        broadcaster = broadcast_handler.Broadcaster(bot=self.test_bot,
+                                                    storage=storage,
+                                                    chunk_size=2)
+
+        # Operate
+        checkpoint: BroadcastCheckpoint = await broadcaster.run(job_id="promo",
+                                                                text="Sale!")
+
+        # Check
+        self.assertEqual(first=[chat_id for chat_id in self.sent_to if chat_id != "owner"],
+                         second=[1, 2, 4, 5])
+        self.assertEqual(first=storage.unreachable_chat_ids,
+                         second=[3])
+        self.assertEqual(first=storage.fetched_after[1:],
+                         second=[0, 2, 4, 5])
+        self.assertEqual(first=checkpoint,
+                         second=BroadcastCheckpoint(job_id="promo", last_chat_id=5, sent=4,
+                                                    failed=0, unreachable=1, is_finished=True))
+
+    # -------------------------------------------------------------------------
+    async def test_interrupted_broadcast_resumes_after_checkpoint(self) -> None:
+        # Build
+        storage = FakeBroadcastStorage(chat_ids=[1, 2, 4, 5])
+        storage.checkpoints["promo"] = BroadcastCheckpoint(job_id="promo",
+                                                           last_chat_id=2,
+                                                           sent=2)
+        broadcaster = broadcast_handler.Broadcaster(bot=self.test_bot,
+                                                    storage=storage)
+
+        # Operate
+        checkpoint: BroadcastCheckpoint = await broadcaster.run(job_id="promo",
+                                                                text="Sale!")
+
+        # Check
+        self.assertEqual(first=[chat_id for chat_id in self.sent_to if chat_id != "owner"],
+                         second=[4, 5])
+        self.assertEqual(first=checkpoint.sent,
+                         second=4)
+
+    # -------------------------------------------------------------------------
+    async def test_finished_broadcast_is_not_sent_again(self) -> None:
+        # Build
+        storage = FakeBroadcastStorage(chat_ids=[1, 2])
+        storage.checkpoints["promo"] = BroadcastCheckpoint(job_id="promo",
+                                                           is_finished=True)
+        broadcaster = broadcast_handler.Broadcaster(bot=self.test_bot,
+                                                    storage=storage)
+
+        # Operate
+        await broadcaster.run(job_id="promo", text="Sale!")
+
+        # Check
+        self.test_bot.send_message.assert_not_awaited()
+
+
+# _____________________________________________________________________________
+class TestBroadcastStorage(unittest.IsolatedAsyncioTestCase):
+    async def test_unreachable_users_are_flagged_by_one_query(self) -> None:
+        # Build
+        database_api = UnitMock.AsyncMock()
+        storage = broadcast_handler.BroadcastStorage(database_api=database_api)
+
+        # Operate
+        await storage.flag_unreachable(chat_ids=[3, 7, 9])
+
+        # Check
+        database_api.execute.assert_awaited_once_with(
+            query="UPDATE users SET is_reachable = %s WHERE chat_id IN (%s, %s, %s)",
+            parameters=(False, 3, 7, 9)
+        )
+
+    # -------------------------------------------------------------------------
+    def test_invalid_table_name_raises_ValueError(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            broadcast_handler.BroadcastStorage(database_api=UnitMock.AsyncMock(),
+                                               users_table="users; DROP TABLE users")
+
+
+# _____________________________________________________________________________
+class TestFormatBroadcastProgress(unittest.TestCase):
+    def test_eta_is_remaining_by_rate(self) -> None:
+        # Build
+        checkpoint = BroadcastCheckpoint(job_id="promo", sent=100)
+
+        # Operate
+        report: str = broadcast_handler.format_broadcast_progress(checkpoint=checkpoint,
+                                                                  remaining=3600,
+                                                                  rate=2.0)
+
+        # Check
+        self.assertIn(member="Throughput: 2.0 msg/s, ETA: 0:30:00.",
+                      container=report)
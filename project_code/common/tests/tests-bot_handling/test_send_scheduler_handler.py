@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_send_scheduler_handler`, a set of test cases used to control the performance
+and quality of the `send_scheduler_handler` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+import unittest.mock as UnitMock
+
+import aiogram
+import asyncio
+import time
+
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import GetMe, SendMessage
+
+from common.bot_handling import send_scheduler_handler
+from common.bot_handling.send_scheduler_handler import SendPriority
+
+from typing import Any, List
+
+
+# _____________________________________________________________________________
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_is_bounded_by_capacity(self) -> None:
+        # Build
+        bucket = send_scheduler_handler.TokenBucket(rate=1.0, capacity=2.0)
+
+        # Operate
+        delays: List[float] = [bucket.consume() for _ in range(3)]
+
+        # Check
+        self.assertEqual(first=delays[:2],
+                         second=[0.0, 0.0])
+        self.assertGreater(a=delays[2],
+                           b=0.0)
+
+
+# _____________________________________________________________________________
+class TestSendScheduler(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.test_bot = aiogram.Bot(token="0000:xxxx")
+        self.sent: List[Any] = []
+
+        async def make_request(bot: aiogram.Bot, method: Any) -> Any:
+            self.sent.append(method)
+
+            return UnitMock.sentinel.response
+
+        self.make_request = make_request
+
+    # -------------------------------------------------------------------------
+    async def test_other_methods_are_not_paced(self) -> None:
+        # Build
+        send_scheduler = send_scheduler_handler.SendScheduler(global_rate=1.0)
+
+        # Operate
+        for _ in range(3):
+            await send_scheduler(self.make_request, self.test_bot, GetMe())
+
+        # Check
+        self.assertEqual(first=len(self.sent),
+                         second=3)
+        self.assertEqual(first=sum(send_scheduler.get_statistics().sent.values()),
+                         second=0)
+
+    # -------------------------------------------------------------------------
+    async def test_messages_of_a_chat_are_spaced(self) -> None:
+        # Build
+        send_scheduler = send_scheduler_handler.SendScheduler(global_rate=100.0,
+                                                              chat_rate=20.0)
+        started_at: float = time.monotonic()
+
+        # Operate
+        await asyncio.gather(*(
+            send_scheduler(self.make_request, self.test_bot,
+                           SendMessage(chat_id=1, text=str(index)))
+            for index in range(3)
+        ))
+        await send_scheduler.close()
+
+        # Check
+        self.assertGreaterEqual(a=time.monotonic() - started_at,
+                                b=0.09)
+        self.assertEqual(first=[method.text for method in self.sent],
+                         second=["0", "1", "2"])
+
+    # -------------------------------------------------------------------------
+    async def test_higher_priority_lane_is_served_first(self) -> None:
+        # Build
+        send_scheduler = send_scheduler_handler.SendScheduler(global_rate=10.0,
+                                                              chat_rate=1000.0)
+
+        async def send(chat_id: int, priority: SendPriority) -> None:
+            with send_scheduler_handler.send_priority(priority=priority):
+                await send_scheduler(self.make_request, self.test_bot,
+                                     SendMessage(chat_id=chat_id, text=priority.name))
+
+        # The first messages take the burst tokens, the others wait in their lanes.
+        for chat_id in range(10):
+            await send(chat_id=chat_id, priority=SendPriority.BULK)
+
+        self.sent.clear()
+
+        # Operate
+        await asyncio.gather(send(chat_id=10, priority=SendPriority.BULK),
+                             send(chat_id=11, priority=SendPriority.INTERACTIVE))
+        await send_scheduler.close()
+
+        # Check
+        self.assertEqual(first=[method.text for method in self.sent],
+                         second=["INTERACTIVE", "BULK"])
+
+    # -------------------------------------------------------------------------
+    async def test_retry_after_pauses_only_its_lane(self) -> None:
+        # Build
+        send_scheduler = send_scheduler_handler.SendScheduler(global_rate=1000.0,
+                                                              chat_rate=1000.0)
+        is_throttled: List[bool] = [True]
+
+        async def make_request(bot: aiogram.Bot, method: Any) -> Any:
+            if method.text == "BULK" and is_throttled.pop(0):
+                raise TelegramRetryAfter(method=method, message="", retry_after=1)
+
+            self.sent.append(method)
+
+            return UnitMock.sentinel.response
+
+        async def send(chat_id: int, priority: SendPriority) -> None:
+            with send_scheduler_handler.send_priority(priority=priority):
+                await send_scheduler(make_request, self.test_bot,
+                                     SendMessage(chat_id=chat_id, text=priority.name))
+
+        # Operate
+        bulk_task = asyncio.create_task(send(chat_id=1, priority=SendPriority.BULK))
+        await asyncio.sleep(0.1)
+        await send(chat_id=2, priority=SendPriority.INTERACTIVE)
+
+        interactive_sent: List[str] = [method.text for method in self.sent]
+
+        is_throttled.append(False)
+        await bulk_task
+        await send_scheduler.close()
+
+        # Check
+        self.assertEqual(first=interactive_sent,
+                         second=["INTERACTIVE"])
+        self.assertEqual(first=[method.text for method in self.sent],
+                         second=["INTERACTIVE", "BULK"])
+        self.assertEqual(first=send_scheduler.get_statistics().retry_afters[SendPriority.BULK],
+                         second=1)
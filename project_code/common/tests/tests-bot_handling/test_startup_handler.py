@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_startup_handler`, a set of test cases used to control the performance
+and quality of the `startup_handler` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import unittest
+
+import unittest.mock as UnitMock
+
+import asyncio
+import time
+
+from common.bot_handling import startup_handler
+
+from typing import Any, Dict
+
+
+# _____________________________________________________________________________
+class TestRunStartupSteps(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.tested_function = startup_handler.run_startup_steps
+
+    # -------------------------------------------------------------------------
+    async def test_steps_run_concurrently(self) -> None:
+        # Build
+        async def slow_step() -> str:
+            await asyncio.sleep(0.2)
+
+            return "done"
+
+        steps = {"first": slow_step, "second": slow_step, "third": slow_step}
+        expected_results = {"first": "done", "second": "done", "third": "done"}
+
+        # Operate
+        started_at: float = time.perf_counter()
+        results: Dict[str, Any] = await self.tested_function(steps=steps)
+        elapsed_time: float = time.perf_counter() - started_at
+
+        # Check
+        self.assertEqual(first=results,
+                         second=expected_results)
+        self.assertLess(a=elapsed_time, b=0.5)
+
+    # -------------------------------------------------------------------------
+    async def test_step_timeout_raises_after_all_steps(self) -> None:
+        # Build
+        fast_step = UnitMock.AsyncMock(return_value=None)
+
+        async def hanging_step() -> None:
+            await asyncio.sleep(10)
+
+        steps = {"hanging": hanging_step, "fast": fast_step}
+
+        # Operate
+        # Check
+        with self.assertRaises(expected_exception=asyncio.TimeoutError):
+            await self.tested_function(steps=steps, timeout=0.05)
+
+        fast_step.assert_awaited_once_with()
+
+    # -------------------------------------------------------------------------
+    async def test_step_timeout_can_be_overridden(self) -> None:
+        # Build
+        async def slow_step() -> str:
+            await asyncio.sleep(0.1)
+
+            return "done"
+
+        steps = {"slow": slow_step, "fast": UnitMock.AsyncMock(return_value="done")}
+
+        # Operate
+        results: Dict[str, Any] = await self.tested_function(steps=steps,
+                                                             timeout=0.05,
+                                                             step_timeouts={"slow": None})
+
+        # Check
+        self.assertEqual(first=results,
+                         second={"slow": "done", "fast": "done"})
+
+    # -------------------------------------------------------------------------
+    async def test_step_error_is_raised(self) -> None:
+        # Build
+        failed_step = UnitMock.AsyncMock(side_effect=ConnectionError("no database"))
+        steps = {"database": failed_step}
+
+        # Operate
+        # Check
+        with self.assertRaises(expected_exception=ConnectionError):
+            await self.tested_function(steps=steps)
+
+    # -------------------------------------------------------------------------
+    @UnitMock.patch.object(target=startup_handler.logger,
+                           attribute="info", autospec=True)
+    async def test_step_timing_is_logged(self,
+                                         mock_logger_info: UnitMock.MagicMock) -> None:
+        # Build
+        steps = {"cache": UnitMock.AsyncMock(return_value=None)}
+
+        # Operate
+        await self.tested_function(steps=steps)
+
+        # Check
+        logged_messages = [call.kwargs["msg"]
+                           for call in mock_logger_info.call_args_list]
+
+        self.assertTrue(
+            expr=any(message.startswith("Startup step 'cache' finished in")
+                     for message in logged_messages),
+            msg=f"Failure! Step timing is not logged: {logged_messages}"
+        )
+
+
+# _____________________________________________________________________________
+class TestValidateBot(unittest.IsolatedAsyncioTestCase):
+    @UnitMock.patch("aiogram.Bot", new_callable=UnitMock.AsyncMock)
+    async def test_get_me_is_requested(self,
+                                       MockBot: UnitMock.AsyncMock) -> None:
+        # Build
+        test_bot: UnitMock.AsyncMock = MockBot.return_value
+
+        # Operate
+        await startup_handler.validate_bot(bot=test_bot)
+
+        # Check
+        test_bot.get_me.assert_awaited_once_with()
+
+
+# _____________________________________________________________________________
+class TestTrackFirstUpdate(unittest.IsolatedAsyncioTestCase):
+    @UnitMock.patch.object(target=startup_handler.logger,
+                           attribute="info", autospec=True)
+    async def test_only_first_update_is_logged(self,
+                                               mock_logger_info: UnitMock.MagicMock) -> None:
+        # Build
+        test_dispatcher = UnitMock.MagicMock()
+        handler = UnitMock.AsyncMock(return_value="handled")
+
+        startup_handler.track_first_update(dispatcher=test_dispatcher,
+                                           started_at=time.perf_counter())
+
+        middleware = test_dispatcher.update.outer_middleware.call_args.args[0]
+
+        # Operate
+        first_result: Any = await middleware(handler, "first_update", {})
+        await middleware(handler, "second_update", {})
+
+        # Check
+        self.assertEqual(first=first_result,
+                         second="handled")
+        mock_logger_info.assert_called_once()
+
+    # -------------------------------------------------------------------------
+    @UnitMock.patch.object(target=startup_handler.logger,
+                           attribute="info", autospec=True)
+    async def test_forwarded_update_is_logged_as_forwarded(self,
+                                                           mock_logger_info: UnitMock.MagicMock) -> None:
+        # Build
+        test_dispatcher = UnitMock.MagicMock()
+        handler = UnitMock.AsyncMock(return_value=None)
+
+        startup_handler.track_first_update(dispatcher=test_dispatcher,
+                                           started_at=time.perf_counter(),
+                                           is_forwarding=True)
+
+        middleware = test_dispatcher.update.outer_middleware.call_args.args[0]
+
+        # Operate
+        await middleware(handler, "first_update", {})
+
+        # Check
+        logged_message: str = mock_logger_info.call_args.kwargs["msg"]
+
+        self.assertTrue(expr=logged_message.startswith("First update forwarded to the workers"),
+                        msg=f"Failure! Forwarding is not logged: {logged_message}")
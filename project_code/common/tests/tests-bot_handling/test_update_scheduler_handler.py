@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_update_scheduler_handler`, a set of test cases used to control the performance
+and quality of the `update_scheduler_handler` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.1"
+
+import unittest
+
+import asyncio
+
+from aiogram.types import Update
+
+from common.bot_handling import update_scheduler_handler
+
+from typing import Any, Dict, List
+
+
+# -----------------------------------------------------------------------------
+def build_update(update_id: int, chat_id: int, event_type: str = "message") -> Update:
+    return Update.model_validate({
+        "update_id": update_id,
+        event_type: {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "text": str(update_id)
+        }
+    })
+
+
+# _____________________________________________________________________________
+class TestUpdateScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_in_flight_handlers_are_capped(self) -> None:
+        # Build
+        scheduler = update_scheduler_handler.UpdateScheduler(max_in_flight=2)
+        running: List[int] = []
+        max_running: int = 0
+
+        async def handler(event: Update, data: Dict[str, Any]) -> None:
+            nonlocal max_running
+
+            running.append(event.update_id)
+            max_running = max(max_running, len(running))
+            await asyncio.sleep(0.01)
+            running.remove(event.update_id)
+
+        # Operate
+        await asyncio.gather(*(scheduler(handler, build_update(update_id=index,
+                                                               chat_id=index), {})
+                               for index in range(6)))
+
+        # Check
+        self.assertEqual(first=max_running,
+                         second=2)
+        self.assertEqual(first=scheduler.get_statistics().handled,
+                         second=6)
+        self.assertGreater(a=scheduler.get_statistics().max_wait_time,
+                           b=0.0)
+
+    # -------------------------------------------------------------------------
+    async def test_updates_of_a_chat_run_one_at_a_time_in_order(self) -> None:
+        # Build
+        scheduler = update_scheduler_handler.UpdateScheduler(max_in_flight=10)
+        handled: List[int] = []
+
+        async def handler(event: Update, data: Dict[str, Any]) -> None:
+            # The earlier updates are the slower ones.
+            await asyncio.sleep(0.01 * (3 - event.update_id))
+            handled.append(event.update_id)
+
+        # Operate
+        await asyncio.gather(*(scheduler(handler, build_update(update_id=index,
+                                                               chat_id=1), {})
+                               for index in range(3)))
+
+        # Check
+        self.assertEqual(first=handled,
+                         second=[0, 1, 2])
+
+    # -------------------------------------------------------------------------
+    async def test_idle_chat_locks_are_evicted(self) -> None:
+        # Build
+        scheduler = update_scheduler_handler.UpdateScheduler()
+
+        async def handler(event: Update, data: Dict[str, Any]) -> None:
+            await asyncio.sleep(0)
+
+        # Operate
+        await asyncio.gather(*(scheduler(handler, build_update(update_id=index,
+                                                               chat_id=index % 3), {})
+                               for index in range(9)))
+
+        # Check
+        self.assertEqual(first=scheduler.chat_lock_count,
+                         second=0)
+        self.assertEqual(first=scheduler.get_statistics().queued,
+                         second=0)
+
+    # -------------------------------------------------------------------------
+    async def test_low_priority_update_is_shed_under_backlog(self) -> None:
+        # Build
+        scheduler = update_scheduler_handler.UpdateScheduler(max_in_flight=1,
+                                                             backlog_threshold=2,
+                                                             defer_timeout=0.01)
+        release = asyncio.Event()
+        handled: List[int] = []
+
+        async def handler(event: Update, data: Dict[str, Any]) -> str:
+            await release.wait()
+            handled.append(event.update_id)
+
+            return "handled"
+
+        backlog = [asyncio.create_task(scheduler(handler,
+                                                 build_update(update_id=index,
+                                                              chat_id=index), {}))
+                   for index in range(3)]
+        await asyncio.sleep(0)
+
+        # Operate
+        result: Any = await scheduler(handler,
+                                      build_update(update_id=10,
+                                                   chat_id=10,
+                                                   event_type="edited_message"), {})
+        release.set()
+        await asyncio.gather(*backlog)
+
+        # Check
+        self.assertIsNone(obj=result)
+        self.assertNotIn(member=10, container=handled)
+        self.assertEqual(first=scheduler.get_statistics().shed,
+                         second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_deferred_update_keeps_its_place_in_the_chat(self) -> None:
+        # Build
+        scheduler = update_scheduler_handler.UpdateScheduler(max_in_flight=1,
+                                                             backlog_threshold=2,
+                                                             defer_timeout=1.0)
+        release = asyncio.Event()
+        handled: List[int] = []
+
+        async def handler(event: Update, data: Dict[str, Any]) -> None:
+            if event.update_id < 10:
+                await release.wait()
+
+            handled.append(event.update_id)
+
+        backlog = [asyncio.create_task(scheduler(handler,
+                                                 build_update(update_id=index,
+                                                              chat_id=index), {}))
+                   for index in range(3)]
+        await asyncio.sleep(0)
+
+        # Operate
+        edit = asyncio.create_task(scheduler(handler,
+                                             build_update(update_id=10,
+                                                          chat_id=10,
+                                                          event_type="edited_message"), {}))
+        await asyncio.sleep(0)
+        message = asyncio.create_task(scheduler(handler,
+                                                build_update(update_id=11,
+                                                             chat_id=10), {}))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(*backlog, edit, message)
+
+        # Check
+        self.assertLess(a=handled.index(10), b=handled.index(11))
+        self.assertEqual(first=scheduler.get_statistics().deferred,
+                         second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_low_priority_update_runs_without_backlog(self) -> None:
+        # Build
+        scheduler = update_scheduler_handler.UpdateScheduler(backlog_threshold=2)
+
+        async def handler(event: Update, data: Dict[str, Any]) -> str:
+            return "handled"
+
+        # Operate
+        result: Any = await scheduler(handler,
+                                      build_update(update_id=1,
+                                                   chat_id=1,
+                                                   event_type="edited_message"), {})
+
+        # Check
+        self.assertEqual(first=result,
+                         second="handled")
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_worker_pool_handler`, a set of test cases used to control the performance
+and quality of the `worker_pool_handler` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+import unittest.mock as UnitMock
+
+import aiogram
+import asyncio
+
+from aiogram.types import Update
+
+from common.bot_handling import worker_pool_handler
+
+from typing import Any, Dict, List, Tuple
+
+
+# -----------------------------------------------------------------------------
+def build_message_update(update_id: int, chat_id: int, text: str = "") -> Dict[str, Any]:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 0,
+            "chat": {"id": chat_id, "type": "private"},
+            "text": text
+        }
+    }
+
+
+# _____________________________________________________________________________
+class TestResolveChatId(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tested_function = worker_pool_handler.resolve_chat_id
+
+    # -------------------------------------------------------------------------
+    def test_message_is_routed_by_chat(self) -> None:
+        # Build
+        update = Update.model_validate(build_message_update(update_id=1, chat_id=42))
+
+        # Operate
+        chat_id: int = self.tested_function(update=update)
+
+        # Check
+        self.assertEqual(first=chat_id,
+                         second=42)
+
+    # -------------------------------------------------------------------------
+    def test_inline_query_is_routed_by_user(self) -> None:
+        # Build
+        update = Update.model_validate({
+            "update_id": 1,
+            "inline_query": {
+                "id": "1",
+                "from": {"id": 7, "is_bot": False, "first_name": "test"},
+                "query": "",
+                "offset": ""
+            }
+        })
+
+        # Operate
+        chat_id: int = self.tested_function(update=update)
+
+        # Check
+        self.assertEqual(first=chat_id,
+                         second=7)
+
+
+# _____________________________________________________________________________
+class TestWorkerPoolSubmit(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_of_a_chat_go_to_the_same_worker(self) -> None:
+        # Build
+        worker_pool = worker_pool_handler.WorkerPool(worker_count=3,
+                                                     worker_factory=UnitMock.AsyncMock())
+
+        # Operate
+        for update_id in range(4):
+            worker_pool.submit(
+                update=Update.model_validate(build_message_update(update_id=update_id,
+                                                                  chat_id=4))
+            )
+
+        # Check
+        self.assertEqual(first=worker_pool.get_queue_depths(),
+                         second=[0, 4, 0])
+
+    # -------------------------------------------------------------------------
+    def test_worker_count_below_one_raises_ValueError(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            worker_pool_handler.WorkerPool(worker_count=0,
+                                           worker_factory=UnitMock.AsyncMock())
+
+
+# _____________________________________________________________________________
+class TestServeUpdates(unittest.IsolatedAsyncioTestCase):
+    async def test_updates_of_a_chat_are_handled_in_order(self) -> None:
+        # Build
+        handled: List[Tuple[int, str]] = []
+        test_bot = aiogram.Bot(token="0000:xxxx")
+        test_dispatcher = aiogram.Dispatcher()
+
+        @test_dispatcher.message()
+        async def handle_message(message: aiogram.types.Message) -> None:
+            # The first update of each chat is the slowest one.
+            await asyncio.sleep(0.05 if message.text == "0" else 0)
+            handled.append((message.chat.id, str(message.text)))
+
+        batch = [
+            (chat_id, build_message_update(update_id=index, chat_id=chat_id, text=str(index)))
+            for index in range(3)
+            for chat_id in (1, 2)
+        ]
+        test_connection = UnitMock.MagicMock()
+        test_connection.recv.side_effect = [batch, [None]]
+
+        # Operate
+        await worker_pool_handler._serve_updates(
+            worker_index=0,
+            connection=test_connection,
+            worker_factory=UnitMock.AsyncMock(return_value=(test_bot, test_dispatcher))
+        )
+
+        # Check
+        for chat_id in (1, 2):
+            with self.subTest(chat_id=chat_id):
+                self.assertEqual(
+                    first=[text for handled_chat_id, text in handled
+                           if handled_chat_id == chat_id],
+                    second=["0", "1", "2"]
+                )
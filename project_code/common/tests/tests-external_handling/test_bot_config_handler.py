@@ -9,7 +9,7 @@ Apache license, version 2.0 (Apache-2.0 license)
 """
 
 __author__ = "4-proxy"
-__version__ = "1.2.0"
+__version__ = "1.4.1"
 
 import unittest
 
@@ -57,3 +57,43 @@ class TestBotConfig(unittest.TestCase):
                     container=self.tested_class.__dataclass_fields__,
                     msg=f"The inspected class does not have the {expected_field} field!"
                 )
+
+    # -------------------------------------------------------------------------
+    def test_global_send_rate_is_split_between_processes(self) -> None:
+        for workers, expected_rate in ((0, 30.0), (1, 15.0), (3, 7.5)):
+            with self.subTest(workers=workers):
+                # Build
+                bot_config = self.tested_class(api_token="0000:xxxx",
+                                               owner_chat_id="1",
+                                               debug=False,
+                                               workers=workers,
+                                               global_send_rate=30.0)
+
+                # Check
+                self.assertEqual(first=bot_config.process_send_rate,
+                                 second=expected_rate)
+
+
+# _____________________________________________________________________________
+class TestWebhookConfig(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tested_class = bot_config_handler.WebhookConfigDTO
+
+    # -------------------------------------------------------------------------
+    def test_valid_secret_token_is_accepted(self) -> None:
+        # Operate
+        webhook_config = self.tested_class(url="https://example.com/webhook",
+                                           secret_token="Valid_secret-123")
+
+        # Check
+        self.assertEqual(first=webhook_config.path,
+                         second="/webhook")
+
+    # -------------------------------------------------------------------------
+    def test_invalid_secret_token_raises_ValueError(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            self.tested_class(url="https://example.com/webhook",
+                              secret_token="not a valid secret!")
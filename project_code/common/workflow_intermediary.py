@@ -12,11 +12,12 @@ Apache license, version 2.0 (Apache-2.0 license)
 __all__: list[str] = ["WorkflowIntermediary"]
 
 __author__ = "4-proxy"
-__version__ = "0.1.3"
+__version__ = "0.3.0"
 
 from dataclasses import dataclass
 
 from aiogram import Bot
+from typing import Awaitable, Callable, ClassVar, Dict, List
 
 
 # _____________________________________________________________________________
@@ -31,6 +32,13 @@ class WorkflowIntermediary:
     Attributes:
         current_bot (Bot): An instance of the Telegram bot.
         owner_chat_id (str): The chat ID of the bot owner.
+        startup_callbacks (Dict[str, Callable[[], Awaitable[None]]]): Named coroutine functions awaited concurrently
+                                                                      at the startup, e.g. database pool prefills
+                                                                      and cache preloads.
+        shutdown_callbacks (List[Callable[[], Awaitable[None]]]): Coroutine functions awaited on the bot shutdown,
+                                                                  e.g. flushes of the write-behind queues.
     """
     current_bot: Bot
     owner_chat_id: str
+    startup_callbacks: ClassVar[Dict[str, Callable[[], Awaitable[None]]]] = {}
+    shutdown_callbacks: ClassVar[List[Callable[[], Awaitable[None]]]] = []
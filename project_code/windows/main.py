@@ -9,19 +9,29 @@ Apache license, version 2.0 (Apache-2.0 license)
 """
 
 __author__ = "4-proxy"
-__version__ = "0.5.1"
+__version__ = "0.10.3"
 
 import aiogram
 
+import asyncio
+import logging
 import os
+import time
 
 from common.external_handling import logger_handler
 from common.bot_handling import bot_handler
 from common.bot_handling import bot_state_handler
+from common.bot_handling import send_scheduler_handler
+from common.bot_handling import startup_handler
+from common.bot_handling import update_scheduler_handler
+from common.bot_handling import worker_pool_handler
 from common.workflow_intermediary import WorkflowIntermediary
-from common.external_handling.bot_config_handler import BotConfigDTO
+from common.external_handling.bot_config_handler import (
+    BotConfigDTO,
+    WebhookConfigDTO
+)
 
-from typing import NoReturn
+from typing import Any, Dict, NoReturn, Optional, Tuple
 from common.external_handling.json_handler import ContentJSON
 
 
@@ -29,6 +39,16 @@ PROJECT_CONFIG_FILEPATH: str = os.path.join(
     "windows", "project_config.json"
 )
 
+# Seconds each startup step may take before the launch is aborted.
+STARTUP_STEP_TIMEOUT: float = 30.0
+
+# The bot preparation runs its own timed steps, see `prepare_bot`,
+# so it is not limited as a whole and their timeouts are the ones reported.
+STARTUP_STEP_TIMEOUTS: Dict[str, Optional[float]] = {"bot": None}
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
 
 # -----------------------------------------------------------------------------
 async def configure_BotConfig() -> BotConfigDTO:
@@ -38,19 +58,51 @@ async def configure_BotConfig() -> BotConfigDTO:
     extracts the bot's API token, owner chat ID, and debug mode settings,
     and returns a `BotConfigDTO` object containing these values.
 
+    The `Bot.MODE` setting picks how the updates are received,
+    `polling` by default, or `webhook` with the settings of the `Webhook` section.
+    The `Bot.WORKERS` setting is the number of worker processes handling the updates,
+    0 by default, the updates are handled in the receiving process.
+    The `Bot.MAX_IN_FLIGHT_UPDATES` and `Bot.UPDATE_BACKLOG_THRESHOLD` settings
+    configure the update scheduler of the processes handling the updates.
+    The `Bot.GLOBAL_SEND_RATE` and `Bot.CHAT_SEND_RATE` settings
+    configure the outbound rate limits of the bot,
+    the global one is shared by the worker processes.
+
     Returns:
         BotConfigDTO: A data transfer object containing the bot's configuration settings.
     """
     from common.external_handling import json_handler
 
-    project_config: ContentJSON = json_handler.parse_content_from_json(
-        filepath=PROJECT_CONFIG_FILEPATH
+    # The file is read on a worker thread, so the other startup steps are not blocked.
+    project_config: ContentJSON = await asyncio.to_thread(
+        json_handler.parse_content_from_json, filepath=PROJECT_CONFIG_FILEPATH
     )
 
+    webhook_config: Optional[WebhookConfigDTO] = None
+
+    if project_config["Bot"].get("MODE", "polling") == "webhook":
+        webhook_section: Dict[str, Any] = project_config["Webhook"]
+
+        webhook_config = WebhookConfigDTO(
+            url=webhook_section["URL"],
+            secret_token=webhook_section["SECRET_TOKEN"],
+            host=webhook_section.get("HOST", "0.0.0.0"),
+            port=webhook_section.get("PORT", 8080),
+            path=webhook_section.get("PATH", "/webhook"),
+            drop_pending_updates=webhook_section.get("DROP_PENDING_UPDATES", False),
+            delete_on_shutdown=webhook_section.get("DELETE_ON_SHUTDOWN", True)
+        )
+
     bot_config = BotConfigDTO(
         api_token=project_config["Bot"]["API_TOKEN"],
         owner_chat_id=project_config["Bot"]["OWNER_CHAT_ID"],
-        debug=project_config["Bot"]["DEBUG"]
+        debug=project_config["Bot"]["DEBUG"],
+        webhook=webhook_config,
+        workers=project_config["Bot"].get("WORKERS", 0),
+        max_in_flight_updates=project_config["Bot"].get("MAX_IN_FLIGHT_UPDATES", 100),
+        update_backlog_threshold=project_config["Bot"].get("UPDATE_BACKLOG_THRESHOLD", 1000),
+        global_send_rate=project_config["Bot"].get("GLOBAL_SEND_RATE", 30.0),
+        chat_send_rate=project_config["Bot"].get("CHAT_SEND_RATE", 1.0)
     )
 
     return bot_config
@@ -63,6 +115,8 @@ async def configure_WorkflowIntermediary(bot_config: BotConfigDTO) -> None:
     This function creates an instance of the Telegram bot using the API token
     from the provided bot configuration and assigns it to the `WorkflowIntermediary`.
     It also sets the owner chat ID for future reference.
+    The messages sent by the bot are paced within the configured send rates,
+    the global one is split between all the bot processes, see `BotConfigDTO.process_send_rate`.
 
     Args:
         bot_config (BotConfigDTO): The configuration object containing API token
@@ -71,12 +125,93 @@ async def configure_WorkflowIntermediary(bot_config: BotConfigDTO) -> None:
     api_token: str = bot_config.api_token
     owner_chat_id: str = bot_config.owner_chat_id
 
-    bot_instance: aiogram.Bot = await bot_handler.create_bot(api_token=api_token)
+    send_scheduler = send_scheduler_handler.SendScheduler(
+        global_rate=bot_config.process_send_rate,
+        chat_rate=bot_config.chat_send_rate
+    )
+
+    bot_instance: aiogram.Bot = await bot_handler.create_bot(api_token=api_token,
+                                                             send_scheduler=send_scheduler)
 
     WorkflowIntermediary.current_bot = bot_instance
     WorkflowIntermediary.owner_chat_id = owner_chat_id
 
 
+# -----------------------------------------------------------------------------
+async def prepare_bot() -> BotConfigDTO:
+    """Load the bot configuration, create the bot and validate its token.
+
+    These steps depend on each other, so they run in order,
+    each with its own timeout and timing in the logs.
+    The `get_me` validation also opens the HTTP session of the bot.
+
+    Returns:
+        BotConfigDTO: The loaded bot configuration.
+    """
+    bot_config: BotConfigDTO = await startup_handler.run_startup_step(
+        name="config",
+        function=configure_BotConfig,
+        timeout=STARTUP_STEP_TIMEOUT
+    )
+
+    await configure_WorkflowIntermediary(bot_config=bot_config)
+
+    await startup_handler.run_startup_step(
+        name="get_me",
+        function=lambda: startup_handler.validate_bot(
+            bot=WorkflowIntermediary.current_bot
+        ),
+        timeout=STARTUP_STEP_TIMEOUT
+    )
+
+    return bot_config
+
+
+# -----------------------------------------------------------------------------
+def configure_UpdateScheduler(dispatcher: aiogram.Dispatcher,
+                              bot_config: BotConfigDTO) -> None:
+    """Bound the concurrent update processing of the dispatcher.
+
+    Args:
+        dispatcher (aiogram.Dispatcher): The dispatcher handling the updates.
+        bot_config (BotConfigDTO): The configuration object with the scheduler limits.
+    """
+    update_scheduler = update_scheduler_handler.UpdateScheduler(
+        max_in_flight=bot_config.max_in_flight_updates,
+        backlog_threshold=bot_config.update_backlog_threshold
+    )
+
+    dispatcher.update.outer_middleware(update_scheduler)
+
+
+# -----------------------------------------------------------------------------
+async def create_worker() -> Tuple[aiogram.Bot, aiogram.Dispatcher]:
+    """Prepare the bot and the dispatcher of a worker process.
+
+    Every worker runs the same startup steps as a single process bot,
+    so it has its own bot session, dispatcher, database pools and caches.
+
+    Returns:
+        Tuple[aiogram.Bot, aiogram.Dispatcher]: The bot and the dispatcher of the worker.
+    """
+    startup_results: Dict[str, Any] = await startup_handler.run_startup_steps(
+        steps={
+            "bot": prepare_bot,
+            "dispatcher": bot_handler.create_dispatcher,
+            **WorkflowIntermediary.startup_callbacks
+        },
+        timeout=STARTUP_STEP_TIMEOUT,
+        step_timeouts=STARTUP_STEP_TIMEOUTS
+    )
+
+    worker_dispatcher: aiogram.Dispatcher = startup_results["dispatcher"]
+
+    configure_UpdateScheduler(dispatcher=worker_dispatcher,
+                              bot_config=startup_results["bot"])
+
+    return WorkflowIntermediary.current_bot, worker_dispatcher
+
+
 # -----------------------------------------------------------------------------
 async def main() -> NoReturn:
     """Main entry point for launching the Telegram bot.
@@ -84,28 +219,59 @@ async def main() -> NoReturn:
     This function orchestrates the configuration of the bot and its components,
     including setting up the dispatcher for handling incoming messages and events.
 
+    The independent startup steps run concurrently, with timeouts:
+    the bot preparation, the dispatcher creation,
+    and the callbacks registered in `WorkflowIntermediary.startup_callbacks`,
+    e.g. database pool prefills and cache preloads.
+    The time to the first served update is logged.
+
+    With worker processes configured, this process only receives the updates,
+    and forwards them to the workers by their chat ids, see `create_worker`.
+    The logged time is then the time to the first forwarded update.
+
     It runs indefinitely until interrupted by a `KeyboardInterrupt`.
 
     Returns:
         NoReturn: This function does not return a value.
     """
-    bot_config: BotConfigDTO = await configure_BotConfig()
-
-    await configure_WorkflowIntermediary(bot_config=bot_config)
+    started_at: float = time.perf_counter()
+
+    startup_results: Dict[str, Any] = await startup_handler.run_startup_steps(
+        steps={
+            "bot": prepare_bot,
+            "dispatcher": bot_handler.create_dispatcher,
+            **WorkflowIntermediary.startup_callbacks
+        },
+        timeout=STARTUP_STEP_TIMEOUT,
+        step_timeouts=STARTUP_STEP_TIMEOUTS
+    )
 
+    bot_config: BotConfigDTO = startup_results["bot"]
     telegram_bot: aiogram.Bot = WorkflowIntermediary.current_bot
-    telegram_dispatcher: aiogram.Dispatcher = await bot_handler.create_dispatcher()
+    telegram_dispatcher: aiogram.Dispatcher = startup_results["dispatcher"]
+
+    startup_handler.track_first_update(dispatcher=telegram_dispatcher,
+                                       started_at=started_at,
+                                       is_forwarding=bool(bot_config.workers))
+
+    if bot_config.workers:
+        worker_pool = worker_pool_handler.WorkerPool(worker_count=bot_config.workers,
+                                                     worker_factory=create_worker)
+        worker_pool.attach(dispatcher=telegram_dispatcher)
+
+    else:
+        configure_UpdateScheduler(dispatcher=telegram_dispatcher,
+                                  bot_config=bot_config)
 
     telegram_dispatcher.startup.register(bot_state_handler.on_startup)
     telegram_dispatcher.shutdown.register(bot_state_handler.on_shutdown)
 
     await bot_handler.run_bot(bot=telegram_bot,
-                              dispatcher=telegram_dispatcher)
+                              dispatcher=telegram_dispatcher,
+                              webhook_config=bot_config.webhook)
 
 
 if __name__ == "__main__":
-    import asyncio
-
     try:
         asyncio.run(main=main())
 
@@ -1,5 +1,22 @@
-__all__: list[str] = ["AbstractAsyncDataBase", "AsyncSQLDataBaseAPI", "AsyncSQLDataBasePoolAPI"]
+__all__: list[str] = [
+    "AbstractAsyncDataBase",
+    "AsyncSQLDataBaseAPI",
+    "AsyncSQLDataBasePoolAPI",
+    "QueryResultCache",
+    "AbstractQueryHook",
+    "QueryLatencyRecorder",
+    "WriteBehindQueue",
+    "SingleFlight",
+    "KeysetPaginator",
+    "RowMapper",
+]
 
 from .abstract_async_database import AbstractAsyncDataBase
 from .async_sql_database_api import AsyncSQLDataBaseAPI
-from .async_sql_database_pool_api import AsyncSQLDataBasePoolAPI
\ No newline at end of file
+from .async_sql_database_pool_api import AsyncSQLDataBasePoolAPI
+from .query_result_cache import QueryResultCache
+from .query_instrumentation import AbstractQueryHook, QueryLatencyRecorder
+from .write_behind_queue import WriteBehindQueue
+from .single_flight import SingleFlight
+from .keyset_pagination import KeysetPaginator
+from .row_mapping import RowMapper
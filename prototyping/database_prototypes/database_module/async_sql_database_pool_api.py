@@ -12,11 +12,11 @@ Apache license, version 2.0 (Apache-2.0 license)
 __all__: list[str] = ["AsyncSQLDataBasePoolAPI"]
 
 __author__ = "4-proxy"
-__version__ = "1.0.1"
+__version__ = "1.3.0"
 
 from abc import ABC, abstractmethod
 
-from typing import Dict
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
 from string import Template
 
 
@@ -87,9 +87,93 @@ class AsyncSQLDataBasePoolAPI[PoolType, PooledConnectionType](ABC):
 
         This method should execute a query against the database using a connection from the pool.
         As well as receiving the query as a string template and data to substitute into the query.
+        A failed query should be logged, then raised to the caller.
 
         Args:
             query_template (Template): query template.
             query_data (Dict[str, str]): The data to substitute into the query.
         """
         pass
+
+    # -------------------------------------------------------------------------
+    @abstractmethod
+    async def execute_parameterized_query_use_pool(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> int:
+        """execute_parameterized_query_use_pool executes a parameterized database query.
+
+        This method should execute a query with placeholders using a connection from the pool,
+        passing the values separately from the query text.
+
+        Args:
+            query (str): The query text with placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            int: The number of rows affected by the query.
+        """
+        pass
+
+    # -------------------------------------------------------------------------
+    @abstractmethod
+    async def fetch_one_use_pool(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> Optional[Any]:
+        """fetch_one_use_pool returns the first row of the query result.
+
+        This method should execute a query with placeholders using a connection from the pool,
+        and return the first row of its result.
+
+        Args:
+            query (str): The query text with placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Optional[Any]: The first row of the result; None if the result is empty.
+        """
+        pass
+
+    # -------------------------------------------------------------------------
+    @abstractmethod
+    async def fetch_all_use_pool(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> List[Any]:
+        """fetch_all_use_pool returns all rows of the query result.
+
+        This method should execute a query with placeholders using a connection from the pool,
+        and return all rows of its result.
+
+        Args:
+            query (str): The query text with placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            List[Any]: The rows of the result.
+        """
+        pass
+
+    # -------------------------------------------------------------------------
+    @abstractmethod
+    def stream_use_pool(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[List[Any]]:
+        """stream_use_pool yields the query result in chunks of rows.
+
+        This method should execute a query with placeholders using a connection from the pool,
+        reading its result from the server chunk by chunk,
+        so the whole result is never held in memory.
+
+        Args:
+            query (str): The query text with placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Yields:
+            List[Any]: The next chunk of rows of the result.
+        """
+        pass
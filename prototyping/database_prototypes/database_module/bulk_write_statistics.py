@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `bulk_write_statistics` module provides a data class,
+with the counters of a bulk write shared by the database APIs.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["BulkWriteStatistics"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from dataclasses import dataclass
+
+
+# _____________________________________________________________________________
+@dataclass
+class BulkWriteStatistics:
+    """BulkWriteStatistics data class with the counters of one bulk write.
+
+    Attributes:
+        rows (int): The number of rows sent to the database.
+        statements (int): The number of statements executed.
+        affected_rows (int): The number of rows reported as affected by the database.
+        elapsed_time (float): The duration of the write, in seconds.
+    """
+
+    rows: int = 0
+    statements: int = 0
+    affected_rows: int = 0
+    elapsed_time: float = 0.0
+
+    # -------------------------------------------------------------------------
+    @property
+    def rows_per_second(self) -> float:
+        """rows_per_second returns the write throughput."""
+        if self.elapsed_time <= 0:
+            return 0.0
+
+        return self.rows / self.elapsed_time
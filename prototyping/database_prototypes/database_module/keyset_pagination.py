@@ -0,0 +1,509 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `keyset_pagination` module provides a paginator seeking the pages by their keys,
+and the compact cursor tokens passed between the pages, e.g. in callback data.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "KeysetCursor",
+    "KeysetPage",
+    "KeysetPaginator",
+    "encode_cursor",
+    "decode_cursor",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import base64
+import binascii
+import datetime
+import decimal
+
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+
+# The most bytes of callback data, Telegram Bot API.
+CALLBACK_DATA_LIMIT: int = 64
+
+_DIGITS: str = "0123456789abcdefghijklmnopqrstuvwxyz"
+_SEPARATOR: str = "~"
+_FORWARD: str = ">"
+_BACKWARD: str = "<"
+
+# Annotation for the function returning all rows of a query, e.g. `fetch_all` of an API.
+FetchMethodType = Callable[[str, Sequence[Any]], Awaitable[List[Any]]]
+
+
+# _____________________________________________________________________________
+class KeysetCursor(NamedTuple):
+    """KeysetCursor named tuple of the position of a page boundary.
+
+    Attributes:
+        sort_value (Any): The sort key of the boundary row; its id for the pages sorted by id.
+        row_id (Any): The id of the boundary row.
+        forward (bool): Whether the rows after the boundary are requested, otherwise the rows before it.
+    """
+
+    sort_value: Any
+    row_id: Any
+    forward: bool = True
+
+
+# _____________________________________________________________________________
+@dataclass
+class KeysetPage:
+    """KeysetPage data class of a page of rows.
+
+    Attributes:
+        rows (List[Any]): The rows of the page, in the sort order.
+        next_cursor (Optional[str]): The token of the next page; None on the last page.
+        prev_cursor (Optional[str]): The token of the previous page; None on the first page.
+    """
+
+    rows: List[Any]
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+
+# _____________________________________________________________________________
+class KeysetPaginator:
+    """KeysetPaginator class of the keyset pagination of a query.
+
+    This class reads a page as the rows following, or preceding,
+    the sort key and the id of the boundary row of the neighbouring page,
+    e.g. `WHERE (price, id) > (%s, %s) ORDER BY price, id LIMIT %s`.
+    With an index on the sort column and the id, any page costs a single index seek,
+    unlike `LIMIT/OFFSET`, which reads and drops all the rows before the page.
+
+    *The sort column must not hold NULL values;
+    the id makes the order total, so no row is skipped or repeated between the pages.
+
+    *The column names and the condition are inserted into the queries as they are,
+    so they must never come from the users.
+
+    *A sort key too long for the token, e.g. a long product name,
+    is left out of it; the key of such a cursor is read back by the id of its row.
+
+    Attributes:
+        sort_column (str): The column the pages are sorted by.
+        id_column (str): The unique column, breaking the ties of the sort column.
+        page_size (int): The number of rows per page.
+        descending (bool): Whether the pages are sorted from the largest keys.
+        id_position (int): The position of the id in a row.
+        sort_position (int): The position of the sort key in a row.
+        max_token_length (int): The longest allowed cursor token.
+        __queries (Dict[Tuple[bool, bool], str]): The page queries, by whether there is a cursor and its direction.
+        __sort_value_query (str): The query of the sort key of a row, by its id.
+    """
+
+    sort_column: str
+    id_column: str
+    page_size: int
+    descending: bool
+    id_position: int
+    sort_position: int
+    max_token_length: int
+    __queries: Dict[Tuple[bool, bool], str]
+    __sort_value_query: str
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        select_query: str,
+        id_column: str,
+        sort_column: Optional[str] = None,
+        condition: Optional[str] = None,
+        page_size: int = 10,
+        descending: bool = False,
+        id_position: int = 0,
+        sort_position: Optional[int] = None,
+        max_token_length: int = CALLBACK_DATA_LIMIT,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            select_query (str): The query without a condition, order and limit,
+                                e.g. `SELECT id, name, price FROM products`.
+            id_column (str): The unique column, breaking the ties of the sort column.
+            sort_column (Optional[str], optional): The column the pages are sorted by.
+                                                   The default is None, the pages are sorted by the id.
+            condition (Optional[str], optional): The filter of the rows, with `%s` placeholders,
+                                                 e.g. `category_id = %s`.
+                                                 The default is None, all rows are paged.
+            page_size (int, optional): The number of rows per page.
+                                       The default is 10.
+            descending (bool, optional): Whether the pages are sorted from the largest keys.
+                                         The default is False.
+            id_position (int, optional): The position of the id in a row.
+                                         The default is 0.
+            sort_position (Optional[int], optional): The position of the sort key in a row.
+                                                     The default is None, the id position is used.
+            max_token_length (int, optional): The longest allowed cursor token, in bytes,
+                                              leaving room for a prefix of the callback data.
+                                              The default is 64.
+
+        Raises:
+            ValueError: If the page size is not positive.
+        """
+        if page_size < 1:
+            raise ValueError("Page size must be at least 1!")
+
+        self.id_column = id_column
+        self.sort_column = sort_column or id_column
+        self.page_size = page_size
+        self.descending = descending
+        self.id_position = id_position
+        self.sort_position = id_position if sort_position is None else sort_position
+        self.max_token_length = max_token_length
+        self.__queries = {
+            (has_cursor, forward): self.__build_query(
+                select_query=select_query,
+                condition=condition,
+                has_cursor=has_cursor,
+                forward=forward,
+            )
+            for has_cursor in (False, True)
+            for forward in (False, True)
+        }
+        self.__sort_value_query = f"{select_query} WHERE {self.id_column} = %s LIMIT 1"
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_sorted_by_id(self) -> bool:
+        """is_sorted_by_id returns whether the pages are sorted by the id alone."""
+        return self.sort_column == self.id_column
+
+    # -------------------------------------------------------------------------
+    def get_query(self, cursor: Optional[KeysetCursor] = None) -> str:
+        """get_query returns the query of the page following or preceding the cursor.
+
+        *The query takes the condition parameters,
+        then the cursor keys, then the number of rows to read.
+
+        Args:
+            cursor (Optional[KeysetCursor], optional): The boundary of the page.
+                                                       The default is None, the first page is read.
+
+        Returns:
+            str: The query text with `%s` placeholders.
+        """
+        return self.__queries[
+            (cursor is not None, cursor is None or cursor.forward)
+        ]
+
+    # -------------------------------------------------------------------------
+    async def fetch_page(
+        self,
+        fetch_method: FetchMethodType,
+        parameters: Sequence[Any] = (),
+        cursor: Optional[str] = None,
+    ) -> KeysetPage:
+        """fetch_page reads the page of the cursor token.
+
+        A page is read with one more row than its size,
+        which tells whether there is a page beyond it.
+
+        Args:
+            fetch_method (FetchMethodType): Returns all rows of a query, e.g. `AsyncMySQLAPI.fetch_all`.
+            parameters (Sequence[Any], optional): The values of the condition placeholders.
+                                                  The default is an empty tuple.
+            cursor (Optional[str], optional): The token of the page, taken from a previous page.
+                                              The default is None, the first page is read.
+
+        Returns:
+            KeysetPage: The rows of the page and the tokens of its neighbours.
+
+        Raises:
+            ValueError: If the cursor token is malformed,
+                        its row is gone while the token holds no sort key,
+                        or the id of a boundary row does not fit a token.
+        """
+        keyset_cursor: Optional[KeysetCursor] = (
+            decode_cursor(token=cursor) if cursor is not None else None
+        )
+        query_parameters: List[Any] = list(parameters)
+
+        if keyset_cursor is not None:
+            if not self.is_sorted_by_id:
+                if not _has_sort_value(token=cursor):
+                    keyset_cursor = await self.__read_sort_value(
+                        fetch_method=fetch_method, cursor=keyset_cursor
+                    )
+
+                query_parameters.append(keyset_cursor.sort_value)
+
+            query_parameters.append(keyset_cursor.row_id)
+
+        query_parameters.append(self.page_size + 1)
+
+        rows: List[Any] = list(
+            await fetch_method(
+                self.get_query(cursor=keyset_cursor), query_parameters
+            )
+        )
+        has_more: bool = len(rows) > self.page_size
+
+        del rows[self.page_size :]
+
+        if keyset_cursor is not None and not keyset_cursor.forward:
+            # A backward page is read from its end.
+            rows.reverse()
+
+            return KeysetPage(
+                rows=rows,
+                next_cursor=(
+                    self.__make_token(row=rows[-1], forward=True) if rows else None
+                ),
+                prev_cursor=(
+                    self.__make_token(row=rows[0], forward=False)
+                    if has_more
+                    else None
+                ),
+            )
+
+        return KeysetPage(
+            rows=rows,
+            next_cursor=(
+                self.__make_token(row=rows[-1], forward=True) if has_more else None
+            ),
+            prev_cursor=(
+                self.__make_token(row=rows[0], forward=False)
+                if keyset_cursor is not None and rows
+                else None
+            ),
+        )
+
+    # -------------------------------------------------------------------------
+    def __make_token(self, row: Any, forward: bool) -> str:
+        cursor = KeysetCursor(
+            sort_value=row[self.sort_position],
+            row_id=row[self.id_position],
+            forward=forward,
+        )
+
+        try:
+            return encode_cursor(
+                cursor=cursor,
+                sorted_by_id=self.is_sorted_by_id,
+                max_length=self.max_token_length,
+            )
+
+        except ValueError:
+            if self.is_sorted_by_id:
+                raise
+
+        # The sort key does not fit the token, so the next page reads it back by the id.
+        return encode_cursor(
+            cursor=cursor, sorted_by_id=True, max_length=self.max_token_length
+        )
+
+    # -------------------------------------------------------------------------
+    async def __read_sort_value(
+        self, fetch_method: FetchMethodType, cursor: KeysetCursor
+    ) -> KeysetCursor:
+        rows: List[Any] = list(
+            await fetch_method(self.__sort_value_query, [cursor.row_id])
+        )
+
+        if not rows:
+            raise ValueError(f"Cursor row {cursor.row_id!r} no longer exists!")
+
+        return cursor._replace(sort_value=rows[0][self.sort_position])
+
+    # -------------------------------------------------------------------------
+    def __build_query(
+        self,
+        select_query: str,
+        condition: Optional[str],
+        has_cursor: bool,
+        forward: bool,
+    ) -> str:
+        # Reading backward flips both the comparison and the order.
+        ascending: bool = forward != self.descending
+        order: str = "ASC" if ascending else "DESC"
+        conditions: List[str] = [f"({condition})"] if condition else []
+
+        if has_cursor:
+            comparison: str = ">" if ascending else "<"
+
+            conditions.append(
+                f"{self.id_column} {comparison} %s"
+                if self.is_sorted_by_id
+                else f"({self.sort_column}, {self.id_column}) {comparison} (%s, %s)"
+            )
+
+        order_by: str = (
+            f"{self.id_column} {order}"
+            if self.is_sorted_by_id
+            else f"{self.sort_column} {order}, {self.id_column} {order}"
+        )
+        where: str = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        return f"{select_query}{where} ORDER BY {order_by} LIMIT %s"
+
+
+# -----------------------------------------------------------------------------
+def encode_cursor(
+    cursor: KeysetCursor,
+    sorted_by_id: bool = False,
+    max_length: int = CALLBACK_DATA_LIMIT,
+) -> str:
+    """Encode a cursor into a compact token.
+
+    The token is the direction, then the tagged id and sort key separated by `~`:
+    integers in base 36, texts in URL-safe base64, e.g. `>i2n9~f19.99`.
+
+    Args:
+        cursor (KeysetCursor): The cursor.
+        sorted_by_id (bool, optional): Whether the sort key is the id, and is left out.
+                                       The default is False.
+        max_length (int, optional): The longest allowed token, in bytes.
+                                    The default is 64, the callback data limit.
+
+    Returns:
+        str: The token.
+
+    Raises:
+        ValueError: If a key has an unsupported type or the token is too long.
+    """
+    values: List[Any] = (
+        [cursor.row_id] if sorted_by_id else [cursor.row_id, cursor.sort_value]
+    )
+    token: str = (_FORWARD if cursor.forward else _BACKWARD) + _SEPARATOR.join(
+        _encode_value(value=value) for value in values
+    )
+
+    if len(token.encode()) > max_length:
+        raise ValueError(
+            f"Cursor token of {len(token.encode())} bytes exceeds {max_length} bytes!"
+        )
+
+    return token
+
+
+# -----------------------------------------------------------------------------
+def decode_cursor(token: str) -> KeysetCursor:
+    """Decode a token made by `encode_cursor`.
+
+    Args:
+        token (str): The token.
+
+    Returns:
+        KeysetCursor: The cursor; for a token without a sort key, the id is used as the sort key.
+
+    Raises:
+        ValueError: If the token is malformed.
+    """
+    if not token or token[0] not in (_FORWARD, _BACKWARD):
+        raise ValueError(f"Malformed cursor token: {token!r}!")
+
+    values: List[Any] = [
+        _decode_value(part=part) for part in token[1:].split(_SEPARATOR)
+    ]
+
+    if len(values) not in (1, 2):
+        raise ValueError(f"Malformed cursor token: {token!r}!")
+
+    return KeysetCursor(
+        sort_value=values[-1], row_id=values[0], forward=token[0] == _FORWARD
+    )
+
+
+# -----------------------------------------------------------------------------
+def _has_sort_value(token: str) -> bool:
+    return _SEPARATOR in token
+
+
+# -----------------------------------------------------------------------------
+def _encode_value(value: Any) -> str:
+    if value is None:
+        return "n"
+
+    if isinstance(value, bool):
+        return f"b{int(value)}"
+
+    if isinstance(value, int):
+        return f"i{_to_base36(number=value)}"
+
+    if isinstance(value, float):
+        return f"f{value!r}"
+
+    if isinstance(value, decimal.Decimal):
+        return f"m{value}"
+
+    if isinstance(value, datetime.datetime):
+        return f"t{value.isoformat()}"
+
+    if isinstance(value, datetime.date):
+        return f"d{value.isoformat()}"
+
+    if isinstance(value, str):
+        return "s" + base64.urlsafe_b64encode(value.encode()).decode().rstrip("=")
+
+    raise ValueError(f"Unsupported cursor key type: {type(value).__name__}!")
+
+
+# -----------------------------------------------------------------------------
+def _decode_value(part: str) -> Any:
+    tag, text = part[:1], part[1:]
+
+    try:
+        if tag == "n" and not text:
+            return None
+
+        if tag == "b" and text in ("0", "1"):
+            return text == "1"
+
+        if tag == "i":
+            return int(text, 36)
+
+        if tag == "f":
+            return float(text)
+
+        if tag == "m":
+            return decimal.Decimal(text)
+
+        if tag == "t":
+            return datetime.datetime.fromisoformat(text)
+
+        if tag == "d":
+            return datetime.date.fromisoformat(text)
+
+        if tag == "s":
+            return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4)).decode()
+
+    except (ValueError, ArithmeticError, binascii.Error) as error:
+        raise ValueError(f"Malformed cursor key: {part!r}!") from error
+
+    raise ValueError(f"Malformed cursor key: {part!r}!")
+
+
+# -----------------------------------------------------------------------------
+def _to_base36(number: int) -> str:
+    if number < 0:
+        return "-" + _to_base36(number=-number)
+
+    digits: List[str] = []
+
+    while True:
+        number, remainder = divmod(number, 36)
+        digits.append(_DIGITS[remainder])
+
+        if not number:
+            return "".join(reversed(digits))
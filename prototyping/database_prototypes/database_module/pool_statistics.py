@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `pool_statistics` module provides a data class,
+with the load counters shared by the connection pools.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["ConnectionPoolStatistics"]
+
+__author__ = "4-proxy"
+__version__ = "1.2.0"
+
+from dataclasses import dataclass, field
+
+from .query_instrumentation import LatencyHistogram
+
+
+# _____________________________________________________________________________
+@dataclass
+class ConnectionPoolStatistics:
+    """ConnectionPoolStatistics data class with the pool load counters.
+
+    Attributes:
+        waiting (int): The number of tasks currently waiting for a connection.
+        max_waiting (int): The highest observed number of waiting tasks.
+        in_use (int): The number of connections currently checked out.
+        idle (int): The number of open connections waiting in the pool.
+        acquisitions (int): The total number of connections handed out.
+        created (int): The total number of connections opened by the pool.
+        discarded (int): The total number of connections closed by the pool.
+        total_wait_time (float): The total time spent waiting for a connection, in seconds.
+        max_wait_time (float): The longest observed wait for a connection, in seconds.
+        timeouts (int): The total number of waits given up after the acquire timeout.
+        size_limit (int): The current maximum number of open connections.
+        resizes (int): The total number of changes of the size limit.
+        wait_histogram (LatencyHistogram): The rolling histogram of the waits for a connection.
+    """
+
+    waiting: int = 0
+    max_waiting: int = 0
+    in_use: int = 0
+    idle: int = 0
+    acquisitions: int = 0
+    created: int = 0
+    discarded: int = 0
+    total_wait_time: float = 0.0
+    max_wait_time: float = 0.0
+    timeouts: int = 0
+    size_limit: int = 0
+    resizes: int = 0
+    wait_histogram: LatencyHistogram = field(
+        default_factory=LatencyHistogram, repr=False
+    )
+
+    # -------------------------------------------------------------------------
+    @property
+    def average_wait_time(self) -> float:
+        """average_wait_time returns the average wait for a connection, in seconds."""
+        if self.acquisitions == 0:
+            return 0.0
+
+        return self.total_wait_time / self.acquisitions
+
+    # -------------------------------------------------------------------------
+    def wait_time_percentile(self, percent: float) -> float:
+        """wait_time_percentile returns a percentile of the recent waits for a connection.
+
+        Args:
+            percent (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The upper bound of the wait, in seconds, over the histogram window.
+        """
+        return self.wait_histogram.percentile(percent=percent)
+
+    # -------------------------------------------------------------------------
+    def record_wait(self, wait_time: float) -> None:
+        """record_wait accounts a finished wait for a connection.
+
+        Args:
+            wait_time (float): The time spent waiting for the connection, in seconds.
+        """
+        self.acquisitions += 1
+        self.total_wait_time += wait_time
+        self.max_wait_time = max(self.max_wait_time, wait_time)
+        self.wait_histogram.observe(latency=wait_time)
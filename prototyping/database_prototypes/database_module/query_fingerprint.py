@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `query_fingerprint` module provides functions for the analysis of SQL query texts,
+used to key, group and classify the queries sent to the database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "normalize_query",
+    "fingerprint_query",
+    "extract_tables",
+    "is_write_query",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.3.0"
+
+import re
+
+from functools import lru_cache
+from typing import FrozenSet, Pattern
+
+
+# Literals, quoted names, optimizer hints and executable comments are matched first,
+# so they are kept with the comment and whitespace markers inside them.
+_LAYOUT_PATTERN: Pattern[str] = re.compile(
+    r"(?P<literal>'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"|`(?:[^`]|``)*`"
+    r"|/\*[+!].*?\*/)"
+    r"|(?P<layout>(?:\s+|/\*(?![+!]).*?\*/|--(?=\s|\Z)[^\n]*|#[^\n]*)+)",
+    re.DOTALL,
+)
+_STRING_PATTERN: Pattern[str] = re.compile(
+    r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\""
+)
+_NUMBER_PATTERN: Pattern[str] = re.compile(
+    r"(?<![\w`])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?\b", re.IGNORECASE
+)
+_PLACEHOLDER_LIST_PATTERN: Pattern[str] = re.compile(
+    r"\(\s*\?(?:\s*,\s*\?)*\s*\)"
+)
+_VALUES_ROWS_PATTERN: Pattern[str] = re.compile(
+    r"\(\?\+\)(?:\s*,\s*\(\?\+\))+"
+)
+_TABLE_PATTERN: Pattern[str] = re.compile(
+    r"\b(?:from|join|into|update|table)\s+"
+    r"((?:`[^`]+`|\w+)(?:\.(?:`[^`]+`|\w+))?"
+    r"(?:\s*,\s*(?:`[^`]+`|\w+)(?:\.(?:`[^`]+`|\w+))?)*)",
+    re.IGNORECASE,
+)
+_LEADING_KEYWORD_PATTERN: Pattern[str] = re.compile(r"[\s(]*(\w+)")
+
+_WRITE_KEYWORDS: FrozenSet[str] = frozenset(
+    {
+        "insert",
+        "update",
+        "delete",
+        "replace",
+        "create",
+        "alter",
+        "drop",
+        "truncate",
+        "rename",
+        "load",
+    }
+)
+
+
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=1024)
+def normalize_query(query: str) -> str:
+    """Normalize the layout of the query text.
+
+    Comments are removed and runs of whitespace are collapsed,
+    so differently formatted copies of a query get the same text.
+    The string literals and the quoted names are kept as they are,
+    and so are the optimizer hints `/*+ ... */` and the executable comments `/*! ... */`,
+    as they change what the server runs.
+
+    Args:
+        query (str): The query text.
+
+    Returns:
+        str: The normalized query text.
+    """
+    return _LAYOUT_PATTERN.sub(_replace_layout, query).strip()
+
+
+# -----------------------------------------------------------------------------
+def _replace_layout(match: re.Match[str]) -> str:
+    if match.lastgroup == "literal":
+        return match.group()
+
+    return " "
+
+
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=1024)
+def fingerprint_query(query: str) -> str:
+    """Return the fingerprint of the query.
+
+    The fingerprint is the normalized query text in lower case,
+    with literals and placeholders replaced by `?`, and value lists and rows collapsed,
+    so all executions of a query shape share a single fingerprint.
+
+    Args:
+        query (str): The query text.
+
+    Returns:
+        str: The fingerprint of the query.
+    """
+    fingerprint: str = normalize_query(query)
+    fingerprint = _STRING_PATTERN.sub("?", fingerprint)
+    fingerprint = _NUMBER_PATTERN.sub("?", fingerprint)
+    fingerprint = fingerprint.replace("%s", "?")
+    fingerprint = _PLACEHOLDER_LIST_PATTERN.sub("(?+)", fingerprint)
+    fingerprint = _VALUES_ROWS_PATTERN.sub("(?+), ...", fingerprint)
+
+    return fingerprint.lower()
+
+
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=1024)
+def extract_tables(query: str) -> FrozenSet[str]:
+    """Return the names of the tables the query refers to.
+
+    *Names are lower-cased and stripped of the schema and the backticks.
+    Tables referenced only inside expressions, e.g. in a subquery of a column, may be missed.
+
+    Args:
+        query (str): The query text.
+
+    Returns:
+        FrozenSet[str]: The table names.
+    """
+    tables: set[str] = set()
+
+    for match in _TABLE_PATTERN.finditer(normalize_query(query)):
+        for reference in match.group(1).split(","):
+            name: str = reference.strip().split(".")[-1]
+            tables.add(name.strip("`").lower())
+
+    return frozenset(tables)
+
+
+# -----------------------------------------------------------------------------
+def is_write_query(query: str) -> bool:
+    """Check whether the query changes data or schema.
+
+    Args:
+        query (str): The query text.
+
+    Returns:
+        bool: True if the query starts with a data or schema changing keyword; otherwise False.
+    """
+    match = _LEADING_KEYWORD_PATTERN.match(normalize_query(query))
+
+    if match is None:
+        return False
+
+    return match.group(1).lower() in _WRITE_KEYWORDS
@@ -0,0 +1,390 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `query_instrumentation` module provides the hook interface and the recorder,
+of the latencies of the queries sent to the database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "AbstractQueryHook",
+    "QueryTimings",
+    "LatencyHistogram",
+    "QueryLatencyStatistics",
+    "QueryLatencyRecorder",
+    "redact_parameters",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import bisect
+import logging
+import time
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, List, Optional, Sequence, Tuple
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Upper bounds of the histogram buckets, in seconds; the last bucket is unbounded.
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.002,
+    0.005,
+    0.01,
+    0.02,
+    0.05,
+    0.1,
+    0.2,
+    0.5,
+    1.0,
+    2.0,
+    5.0,
+)
+
+
+# _____________________________________________________________________________
+@dataclass
+class QueryTimings:
+    """QueryTimings data class with the durations of one query, in seconds.
+
+    *In a scope running several queries, e.g. a transaction,
+    the connection wait is accounted to its first query and the commit to its last one.
+
+    Attributes:
+        fingerprint (str): The fingerprint of the query.
+        parameters (Tuple[Any, ...]): The values bound to the placeholders.
+        query (str): The normalized query text, with its placeholders.
+        connection_wait (float): Time spent waiting for a connection.
+        execute (float): Time spent executing the query.
+        fetch (float): Time spent reading the result.
+        commit (float): Time spent committing.
+        rows (int): The number of rows read or affected.
+        failed (bool): Whether the query raised an error.
+    """
+
+    fingerprint: str
+    parameters: Tuple[Any, ...] = ()
+    query: str = ""
+    connection_wait: float = 0.0
+    execute: float = 0.0
+    fetch: float = 0.0
+    commit: float = 0.0
+    rows: int = 0
+    failed: bool = False
+
+    # -------------------------------------------------------------------------
+    @property
+    def total(self) -> float:
+        """total returns the whole duration of the query."""
+        return self.connection_wait + self.execute + self.fetch + self.commit
+
+
+# _____________________________________________________________________________
+class AbstractQueryHook(ABC):
+    """AbstractQueryHook interface to observe the queries sent by an API.
+
+    *Hooks are called on the event loop after every query,
+    so they must not block or perform I/O of their own.
+
+    Args:
+        ABC: A base class for creating abstract classes,
+             allowing to realize abstraction.
+    """
+
+    @abstractmethod
+    def record_query(self, timings: QueryTimings) -> None:
+        """record_query receives the timings of a finished query.
+
+        Args:
+            timings (QueryTimings): The durations of the query.
+        """
+        pass
+
+
+# _____________________________________________________________________________
+class LatencyHistogram:
+    """LatencyHistogram class of a rolling histogram of latencies.
+
+    This class counts the latencies in fixed buckets,
+    kept in time slices, so only the last `window` seconds are reported.
+
+    Attributes:
+        window (float): The reported period, in seconds.
+        slice_duration (float): The period of a single slice, in seconds.
+        __slices (Deque[Tuple[int, List[int]]]): The bucket counts by slice number, the oldest first.
+    """
+
+    window: float
+    slice_duration: float
+    __slices: Deque[Tuple[int, List[int]]]
+
+    # -------------------------------------------------------------------------
+    def __init__(self, window: float = 60.0, slices: int = 6) -> None:
+        """__init__ constructor.
+
+        Args:
+            window (float, optional): The reported period, in seconds.
+                                      The default is 60.0.
+            slices (int, optional): The number of slices the period is split into.
+                                    The default is 6.
+        """
+        self.window = window
+        self.slice_duration = window / slices
+        self.__slices = deque(maxlen=slices)
+
+    # -------------------------------------------------------------------------
+    def observe(self, latency: float) -> None:
+        """observe counts a latency.
+
+        Args:
+            latency (float): The latency, in seconds.
+        """
+        slice_number: int = int(time.monotonic() / self.slice_duration)
+
+        if not self.__slices or self.__slices[-1][0] != slice_number:
+            self.__slices.append((slice_number, [0] * (len(LATENCY_BUCKETS) + 1)))
+
+        self.__slices[-1][1][bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    # -------------------------------------------------------------------------
+    @property
+    def counts(self) -> List[int]:
+        """counts returns the bucket counts of the reported period."""
+        oldest_slice: int = (
+            int(time.monotonic() / self.slice_duration)
+            - round(self.window / self.slice_duration)
+            + 1
+        )
+        counts: List[int] = [0] * (len(LATENCY_BUCKETS) + 1)
+
+        for slice_number, slice_counts in self.__slices:
+            if slice_number >= oldest_slice:
+                for index, count in enumerate(slice_counts):
+                    counts[index] += count
+
+        return counts
+
+    # -------------------------------------------------------------------------
+    def percentile(self, percent: float) -> float:
+        """percentile returns the upper bound of the bucket holding the percentile.
+
+        Args:
+            percent (float): The percentile, from 0 to 100.
+
+        Returns:
+            float: The latency bound, in seconds; infinity for the unbounded bucket,
+                   0.0 if nothing was observed in the reported period.
+        """
+        counts: List[int] = self.counts
+        total: int = sum(counts)
+
+        if not total:
+            return 0.0
+
+        rank: float = total * percent / 100
+        accumulated: int = 0
+
+        for index, count in enumerate(counts):
+            accumulated += count
+
+            if accumulated >= rank and count:
+                break
+
+        return (
+            LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else float("inf")
+        )
+
+
+# _____________________________________________________________________________
+@dataclass
+class QueryLatencyStatistics:
+    """QueryLatencyStatistics data class with the counters of a query fingerprint.
+
+    Attributes:
+        fingerprint (str): The fingerprint of the query.
+        calls (int): The number of executions.
+        errors (int): The number of failed executions.
+        rows (int): The number of rows read or affected.
+        total_time (float): The sum of the whole durations, in seconds.
+        connection_wait_time (float): The sum of the connection waits, in seconds.
+        execute_time (float): The sum of the execution durations, in seconds.
+        fetch_time (float): The sum of the result reading durations, in seconds.
+        commit_time (float): The sum of the commit durations, in seconds.
+        max_time (float): The longest whole duration, in seconds.
+        histogram (LatencyHistogram): The rolling histogram of the whole durations.
+    """
+
+    fingerprint: str
+    calls: int = 0
+    errors: int = 0
+    rows: int = 0
+    total_time: float = 0.0
+    connection_wait_time: float = 0.0
+    execute_time: float = 0.0
+    fetch_time: float = 0.0
+    commit_time: float = 0.0
+    max_time: float = 0.0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    # -------------------------------------------------------------------------
+    @property
+    def average_time(self) -> float:
+        """average_time returns the average whole duration."""
+        if not self.calls:
+            return 0.0
+
+        return self.total_time / self.calls
+
+    # -------------------------------------------------------------------------
+    def add(self, timings: QueryTimings) -> None:
+        """add accounts the timings of an execution.
+
+        Args:
+            timings (QueryTimings): The durations of the execution.
+        """
+        total: float = timings.total
+
+        self.calls += 1
+        self.errors += int(timings.failed)
+        self.rows += timings.rows
+        self.total_time += total
+        self.connection_wait_time += timings.connection_wait
+        self.execute_time += timings.execute
+        self.fetch_time += timings.fetch
+        self.commit_time += timings.commit
+        self.max_time = max(self.max_time, total)
+        self.histogram.observe(latency=total)
+
+
+# _____________________________________________________________________________
+class QueryLatencyRecorder(AbstractQueryHook):
+    """QueryLatencyRecorder class of a hook aggregating the query latencies.
+
+    This class keeps the counters and the rolling histogram of each query fingerprint,
+    and logs the queries slower than the threshold, with their parameters redacted.
+
+    Attributes:
+        slow_query_threshold (Optional[float]): The duration logging a query, in seconds.
+        max_fingerprints (int): The maximum number of tracked fingerprints.
+        __statistics (OrderedDict): Counters by fingerprint, the least recently used first.
+    """
+
+    slow_query_threshold: Optional[float]
+    max_fingerprints: int
+    __statistics: "OrderedDict[str, QueryLatencyStatistics]"
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        slow_query_threshold: Optional[float] = 0.5,
+        max_fingerprints: int = 1000,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            slow_query_threshold (Optional[float], optional): The duration logging a query, in seconds.
+                                                              The default is 0.5, None disables the log.
+            max_fingerprints (int, optional): The maximum number of tracked fingerprints,
+                                              the least recently executed ones are forgotten.
+                                              The default is 1000.
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.max_fingerprints = max_fingerprints
+        self.__statistics = OrderedDict()
+
+    # -------------------------------------------------------------------------
+    def record_query(self, timings: QueryTimings) -> None:
+        """record_query accounts the timings of a finished query.
+
+        Args:
+            timings (QueryTimings): The durations of the query.
+        """
+        statistics: Optional[QueryLatencyStatistics] = self.__statistics.get(
+            timings.fingerprint
+        )
+
+        if statistics is None:
+            statistics = QueryLatencyStatistics(fingerprint=timings.fingerprint)
+            self.__statistics[timings.fingerprint] = statistics
+
+            if len(self.__statistics) > self.max_fingerprints:
+                self.__statistics.popitem(last=False)
+
+        else:
+            self.__statistics.move_to_end(timings.fingerprint)
+
+        statistics.add(timings=timings)
+
+        if (
+            self.slow_query_threshold is not None
+            and timings.total >= self.slow_query_threshold
+        ):
+            logger.warning(
+                msg=(
+                    f"Slow query {timings.total * 1000:.1f} ms "
+                    f"(wait {timings.connection_wait * 1000:.1f}, "
+                    f"execute {timings.execute * 1000:.1f}, "
+                    f"fetch {timings.fetch * 1000:.1f}, "
+                    f"commit {timings.commit * 1000:.1f}): "
+                    f"{timings.fingerprint} "
+                    f"parameters={redact_parameters(timings.parameters)}"
+                )
+            )
+
+    # -------------------------------------------------------------------------
+    def get_statistics(self, fingerprint: str) -> Optional[QueryLatencyStatistics]:
+        """get_statistics returns the counters of a fingerprint.
+
+        Args:
+            fingerprint (str): The fingerprint of the query.
+
+        Returns:
+            Optional[QueryLatencyStatistics]: The counters; None if the fingerprint is not tracked.
+        """
+        return self.__statistics.get(fingerprint)
+
+    # -------------------------------------------------------------------------
+    def get_top_queries(self, limit: int = 10) -> List[QueryLatencyStatistics]:
+        """get_top_queries returns the fingerprints with the largest total time.
+
+        Args:
+            limit (int, optional): The number of fingerprints.
+                                   The default is 10.
+
+        Returns:
+            List[QueryLatencyStatistics]: The counters, the largest total time first.
+        """
+        return sorted(
+            self.__statistics.values(),
+            key=lambda statistics: statistics.total_time,
+            reverse=True,
+        )[:limit]
+
+    # -------------------------------------------------------------------------
+    def reset(self) -> None:
+        """reset forgets all counters."""
+        self.__statistics.clear()
+
+
+# -----------------------------------------------------------------------------
+def redact_parameters(parameters: Sequence[Any]) -> List[str]:
+    """Replace the parameter values with their types, to keep them out of the logs.
+
+    Args:
+        parameters (Sequence[Any]): The values bound to the placeholders.
+
+    Returns:
+        List[str]: The type name of each value; `NULL` for None.
+    """
+    return [
+        "NULL" if value is None else f"<{type(value).__name__}>"
+        for value in parameters
+    ]
@@ -0,0 +1,344 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `query_result_cache` module provides a class representing the cache,
+of the query results read from the database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "QueryResultCache",
+    "QueryResultCacheStatistics",
+    "estimate_size",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import sys
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Dict,
+    FrozenSet,
+    Hashable,
+    Iterable,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from .query_fingerprint import normalize_query
+
+
+# Annotation for the key of a cached result.
+QueryResultKeyType = Tuple[str, Tuple[Hashable, ...]]
+
+
+# _____________________________________________________________________________
+@dataclass
+class QueryResultCacheStatistics:
+    """QueryResultCacheStatistics data class with the counters of a result cache.
+
+    Attributes:
+        hits (int): The number of reads answered from the cache.
+        misses (int): The number of reads not found in the cache.
+        evictions (int): The number of results removed to respect the size bounds.
+        expirations (int): The number of results removed after their lifetime.
+        invalidations (int): The number of results removed by writes to their tables.
+        entries (int): The number of cached results.
+        memory_usage (int): The estimated size of the cached results, in bytes.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    entries: int = 0
+    memory_usage: int = 0
+
+    # -------------------------------------------------------------------------
+    @property
+    def hit_ratio(self) -> float:
+        """hit_ratio returns the share of reads answered from the cache."""
+        lookups: int = self.hits + self.misses
+
+        if not lookups:
+            return 0.0
+
+        return self.hits / lookups
+
+
+# _____________________________________________________________________________
+class _CacheEntry(NamedTuple):
+    value: Any
+    tables: FrozenSet[str]
+    expires_at: float
+    size: int
+
+
+# _____________________________________________________________________________
+class QueryResultCache:
+    """QueryResultCache class of a size-bounded LRU cache of query results.
+
+    This class keeps the results of read queries for their lifetime,
+    keyed by the normalized query text and the parameters.
+    Each result is tagged with the tables of its query,
+    so a write to a table removes all results read from it.
+
+    *A result read before a write to its tables, but stored after it,
+    is not cached, so a slow read can not bring back the overwritten data.
+
+    Attributes:
+        max_entries (int): The maximum number of cached results.
+        max_memory (int): The maximum estimated size of the cached results, in bytes.
+        statistics (QueryResultCacheStatistics): Counters of the cache.
+        __entries (OrderedDict): Cached results, the least recently used first.
+        __keys_by_table (Dict[str, Set[QueryResultKeyType]]): Keys of the results by table.
+        __invalidated_at (Dict[str, int]): The version of the last invalidation by table.
+        __version (int): The number of invalidations performed.
+    """
+
+    max_entries: int
+    max_memory: int
+    statistics: QueryResultCacheStatistics
+    __entries: "OrderedDict[QueryResultKeyType, _CacheEntry]"
+    __keys_by_table: Dict[str, Set[QueryResultKeyType]]
+    __invalidated_at: Dict[str, int]
+    __version: int
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, max_entries: int = 1024, max_memory: int = 64 * 1024 * 1024
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            max_entries (int, optional): The maximum number of cached results.
+                                         The default is 1024.
+            max_memory (int, optional): The maximum estimated size of the cached results, in bytes.
+                                        The default is 64 MiB.
+        """
+        self.max_entries = max_entries
+        self.max_memory = max_memory
+        self.statistics = QueryResultCacheStatistics()
+        self.__entries = OrderedDict()
+        self.__keys_by_table = {}
+        self.__invalidated_at = {}
+        self.__version = 0
+
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    # -------------------------------------------------------------------------
+    @property
+    def version(self) -> int:
+        """version returns the number of invalidations performed.
+
+        *Taken before a read, it is passed to `set` to detect the writes made during the read.
+        """
+        return self.__version
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def make_key(
+        query: str, parameters: Sequence[Any] = ()
+    ) -> Optional[QueryResultKeyType]:
+        """make_key returns the cache key of a query.
+
+        Args:
+            query (str): The query text.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Optional[QueryResultKeyType]: The key; None if a parameter is not hashable.
+        """
+        key: QueryResultKeyType = (normalize_query(query), tuple(parameters))
+
+        try:
+            hash(key)
+
+        except TypeError:
+            return None
+
+        return key
+
+    # -------------------------------------------------------------------------
+    def get(self, key: QueryResultKeyType) -> Optional[Any]:
+        """get returns the cached result of the key.
+
+        Args:
+            key (QueryResultKeyType): The key made by `make_key`.
+
+        Returns:
+            Optional[Any]: The result; None if it is not cached or expired.
+        """
+        entry: Optional[_CacheEntry] = self.__entries.get(key)
+
+        if entry is None:
+            self.statistics.misses += 1
+
+            return None
+
+        if entry.expires_at <= time.monotonic():
+            self.__remove(key=key)
+            self.statistics.expirations += 1
+            self.statistics.misses += 1
+
+            return None
+
+        self.__entries.move_to_end(key)
+        self.statistics.hits += 1
+
+        return entry.value
+
+    # -------------------------------------------------------------------------
+    def set(
+        self,
+        key: QueryResultKeyType,
+        value: Any,
+        tables: Iterable[str],
+        ttl: float,
+        version: Optional[int] = None,
+    ) -> bool:
+        """set caches the result of the key.
+
+        Args:
+            key (QueryResultKeyType): The key made by `make_key`.
+            value (Any): The result, must not be None.
+            tables (Iterable[str]): The tables the result was read from.
+            ttl (float): The lifetime of the result, in seconds.
+            version (Optional[int], optional): The `version` of the cache taken before the read.
+                                               The default is None, the check is skipped.
+
+        Returns:
+            bool: True if the result is cached; otherwise False.
+        """
+        tags: FrozenSet[str] = frozenset(table.lower() for table in tables)
+
+        if version is not None and any(
+            self.__invalidated_at.get(table, -1) >= version for table in tags
+        ):
+            return False
+
+        size: int = estimate_size(value)
+
+        if ttl <= 0 or size > self.max_memory:
+            return False
+
+        if key in self.__entries:
+            self.__remove(key=key)
+
+        self.__entries[key] = _CacheEntry(
+            value=value,
+            tables=tags,
+            expires_at=time.monotonic() + ttl,
+            size=size,
+        )
+        self.statistics.memory_usage += size
+
+        for table in tags:
+            self.__keys_by_table.setdefault(table, set()).add(key)
+
+        while (
+            len(self.__entries) > self.max_entries
+            or self.statistics.memory_usage > self.max_memory
+        ):
+            oldest_key: QueryResultKeyType = next(iter(self.__entries))
+            self.__remove(key=oldest_key)
+            self.statistics.evictions += 1
+
+        self.statistics.entries = len(self.__entries)
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """invalidate_tables removes the results read from the tables.
+
+        Args:
+            tables (Iterable[str]): The tables changed by a write.
+
+        Returns:
+            int: The number of removed results.
+        """
+        removed: int = 0
+
+        for table in {table.lower() for table in tables}:
+            self.__invalidated_at[table] = self.__version
+
+            for key in self.__keys_by_table.pop(table, set()):
+                if key in self.__entries:
+                    self.__remove(key=key)
+                    removed += 1
+
+        self.__version += 1
+        self.statistics.invalidations += removed
+
+        return removed
+
+    # -------------------------------------------------------------------------
+    def clear(self) -> None:
+        """clear removes all cached results."""
+        self.__entries.clear()
+        self.__keys_by_table.clear()
+        self.statistics.entries = 0
+        self.statistics.memory_usage = 0
+
+    # -------------------------------------------------------------------------
+    def __remove(self, key: QueryResultKeyType) -> None:
+        entry: _CacheEntry = self.__entries.pop(key)
+        self.statistics.memory_usage -= entry.size
+        self.statistics.entries = len(self.__entries)
+
+        for table in entry.tables:
+            keys: Optional[Set[QueryResultKeyType]] = self.__keys_by_table.get(
+                table
+            )
+
+            if keys is not None:
+                keys.discard(key)
+
+                if not keys:
+                    del self.__keys_by_table[table]
+
+
+# -----------------------------------------------------------------------------
+def estimate_size(value: Any) -> int:
+    """Estimate the memory taken by a query result.
+
+    *Containers are measured with their items; other objects by their own size.
+
+    Args:
+        value (Any): The result, e.g. a list of rows.
+
+    Returns:
+        int: The estimated number of bytes.
+    """
+    size: int = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        for key, item in value.items():
+            size += estimate_size(key) + estimate_size(item)
+
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        for item in value:
+            size += estimate_size(item)
+
+    else:
+        # Slotted records, e.g. the ones of a `RowMapper`, keep their values outside of a dictionary.
+        for slot in getattr(type(value), "__slots__", ()):
+            if hasattr(value, slot):
+                size += estimate_size(getattr(value, slot))
+
+    return size
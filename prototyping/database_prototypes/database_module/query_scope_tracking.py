@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `query_scope_tracking` module provides a class that follows the query scopes of a database API,
+sharing the pool reads through the result cache and the read coalescer,
+and reporting the query timings to the hooks once a scope is finished.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["QueryScopeTracker"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import logging
+
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Set,
+)
+
+from .query_fingerprint import (
+    extract_tables,
+    fingerprint_query,
+    is_write_query,
+    normalize_query,
+)
+from .query_instrumentation import AbstractQueryHook, QueryTimings
+from .query_result_cache import QueryResultCache
+from .row_mapping import ResultRows
+from .single_flight import SingleFlight
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Annotation for the function running a pool read.
+FetchAllType = Callable[[], Awaitable[ResultRows]]
+
+
+# _____________________________________________________________________________
+class QueryScopeTracker:
+    """QueryScopeTracker class of the bookkeeping shared by the database APIs.
+
+    A scope is the use of a connection, from its checkout up to its commit or rollback.
+    The tracker collects the tables written and the query timings of every open scope,
+    by connection, and settles them when the API reports the scope finished.
+
+    *A pool read given a `cache_ttl` is answered from the result cache, if there is one.
+    Writes drop the cached results of the tables they change, once their scope is finished.
+
+    *With a read coalescer set, identical pool reads running at the same time
+    share a single query and its result or error.
+    A read started after a write scope is finished never joins a read started before it.
+
+    Attributes:
+        result_cache (Optional[QueryResultCache]): The cache of the pool read results.
+        read_coalescer (Optional[SingleFlight]): Coalesces the identical concurrent pool reads.
+        __write_generation (int): The number of write scopes finished, separating the coalesced reads.
+        __written_tables (Dict[Any, Set[str]]): Tables changed by the unfinished scopes, by connection.
+        __query_hooks (List[AbstractQueryHook]): The hooks receiving the query timings.
+        __pending_timings (Dict[Any, List[QueryTimings]]): Timings of the queries of the open scopes, by connection.
+    """
+
+    result_cache: Optional[QueryResultCache]
+    read_coalescer: Optional[SingleFlight[ResultRows]]
+    __write_generation: int
+    __written_tables: Dict[Any, Set[str]]
+    __query_hooks: List[AbstractQueryHook]
+    __pending_timings: Dict[Any, List[QueryTimings]]
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        result_cache: Optional[QueryResultCache] = None,
+        query_hooks: Sequence[AbstractQueryHook] = (),
+        read_coalescer: Optional[SingleFlight[ResultRows]] = None,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            result_cache (Optional[QueryResultCache], optional): The cache of the pool read results.
+                                                                 The default is None, the results are not cached.
+            query_hooks (Sequence[AbstractQueryHook], optional): The hooks receiving the query timings.
+                                                                 The default is an empty tuple.
+            read_coalescer (Optional[SingleFlight], optional): Coalesces the identical concurrent pool reads.
+                                                               The default is None, every read runs its own query.
+        """
+        self.result_cache = result_cache
+        self.read_coalescer = read_coalescer
+        self.__write_generation = 0
+        self.__written_tables = {}
+        self.__query_hooks = list(query_hooks)
+        self.__pending_timings = {}
+
+    # -------------------------------------------------------------------------
+    def add_query_hook(self, hook: AbstractQueryHook) -> None:
+        """add_query_hook adds a hook receiving the timings of the queries.
+
+        Args:
+            hook (AbstractQueryHook): The hook, e.g. a `QueryLatencyRecorder`.
+        """
+        self.__query_hooks.append(hook)
+
+    # -------------------------------------------------------------------------
+    async def fetch_all(
+        self,
+        query: str,
+        parameters: Sequence[Any],
+        fetch_all: FetchAllType,
+        cache_ttl: Optional[float] = None,
+        can_coalesce: bool = True,
+    ) -> ResultRows:
+        """fetch_all returns the rows of a pool read, sharing them where possible.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any]): The values bound to the placeholders.
+            fetch_all (FetchAllType): Runs the read on the database.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if there is one.
+                                                   The default is None, the result is not cached.
+            can_coalesce (bool, optional): Whether the read may share the result of a read in flight,
+                                           e.g. False for a read that must see the writes of its caller.
+                                           The default is True.
+
+        Returns:
+            ResultRows: A copy of the rows of the result, owned by the caller.
+        """
+        result_cache: Optional[QueryResultCache] = self.result_cache
+        cache_key = (
+            None
+            if cache_ttl is None or result_cache is None
+            else result_cache.make_key(query=query, parameters=parameters)
+        )
+
+        if result_cache is None or cache_key is None:
+            # A coalesced result is shared, so every caller gets a copy.
+            rows: ResultRows = await self.__fetch_all_coalesced(
+                query=query,
+                parameters=parameters,
+                fetch_all=fetch_all,
+                can_coalesce=can_coalesce,
+            )
+
+            return ResultRows(rows, column_names=rows.column_names)
+
+        cached_rows: Optional[ResultRows] = result_cache.get(key=cache_key)
+
+        if cached_rows is not None:
+            return ResultRows(cached_rows, column_names=cached_rows.column_names)
+
+        # Taken before the read, so a write committed meanwhile is detected.
+        cache_version: int = result_cache.version
+
+        rows = await self.__fetch_all_coalesced(
+            query=query,
+            parameters=parameters,
+            fetch_all=fetch_all,
+            can_coalesce=can_coalesce,
+        )
+
+        # The cached rows are never handed out, only their copies.
+        result_cache.set(
+            key=cache_key,
+            value=rows,
+            tables=extract_tables(query),
+            ttl=cache_ttl,
+            version=cache_version,
+        )
+
+        return ResultRows(rows, column_names=rows.column_names)
+
+    # -------------------------------------------------------------------------
+    def note_write(self, connection: Any, query: str) -> None:
+        """note_write records the tables changed by a query of an open scope.
+
+        Args:
+            connection (Any): The connection of the scope.
+            query (str): The query text.
+        """
+        if (
+            self.result_cache is None and self.read_coalescer is None
+        ) or not is_write_query(query):
+            return
+
+        self.__written_tables.setdefault(connection, set()).update(
+            extract_tables(query)
+        )
+
+    # -------------------------------------------------------------------------
+    def add_timings(
+        self,
+        connection: Any,
+        query: str,
+        parameters: Sequence[Any] = (),
+        execute: float = 0.0,
+        fetch: float = 0.0,
+        rows: int = 0,
+        failed: bool = False,
+    ) -> None:
+        """add_timings records the timings of a query of an open scope.
+
+        Args:
+            connection (Any): The connection of the scope.
+            query (str): The query text.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            execute (float, optional): The execution time, in seconds.
+                                       The default is 0.0.
+            fetch (float, optional): The time spent reading the rows, in seconds.
+                                     The default is 0.0.
+            rows (int, optional): The number of rows read or affected.
+                                  The default is 0.
+            failed (bool, optional): Whether the query failed.
+                                     The default is False.
+        """
+        if not self.__query_hooks:
+            return
+
+        self.__pending_timings.setdefault(connection, []).append(
+            QueryTimings(
+                fingerprint=fingerprint_query(query),
+                parameters=tuple(parameters),
+                query=normalize_query(query),
+                execute=execute,
+                fetch=fetch,
+                rows=rows,
+                failed=failed,
+            )
+        )
+
+    # -------------------------------------------------------------------------
+    def finish_scope(
+        self, connection: Any, connection_wait: float, commit_time: float
+    ) -> None:
+        """finish_scope settles a scope once it is committed or rolled back.
+
+        The cached results of the tables written by the scope are dropped,
+        and the timings of its queries are handed to the hooks.
+
+        Args:
+            connection (Any): The connection of the scope.
+            connection_wait (float): The time spent waiting for the connection, in seconds.
+            commit_time (float): The time spent committing the scope, in seconds.
+        """
+        self.__invalidate_written_tables(connection=connection)
+        self.__report_timings(
+            connection=connection,
+            connection_wait=connection_wait,
+            commit_time=commit_time,
+        )
+
+    # -------------------------------------------------------------------------
+    async def __fetch_all_coalesced(
+        self,
+        query: str,
+        parameters: Sequence[Any],
+        fetch_all: FetchAllType,
+        can_coalesce: bool,
+    ) -> ResultRows:
+        read_coalescer: Optional[SingleFlight[ResultRows]] = self.read_coalescer
+        # The normalized text keeps the literals, so queries differing only in them are not merged.
+        query_key = QueryResultCache.make_key(query=query, parameters=parameters)
+
+        if read_coalescer is None or query_key is None or not can_coalesce:
+            return await fetch_all()
+
+        return await read_coalescer.run(
+            key=(self.__write_generation, query_key), function=fetch_all
+        )
+
+    # -------------------------------------------------------------------------
+    def __invalidate_written_tables(self, connection: Any) -> None:
+        # Called once the scope is committed or rolled back; a rollback only costs a few misses.
+        tables: Optional[Set[str]] = self.__written_tables.pop(connection, None)
+
+        if not tables:
+            return
+
+        self.__write_generation += 1
+
+        if self.result_cache is not None:
+            self.result_cache.invalidate_tables(tables=tables)
+
+    # -------------------------------------------------------------------------
+    def __report_timings(
+        self, connection: Any, connection_wait: float, commit_time: float
+    ) -> None:
+        scope_timings: Optional[List[QueryTimings]] = self.__pending_timings.pop(
+            connection, None
+        )
+
+        if not scope_timings:
+            return
+
+        scope_timings[0].connection_wait = connection_wait
+        scope_timings[-1].commit = commit_time
+
+        for timings in scope_timings:
+            for hook in self.__query_hooks:
+                try:
+                    hook.record_query(timings=timings)
+
+                except Exception:
+                    logger.exception(msg="A query hook failed!")
@@ -0,0 +1,289 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `row_mapping` module provides the mapping of the query result rows,
+into compact typed records, or into columns.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "ResultRows",
+    "RowMapper",
+    "to_columns",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import dataclasses
+
+from array import array
+from operator import itemgetter
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
+
+
+# The bounds of the signed 64-bit integers of a columnar array.
+_INT64_MIN: int = -(2**63)
+_INT64_MAX: int = 2**63 - 1
+
+
+# _____________________________________________________________________________
+class ResultRows(list):
+    """ResultRows class of the rows of a query result, with its column names.
+
+    *It is a plain list of the rows otherwise,
+    so the callers not interested in the columns are not affected.
+
+    Attributes:
+        column_names (Tuple[str, ...]): The names of the result columns, in the order of the row values.
+    """
+
+    __slots__ = ("column_names",)
+
+    column_names: Tuple[str, ...]
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, rows: Iterable[Any] = (), column_names: Sequence[str] = ()
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            rows (Iterable[Any], optional): The rows of the result.
+                                            The default is an empty tuple.
+            column_names (Sequence[str], optional): The names of the result columns.
+                                                    The default is an empty tuple.
+        """
+        super().__init__(rows)
+
+        self.column_names = tuple(column_names)
+
+
+# _____________________________________________________________________________
+class RowMapper[RecordType]:
+    """RowMapper class of the mapping of rows into typed records.
+
+    This class builds the records of a type declared for a query,
+    a dataclass with `slots=True` or a named tuple,
+    from the rows of its result, matching the fields with the columns by name.
+
+    The positions of the fields in a row are compiled once per result shape,
+    i.e. per sequence of column names, into a single item getter,
+    so mapping a row costs one call of the record type.
+
+    *A slotted record takes about the memory of the row tuple,
+    several times less than a dictionary of the same values.
+
+    Attributes:
+        record_type (Type[RecordType]): The type of the records.
+        field_names (Tuple[str, ...]): The fields of the record type, in the order of its constructor.
+        __column_names (Dict[str, str]): The column of each field.
+        __plans (Dict[Tuple[str, ...], Callable]): The compiled mapping, by result shape.
+    """
+
+    record_type: Type[RecordType]
+    field_names: Tuple[str, ...]
+    __column_names: Dict[str, str]
+    __plans: Dict[Tuple[str, ...], Callable[[Any], RecordType]]
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        record_type: Type[RecordType],
+        columns: Optional[Dict[str, str]] = None,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            record_type (Type[RecordType]): The type of the records, a dataclass or a named tuple.
+            columns (Optional[Dict[str, str]], optional): The column of a field, for the fields named otherwise.
+                                                          The default is None, the fields are named as the columns.
+
+        Raises:
+            TypeError: If the record type is neither a dataclass nor a named tuple.
+        """
+        self.record_type = record_type
+        self.field_names = _get_field_names(record_type=record_type)
+        self.__column_names = {
+            field_name: (columns or {}).get(field_name, field_name)
+            for field_name in self.field_names
+        }
+        self.__plans = {}
+
+    # -------------------------------------------------------------------------
+    def map_rows(
+        self, rows: Sequence[Any], column_names: Optional[Sequence[str]] = None
+    ) -> List[RecordType]:
+        """map_rows returns the records of the rows.
+
+        Args:
+            rows (Sequence[Any]): The rows of a query result.
+            column_names (Optional[Sequence[str]], optional): The names of the result columns.
+                                                              The default is None, the names kept by `ResultRows` are used.
+
+        Returns:
+            List[RecordType]: The records, in the order of the rows.
+
+        Raises:
+            ValueError: If a field has no column in the result.
+        """
+        plan: Callable[[Any], RecordType] = self.__get_plan(
+            column_names=_resolve_column_names(
+                rows=rows, column_names=column_names
+            )
+        )
+
+        return [plan(row) for row in rows]
+
+    # -------------------------------------------------------------------------
+    def map_row(self, row: Any, column_names: Sequence[str]) -> RecordType:
+        """map_row returns the record of a single row.
+
+        Args:
+            row (Any): The row of a query result.
+            column_names (Sequence[str]): The names of the result columns.
+
+        Returns:
+            RecordType: The record.
+
+        Raises:
+            ValueError: If a field has no column in the result.
+        """
+        return self.__get_plan(column_names=tuple(column_names))(row)
+
+    # -------------------------------------------------------------------------
+    def __get_plan(
+        self, column_names: Tuple[str, ...]
+    ) -> Callable[[Any], RecordType]:
+        plan: Optional[Callable[[Any], RecordType]] = self.__plans.get(column_names)
+
+        if plan is None:
+            plan = self.__compile(column_names=column_names)
+            self.__plans[column_names] = plan
+
+        return plan
+
+    # -------------------------------------------------------------------------
+    def __compile(self, column_names: Tuple[str, ...]) -> Callable[[Any], RecordType]:
+        positions: Dict[str, int] = {
+            column_name: position for position, column_name in enumerate(column_names)
+        }
+        missing: List[str] = [
+            column_name
+            for column_name in self.__column_names.values()
+            if column_name not in positions
+        ]
+
+        if missing:
+            raise ValueError(
+                f"Columns {missing} of {self.record_type.__name__} "
+                f"are not in the result {list(column_names)}!"
+            )
+
+        record_type: Callable[..., RecordType] = self.record_type
+        field_positions: List[int] = [
+            positions[self.__column_names[field_name]]
+            for field_name in self.field_names
+        ]
+
+        if field_positions == list(range(len(column_names))):
+            return lambda row: record_type(*row)
+
+        if len(field_positions) == 1:
+            (position,) = field_positions
+
+            return lambda row: record_type(row[position])
+
+        get_values: Callable[[Any], Tuple[Any, ...]] = itemgetter(*field_positions)
+
+        return lambda row: record_type(*get_values(row))
+
+
+# -----------------------------------------------------------------------------
+def to_columns(
+    rows: Sequence[Any], column_names: Optional[Sequence[str]] = None
+) -> Dict[str, Union[array, List[Any]]]:
+    """Transpose the rows of a query result into columns.
+
+    *A column of integers fitting 64 bits, or of floats, becomes an `array`,
+    taking 8 bytes per value instead of a reference to a number object;
+    any other column becomes a list.
+
+    Args:
+        rows (Sequence[Any]): The rows of a query result.
+        column_names (Optional[Sequence[str]], optional): The names of the result columns.
+                                                          The default is None, the names kept by `ResultRows` are used.
+
+    Returns:
+        Dict[str, Union[array, List[Any]]]: The values of each column, in the order of the rows.
+    """
+    names: Tuple[str, ...] = _resolve_column_names(
+        rows=rows, column_names=column_names
+    )
+    columns: List[Tuple[Any, ...]] = (
+        list(zip(*rows)) if rows else [() for _ in names]
+    )
+
+    return {
+        name: _to_column(values=values) for name, values in zip(names, columns)
+    }
+
+
+# -----------------------------------------------------------------------------
+def _to_column(values: Tuple[Any, ...]) -> Union[array, List[Any]]:
+    if not values:
+        return []
+
+    value_types: Set[type] = {type(value) for value in values}
+
+    if value_types == {int} and _INT64_MIN <= min(values) <= max(values) <= _INT64_MAX:
+        return array("q", values)
+
+    if value_types == {float}:
+        return array("d", values)
+
+    return list(values)
+
+
+# -----------------------------------------------------------------------------
+def _resolve_column_names(
+    rows: Sequence[Any], column_names: Optional[Sequence[str]]
+) -> Tuple[str, ...]:
+    if column_names is not None:
+        return tuple(column_names)
+
+    if isinstance(rows, ResultRows):
+        return rows.column_names
+
+    raise ValueError("The column names of the rows are not known!")
+
+
+# -----------------------------------------------------------------------------
+def _get_field_names(record_type: type) -> Tuple[str, ...]:
+    if dataclasses.is_dataclass(record_type):
+        return tuple(
+            field.name for field in dataclasses.fields(record_type) if field.init
+        )
+
+    field_names: Optional[Tuple[str, ...]] = getattr(record_type, "_fields", None)
+
+    if field_names is None:
+        raise TypeError(
+            f"Record type {record_type.__name__} must be a dataclass or a named tuple!"
+        )
+
+    return tuple(field_names)
@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `single_flight` module provides a class coalescing identical concurrent calls,
+into a single execution shared by all of the callers.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["SingleFlight", "SingleFlightStatistics"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import asyncio
+
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+
+
+# _____________________________________________________________________________
+@dataclass
+class SingleFlightStatistics:
+    """SingleFlightStatistics data class with the counters of a single-flight group.
+
+    Attributes:
+        calls (int): The number of calls made.
+        executions (int): The number of executions started, one per key in flight.
+        shared (int): The number of calls served by an execution already in flight.
+        errors (int): The number of failed executions.
+        timeouts (int): The number of executions stopped by the timeout.
+    """
+
+    calls: int = 0
+    executions: int = 0
+    shared: int = 0
+    errors: int = 0
+    timeouts: int = 0
+
+
+# _____________________________________________________________________________
+class SingleFlight[ResultType]:
+    """SingleFlight class of a group of coalesced calls.
+
+    This class runs at most one execution per key at a time.
+    A call made while an execution of its key is in flight
+    waits for that execution instead of starting its own,
+    and all callers receive its result or its error.
+
+    *A caller being cancelled does not cancel the shared execution,
+    the execution is only stopped by its timeout.
+
+    Attributes:
+        timeout (Optional[float]): The default limit of an execution, in seconds.
+        statistics (SingleFlightStatistics): Counters of the group.
+        __in_flight (Dict[Hashable, asyncio.Task]): The executions in flight by key.
+    """
+
+    timeout: Optional[float]
+    statistics: SingleFlightStatistics
+    __in_flight: Dict[Hashable, "asyncio.Task[ResultType]"]
+
+    # -------------------------------------------------------------------------
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        """__init__ constructor.
+
+        Args:
+            timeout (Optional[float], optional): The default limit of an execution, in seconds.
+                                                 The default is None, the executions are not limited.
+        """
+        self.timeout = timeout
+        self.statistics = SingleFlightStatistics()
+        self.__in_flight = {}
+
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.__in_flight)
+
+    # -------------------------------------------------------------------------
+    async def run(
+        self,
+        key: Hashable,
+        function: Callable[[], Awaitable[ResultType]],
+        timeout: Optional[float] = None,
+    ) -> ResultType:
+        """run returns the result of the execution of the key.
+
+        Args:
+            key (Hashable): The key identifying identical calls.
+            function (Callable[[], Awaitable[ResultType]]): Starts the execution, if none is in flight.
+            timeout (Optional[float], optional): The limit of a started execution, in seconds.
+                                                 The default is None, the group timeout is used.
+
+        Returns:
+            ResultType: The result of the execution, shared by all callers of the key.
+
+        Raises:
+            asyncio.TimeoutError: If the execution exceeds the timeout.
+            Exception: The error of the execution, raised to all callers of the key.
+        """
+        self.statistics.calls += 1
+
+        task: Optional["asyncio.Task[ResultType]"] = self.__in_flight.get(key)
+
+        if task is None:
+            task = asyncio.create_task(
+                self.__execute(
+                    key=key,
+                    function=function,
+                    timeout=self.timeout if timeout is None else timeout,
+                )
+            )
+            # Retrieves the error even if every caller was cancelled.
+            task.add_done_callback(
+                lambda done: done.cancelled() or done.exception()
+            )
+            self.__in_flight[key] = task
+            self.statistics.executions += 1
+
+        else:
+            self.statistics.shared += 1
+
+        return await asyncio.shield(task)
+
+    # -------------------------------------------------------------------------
+    async def __execute(
+        self,
+        key: Hashable,
+        function: Callable[[], Awaitable[ResultType]],
+        timeout: Optional[float],
+    ) -> ResultType:
+        try:
+            return await asyncio.wait_for(function(), timeout=timeout)
+
+        except asyncio.TimeoutError:
+            self.statistics.timeouts += 1
+            raise
+
+        except Exception:
+            self.statistics.errors += 1
+            raise
+
+        finally:
+            del self.__in_flight[key]
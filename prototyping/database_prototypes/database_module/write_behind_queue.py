@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `write_behind_queue` module provides a class buffering the small updates,
+and writing them to the database in bulk.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "CommittedFlushError",
+    "WriteBehindQueue",
+    "WriteBehindStatistics",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import asyncio
+import logging
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+# _____________________________________________________________________________
+class CommittedFlushError(Exception):
+    """CommittedFlushError is raised by a flush method failing after its batch was committed.
+
+    *The entries of such a batch are written, so they are not restored for a retry.
+    """
+
+
+# _____________________________________________________________________________
+@dataclass
+class WriteBehindStatistics:
+    """WriteBehindStatistics data class with the counters of a write-behind queue.
+
+    Attributes:
+        puts (int): The number of updates put into the queue.
+        coalesced (int): The number of updates merged into a pending one of the same key.
+        flushes (int): The number of successful flush batches.
+        flushed_entries (int): The number of entries written by the flushes.
+        failed_flushes (int): The number of failed flush batches, their entries are kept.
+        pending (int): The number of entries waiting for a flush.
+        backpressure_waits (int): The number of updates that waited for free buffer space.
+    """
+
+    puts: int = 0
+    coalesced: int = 0
+    flushes: int = 0
+    flushed_entries: int = 0
+    failed_flushes: int = 0
+    pending: int = 0
+    backpressure_waits: int = 0
+
+
+# _____________________________________________________________________________
+class WriteBehindQueue[KeyType: Hashable, ValueType]:
+    """WriteBehindQueue class of a coalescing write-behind buffer.
+
+    This class keeps the latest update of each key in memory,
+    merging a new update into the pending one of the same key,
+    and passes the pending entries to the flush method in batches:
+    every `flush_interval` seconds, or as soon as `max_batch_size` entries are pending.
+
+    *The buffer holds at most `max_pending` keys;
+    an update of a new key waits while the buffer is full, which slows down the producers.
+
+    *Entries of a failed flush are kept and merged with the updates made meanwhile,
+    so they are written by a later flush.
+    A flush method failing after the commit of its batch raises `CommittedFlushError`,
+    so the batch is not written twice, e.g. with its increments applied again.
+    A cancelled flush waits for the write of its batch to end, and restores the batch only if the write failed.
+
+    Attributes:
+        __flush_method (Callable): Writes a batch of `(key, value)` entries.
+        __merge_method (Callable): Merges a new value into the pending one of the same key.
+        __pending (Dict[KeyType, ValueType]): The entries waiting for a flush.
+        __flush_lock (asyncio.Lock): Serializes the flushes.
+        __space_freed (asyncio.Condition): Notifies the producers waiting for buffer space.
+        __batch_ready (asyncio.Event): Wakes the flush task when a batch is full.
+        __flush_task (Optional[asyncio.Task]): The background flush task.
+        name (str): The name of the queue, used in the logs.
+        flush_interval (float): Seconds between the periodic flushes.
+        max_batch_size (int): The number of entries triggering a flush, and per flush batch.
+        max_pending (int): The maximum number of pending keys.
+        statistics (WriteBehindStatistics): Counters of the queue.
+    """
+
+    __flush_method: Callable[[List[Tuple[KeyType, ValueType]]], Awaitable[Any]]
+    __merge_method: Callable[[ValueType, ValueType], ValueType]
+    __pending: Dict[KeyType, ValueType]
+    __flush_lock: asyncio.Lock
+    __space_freed: asyncio.Condition
+    __batch_ready: asyncio.Event
+    __flush_task: Optional["asyncio.Task[None]"]
+    name: str
+    flush_interval: float
+    max_batch_size: int
+    max_pending: int
+    statistics: WriteBehindStatistics
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        flush_method: Callable[[List[Tuple[KeyType, ValueType]]], Awaitable[Any]],
+        merge_method: Optional[Callable[[ValueType, ValueType], ValueType]] = None,
+        name: str = "write_behind",
+        flush_interval: float = 0.5,
+        max_batch_size: int = 1000,
+        max_pending: int = 10000,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            flush_method (Callable): Writes a batch of `(key, value)` entries, e.g. with a bulk upsert.
+            merge_method (Optional[Callable], optional): Merges a new value into the pending one of the same key.
+                                                         The default is None, the new value replaces the pending one.
+            name (str, optional): The name of the queue, used in the logs.
+                                  The default is “write_behind”.
+            flush_interval (float, optional): Seconds between the periodic flushes.
+                                              The default is 0.5.
+            max_batch_size (int, optional): The number of entries triggering a flush, and per flush batch.
+                                            The default is 1000.
+            max_pending (int, optional): The maximum number of pending keys.
+                                         The default is 10000.
+
+        Raises:
+            ValueError: If the buffer can not hold a single batch.
+        """
+        if not 0 < max_batch_size <= max_pending:
+            raise ValueError(
+                "Write-behind bounds must satisfy 0 < max_batch_size <= max_pending!"
+            )
+
+        self.__flush_method = flush_method
+        self.__merge_method = merge_method or (lambda _, new_value: new_value)
+        self.__pending = {}
+        self.__flush_lock = asyncio.Lock()
+        self.__space_freed = asyncio.Condition()
+        self.__batch_ready = asyncio.Event()
+        self.__flush_task = None
+        self.name = name
+        self.flush_interval = flush_interval
+        self.max_batch_size = max_batch_size
+        self.max_pending = max_pending
+        self.statistics = WriteBehindStatistics()
+
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.__pending)
+
+    # -------------------------------------------------------------------------
+    async def start(self) -> None:
+        """start starts the background flushes.
+
+        *Calling this method on a started queue has no effect.
+        """
+        if self.__flush_task is not None:
+            return
+
+        self.__flush_task = asyncio.create_task(
+            self.__flush_periodically(), name=f"{self.name}_flush"
+        )
+
+    # -------------------------------------------------------------------------
+    async def put(self, key: KeyType, value: ValueType) -> None:
+        """put adds an update to the queue.
+
+        An update of a pending key is merged into it right away,
+        an update of a new key waits while the buffer is full.
+
+        Args:
+            key (KeyType): The key of the updated record.
+            value (ValueType): The update.
+        """
+        self.statistics.puts += 1
+
+        if key not in self.__pending and len(self.__pending) >= self.max_pending:
+            self.statistics.backpressure_waits += 1
+
+            if self.__flush_task is None:
+                # Nothing flushes in the background, the producer does it.
+                await self.flush()
+
+            self.__batch_ready.set()
+
+            async with self.__space_freed:
+                await self.__space_freed.wait_for(
+                    lambda: key in self.__pending
+                    or len(self.__pending) < self.max_pending
+                )
+
+        self.__add(key=key, value=value)
+
+        if len(self.__pending) >= self.max_batch_size:
+            self.__batch_ready.set()
+
+    # -------------------------------------------------------------------------
+    async def flush(self) -> None:
+        """flush writes all pending entries.
+
+        Raises:
+            Exception: The error of the flush method; the entries are kept for a retry.
+        """
+        async with self.__flush_lock:
+            self.__batch_ready.clear()
+
+            while self.__pending:
+                batch: List[Tuple[KeyType, ValueType]] = []
+
+                for key in list(self.__pending)[: self.max_batch_size]:
+                    batch.append((key, self.__pending.pop(key)))
+
+                self.statistics.pending = len(self.__pending)
+
+                try:
+                    await self.__write_batch(batch=batch)
+
+                finally:
+                    async with self.__space_freed:
+                        self.__space_freed.notify_all()
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close stops the background flushes and writes the pending entries.
+
+        Raises:
+            Exception: The error of the final flush.
+        """
+        task: Optional["asyncio.Task[None]"] = self.__flush_task
+
+        if task is not None:
+            self.__flush_task = None
+            task.cancel()
+
+            try:
+                await task
+
+            except asyncio.CancelledError:
+                pass
+
+        await self.flush()
+
+    # -------------------------------------------------------------------------
+    async def __write_batch(self, batch: List[Tuple[KeyType, ValueType]]) -> None:
+        write_task: "asyncio.Future[Any]" = asyncio.ensure_future(
+            self.__flush_method(batch)
+        )
+        is_cancelled: bool = False
+
+        # The write is not abandoned mid-way, its outcome decides whether the batch is restored.
+        while not write_task.done():
+            try:
+                await asyncio.wait({write_task})
+
+            except asyncio.CancelledError:
+                is_cancelled = True
+
+        error: Optional[BaseException] = (
+            asyncio.CancelledError()
+            if write_task.cancelled()
+            else write_task.exception()
+        )
+
+        if error is not None and not isinstance(error, CommittedFlushError):
+            self.statistics.failed_flushes += 1
+            self.__restore(batch=batch)
+
+            if is_cancelled:
+                raise asyncio.CancelledError()
+
+            raise error
+
+        if error is not None:
+            logger.warning(msg=f"Flush of {self.name} failed after its commit! {error}")
+
+        self.statistics.flushes += 1
+        self.statistics.flushed_entries += len(batch)
+
+        if is_cancelled:
+            raise asyncio.CancelledError()
+
+    # -------------------------------------------------------------------------
+    def __add(self, key: KeyType, value: ValueType) -> None:
+        if key in self.__pending:
+            self.__pending[key] = self.__merge_method(self.__pending[key], value)
+            self.statistics.coalesced += 1
+
+        else:
+            self.__pending[key] = value
+
+        self.statistics.pending = len(self.__pending)
+
+    # -------------------------------------------------------------------------
+    def __restore(self, batch: List[Tuple[KeyType, ValueType]]) -> None:
+        # The failed values are older than the pending ones of the same keys.
+        for key, value in batch:
+            if key in self.__pending:
+                self.__pending[key] = self.__merge_method(value, self.__pending[key])
+
+            else:
+                self.__pending[key] = value
+
+        self.statistics.pending = len(self.__pending)
+
+    # -------------------------------------------------------------------------
+    async def __flush_periodically(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(
+                    self.__batch_ready.wait(), timeout=self.flush_interval
+                )
+
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.flush()
+
+            except Exception:
+                logger.exception(msg=f"Flush of {self.name} failed, retrying later!")
+
+                await asyncio.sleep(self.flush_interval)
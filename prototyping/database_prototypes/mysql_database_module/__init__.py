@@ -1,4 +1,20 @@
-__all__: list[str] = ["AsyncMySQLAPI", "AsyncMySQLDataBase"]
+__all__: list[str] = [
+    "AsyncMySQLAPI",
+    "AsyncMySQLDataBase",
+    "AsyncMySQLConnectionPool",
+    "ExecutorMySQLConnectionPool",
+    "AsyncMySQLTransaction",
+    "IsolationLevel",
+    "QueryKiller",
+    "TransactionRetryPolicy",
+    "IndexAdvisor",
+]
 
 from .async_mysql_database import AsyncMySQLDataBase
 from .async_mysql_database_api import AsyncMySQLAPI
+from .async_mysql_connection_pool import AsyncMySQLConnectionPool
+from .executor_connection_pool import ExecutorMySQLConnectionPool
+from .transaction import AsyncMySQLTransaction, IsolationLevel
+from .query_deadline import QueryKiller
+from .transaction_retry import TransactionRetryPolicy
+from .index_advisor import IndexAdvisor
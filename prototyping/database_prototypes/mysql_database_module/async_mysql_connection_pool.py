@@ -0,0 +1,588 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `async_mysql_connection_pool` module provides a native asynchronous pool,
+of connections to the database, DBMS-MySQL.
+
+Connections of the pool are created with the asynchronous connect method,
+so no worker threads are involved in the pool work.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["AsyncMySQLConnectionPool"]
+
+__author__ = "4-proxy"
+__version__ = "1.3.1"
+
+from ..database_module.pool_statistics import ConnectionPoolStatistics
+
+import asyncio
+import time
+
+from collections import deque
+from typing import Any, Deque, Dict, Optional, Set, Tuple
+from mysql.connector.errors import Error as MySQLError, PoolError
+
+from .types import AsyncMySQLConnectionType, AsyncMySQLConnectMethodType
+
+
+# _____________________________________________________________________________
+class AsyncMySQLConnectionPool:
+    """AsyncMySQLConnectionPool class of a native asynchronous connection pool.
+
+    This class keeps between `min_size` and `max_size` asynchronous connections,
+    created with the assigned connect method.
+    Tasks wait for a free connection up to `acquire_timeout` seconds,
+    idle connections above `min_size` are closed after `max_idle_time` seconds,
+    and an idle connection is health-checked before it is handed out.
+    The maintenance pings the idle connections ahead of time,
+    so a dead connection is replaced before a task asks for it.
+
+    *With `target_wait_time` set, the pool is adaptive:
+    it opens connections only up to `size_limit`, adjusted every `resize_interval` seconds.
+    The limit starts at `max_size`, so a burst right after the start is not queued,
+    and shrinks towards `min_size` while the waits stay well below the target and connections are spare.
+    It grows towards `max_size` while the 95th percentile of the waits exceeds the target,
+    and at once by one connection whenever a task has waited for the target time.
+
+    Attributes:
+        __connect_method (AsyncMySQLConnectMethodType): The function used to open the connections.
+        __connection_data (Dict[str, Any]): The data used to authenticate the connections.
+        __idle (Deque[Tuple[AsyncMySQLConnectionType, float]]): Idle connections with their release time.
+        __in_use (Set[AsyncMySQLConnectionType]): Connections currently checked out.
+        __opening (int): The number of connections currently being opened.
+        __condition (asyncio.Condition): Notifies the waiting tasks about returned connections.
+        __maintenance_task (Optional[asyncio.Task]): The background idle eviction task.
+        __resize_task (Optional[asyncio.Task]): The background size limit adjustment task.
+        __recent_waits (Deque[float]): The waits for a connection since the last adjustment.
+        __peak_in_use (int): The most connections in use since the last adjustment.
+        __checked_at (Dict[AsyncMySQLConnectionType, float]): The time of the last ping by idle connection.
+        size_limit (int): The current maximum number of open connections.
+        target_wait_time (Optional[float]): The wait for a connection the adaptive sizing aims at.
+        resize_interval (float): Seconds between the size limit adjustments.
+        __closed (bool): Whether the pool has been closed.
+        statistics (ConnectionPoolStatistics): The pool load counters.
+    """
+
+    __connect_method: AsyncMySQLConnectMethodType
+    __connection_data: Dict[str, Any]
+    __idle: Deque[Tuple[AsyncMySQLConnectionType, float]]
+    __in_use: Set[AsyncMySQLConnectionType]
+    __opening: int
+    __condition: asyncio.Condition
+    __maintenance_task: Optional["asyncio.Task[None]"]
+    __resize_task: Optional["asyncio.Task[None]"]
+    __recent_waits: Deque[float]
+    __peak_in_use: int
+    __checked_at: Dict[AsyncMySQLConnectionType, float]
+    size_limit: int
+    target_wait_time: Optional[float]
+    resize_interval: float
+    __closed: bool
+    statistics: ConnectionPoolStatistics
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        connect_method: AsyncMySQLConnectMethodType,
+        connection_data: Dict[str, Any],
+        pool_name: str = "mysql_async_pool",
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 10.0,
+        max_idle_time: float = 300.0,
+        health_check_after: float = 30.0,
+        maintenance_interval: float = 30.0,
+        target_wait_time: Optional[float] = None,
+        resize_interval: float = 5.0,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connect_method (AsyncMySQLConnectMethodType): The function used to open the connections.
+            connection_data (Dict[str, Any]): Data used to authenticate the connections.
+            pool_name (str, optional): The name identifier of the pool.
+                                       The default is “mysql_async_pool”.
+            min_size (int, optional): The number of connections kept open at all times.
+                                      The default is 1.
+            max_size (int, optional): The maximum number of open connections.
+                                      The default is 10.
+            acquire_timeout (float, optional): Seconds to wait for a free connection.
+                                               The default is 10.0.
+            max_idle_time (float, optional): Seconds after which an idle connection above `min_size` is closed.
+                                             The default is 300.0.
+            health_check_after (float, optional): Seconds of idling after which a connection is checked before use.
+                                                  The default is 30.0.
+            maintenance_interval (float, optional): Seconds between the idle eviction runs.
+                                                    The default is 30.0.
+            target_wait_time (Optional[float], optional): The wait for a connection the adaptive sizing aims at, in seconds.
+                                                          The default is None, the pool grows up to `max_size` on demand.
+            resize_interval (float, optional): Seconds between the size limit adjustments of the adaptive pool.
+                                               The default is 5.0.
+
+        Raises:
+            ValueError: If the pool size bounds are not valid.
+        """
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError(
+                "Pool size bounds must satisfy 0 <= min_size <= max_size "
+                "and max_size >= 1!"
+            )
+
+        self.__connect_method = connect_method
+        self.__connection_data = connection_data
+        self.pool_name = pool_name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.max_idle_time = max_idle_time
+        self.health_check_after = health_check_after
+        self.maintenance_interval = maintenance_interval
+        self.target_wait_time = target_wait_time
+        self.resize_interval = resize_interval
+        self.size_limit = max_size
+
+        self.__idle = deque()
+        self.__in_use = set()
+        self.__opening = 0
+        self.__condition = asyncio.Condition()
+        self.__maintenance_task = None
+        self.__resize_task = None
+        self.__recent_waits = deque(maxlen=1024)
+        self.__peak_in_use = 0
+        self.__checked_at = {}
+        self.__closed = False
+        self.statistics = ConnectionPoolStatistics(size_limit=self.size_limit)
+
+    # -------------------------------------------------------------------------
+    @property
+    def pool_size(self) -> int:
+        """pool_size returns the number of open connections of the pool."""
+        return len(self.__idle) + len(self.__in_use) + self.__opening
+
+    # -------------------------------------------------------------------------
+    async def open(self) -> None:
+        """open fills the pool up to the minimum size and starts its maintenance.
+
+        *Calling this method on an already opened pool has no effect.
+        """
+        if self.__maintenance_task is not None:
+            return
+
+        await self.fill_to_min_size()
+
+        self.__maintenance_task = asyncio.create_task(
+            self.__maintain(), name=f"{self.pool_name}_maintenance"
+        )
+
+        if self.target_wait_time is not None:
+            self.__resize_task = asyncio.create_task(
+                self.__resize(), name=f"{self.pool_name}_resize"
+            )
+
+    # -------------------------------------------------------------------------
+    async def fill_to_min_size(self) -> None:
+        """fill_to_min_size opens connections until the pool has `min_size` of them."""
+        missing: int = self.min_size - self.pool_size
+
+        if missing <= 0:
+            return
+
+        self.__opening += missing
+
+        try:
+            results: list[Any] = await asyncio.gather(
+                *(self.__connect() for _ in range(missing)),
+                return_exceptions=True,
+            )
+
+        finally:
+            self.__opening -= missing
+
+        released_at: float = time.monotonic()
+
+        for result in results:
+            if isinstance(result, BaseException):
+                continue
+
+            self.__idle.append((result, released_at))
+
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify_all()
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    # -------------------------------------------------------------------------
+    async def get_connection(self) -> AsyncMySQLConnectionType:
+        """get_connection returns a connection from the pool.
+
+        This method hands out a healthy idle connection,
+        opens a new one while the pool is below `max_size`,
+        or waits for a connection to be returned.
+
+        Returns:
+            AsyncMySQLConnectionType: The asynchronous connection to the database.
+
+        Raises:
+            PoolError: If the pool is closed or no connection was freed within `acquire_timeout`.
+        """
+        statistics: ConnectionPoolStatistics = self.statistics
+        started_at: float = time.perf_counter()
+        deadline: float = time.monotonic() + self.acquire_timeout
+
+        statistics.waiting += 1
+        statistics.max_waiting = max(statistics.max_waiting, statistics.waiting)
+
+        try:
+            connection: AsyncMySQLConnectionType = await self.__acquire(
+                deadline=deadline
+            )
+
+        except PoolError:
+            statistics.timeouts += int(not self.__closed)
+            raise
+
+        finally:
+            statistics.waiting -= 1
+
+        wait_time: float = time.perf_counter() - started_at
+
+        self.__in_use.add(connection)
+        self.__recent_waits.append(wait_time)
+        self.__peak_in_use = max(self.__peak_in_use, len(self.__in_use))
+        statistics.record_wait(wait_time=wait_time)
+        self.__update_counters()
+
+        return connection
+
+    # -------------------------------------------------------------------------
+    async def release_connection(
+        self, connection: AsyncMySQLConnectionType
+    ) -> None:
+        """release_connection returns the connection back to the pool.
+
+        *Connections returned to a closed pool are closed.
+
+        Args:
+            connection (AsyncMySQLConnectionType): The connection to return.
+        """
+        self.__in_use.discard(connection)
+
+        if self.__closed or self.pool_size >= self.size_limit:
+            # Also shrinks a pool whose size limit was lowered meanwhile.
+            await self.__discard(connection=connection)
+
+        else:
+            self.__idle.append((connection, time.monotonic()))
+
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify()
+
+    # -------------------------------------------------------------------------
+    async def discard_connection(
+        self, connection: AsyncMySQLConnectionType
+    ) -> None:
+        """discard_connection closes a broken connection instead of returning it.
+
+        Args:
+            connection (AsyncMySQLConnectionType): The connection to close.
+        """
+        self.__in_use.discard(connection)
+
+        await self.__discard(connection=connection)
+
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify()
+
+    # -------------------------------------------------------------------------
+    async def evict_idle_connections(self) -> None:
+        """evict_idle_connections closes connections idle for over `max_idle_time`.
+
+        *The pool never shrinks below `min_size` due to eviction.
+        """
+        now: float = time.monotonic()
+
+        while (
+            self.__idle
+            and self.pool_size > self.min_size
+            and now - self.__idle[0][1] > self.max_idle_time
+        ):
+            connection, _ = self.__idle.popleft()
+
+            await self.__discard(connection=connection)
+
+        self.__update_counters()
+
+    # -------------------------------------------------------------------------
+    async def ping_idle_connections(self) -> None:
+        """ping_idle_connections checks the idle connections not used for `health_check_after` seconds.
+
+        The checked connections are taken out of the pool for the ping,
+        the dead ones are closed, and the pool is refilled up to `min_size`.
+        """
+        now: float = time.monotonic()
+        stale: list[Tuple[AsyncMySQLConnectionType, float]] = []
+        fresh: list[Tuple[AsyncMySQLConnectionType, float]] = []
+
+        for connection, released_at in self.__idle:
+            if self.__is_due_for_check(connection, released_at, now):
+                stale.append((connection, released_at))
+            else:
+                fresh.append((connection, released_at))
+
+        if not stale:
+            return
+
+        self.__idle = deque(fresh)
+        self.__opening += len(stale)
+
+        try:
+            results: list[bool] = await asyncio.gather(
+                *(self.__ping(connection) for connection, _ in stale)
+            )
+
+        finally:
+            self.__opening -= len(stale)
+
+        checked_at: float = time.monotonic()
+
+        for (connection, released_at), is_alive in zip(stale, results):
+            if not is_alive or self.__closed:
+                await self.__discard(connection=connection)
+
+            else:
+                self.__checked_at[connection] = checked_at
+                self.__idle.append((connection, released_at))
+
+        # Ordered by the release time again, as the eviction expects.
+        self.__idle = deque(sorted(self.__idle, key=lambda entry: entry[1]))
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify_all()
+
+        if not self.__closed:
+            await self.fill_to_min_size()
+
+    # -------------------------------------------------------------------------
+    async def adjust_size(self) -> None:
+        """adjust_size moves the size limit of the adaptive pool by the recent waits.
+
+        *The waits collected since the previous adjustment are used,
+        so each call judges the load of one `resize_interval`.
+        """
+        if self.target_wait_time is None:
+            return
+
+        waits: list[float] = sorted(self.__recent_waits)
+        peak_in_use: int = self.__peak_in_use
+
+        self.__recent_waits.clear()
+        self.__peak_in_use = len(self.__in_use)
+
+        wait_p95: float = waits[int(0.95 * (len(waits) - 1))] if waits else 0.0
+        size_limit: int = self.size_limit
+
+        if (
+            wait_p95 > self.target_wait_time or self.statistics.waiting
+        ) and size_limit < self.max_size:
+            # Grows by half, so a spike is absorbed in a few adjustments.
+            size_limit = min(self.max_size, size_limit + max(size_limit // 2, 1))
+
+        elif (
+            wait_p95 < self.target_wait_time / 4
+            and peak_in_use < size_limit - 1
+            and size_limit > max(self.min_size, 1)
+        ):
+            size_limit -= 1
+
+        if size_limit == self.size_limit:
+            return
+
+        self.size_limit = size_limit
+        self.statistics.resizes += 1
+
+        while self.__idle and self.pool_size > self.size_limit:
+            connection, _ = self.__idle.popleft()
+
+            await self.__discard(connection=connection)
+
+        self.__update_counters()
+
+        async with self.__condition:
+            # Waiting tasks may open connections up to the raised limit.
+            self.__condition.notify_all()
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close closes the idle connections and stops the pool maintenance.
+
+        *Connections still in use are closed when they are returned.
+        """
+        self.__closed = True
+
+        for task in (self.__maintenance_task, self.__resize_task):
+            if task is None:
+                continue
+
+            task.cancel()
+
+            try:
+                await task
+
+            except asyncio.CancelledError:
+                pass
+
+        self.__maintenance_task = None
+        self.__resize_task = None
+
+        while self.__idle:
+            connection, _ = self.__idle.popleft()
+
+            await self.__discard(connection=connection)
+
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify_all()
+
+    # -------------------------------------------------------------------------
+    async def __acquire(self, deadline: float) -> AsyncMySQLConnectionType:
+        while True:
+            if self.__closed:
+                raise PoolError("Failed getting connection; pool is closed")
+
+            while self.__idle:
+                # The most recently used connection is the warmest one.
+                connection, released_at = self.__idle.pop()
+
+                if await self.__is_healthy(connection, released_at):
+                    return connection
+
+                await self.__discard(connection=connection)
+
+            if self.pool_size < self.size_limit:
+                self.__opening += 1
+
+                try:
+                    return await self.__connect()
+
+                finally:
+                    self.__opening -= 1
+
+            timeout: float = deadline - time.monotonic()
+
+            if timeout <= 0:
+                raise PoolError("Failed getting connection; pool exhausted")
+
+            can_grow: bool = (
+                self.target_wait_time is not None and self.size_limit < self.max_size
+            )
+
+            if can_grow:
+                timeout = min(timeout, self.target_wait_time)
+
+            try:
+                async with self.__condition:
+                    await asyncio.wait_for(
+                        self.__condition.wait(), timeout=timeout
+                    )
+
+            except asyncio.TimeoutError:
+                if not can_grow or time.monotonic() >= deadline:
+                    raise PoolError(
+                        "Failed getting connection; pool exhausted"
+                    ) from None
+
+                # Other waiters may have raised the limit to `max_size` meanwhile.
+                if self.size_limit < self.max_size:
+                    # The wait is past the target, so the limit grows now, not at the next adjustment.
+                    self.size_limit = min(self.max_size, self.size_limit + 1)
+                    self.statistics.resizes += 1
+                    self.__update_counters()
+
+    # -------------------------------------------------------------------------
+    async def __is_healthy(
+        self, connection: AsyncMySQLConnectionType, released_at: float
+    ) -> bool:
+        if not self.__is_due_for_check(connection, released_at, time.monotonic()):
+            return True
+
+        return await self.__ping(connection=connection)
+
+    # -------------------------------------------------------------------------
+    def __is_due_for_check(
+        self, connection: AsyncMySQLConnectionType, released_at: float, now: float
+    ) -> bool:
+        last_used: float = max(
+            released_at, self.__checked_at.get(connection, released_at)
+        )
+
+        return now - last_used >= self.health_check_after
+
+    # -------------------------------------------------------------------------
+    async def __ping(self, connection: AsyncMySQLConnectionType) -> bool:
+        try:
+            return await connection.is_connected()
+
+        except MySQLError:
+            return False
+
+    # -------------------------------------------------------------------------
+    async def __connect(self) -> AsyncMySQLConnectionType:
+        connection: AsyncMySQLConnectionType = await self.__connect_method(
+            **self.__connection_data
+        )
+
+        self.statistics.created += 1
+
+        return connection
+
+    # -------------------------------------------------------------------------
+    async def __discard(self, connection: AsyncMySQLConnectionType) -> None:
+        self.statistics.discarded += 1
+        self.__checked_at.pop(connection, None)
+
+        try:
+            await connection.close()
+
+        except MySQLError:
+            pass
+
+    # -------------------------------------------------------------------------
+    async def __maintain(self) -> None:
+        while True:
+            await asyncio.sleep(self.maintenance_interval)
+
+            await self.evict_idle_connections()
+
+            try:
+                await self.ping_idle_connections()
+                await self.fill_to_min_size()
+
+            except MySQLError:
+                # The next run tries again; get_connection opens connections on demand.
+                pass
+
+    # -------------------------------------------------------------------------
+    async def __resize(self) -> None:
+        while True:
+            await asyncio.sleep(self.resize_interval)
+
+            await self.adjust_size()
+
+    # -------------------------------------------------------------------------
+    def __update_counters(self) -> None:
+        self.statistics.in_use = len(self.__in_use)
+        self.statistics.idle = len(self.__idle)
+        self.statistics.size_limit = self.size_limit
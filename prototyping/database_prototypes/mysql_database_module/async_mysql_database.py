@@ -11,14 +11,18 @@ Apache license, version 2.0 (Apache-2.0 license)
 __all__: list[str] = ["AsyncMySQLDataBase"]
 
 __author__ = "4-proxy"
-__version__ = "1.0.1"
+__version__ = "1.6.1"
 
 from ..database_module.abstract_async_database import AbstractAsyncDataBase
 
-from typing import Dict, Any
+from functools import partial
+from typing import Any, Dict, List, Optional, Sequence
 from mysql.connector.pooling import MySQLConnectionPool
 
-from .async_mysql_database_api import AsyncMySQLAPI
+from .async_mysql_database_api import AsyncMySQLAPI, AsyncMySQLPoolType
+from .executor_connection_pool import ExecutorMySQLConnectionPool
+from .async_mysql_connection_pool import AsyncMySQLConnectionPool
+from .query_deadline import QueryKiller
 from .types import AsyncMySQLConnectionType, AsyncMySQLConnectMethodType
 
 
@@ -37,14 +41,29 @@ class AsyncMySQLDataBase(
     *This implementation of the parent class,
     is interpreted using connection pooling and single/independent connection.
 
+    *The pool is either the native asynchronous pool built on the connect method,
+    or the synchronous pool wrapped to run its blocking calls on a worker-thread executor.
+
     Args:
         AbstractAsyncDataBase: Base class for implementing a specific type of database.
 
+    *Replica servers get a pool of the same kind each,
+    and the API routes the read-only queries to them.
+
+    *Each server gets a query killer with a side connection of its own,
+    used by the API to kill the queries stopped by their deadline or cancellation.
+
     Attributes:
-        __pool (AsyncMySQLConnectionPool): The active pool of connections to the database.
+        __pool (AsyncMySQLPoolType): The active pool of connections to the database.
+        __replica_pools (List[AsyncMySQLPoolType]): The pools of connections to the replica servers.
+        __keepalive_interval (Optional[float]): Seconds between the pings of the idle independent connection.
+        __query_killers (Dict[AsyncMySQLPoolType, QueryKiller]): The query killer of the server of each pool.
     """
 
-    __pool: MySQLConnectionPool
+    __pool: AsyncMySQLPoolType
+    __replica_pools: List[AsyncMySQLPoolType]
+    __keepalive_interval: Optional[float]
+    __query_killers: Dict[AsyncMySQLPoolType, QueryKiller]
 
     # -------------------------------------------------------------------------
     def __init__(
@@ -54,6 +73,13 @@ class AsyncMySQLDataBase(
         api: AsyncMySQLAPI,
         pool_name: str = "mysql_pool",
         pool_size: int = 3,
+        use_async_pool: bool = False,
+        pool_min_size: int = 1,
+        pool_acquire_timeout: float = 10.0,
+        pool_max_idle_time: float = 300.0,
+        pool_target_wait_time: Optional[float] = None,
+        replica_connection_data: Sequence[Dict[str, Any]] = (),
+        keepalive_interval: Optional[float] = 60.0,
     ) -> None:
         """__init__ constructor.
 
@@ -66,7 +92,23 @@ class AsyncMySQLDataBase(
             pool_name (str, optional): The name identifier of the connection pool.
                                        The default is “mysql_pool”.
             pool_size (int, optional): The size/number of available pool connections.
+                                       For the native asynchronous pool, this is its maximum size.
                                        The default is 3.
+            use_async_pool (bool, optional): Whether to use the native asynchronous pool.
+                                             The default is False.
+            pool_min_size (int, optional): The minimum size of the native asynchronous pool.
+                                           The default is 1.
+            pool_acquire_timeout (float, optional): Seconds to wait for a free connection of the pool.
+                                                    The default is 10.0.
+            pool_max_idle_time (float, optional): Seconds after which idle connections of the native asynchronous pool are closed.
+                                                  The default is 300.0.
+            pool_target_wait_time (Optional[float], optional): The connection wait the native asynchronous pool sizes itself for,
+                                                               between `pool_min_size` and `pool_size`.
+                                                               The default is None, the pool grows up to `pool_size` on demand.
+            replica_connection_data (Sequence[Dict[str, Any]], optional): Data used to authenticate connections to each replica server.
+                                                                          The default is an empty tuple, there are no replicas.
+            keepalive_interval (Optional[float], optional): Seconds between the pings of the idle independent connection.
+                                                            The default is 60.0, None disables the keepalive.
         """
         super().__init__(
             connect_method=connect_method,
@@ -74,9 +116,36 @@ class AsyncMySQLDataBase(
             api=api,
         )
 
-        self.__pool = MySQLConnectionPool(
-            pool_name=pool_name, pool_size=pool_size, **connection_data
+        pool_settings: Dict[str, Any] = {
+            "use_async_pool": use_async_pool,
+            "pool_size": pool_size,
+            "pool_min_size": pool_min_size,
+            "pool_acquire_timeout": pool_acquire_timeout,
+            "pool_max_idle_time": pool_max_idle_time,
+            "pool_target_wait_time": pool_target_wait_time,
+        }
+
+        self.__keepalive_interval = keepalive_interval
+        self.__pool = self.__create_pool(
+            connection_data=connection_data,
+            pool_name=pool_name,
+            **pool_settings,
         )
+        self.__replica_pools = [
+            self.__create_pool(
+                connection_data=replica_data,
+                pool_name=f"{pool_name}_replica_{index}",
+                **pool_settings,
+            )
+            for index, replica_data in enumerate(replica_connection_data)
+        ]
+        self.__query_killers = {
+            pool: QueryKiller(connect_method=partial(connect_method, **pool_data))
+            for pool, pool_data in zip(
+                (self.__pool, *self.__replica_pools),
+                (connection_data, *replica_connection_data),
+            )
+        }
 
     # -------------------------------------------------------------------------
     async def get_connect_method(self) -> AsyncMySQLConnectMethodType:
@@ -133,13 +202,33 @@ class AsyncMySQLDataBase(
 
         This method closes the current independent connection to the database from the connection pool,
         connection to the database, thus terminating the independent connection to the database.
+
+        *The keepalive of the connection is stopped first.
         """
+        await self.api.stop_keepalive()
+
         connection: AsyncMySQLConnectionType = (
             await self.get_connection_with_database()
         )
 
         await connection.close()
 
+    # -------------------------------------------------------------------------
+    async def close_connection_pool(self) -> None:
+        """close_connection_pool closes the connection pool.
+
+        This method closes the idle connections of the native asynchronous pool,
+        or waits for the pending work of the synchronous pool executor to finish,
+        releasing its worker threads.
+        The replica pools are closed the same way,
+        and so are the side connections of the query killers.
+        """
+        for pool in (self.__pool, *self.__replica_pools):
+            await pool.close()
+
+        for query_killer in self.__query_killers.values():
+            await query_killer.close()
+
     # -------------------------------------------------------------------------
     async def connect_api_to_database(self) -> None:
         """connect_api_to_database sets up the API connection to the database.
@@ -147,12 +236,60 @@ class AsyncMySQLDataBase(
         This method configures the API connection to the database,
         passing a connection pool and an independent connection,
         allowing the API to communicate over the database.
+
+        *The native asynchronous pools are filled up to their minimum size here,
+        and the keepalive of the independent connection is started.
         """
-        pool: MySQLConnectionPool = self.__pool
+        pool: AsyncMySQLPoolType = self.__pool
         connection_with_database: AsyncMySQLConnectionType = (
             await self.get_connection_with_database()
         )
 
+        for each_pool in (pool, *self.__replica_pools):
+            if isinstance(each_pool, AsyncMySQLConnectionPool):
+                await each_pool.open()
+
         await self.api.set_up(
-            separate_connection=connection_with_database, pool=pool
+            separate_connection=connection_with_database,
+            pool=pool,
+            replica_pools=self.__replica_pools,
+        )
+        await self.api.set_query_killers(query_killers=self.__query_killers)
+
+        if self.__keepalive_interval is not None:
+            await self.api.start_keepalive(interval=self.__keepalive_interval)
+
+    # -------------------------------------------------------------------------
+    def __create_pool(
+        self,
+        connection_data: Dict[str, Any],
+        pool_name: str,
+        use_async_pool: bool,
+        pool_size: int,
+        pool_min_size: int,
+        pool_acquire_timeout: float,
+        pool_max_idle_time: float,
+        pool_target_wait_time: Optional[float],
+    ) -> AsyncMySQLPoolType:
+        if use_async_pool:
+            return AsyncMySQLConnectionPool(
+                connect_method=self._connect_method,
+                connection_data=connection_data,
+                pool_name=pool_name,
+                min_size=pool_min_size,
+                max_size=pool_size,
+                acquire_timeout=pool_acquire_timeout,
+                max_idle_time=pool_max_idle_time,
+                target_wait_time=pool_target_wait_time,
+            )
+
+        # The sessions are not reset on return, so the prepared statements of a connection are reused.
+        return ExecutorMySQLConnectionPool(
+            pool=MySQLConnectionPool(
+                pool_name=pool_name,
+                pool_size=pool_size,
+                pool_reset_session=False,
+                **connection_data,
+            ),
+            acquire_timeout=pool_acquire_timeout,
         )
@@ -11,7 +11,7 @@ Apache license, version 2.0 (Apache-2.0 license)
 __all__: list[str] = ["AsyncMySQLAPI"]
 
 __author__ = "4-proxy"
-__version__ = "1.0.1"
+__version__ = "1.17.0"
 
 from ..database_module.async_sql_database_api import (
     AsyncSQLDataBaseAPI,
@@ -19,21 +19,90 @@ from ..database_module.async_sql_database_api import (
 from ..database_module.async_sql_database_pool_api import (
     AsyncSQLDataBasePoolAPI,
 )
+from ..database_module.query_instrumentation import AbstractQueryHook
+from ..database_module.write_behind_queue import (
+    CommittedFlushError,
+    WriteBehindQueue,
+)
+from ..database_module.single_flight import SingleFlight, SingleFlightStatistics
+from ..database_module.pool_statistics import ConnectionPoolStatistics
+from ..database_module.row_mapping import ResultRows, RowMapper, to_columns
+from ..database_module.query_scope_tracking import QueryScopeTracker
+from ..database_module.query_result_cache import (
+    QueryResultCache,
+    QueryResultCacheStatistics,
+)
 
-from typing import Dict
+import asyncio
+import json
+import logging
+import time
+import weakref
+
+from array import array
+from contextlib import aclosing, asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 from string import Template
-from mysql.connector.pooling import MySQLConnectionPool
+from mysql.connector import errorcode
 from mysql.connector.errors import Error as MySQLError
+from mysql.connector.types import RowType
 
-from .types import (
-    AsyncMySQLConnectionType,
-    MySQLPooledConnection,
+from .types import AsyncMySQLConnectionType
+from .executor_connection_pool import (
+    AsyncPooledMySQLConnection,
+    ExecutorMySQLConnectionPool,
 )
+from .async_mysql_connection_pool import AsyncMySQLConnectionPool
+from .bulk_write import (
+    BulkInsertStatementBuilder,
+    BulkWriteStatistics,
+    RowsSourceType,
+    iterate_batches,
+)
+from .transaction import AsyncMySQLTransaction, IsolationLevel, execute_statement
+from .error_classification import is_connection_lost
+from .query_deadline import QueryDeadline, QueryDeadlineStatistics, QueryKiller
+from .transaction_retry import (
+    TransactionRetryPolicy,
+    TransactionRetryStatistics,
+    run_with_retries,
+)
+from .replica_router import ReplicaRouter
+from .prepared_statement_cache import (
+    PreparedStatementCache,
+    PreparedStatementStatistics,
+)
+
 
+logger: logging.Logger = logging.getLogger(name=__name__)
 
+# Annotation for the connection pools supported by the API.
+AsyncMySQLPoolType = Union[ExecutorMySQLConnectionPool, AsyncMySQLConnectionPool]
+
+# Annotation for the connections handed out by the supported pools.
+AsyncMySQLPooledConnectionType = Union[
+    AsyncPooledMySQLConnection, AsyncMySQLConnectionType
+]
+
+
+# _____________________________________________________________________________
 class AsyncMySQLAPI(
     AsyncSQLDataBaseAPI[AsyncMySQLConnectionType],
-    AsyncSQLDataBasePoolAPI[MySQLConnectionPool, MySQLPooledConnection],
+    AsyncSQLDataBasePoolAPI[AsyncMySQLPoolType, AsyncMySQLPooledConnectionType],
 ):
     """AsyncMySQLAPI class to represent the API for a RDBMS-MySQL database.
 
@@ -43,22 +112,185 @@ class AsyncMySQLAPI(
     The *Independent connection is used for direct connection to the database.
     The connection pool is used to query the application using this API.
 
+    *The pool is either the native asynchronous pool,
+    or the synchronous pool running its blocking work on a worker-thread executor.
+    In both cases pool queries do not block the event loop.
+
+    *Parameterized queries are executed as server-side prepared statements,
+    kept in a bounded LRU cache per connection.
+    A synchronous pool resetting the session of a returned connection
+    drops its statements, so they are reused only while the connection is checked out;
+    `AsyncMySQLDataBase` creates the pool without the session reset.
+
+    *The `fetch_one`, `fetch_all`, `stream` and `execute` shortcuts
+    perform application queries using the connection pool.
+
+    *With replica pools set, the pool reads and read-only transactions go to the replicas,
+    and everything else goes to the primary pool.
+    A `sticky_key` (e.g. a chat id) keeps the reads of a key on the primary
+    for a few seconds after a write with the same key.
+
+    *With a result cache set, the pool reads given a `cache_ttl` are answered from the cache.
+    Writes made through the API drop the cached results of the tables they change,
+    once they are committed.
+
+    *With a read coalescer set, identical pool reads running at the same time
+    share a single query and its result or error.
+    A read started after a write is committed never joins a read started before it,
+    and the reads of a sticky key within its window are not coalesced.
+
+    *The query hooks receive the connection wait, execution, fetch and commit times,
+    of every query executed by the API, keyed by the query fingerprint.
+    The plans of the captured queries can be requested with `explain_query`,
+    e.g. by an `IndexAdvisor` hook.
+
+    *The read rows keep the names of the result columns, see `ResultRows`,
+    so they can be mapped into typed records or transposed into columns.
+
+    *A query failing on a lost connection is retried once on a reopened connection,
+    unless it is a write whose commit may have reached the server.
+    The keepalive pings the idle independent connection in the background,
+    reconnecting it before the next query needs it.
+
+    *A query or a transaction given a `timeout`, or the default `query_timeout`,
+    is stopped once its deadline expires, with `TimeoutError`.
+    With query killers set, a query stopped by its deadline or by the cancellation of its task
+    is killed on the server with `KILL QUERY`, so it releases its locks,
+    and its connection is rolled back and returned in a clean state.
+    A connection whose query could not be killed in time is discarded instead.
+
+    *A query or a `run_transaction` unit losing a lock conflict,
+    a deadlock or a lock wait timeout, is rolled back and run again,
+    after a jittered exponential backoff, within the attempt budget of the retry policy.
+
+    *Every query outside of a `transaction` scope is committed on its own.
+    Queries of the independent connection are serialized, as it is shared by all tasks.
+
     Args:
         AsyncSQLDataBaseAPI: Interface for implementing the single connection API.
         AsyncSQLDataBasePoolAPI: Interface to implement the connection pool API.
 
     Attributes:
-        __pool (AsyncMySQLConnectionPool): The active database connection pool
+        __pool (AsyncMySQLPoolType): The active database connection pool.
+        __replica_pools (List[AsyncMySQLPoolType]): The connection pools of the replica servers.
+        __router (ReplicaRouter): Routes the pool queries between the primary and the replicas.
+        __read_your_writes_window (float): Seconds the reads of a sticky key stay on the primary after its write.
         __connection_with_database (AsyncMySQLConnectionType): Active independent connection to the database.
+        __statement_caches (weakref.WeakKeyDictionary): Prepared statement caches by connection.
+        __prepared_statement_cache_size (int): The maximum number of prepared statements per connection.
+        prepared_statement_statistics (PreparedStatementStatistics): Counters of all prepared statement caches.
+        __max_allowed_packet (Optional[int]): The server packet limit, read on the first bulk insert.
+        __connection_lock (asyncio.Lock): Serializes the use of the independent connection.
+        __scope_tracker (QueryScopeTracker): Shares the pool reads and reports the query timings of the scopes.
+        __keepalive_task (Optional[asyncio.Task]): The background ping of the independent connection.
+        __connection_used_at (float): The time the independent connection was last used.
+        query_timeout (Optional[float]): Seconds a query scope may take, unless a timeout is given.
+        kill_grace_period (float): Seconds a killed query is given to end, before its connection is discarded.
+        __query_killers (Dict[Any, QueryKiller]): Kill the queries on the server of each pool.
+        __deadlines (Dict[Any, QueryDeadline]): The deadlines of the open scopes, by connection.
+        __desynchronized_connections (Set[Any]): Connections left by a query that could not be killed.
+        query_deadline_statistics (QueryDeadlineStatistics): The query interruption counters.
+        transaction_retry_policy (TransactionRetryPolicy): The retries of the transactions losing a lock conflict.
+        transaction_retry_statistics (TransactionRetryStatistics): The transaction retry counters.
     """
 
-    __pool: MySQLConnectionPool
+    __pool: AsyncMySQLPoolType
+    __replica_pools: List[AsyncMySQLPoolType]
+    __router: ReplicaRouter
+    __read_your_writes_window: float
     __connection_with_database: AsyncMySQLConnectionType
+    __statement_caches: "weakref.WeakKeyDictionary[Any, PreparedStatementCache]"
+    __prepared_statement_cache_size: int
+    prepared_statement_statistics: PreparedStatementStatistics
+    __max_allowed_packet: Optional[int]
+    __connection_lock: asyncio.Lock
+    __scope_tracker: QueryScopeTracker
+    __keepalive_task: Optional["asyncio.Task[None]"]
+    __connection_used_at: float
+    query_timeout: Optional[float]
+    kill_grace_period: float
+    __query_killers: Dict[Any, QueryKiller]
+    __deadlines: Dict[Any, QueryDeadline]
+    __desynchronized_connections: Set[Any]
+    query_deadline_statistics: QueryDeadlineStatistics
+    transaction_retry_policy: TransactionRetryPolicy
+    transaction_retry_statistics: TransactionRetryStatistics
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        prepared_statement_cache_size: int = 64,
+        read_your_writes_window: float = 5.0,
+        result_cache: Optional[QueryResultCache] = None,
+        query_hooks: Sequence[AbstractQueryHook] = (),
+        read_coalescer: Optional[SingleFlight[ResultRows]] = None,
+        query_timeout: Optional[float] = None,
+        kill_grace_period: float = 2.0,
+        transaction_retry_policy: Optional[TransactionRetryPolicy] = None,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            prepared_statement_cache_size (int, optional): The maximum number of prepared statements per connection.
+                                                           The default is 64.
+            read_your_writes_window (float, optional): Seconds the reads of a sticky key stay on the primary after its write.
+                                                       The default is 5.0.
+            result_cache (Optional[QueryResultCache], optional): The cache of the pool read results.
+                                                                 The default is None, the results are not cached.
+            query_hooks (Sequence[AbstractQueryHook], optional): The hooks receiving the query timings.
+                                                                 The default is an empty tuple.
+            read_coalescer (Optional[SingleFlight], optional): Coalesces the identical concurrent pool reads.
+                                                               The default is None, every read runs its own query.
+            query_timeout (Optional[float], optional): Seconds a query scope may take, unless a timeout is given.
+                                                       The default is None, the queries are not limited in time.
+            kill_grace_period (float, optional): Seconds a killed query is given to end, before its connection is discarded.
+                                                 The default is 2.0.
+            transaction_retry_policy (Optional[TransactionRetryPolicy], optional): The retries of the transactions losing a lock conflict.
+                                                                                   The default is None, up to 3 attempts are made.
+        """
+        self.__replica_pools = []
+        self.__read_your_writes_window = read_your_writes_window
+        self.__statement_caches = weakref.WeakKeyDictionary()
+        self.__prepared_statement_cache_size = prepared_statement_cache_size
+        self.prepared_statement_statistics = PreparedStatementStatistics()
+        self.__max_allowed_packet = None
+        self.__connection_lock = asyncio.Lock()
+        self.__scope_tracker = QueryScopeTracker(
+            result_cache=result_cache,
+            query_hooks=query_hooks,
+            read_coalescer=read_coalescer,
+        )
+        self.__keepalive_task = None
+        self.__connection_used_at = time.monotonic()
+        self.query_timeout = query_timeout
+        self.kill_grace_period = kill_grace_period
+        self.__query_killers = {}
+        self.__deadlines = {}
+        self.__desynchronized_connections = set()
+        self.query_deadline_statistics = QueryDeadlineStatistics()
+        self.transaction_retry_policy = (
+            transaction_retry_policy or TransactionRetryPolicy()
+        )
+        self.transaction_retry_statistics = TransactionRetryStatistics()
 
+    # -------------------------------------------------------------------------
+    @property
+    def result_cache(self) -> Optional[QueryResultCache]:
+        """result_cache returns the cache of the pool read results, if the API has one."""
+        return self.__scope_tracker.result_cache
+
+    # -------------------------------------------------------------------------
+    @property
+    def read_coalescer(self) -> Optional[SingleFlight[ResultRows]]:
+        """read_coalescer returns the coalescer of the pool reads, if the API has one."""
+        return self.__scope_tracker.read_coalescer
+
+    # -------------------------------------------------------------------------
     async def set_up(
         self,
         separate_connection: AsyncMySQLConnectionType,
-        pool: MySQLConnectionPool,
+        pool: AsyncMySQLPoolType,
+        replica_pools: Sequence[AsyncMySQLPoolType] = (),
     ) -> None:
         """set_up configures the API.
 
@@ -67,22 +299,43 @@ class AsyncMySQLAPI(
 
         Args:
             separate_connection (AsyncMySQLConnectionType): Independent connection to the database.
-            pool (MySQLConnectionPool): A pool of connections to the database.
+            pool (AsyncMySQLPoolType): A pool of connections to the database.
+            replica_pools (Sequence[AsyncMySQLPoolType], optional): Pools of connections to the replica servers.
+                                                                    The default is an empty tuple.
         """
         await self.set_connection_with_database(connection=separate_connection)
+        await self.set_replica_pools(pools=replica_pools)
         await self.set_connection_to_pool(pool=pool)
 
     # -------------------------------------------------------------------------
-    async def set_connection_to_pool(self, pool: MySQLConnectionPool) -> None:
+    async def set_connection_to_pool(self, pool: AsyncMySQLPoolType) -> None:
         """set_connection_to_pool connects the connection pool to the API.
 
         This method sets the received connection pool to the database,
         to the corresponding API attribute responsible for storing the connection pool.
 
         Args:
-            pool (MySQLConnectionPool): The database connection pool.
+            pool (AsyncMySQLPoolType): The database connection pool.
         """
         self.__pool = pool
+        self.__router = ReplicaRouter(
+            primary_pool=pool,
+            replica_pools=self.__replica_pools,
+            sticky_window=self.__read_your_writes_window,
+        )
+
+    # -------------------------------------------------------------------------
+    async def set_replica_pools(
+        self, pools: Sequence[AsyncMySQLPoolType]
+    ) -> None:
+        """set_replica_pools connects the replica connection pools to the API.
+
+        *Takes effect when the primary pool is set with `set_connection_to_pool`.
+
+        Args:
+            pools (Sequence[AsyncMySQLPoolType]): Pools of connections to the replica servers.
+        """
+        self.__replica_pools = list(pools)
 
     # -------------------------------------------------------------------------
     async def set_connection_with_database(
@@ -98,6 +351,28 @@ class AsyncMySQLAPI(
         """
         self.__connection_with_database = connection
 
+    # -------------------------------------------------------------------------
+    async def set_query_killers(
+        self, query_killers: Dict[AsyncMySQLPoolType, QueryKiller]
+    ) -> None:
+        """set_query_killers sets the killers of the queries running too long.
+
+        *The killer of the primary pool also kills the queries of the independent connection.
+
+        Args:
+            query_killers (Dict[AsyncMySQLPoolType, QueryKiller]): The killer of the server of each pool.
+        """
+        self.__query_killers = dict(query_killers)
+
+    # -------------------------------------------------------------------------
+    async def add_query_hook(self, hook: AbstractQueryHook) -> None:
+        """add_query_hook adds a hook receiving the timings of the queries.
+
+        Args:
+            hook (AbstractQueryHook): The hook, e.g. a `QueryLatencyRecorder`.
+        """
+        self.__scope_tracker.add_query_hook(hook=hook)
+
     # -------------------------------------------------------------------------
     async def get_connection_with_database(self) -> AsyncMySQLConnectionType:
         """get_connection_with_database returns an independent connection to the database.
@@ -113,20 +388,46 @@ class AsyncMySQLAPI(
         return self.__connection_with_database
 
     # -------------------------------------------------------------------------
-    async def get_connection_from_pool(self) -> MySQLPooledConnection:
+    async def get_connection_from_pool(
+        self,
+    ) -> AsyncMySQLPooledConnectionType:
         """get_connection_from_pool returns a database connection object from the pool.
 
         This method returns a connection object from the pool.
+        If all pool connections are busy, the call waits for one to be returned.
 
-        *Pool connections, are synchronous.
+        *Connections of the synchronous pool are wrapped,
+        to run their blocking calls on the pool executor.
 
         Returns:
-            MySQLPooledConnection: database connection object from the pool.
+            AsyncMySQLPooledConnectionType: database connection object from the pool.
         """
-        connection: MySQLPooledConnection = self.__pool.get_connection()
+        connection: AsyncMySQLPooledConnectionType = (
+            await self.__pool.get_connection()
+        )
 
         return connection
 
+    # -------------------------------------------------------------------------
+    async def get_pool_statistics(self) -> ConnectionPoolStatistics:
+        """get_pool_statistics returns the load counters of the connection pool.
+
+        Returns:
+            ConnectionPoolStatistics: Queue depth and wait-time counters of the pool.
+        """
+        return self.__pool.statistics
+
+    # -------------------------------------------------------------------------
+    async def get_replica_pool_statistics(
+        self,
+    ) -> List[ConnectionPoolStatistics]:
+        """get_replica_pool_statistics returns the load counters of the replica pools.
+
+        Returns:
+            List[ConnectionPoolStatistics]: Counters of each replica pool, in the order of the pools.
+        """
+        return [pool.statistics for pool in self.__replica_pools]
+
     # -------------------------------------------------------------------------
     async def check_connection_with_database(self) -> bool:
         """check_connection_with_database checks for direct database connection activity.
@@ -145,9 +446,60 @@ class AsyncMySQLAPI(
 
         return connection_status
 
+    # -------------------------------------------------------------------------
+    async def reconnect_connection_with_database(self) -> None:
+        """reconnect_connection_with_database reopens the independent connection.
+
+        *The connection object is kept, so the users of the API are not affected.
+
+        Raises:
+            InterfaceError: If the connection can not be reopened.
+        """
+        async with self.__connection_lock:
+            await self.__reconnect(
+                connection=await self.get_connection_with_database()
+            )
+
+    # -------------------------------------------------------------------------
+    async def start_keepalive(self, interval: float = 60.0) -> None:
+        """start_keepalive starts pinging the idle independent connection.
+
+        Every `interval` seconds, a connection unused for that long is pinged,
+        and reopened if the server has dropped it, e.g. after `wait_timeout`.
+
+        *Calling this method with the keepalive running has no effect.
+
+        Args:
+            interval (float, optional): Seconds between the pings.
+                                        The default is 60.0.
+        """
+        if self.__keepalive_task is not None:
+            return
+
+        self.__keepalive_task = asyncio.create_task(
+            self.__keep_alive(interval=interval), name="mysql_api_keepalive"
+        )
+
+    # -------------------------------------------------------------------------
+    async def stop_keepalive(self) -> None:
+        """stop_keepalive stops pinging the independent connection."""
+        task: Optional["asyncio.Task[None]"] = self.__keepalive_task
+
+        if task is None:
+            return
+
+        self.__keepalive_task = None
+        task.cancel()
+
+        try:
+            await task
+
+        except asyncio.CancelledError:
+            pass
+
     # -------------------------------------------------------------------------
     async def close_connection_from_pool(
-        self, connection: MySQLPooledConnection
+        self, connection: AsyncMySQLPooledConnectionType
     ) -> None:
         """close_connection_from_pool closes the connection from the pool.
 
@@ -155,69 +507,1753 @@ class AsyncMySQLAPI(
         returning the connection back to the pool.
 
         Args:
-            connection (MySQLPooledConnection): pooled connection object.
+            connection (AsyncMySQLPooledConnectionType): pooled connection object.
         """
-        connection.close()
+        await self.__release_connection(pool=self.__pool, connection=connection)
 
     # -------------------------------------------------------------------------
     async def execute_sql_query_use_pool(
         self,
         query_template: Template,
         query_data: Dict[str, str],
+        timeout: Optional[float] = None,
     ) -> None:
         """execute_sql_query_use_pool executes a database query.
 
         This method executes a query to the database using a connection from the pool.
         The query template and the data to be substituted into the query are used to generate the query.
 
+        *A failed query is logged and raised, after the retries.
+
         Args:
             query_template (Template): query string template.
             query_data (Dict[str, str]): Data to substitute into the template.
-        """
-        connection: MySQLPooledConnection = (
-            await self.get_connection_from_pool()
-        )
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
 
+        Raises:
+            MySQLError: If the query fails, after the retries.
+            TimeoutError: If the query does not finish in time.
+        """
         query_string: str = query_template.substitute(**query_data)
 
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute(query_string)
+        async def execute_query() -> None:
+            await self.__run_with_reconnect(
+                function=lambda connection: self.__execute_template_query(
+                    connection=connection, query=query_string
+                ),
+                use_pool=True,
+                timeout=timeout,
+            )
 
-                connection.commit()
+        try:
+            await run_with_retries(
+                function=execute_query,
+                policy=self.transaction_retry_policy,
+                statistics=self.transaction_retry_statistics,
+            )
 
-        except MySQLError as error:
-            connection.rollback()
-            print(f"An error occurred while executing a query! {error}")
+        except (MySQLError, TimeoutError) as error:
+            logger.error(msg=f"An error occurred while executing a query! {error}")
 
-        finally:
-            await self.close_connection_from_pool(connection=connection)
+            raise
 
     # -------------------------------------------------------------------------
     async def execute_sql_query_to_database(
-        self, query_template: Template, query_data: Dict[str, str]
+        self,
+        query_template: Template,
+        query_data: Dict[str, str],
+        timeout: Optional[float] = None,
     ) -> None:
         """execute_sql_query_to_database executes a query to the database.
 
         This method executes a query to the database using an independent connection.
         The query template and the data to be substituted into the query are used to generate the query.
 
+        *A failed query is logged and raised, after the retries.
+
         Args:
             query_template (Template): query string template.
             query_data (Dict[str, str]): The data to substitute into the template.
-        """
-        connection: AsyncMySQLConnectionType = (
-            await self.get_connection_with_database()
-        )
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
 
+        Raises:
+            MySQLError: If the query fails, after the retries.
+            TimeoutError: If the query does not finish in time.
+        """
         query_string: str = query_template.substitute(**query_data)
 
+        async def execute_query() -> None:
+            await self.__run_with_reconnect(
+                function=lambda connection: self.__execute_template_query(
+                    connection=connection, query=query_string
+                ),
+                use_pool=False,
+                timeout=timeout,
+            )
+
         try:
+            await run_with_retries(
+                function=execute_query,
+                policy=self.transaction_retry_policy,
+                statistics=self.transaction_retry_statistics,
+            )
+
+        except (MySQLError, TimeoutError) as error:
+            logger.error(msg=f"An error occurred while executing a query! {error}")
+
+            raise
+
+    # -------------------------------------------------------------------------
+    async def execute_parameterized_query_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """execute_parameterized_query_use_pool executes a parameterized database query.
+
+        This method executes a query with placeholders using a connection from the pool,
+        as a prepared statement of that connection.
+        The changes are committed, or rolled back if the query fails.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            int: The number of rows affected by the query.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        affected_rows, _ = await self.__run_prepared_query(
+            query=query,
+            parameters=parameters,
+            sticky_key=sticky_key,
+            timeout=timeout,
+        )
+
+        return affected_rows
+
+    # -------------------------------------------------------------------------
+    async def execute_parameterized_query_to_database(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        timeout: Optional[float] = None,
+    ) -> int:
+        """execute_parameterized_query_to_database executes a parameterized query to the database.
+
+        This method executes a query with placeholders using an independent connection,
+        as a prepared statement of that connection.
+        The changes are committed, or rolled back if the query fails.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            int: The number of rows affected by the query.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        affected_rows, _ = await self.__run_prepared_query(
+            query=query, parameters=parameters, use_pool=False, timeout=timeout
+        )
+
+        return affected_rows
+
+    # -------------------------------------------------------------------------
+    async def fetch_one_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[RowType]:
+        """fetch_one_use_pool returns the first row of the query result.
+
+        This method executes a query with placeholders using a connection from the pool,
+        as a prepared statement of that connection.
+
+        *The whole result is read from the server, so the query should limit it.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            Optional[RowType]: The first row of the result; None if the result is empty.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        rows: List[RowType] = await self.fetch_all_use_pool(
+            query=query,
+            parameters=parameters,
+            sticky_key=sticky_key,
+            cache_ttl=cache_ttl,
+            timeout=timeout,
+        )
+
+        return rows[0] if rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetch_all_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> List[RowType]:
+        """fetch_all_use_pool returns all rows of the query result.
+
+        This method executes a query with placeholders using a connection from the pool,
+        as a prepared statement of that connection.
+
+        *With `cache_ttl` given, a cached result is returned without querying the database,
+        and a new result is cached, tagged with the tables of the query.
+
+        *With a read coalescer set, a read identical to one in flight waits for its result.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            List[RowType]: The rows of the result.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        # A shared read is limited by the timeout of the caller that started it.
+        async def fetch_all() -> ResultRows:
+            _, rows = await self.__run_prepared_query(
+                query=query,
+                parameters=parameters,
+                read_only=True,
+                sticky_key=sticky_key,
+                timeout=timeout,
+            )
+
+            return rows
+
+        # A sticky read must see the writes of its caller, so it never joins a read in flight.
+        return await self.__scope_tracker.fetch_all(
+            query=query,
+            parameters=parameters,
+            fetch_all=fetch_all,
+            cache_ttl=cache_ttl,
+            can_coalesce=not self.__router.is_sticky(sticky_key=sticky_key),
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_records_use_pool[RecordType](
+        self,
+        query: str,
+        row_mapper: RowMapper[RecordType],
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> List[RecordType]:
+        """fetch_records_use_pool returns the rows of the query result as typed records.
+
+        This method reads the rows like `fetch_all_use_pool`,
+        and maps them into the records of the mapper, e.g. slotted dataclasses,
+        which are far more compact than dictionaries when kept in memory.
+
+        *A cached result is kept as rows, and mapped on every hit.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            row_mapper (RowMapper[RecordType]): The mapper of the records declared for the query.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            List[RecordType]: The records, in the order of the rows.
+
+        Raises:
+            MySQLError: If the query fails.
+            ValueError: If a field of the records has no column in the result.
+        """
+        rows: List[RowType] = await self.fetch_all_use_pool(
+            query=query,
+            parameters=parameters,
+            sticky_key=sticky_key,
+            cache_ttl=cache_ttl,
+            timeout=timeout,
+        )
+
+        return row_mapper.map_rows(rows=rows)
+
+    # -------------------------------------------------------------------------
+    async def fetch_columns_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> Dict[str, Union[array, List[Any]]]:
+        """fetch_columns_use_pool returns the query result as columns.
+
+        This method is meant for the large analytical reads:
+        the integer and float columns are returned as arrays of 8-byte values,
+        instead of a number object per value.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            Dict[str, Union[array, List[Any]]]: The values of each column by its name, in the order of the rows.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        rows: List[RowType] = await self.fetch_all_use_pool(
+            query=query, parameters=parameters, sticky_key=sticky_key, timeout=timeout
+        )
+
+        return to_columns(rows=rows)
+
+    # -------------------------------------------------------------------------
+    async def stream_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        chunk_size: int = 1000,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[List[RowType]]:
+        """stream_use_pool yields the query result in chunks of rows.
+
+        This method executes a query with placeholders using a connection from the pool,
+        on an unbuffered cursor, reading the result from the server chunk by chunk.
+        The connection stays checked out until the stream is exhausted or closed.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the whole stream may take, including its consumption.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Yields:
+            List[RowType]: The next chunk of rows of the result.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        async with self.__use_pool_connection(
+            read_only=True, sticky_key=sticky_key, timeout=timeout
+        ) as connection:
+            # A stream closed early drains its cursor before the connection is committed.
+            async with aclosing(
+                self.__stream_query(
+                    connection=connection,
+                    query=query,
+                    parameters=parameters,
+                    chunk_size=chunk_size,
+                )
+            ) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    # -------------------------------------------------------------------------
+    async def fetch_one_from_database(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        timeout: Optional[float] = None,
+    ) -> Optional[RowType]:
+        """fetch_one_from_database returns the first row of the query result.
+
+        This method executes a query with placeholders using an independent connection,
+        as a prepared statement of that connection.
+
+        *The whole result is read from the server, so the query should limit it.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            Optional[RowType]: The first row of the result; None if the result is empty.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        rows: List[RowType] = await self.fetch_all_from_database(
+            query=query, parameters=parameters, timeout=timeout
+        )
+
+        return rows[0] if rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetch_all_from_database(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        timeout: Optional[float] = None,
+    ) -> List[RowType]:
+        """fetch_all_from_database returns all rows of the query result.
+
+        This method executes a query with placeholders using an independent connection,
+        as a prepared statement of that connection.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            List[RowType]: The rows of the result.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        _, rows = await self.__run_prepared_query(
+            query=query,
+            parameters=parameters,
+            read_only=True,
+            use_pool=False,
+            timeout=timeout,
+        )
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    async def stream_from_database(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        chunk_size: int = 1000,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[List[RowType]]:
+        """stream_from_database yields the query result in chunks of rows.
+
+        This method executes a query with placeholders using an independent connection,
+        on an unbuffered cursor, reading the result from the server chunk by chunk.
+
+        *The independent connection can not run other queries until the stream is exhausted or closed.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+            timeout (Optional[float], optional): Seconds the whole stream may take, including its consumption.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Yields:
+            List[RowType]: The next chunk of rows of the result.
+
+        Raises:
+            MySQLError: If the query fails.
+        """
+        async with self.__use_independent_connection(
+            timeout=timeout
+        ) as connection:
+            # A stream closed early drains its cursor before the connection is committed.
+            async with aclosing(
+                self.__stream_query(
+                    connection=connection,
+                    query=query,
+                    parameters=parameters,
+                    chunk_size=chunk_size,
+                )
+            ) as chunks:
+                async for chunk in chunks:
+                    yield chunk
+
+    # -------------------------------------------------------------------------
+    async def execute_many_use_pool(
+        self,
+        query: str,
+        parameter_rows: RowsSourceType,
+        batch_size: int = 1000,
+        sticky_key: Optional[Hashable] = None,
+    ) -> BulkWriteStatistics:
+        """execute_many_use_pool executes a query once per row of parameters.
+
+        This method sends the rows to `cursor.executemany` in batches,
+        using a single connection from the pool,
+        and commits once after all of the batches, or rolls back if one of them fails.
+
+        *For a plain `INSERT ... VALUES` query, the connector rewrites every batch,
+        into a single multi-row statement.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameter_rows (RowsSourceType): An iterable or an asynchronous iterable of parameter rows.
+            batch_size (int, optional): The number of rows sent per `executemany` call.
+                                        The default is 1000.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+
+        Returns:
+            BulkWriteStatistics: Row, statement and throughput counters of the write.
+
+        Raises:
+            MySQLError: If a batch fails.
+        """
+        statistics = BulkWriteStatistics()
+        started_at: float = time.perf_counter()
+
+        async with self.__use_pool_connection(
+            sticky_key=sticky_key
+        ) as connection:
             async with await connection.cursor() as cursor:
-                await cursor.execute(query_string)
+                async for batch, _ in iterate_batches(
+                    rows=parameter_rows, max_rows=batch_size
+                ):
+                    await self.__execute_timed(
+                        connection=connection,
+                        cursor=cursor,
+                        query=query,
+                        parameters=batch,
+                        many=True,
+                    )
 
-                await connection.commit()
+                    statistics.rows += len(batch)
+                    statistics.statements += 1
+                    statistics.affected_rows += max(cursor.rowcount, 0)
 
-        except MySQLError as error:
-            await connection.rollback()
-            print(f"An error occurred while executing a query! {error}")
+        statistics.elapsed_time = time.perf_counter() - started_at
+
+        return statistics
+
+    # -------------------------------------------------------------------------
+    async def bulk_insert_use_pool(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: RowsSourceType,
+        update_columns: Optional[Sequence[str]] = None,
+        ignore_duplicates: bool = False,
+        max_rows_per_statement: int = 10000,
+        sticky_key: Optional[Hashable] = None,
+        increment_columns: Optional[Sequence[str]] = None,
+    ) -> BulkWriteStatistics:
+        """bulk_insert_use_pool inserts rows with multi-row insert statements.
+
+        This method builds `INSERT ... VALUES (...), (...)` statements,
+        each holding as many rows as fit into the `max_allowed_packet` of the server,
+        and executes them using a single connection from the pool.
+        All statements are committed at once, or rolled back if one of them fails.
+
+        Args:
+            table (str): The name of the table to insert into.
+            columns (Sequence[str]): The names of the inserted columns.
+            rows (RowsSourceType): An iterable or an asynchronous iterable of rows.
+            update_columns (Optional[Sequence[str]], optional): Columns updated with `ON DUPLICATE KEY UPDATE`.
+                                                                The default is None, a plain insert is performed.
+            ignore_duplicates (bool, optional): Whether rows with a duplicate key are skipped with `INSERT IGNORE`.
+                                                The default is False.
+            max_rows_per_statement (int, optional): The maximum number of rows per statement.
+                                                    The default is 10000.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            increment_columns (Optional[Sequence[str]], optional): Columns incremented by the inserted value
+                                                                   with `ON DUPLICATE KEY UPDATE`, e.g. counters.
+                                                                   The default is None.
+
+        Returns:
+            BulkWriteStatistics: Row, statement and throughput counters of the write.
+
+        Raises:
+            MySQLError: If a statement fails.
+            ValueError: If a row does not match the columns or does not fit into a packet.
+        """
+        return await self.__bulk_insert(
+            table=table,
+            columns=columns,
+            rows=rows,
+            update_columns=update_columns,
+            ignore_duplicates=ignore_duplicates,
+            max_rows_per_statement=max_rows_per_statement,
+            sticky_key=sticky_key,
+            increment_columns=increment_columns,
+        )
+
+    # -------------------------------------------------------------------------
+    async def __bulk_insert(
+        self,
+        table: str,
+        columns: Sequence[str],
+        rows: RowsSourceType,
+        update_columns: Optional[Sequence[str]] = None,
+        ignore_duplicates: bool = False,
+        max_rows_per_statement: int = 10000,
+        sticky_key: Optional[Hashable] = None,
+        increment_columns: Optional[Sequence[str]] = None,
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> BulkWriteStatistics:
+        builder = BulkInsertStatementBuilder(
+            table=table,
+            columns=columns,
+            update_columns=update_columns,
+            ignore_duplicates=ignore_duplicates,
+            increment_columns=increment_columns,
+        )
+        statistics = BulkWriteStatistics()
+        started_at: float = time.perf_counter()
+
+        async with self.__use_pool_connection(
+            sticky_key=sticky_key, on_commit=on_commit
+        ) as connection:
+            max_packet_size: int = await self.__get_max_allowed_packet(
+                connection=connection
+            )
+
+            async with await connection.cursor() as cursor:
+                async for batch, _ in iterate_batches(
+                    rows=rows,
+                    max_rows=max_rows_per_statement,
+                    max_size=max_packet_size,
+                    builder=builder,
+                ):
+                    parameters: List[Any] = [
+                        value for row in batch for value in row
+                    ]
+
+                    statement: str = builder.build(len(batch))
+
+                    await self.__execute_timed(
+                        connection=connection,
+                        cursor=cursor,
+                        query=statement,
+                        parameters=parameters,
+                    )
+
+                    statistics.rows += len(batch)
+                    statistics.statements += 1
+                    statistics.affected_rows += max(cursor.rowcount, 0)
+
+        statistics.elapsed_time = time.perf_counter() - started_at
+
+        return statistics
+
+    # -------------------------------------------------------------------------
+    def create_write_behind_queue(
+        self,
+        table: str,
+        key_columns: Sequence[str],
+        value_columns: Sequence[str],
+        increment: bool = False,
+        flush_interval: float = 0.5,
+        max_batch_size: int = 1000,
+        max_pending: int = 10000,
+    ) -> WriteBehindQueue[Tuple[Any, ...], Tuple[Any, ...]]:
+        """create_write_behind_queue returns a write-behind queue upserting into the table.
+
+        The queue coalesces the updates by key in memory,
+        and writes them with multi-row `INSERT ... ON DUPLICATE KEY UPDATE` statements,
+        all entries of a flush batch in one transaction.
+        A batch is written again only if its transaction was not committed;
+        a commit lost with the connection is taken as not applied.
+
+        *The keys and the values put into the queue are tuples,
+        in the order of `key_columns` and `value_columns`.
+        The queue must be started, and closed on shutdown to write the rest of the entries.
+
+        Args:
+            table (str): The name of the table, with a unique key over `key_columns`.
+            key_columns (Sequence[str]): The columns identifying a record, e.g. the user id.
+            value_columns (Sequence[str]): The updated columns, e.g. the last seen time.
+            increment (bool, optional): Whether the values are counter increments,
+                                        summed in memory and added to the stored values.
+                                        The default is False, the latest values replace the stored ones.
+            flush_interval (float, optional): Seconds between the periodic flushes.
+                                              The default is 0.5.
+            max_batch_size (int, optional): The number of entries triggering a flush, and per flush batch.
+                                            The default is 1000.
+            max_pending (int, optional): The maximum number of pending keys, producers wait above it.
+                                         The default is 10000.
+
+        Returns:
+            WriteBehindQueue[Tuple[Any, ...], Tuple[Any, ...]]: The unstarted queue.
+        """
+        columns: List[str] = [*key_columns, *value_columns]
+
+        async def flush_entries(
+            entries: List[Tuple[Tuple[Any, ...], Tuple[Any, ...]]]
+        ) -> None:
+            commits: List[bool] = []
+
+            try:
+                await self.__bulk_insert(
+                    table=table,
+                    columns=columns,
+                    rows=[(*key, *value) for key, value in entries],
+                    update_columns=None if increment else value_columns,
+                    increment_columns=value_columns if increment else None,
+                    on_commit=lambda: commits.append(True),
+                )
+
+            except BaseException as error:
+                if commits:
+                    raise CommittedFlushError(str(error)) from error
+
+                raise
+
+        return WriteBehindQueue(
+            flush_method=flush_entries,
+            merge_method=(
+                (lambda old, new: tuple(map(sum, zip(old, new))))
+                if increment
+                else None
+            ),
+            name=f"{table}_write_behind",
+            flush_interval=flush_interval,
+            max_batch_size=max_batch_size,
+            max_pending=max_pending,
+        )
+
+    # -------------------------------------------------------------------------
+    async def execute(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> int:
+        """execute executes an application query using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            int: The number of rows affected by the query.
+        """
+        return await self.execute_parameterized_query_use_pool(
+            query=query,
+            parameters=parameters,
+            sticky_key=sticky_key,
+            timeout=timeout,
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_one(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> Optional[RowType]:
+        """fetch_one returns the first row of an application query using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            Optional[RowType]: The first row of the result; None if the result is empty.
+        """
+        return await self.fetch_one_use_pool(
+            query=query,
+            parameters=parameters,
+            sticky_key=sticky_key,
+            cache_ttl=cache_ttl,
+            timeout=timeout,
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_all(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        sticky_key: Optional[Hashable] = None,
+        cache_ttl: Optional[float] = None,
+        timeout: Optional[float] = None,
+    ) -> List[RowType]:
+        """fetch_all returns all rows of an application query using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            List[RowType]: The rows of the result.
+        """
+        return await self.fetch_all_use_pool(
+            query=query,
+            parameters=parameters,
+            sticky_key=sticky_key,
+            cache_ttl=cache_ttl,
+            timeout=timeout,
+        )
+
+    # -------------------------------------------------------------------------
+    def stream(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        chunk_size: int = 1000,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[List[RowType]]:
+        """stream yields the result of an application query in chunks, using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the whole stream may take, including its consumption.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            AsyncIterator[List[RowType]]: The chunks of rows of the result.
+        """
+        return self.stream_use_pool(
+            query=query,
+            parameters=parameters,
+            chunk_size=chunk_size,
+            sticky_key=sticky_key,
+            timeout=timeout,
+        )
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def transaction(
+        self,
+        isolation: Optional[Union[IsolationLevel, str]] = None,
+        read_only: bool = False,
+        use_pool: bool = True,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[AsyncMySQLTransaction]:
+        """transaction runs an explicit transaction scope.
+
+        This method reserves a connection for the scope and starts a transaction on it.
+        All queries of the scope are committed at once when the scope is left,
+        or rolled back if the scope fails, in which case the error is propagated.
+
+        *A transaction on the independent connection blocks its other users until the scope is left.
+
+        Args:
+            isolation (Optional[Union[IsolationLevel, str]], optional): The isolation level of the transaction.
+                                                                  The default is None, the session level is used.
+            read_only (bool, optional): Whether the transaction is read-only.
+                                        The default is False.
+            use_pool (bool, optional): Whether to use a connection from the pool,
+                                       otherwise the independent connection is used.
+                                       A read-only transaction uses a replica pool, if there is one.
+                                       The default is True.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the queries of the whole transaction may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Yields:
+            AsyncMySQLTransaction: The transaction running the queries of the scope.
+
+        Raises:
+            ValueError: If the isolation level is not known.
+            TimeoutError: If the deadline of the transaction expires.
+        """
+        isolation_level: Optional[IsolationLevel] = (
+            IsolationLevel(isolation) if isolation is not None else None
+        )
+        connection_scope = (
+            self.__use_pool_connection(
+                read_only=read_only, sticky_key=sticky_key, timeout=timeout
+            )
+            if use_pool
+            else self.__use_independent_connection(timeout=timeout)
+        )
+
+        async with connection_scope as connection:
+            transaction = AsyncMySQLTransaction(
+                connection=connection,
+                execute_prepared_query=self.__execute_prepared_query,
+                stream_query=self.__stream_query,
+                isolation=isolation_level,
+                read_only=read_only,
+                execute_statement=self.__execute_statement,
+            )
+
+            await transaction.begin()
+
+            yield transaction
+
+    # -------------------------------------------------------------------------
+    async def run_transaction[ResultType](
+        self,
+        function: Callable[[AsyncMySQLTransaction], Awaitable[ResultType]],
+        isolation: Optional[Union[IsolationLevel, str]] = None,
+        read_only: bool = False,
+        use_pool: bool = True,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+        retry_policy: Optional[TransactionRetryPolicy] = None,
+    ) -> ResultType:
+        """run_transaction runs a unit of work in a transaction, retrying it on lock conflicts.
+
+        This method runs the function in a `transaction` scope.
+        If the transaction loses a deadlock or times out waiting for a lock,
+        it is rolled back, and the function is run again in a new transaction,
+        after a jittered exponential backoff, until the attempts run out.
+
+        *Everything the function does is repeated on a retry,
+        so it should have no effects outside of the transaction, e.g. sent messages.
+
+        Args:
+            function (Callable[[AsyncMySQLTransaction], Awaitable[ResultType]]): The unit of work, given the transaction.
+            isolation (Optional[Union[IsolationLevel, str]], optional): The isolation level of the transaction.
+                                                                  The default is None, the session level is used.
+            read_only (bool, optional): Whether the transaction is read-only.
+                                        The default is False.
+            use_pool (bool, optional): Whether to use a connection from the pool,
+                                       otherwise the independent connection is used.
+                                       The default is True.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness, e.g. a chat id.
+                                                       The default is None.
+            timeout (Optional[float], optional): Seconds the queries of each attempt may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+            retry_policy (Optional[TransactionRetryPolicy], optional): The retries of the unit of work.
+                                                                       The default is None, the policy of the API is used.
+
+        Returns:
+            ResultType: The result of the function in the committed transaction.
+
+        Raises:
+            MySQLError: If the transaction fails, or keeps losing lock conflicts until its attempts run out.
+            TimeoutError: If the deadline of an attempt expires.
+        """
+        async def run_attempt() -> ResultType:
+            async with self.transaction(
+                isolation=isolation,
+                read_only=read_only,
+                use_pool=use_pool,
+                sticky_key=sticky_key,
+                timeout=timeout,
+            ) as transaction:
+                return await function(transaction)
+
+        return await run_with_retries(
+            function=run_attempt,
+            policy=retry_policy or self.transaction_retry_policy,
+            statistics=self.transaction_retry_statistics,
+        )
+
+    # -------------------------------------------------------------------------
+    async def explain_query(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        timeout: Optional[float] = None,
+    ) -> Optional[Dict[str, Any]]:
+        """explain_query returns the execution plan of a query, on the primary server.
+
+        This method runs `EXPLAIN FORMAT=JSON` for the query using a connection from the pool.
+        The query itself is not executed, and is not reported to the query hooks.
+
+        *The plan is requested with a text cursor, with the parameters bound on the client,
+        as `EXPLAIN` is not always accepted as a prepared statement.
+
+        Args:
+            query (str): The query text with `%s` placeholders, e.g. a SELECT, UPDATE or DELETE.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            timeout (Optional[float], optional): Seconds the query may take.
+                                                 The default is None, the `query_timeout` of the API is used.
+
+        Returns:
+            Optional[Dict[str, Any]]: The decoded JSON plan; None if the server returned no plan.
+
+        Raises:
+            MySQLError: If the server can not explain the query.
+            TimeoutError: If the deadline expires.
+        """
+        async with self.__use_pool_connection(timeout=timeout) as connection:
+            async with await connection.cursor() as cursor:
+                await self.__run_before_deadline(
+                    connection=connection,
+                    execution=cursor.execute(
+                        f"EXPLAIN FORMAT=JSON {query}", tuple(parameters) or None
+                    ),
+                )
+                row: Optional[RowType] = await self.__run_before_deadline(
+                    connection=connection, execution=cursor.fetchone()
+                )
+
+        if row is None:
+            return None
+
+        return json.loads(row[0])
+
+    # -------------------------------------------------------------------------
+    async def get_transaction_retry_statistics(
+        self,
+    ) -> TransactionRetryStatistics:
+        """get_transaction_retry_statistics returns the transaction retry counters.
+
+        Returns:
+            TransactionRetryStatistics: Retry, recovery and give-up counters.
+        """
+        return self.transaction_retry_statistics
+
+    # -------------------------------------------------------------------------
+    async def get_prepared_statement_statistics(
+        self,
+    ) -> PreparedStatementStatistics:
+        """get_prepared_statement_statistics returns the prepared statement cache counters.
+
+        Returns:
+            PreparedStatementStatistics: Hit, miss and eviction counters of all connections.
+        """
+        return self.prepared_statement_statistics
+
+    # -------------------------------------------------------------------------
+    async def get_result_cache_statistics(
+        self,
+    ) -> Optional[QueryResultCacheStatistics]:
+        """get_result_cache_statistics returns the result cache counters.
+
+        Returns:
+            Optional[QueryResultCacheStatistics]: Hit ratio and memory usage counters;
+                                                  None if the API has no result cache.
+        """
+        result_cache: Optional[QueryResultCache] = self.result_cache
+
+        if result_cache is None:
+            return None
+
+        return result_cache.statistics
+
+    # -------------------------------------------------------------------------
+    async def get_read_coalescer_statistics(
+        self,
+    ) -> Optional[SingleFlightStatistics]:
+        """get_read_coalescer_statistics returns the read coalescer counters.
+
+        Returns:
+            Optional[SingleFlightStatistics]: Shared and executed read counters;
+                                              None if the API has no read coalescer.
+        """
+        read_coalescer: Optional[SingleFlight[ResultRows]] = self.read_coalescer
+
+        if read_coalescer is None:
+            return None
+
+        return read_coalescer.statistics
+
+    # -------------------------------------------------------------------------
+    async def get_query_deadline_statistics(self) -> QueryDeadlineStatistics:
+        """get_query_deadline_statistics returns the query interruption counters.
+
+        Returns:
+            QueryDeadlineStatistics: Timeout, cancellation and kill counters.
+        """
+        return self.query_deadline_statistics
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __use_pool_connection(
+        self,
+        read_only: bool = False,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+        on_commit: Optional[Callable[[], None]] = None,
+    ) -> AsyncIterator[AsyncMySQLPooledConnectionType]:
+        router: ReplicaRouter = self.__router
+        pool: AsyncMySQLPoolType = router.choose_pool(
+            read_only=read_only, sticky_key=sticky_key
+        )
+
+        # Counted before the checkout, so queued queries also steer the balancing.
+        router.mark_acquired(pool=pool)
+
+        try:
+            wait_started_at: float = time.perf_counter()
+            connection: AsyncMySQLPooledConnectionType = (
+                await pool.get_connection()
+            )
+            connection_wait: float = time.perf_counter() - wait_started_at
+            commit_time: float = 0.0
+            is_broken: bool = False
+
+            self.__start_deadline(connection=connection, pool=pool, timeout=timeout)
+
+            try:
+                yield connection
+
+                commit_started_at: float = time.perf_counter()
+                await self.__commit(connection=connection)
+                commit_time = time.perf_counter() - commit_started_at
+
+                if on_commit is not None:
+                    on_commit()
+
+            except BaseException as error:
+                # Also covers a stream closed early, which must not leave a transaction open.
+                is_broken = is_connection_lost(error)
+
+                if connection not in self.__desynchronized_connections:
+                    await self.__rollback(connection=connection)
+
+                raise
+
+            finally:
+                # Left by a query, a commit or a rollback that could not be finished.
+                is_broken = (
+                    is_broken or connection in self.__desynchronized_connections
+                )
+                self.__finish_deadline(connection=connection)
+                self.__scope_tracker.finish_scope(
+                    connection=connection,
+                    connection_wait=connection_wait,
+                    commit_time=commit_time,
+                )
+                await self.__release_connection(
+                    pool=pool, connection=connection, is_broken=is_broken
+                )
+
+        finally:
+            router.mark_released(pool=pool)
+
+        if not read_only:
+            router.mark_write(sticky_key=sticky_key)
+
+    # -------------------------------------------------------------------------
+    async def __release_connection(
+        self,
+        pool: AsyncMySQLPoolType,
+        connection: AsyncMySQLPooledConnectionType,
+        is_broken: bool = False,
+    ) -> None:
+        if is_broken:
+            self.__statement_caches.pop(connection, None)
+
+            # A connection left by an unfinished query may still be used by a worker thread,
+            # so it is closed and replaced, never handed out again.
+            await pool.discard_connection(connection=connection)  # type: ignore
+
+            return
+
+        if isinstance(pool, ExecutorMySQLConnectionPool) and pool.reset_session:
+            # The session is reset on return, which drops its prepared statements.
+            statement_cache: Optional[PreparedStatementCache] = (
+                self.__statement_caches.pop(connection, None)
+            )
+
+            if statement_cache is not None:
+                await statement_cache.close()
+
+        await pool.release_connection(connection=connection)  # type: ignore
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __use_independent_connection(
+        self, timeout: Optional[float] = None
+    ) -> AsyncIterator[AsyncMySQLConnectionType]:
+        wait_started_at: float = time.perf_counter()
+
+        async with self.__connection_lock:
+            connection_wait: float = time.perf_counter() - wait_started_at
+            commit_time: float = 0.0
+            connection: AsyncMySQLConnectionType = (
+                await self.get_connection_with_database()
+            )
+
+            # The independent connection is opened to the primary server.
+            self.__start_deadline(
+                connection=connection, pool=self.__pool, timeout=timeout
+            )
+
+            try:
+                yield connection
+
+                commit_started_at: float = time.perf_counter()
+                await self.__commit(connection=connection)
+                commit_time = time.perf_counter() - commit_started_at
+
+            except BaseException as error:
+                # Also covers a stream closed early, which must not leave a transaction open.
+                if connection not in self.__desynchronized_connections:
+                    await self.__rollback(connection=connection)
+
+                if connection in self.__desynchronized_connections or (
+                    is_connection_lost(error)
+                ):
+                    await self.__reconnect_quietly(connection=connection)
+
+                raise
+
+            finally:
+                self.__finish_deadline(connection=connection)
+                self.__connection_used_at = time.monotonic()
+                self.__scope_tracker.finish_scope(
+                    connection=connection,
+                    connection_wait=connection_wait,
+                    commit_time=commit_time,
+                )
+
+    # -------------------------------------------------------------------------
+    async def __run_prepared_query(
+        self,
+        query: str,
+        parameters: Sequence[Any],
+        read_only: bool = False,
+        use_pool: bool = True,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, ResultRows]:
+        async def run_query() -> Tuple[int, ResultRows]:
+            return await self.__run_with_reconnect(
+                function=lambda connection: self.__execute_prepared_query(
+                    connection=connection, query=query, parameters=parameters
+                ),
+                read_only=read_only,
+                use_pool=use_pool,
+                sticky_key=sticky_key,
+                timeout=timeout,
+            )
+
+        # A lock conflict fails the query before its commit, so even a write is repeated.
+        return await run_with_retries(
+            function=run_query,
+            policy=self.transaction_retry_policy,
+            statistics=self.transaction_retry_statistics,
+        )
+
+    # -------------------------------------------------------------------------
+    async def __execute_template_query(self, connection: Any, query: str) -> None:
+        async with await connection.cursor() as cursor:
+            await self.__execute_timed(
+                connection=connection, cursor=cursor, query=query
+            )
+
+    # -------------------------------------------------------------------------
+    async def __run_with_reconnect[ResultType](
+        self,
+        function: Callable[[Any], Awaitable[ResultType]],
+        read_only: bool = False,
+        use_pool: bool = True,
+        sticky_key: Optional[Hashable] = None,
+        timeout: Optional[float] = None,
+    ) -> ResultType:
+        attempt: int = 1
+
+        while True:
+            is_executed: bool = False
+            connection_scope = (
+                self.__use_pool_connection(
+                    read_only=read_only,
+                    sticky_key=sticky_key,
+                    timeout=timeout,
+                )
+                if use_pool
+                else self.__use_independent_connection(timeout=timeout)
+            )
+
+            try:
+                async with connection_scope as connection:
+                    result: ResultType = await function(connection)
+                    is_executed = True
+
+                return result
+
+            except MySQLError as error:
+                # A lost commit of a write may have been applied, so it is not repeated.
+                if (
+                    attempt > 1
+                    or not is_connection_lost(error)
+                    or (is_executed and not read_only)
+                ):
+                    raise
+
+                logger.warning(
+                    msg=f"Connection lost, retrying the query once! {error}"
+                )
+                attempt += 1
+
+    # -------------------------------------------------------------------------
+    def __start_deadline(
+        self, connection: Any, pool: AsyncMySQLPoolType, timeout: Optional[float]
+    ) -> None:
+        if timeout is None:
+            timeout = self.query_timeout
+
+        query_killer: Optional[QueryKiller] = self.__query_killers.get(pool)
+
+        if timeout is None and query_killer is None:
+            return
+
+        self.__deadlines[connection] = QueryDeadline(
+            expires_at=None if timeout is None else time.monotonic() + timeout,
+            query_killer=query_killer,
+        )
+
+    # -------------------------------------------------------------------------
+    def __finish_deadline(self, connection: Any) -> None:
+        self.__deadlines.pop(connection, None)
+        self.__desynchronized_connections.discard(connection)
+
+    # -------------------------------------------------------------------------
+    async def __run_before_deadline[ResultType](
+        self, connection: Any, execution: Coroutine[Any, Any, ResultType]
+    ) -> ResultType:
+        deadline: Optional[QueryDeadline] = self.__deadlines.get(connection)
+
+        if deadline is None:
+            return await execution
+
+        remaining_time: Optional[float] = deadline.get_remaining_time()
+
+        if remaining_time is not None and remaining_time <= 0:
+            execution.close()
+            self.query_deadline_statistics.timeouts += 1
+
+            raise TimeoutError("The query deadline has expired!")
+
+        # The round-trip runs as a task of its own, so it is not abandoned mid-protocol.
+        task: "asyncio.Task[ResultType]" = asyncio.ensure_future(execution)
+
+        try:
+            await asyncio.wait({task}, timeout=remaining_time)
+
+        except asyncio.CancelledError:
+            self.query_deadline_statistics.cancellations += 1
+            await self.__interrupt_query(
+                connection=connection, deadline=deadline, task=task
+            )
+            raise
+
+        if not task.done():
+            self.query_deadline_statistics.timeouts += 1
+            await self.__interrupt_query(
+                connection=connection, deadline=deadline, task=task
+            )
+
+            if not task.done() or task.cancelled():
+                raise TimeoutError("The query deadline has expired!")
+
+            # The query may have finished before the kill reached it.
+            if task.exception() is not None:
+                raise TimeoutError(
+                    "The query deadline has expired!"
+                ) from task.exception()
+
+        return task.result()
+
+    # -------------------------------------------------------------------------
+    async def __interrupt_query(
+        self, connection: Any, deadline: QueryDeadline, task: "asyncio.Task[Any]"
+    ) -> None:
+        query_killer: Optional[QueryKiller] = deadline.query_killer
+        connection_id: Optional[int] = getattr(connection, "connection_id", None)
+
+        if query_killer is not None and connection_id is not None:
+            self.query_deadline_statistics.kills += 1
+
+            if await query_killer.kill_query(connection_id=connection_id):
+                # The server ends the statement with an error, keeping the protocol in sync.
+                await asyncio.wait({task}, timeout=self.kill_grace_period)
+
+        if task.done():
+            if not task.cancelled():
+                error: Optional[BaseException] = task.exception()
+
+                if isinstance(error, MySQLError) and (
+                    error.errno != errorcode.ER_QUERY_INTERRUPTED
+                ):
+                    logger.warning(msg=f"An interrupted query failed! {error}")
+
+            return
+
+        # The round-trip can not be finished, so the connection must not be reused.
+        logger.warning(msg="Failed to kill a query, discarding its connection!")
+
+        self.query_deadline_statistics.kill_failures += 1
+        self.query_deadline_statistics.discarded_connections += 1
+        self.__desynchronized_connections.add(connection)
+        task.cancel()
+
+    # -------------------------------------------------------------------------
+    async def __commit(self, connection: Any) -> None:
+        deadline: Optional[QueryDeadline] = self.__deadlines.get(connection)
+        remaining_time: Optional[float] = (
+            None if deadline is None else deadline.get_remaining_time()
+        )
+
+        if remaining_time is not None and remaining_time <= 0:
+            self.query_deadline_statistics.timeouts += 1
+
+            raise TimeoutError("The query deadline has expired!")
+
+        await self.__end_transaction(
+            connection=connection,
+            execution=connection.commit(),
+            timeout=remaining_time,
+        )
+
+    # -------------------------------------------------------------------------
+    async def __rollback(self, connection: Any) -> None:
+        # The deadline may be over already, so the rollback gets the grace period of a killed query.
+        timeout: Optional[float] = (
+            self.kill_grace_period if connection in self.__deadlines else None
+        )
+
+        try:
+            await self.__end_transaction(
+                connection=connection,
+                execution=connection.rollback(),
+                timeout=timeout,
+            )
+
+        except (MySQLError, TimeoutError):
+            # A broken connection fails the rollback as well; the original error is kept.
+            pass
+
+    # -------------------------------------------------------------------------
+    async def __end_transaction(
+        self,
+        connection: Any,
+        execution: Coroutine[Any, Any, None],
+        timeout: Optional[float],
+    ) -> None:
+        # The round-trip runs as a task of its own, so a cancelled scope
+        # never leaves a commit running while the connection is rolled back or reused.
+        task: "asyncio.Task[None]" = asyncio.ensure_future(execution)
+
+        try:
+            await asyncio.wait({task}, timeout=timeout)
+
+        except asyncio.CancelledError:
+            self.query_deadline_statistics.cancellations += 1
+
+            try:
+                await asyncio.wait({task}, timeout=self.kill_grace_period)
+
+            finally:
+                self.__discard_unfinished(connection=connection, task=task)
+
+            raise
+
+        if not task.done():
+            self.query_deadline_statistics.timeouts += 1
+            self.__discard_unfinished(connection=connection, task=task)
+
+            raise TimeoutError("The transaction could not be finished in time!")
+
+        task.result()
+
+    # -------------------------------------------------------------------------
+    def __discard_unfinished(self, connection: Any, task: "asyncio.Task[Any]") -> None:
+        if task.done():
+            return
+
+        # The outcome of the round-trip is unknown, so the connection must not be reused.
+        logger.warning(
+            msg="A commit or rollback did not finish, discarding its connection!"
+        )
+
+        self.query_deadline_statistics.discarded_connections += 1
+        self.__desynchronized_connections.add(connection)
+        task.cancel()
+
+    # -------------------------------------------------------------------------
+    async def __reconnect(self, connection: AsyncMySQLConnectionType) -> None:
+        # The prepared statements of the previous session are gone.
+        self.__statement_caches.pop(connection, None)
+
+        await connection.reconnect()
+
+        self.__connection_used_at = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    async def __reconnect_quietly(self, connection: AsyncMySQLConnectionType) -> None:
+        try:
+            await self.__reconnect(connection=connection)
+
+        except MySQLError as error:
+            # The next query reports the outage; the keepalive keeps trying.
+            logger.error(msg=f"Failed to reconnect to the database! {error}")
+
+    # -------------------------------------------------------------------------
+    async def __keep_alive(self, interval: float) -> None:
+        while True:
+            await asyncio.sleep(interval)
+
+            if self.__connection_lock.locked():
+                continue
+
+            if time.monotonic() - self.__connection_used_at < interval:
+                continue
+
+            async with self.__connection_lock:
+                connection: AsyncMySQLConnectionType = (
+                    await self.get_connection_with_database()
+                )
+
+                if not await connection.is_connected():
+                    logger.info(msg="Reconnecting the idle database connection.")
+                    await self.__reconnect_quietly(connection=connection)
+
+                self.__connection_used_at = time.monotonic()
+
+    # -------------------------------------------------------------------------
+    async def __execute_timed(
+        self,
+        connection: Any,
+        cursor: Any,
+        query: str,
+        parameters: Sequence[Any] = (),
+        many: bool = False,
+    ) -> None:
+        started_at: float = time.perf_counter()
+
+        try:
+            await self.__run_before_deadline(
+                connection=connection,
+                execution=(
+                    cursor.executemany(query, parameters)
+                    if many
+                    else cursor.execute(query, parameters or None)
+                ),
+            )
+
+        except (MySQLError, TimeoutError):
+            self.__scope_tracker.add_timings(
+                connection=connection,
+                query=query,
+                execute=time.perf_counter() - started_at,
+                failed=True,
+            )
+            raise
+
+        self.__scope_tracker.note_write(connection=connection, query=query)
+        # Bulk parameters are not kept, the fingerprint and the row count describe them.
+        self.__scope_tracker.add_timings(
+            connection=connection,
+            query=query,
+            execute=time.perf_counter() - started_at,
+            rows=max(cursor.rowcount, 0),
+        )
+
+    # -------------------------------------------------------------------------
+    async def __get_statement_cache(
+        self, connection: Any
+    ) -> PreparedStatementCache:
+        statement_cache: Optional[PreparedStatementCache] = (
+            self.__statement_caches.get(connection)
+        )
+
+        if statement_cache is None:
+            statement_cache = PreparedStatementCache(
+                connection=connection,
+                max_size=self.__prepared_statement_cache_size,
+                statistics=self.prepared_statement_statistics,
+            )
+            self.__statement_caches[connection] = statement_cache
+
+        return statement_cache
+
+    # -------------------------------------------------------------------------
+    async def __execute_prepared_query(
+        self, connection: Any, query: str, parameters: Sequence[Any]
+    ) -> Tuple[int, ResultRows]:
+        statement_cache: PreparedStatementCache = (
+            await self.__get_statement_cache(connection=connection)
+        )
+        cursor: Any = await statement_cache.get_cursor(query=query)
+        rows: ResultRows = ResultRows()
+        started_at: float = time.perf_counter()
+        executed_at: float = started_at
+
+        try:
+            await self.__run_before_deadline(
+                connection=connection,
+                execution=cursor.execute(query, tuple(parameters)),
+            )
+            executed_at = time.perf_counter()
+            self.__scope_tracker.note_write(connection=connection, query=query)
+
+            if cursor.description is not None:
+                # Unread rows would block the next statement of the connection.
+                rows = ResultRows(
+                    await self.__run_before_deadline(
+                        connection=connection, execution=cursor.fetchall()
+                    ),
+                    column_names=[column[0] for column in cursor.description],
+                )
+
+        except (MySQLError, TimeoutError) as error:
+            self.__scope_tracker.add_timings(
+                connection=connection,
+                query=query,
+                parameters=parameters,
+                execute=time.perf_counter() - started_at,
+                failed=True,
+            )
+
+            # A statement interrupted by its deadline is still valid.
+            if isinstance(error, MySQLError):
+                await statement_cache.discard(query=query)
+
+            raise
+
+        self.__scope_tracker.add_timings(
+            connection=connection,
+            query=query,
+            parameters=parameters,
+            execute=executed_at - started_at,
+            fetch=time.perf_counter() - executed_at,
+            rows=len(rows) if rows else max(cursor.rowcount, 0),
+        )
+
+        return cursor.rowcount, rows
+
+    # -------------------------------------------------------------------------
+    async def __execute_statement(self, connection: Any, statement: str) -> None:
+        # The transaction control statements also wait for locks, e.g. on a metadata lock.
+        await self.__run_before_deadline(
+            connection=connection,
+            execution=execute_statement(connection=connection, statement=statement),
+        )
+
+    # -------------------------------------------------------------------------
+    async def __get_max_allowed_packet(self, connection: Any) -> int:
+        if self.__max_allowed_packet is None:
+            async with await connection.cursor() as cursor:
+                await cursor.execute("SELECT @@max_allowed_packet")
+
+                (max_allowed_packet,) = await cursor.fetchone()
+                self.__max_allowed_packet = int(max_allowed_packet)
+
+        return self.__max_allowed_packet
+
+    # -------------------------------------------------------------------------
+    async def __stream_query(
+        self,
+        connection: Any,
+        query: str,
+        parameters: Sequence[Any],
+        chunk_size: int,
+    ) -> AsyncIterator[List[RowType]]:
+        # A plain cursor is unbuffered: rows stay on the server until fetched.
+        async with await connection.cursor() as cursor:
+            started_at: float = time.perf_counter()
+            await self.__run_before_deadline(
+                connection=connection,
+                execution=cursor.execute(query, tuple(parameters)),
+            )
+            execute_time: float = time.perf_counter() - started_at
+            fetch_time: float = 0.0
+            row_count: int = 0
+            column_names: List[str] = [
+                column[0] for column in cursor.description or ()
+            ]
+
+            try:
+                while True:
+                    fetch_started_at: float = time.perf_counter()
+                    chunk: List[RowType] = await self.__run_before_deadline(
+                        connection=connection, execution=cursor.fetchmany(chunk_size)
+                    )
+                    fetch_time += time.perf_counter() - fetch_started_at
+
+                    if not chunk:
+                        break
+
+                    row_count += len(chunk)
+
+                    yield ResultRows(chunk, column_names=column_names)
+
+            except GeneratorExit:
+                # Unread rows would block the next statement of the connection.
+                while await self.__run_before_deadline(
+                    connection=connection, execution=cursor.fetchmany(chunk_size)
+                ):
+                    pass
+
+                raise
+
+            finally:
+                # The time the consumer spends on a chunk is not accounted.
+                self.__scope_tracker.add_timings(
+                    connection=connection,
+                    query=query,
+                    parameters=parameters,
+                    execute=execute_time,
+                    fetch=fetch_time,
+                    rows=row_count,
+                )
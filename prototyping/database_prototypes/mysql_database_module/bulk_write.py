@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `bulk_write` module provides the building blocks of bulk writes,
+to the database, DBMS-MySQL.
+
+It builds multi-row `INSERT ... VALUES` statements,
+splits the input rows into packets fitting `max_allowed_packet`,
+and accounts the write throughput.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "BulkInsertStatementBuilder",
+    "BulkWriteStatistics",
+    "RowsSourceType",
+    "quote_identifier",
+    "iterate_rows",
+    "iterate_batches",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.2.0"
+
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ..database_module.bulk_write_statistics import BulkWriteStatistics
+
+
+# Annotation for the rows accepted by the bulk writes.
+RowsSourceType = Union[Iterable[Sequence[Any]], AsyncIterable[Sequence[Any]]]
+
+# The share of `max_allowed_packet` filled by a statement, leaving room for the protocol overhead.
+PACKET_SAFETY_MARGIN: float = 0.9
+
+
+# _____________________________________________________________________________
+class BulkInsertStatementBuilder:
+    """BulkInsertStatementBuilder class of multi-row insert statements.
+
+    This class builds `INSERT INTO ... VALUES (...), (...)` statements for a table,
+    optionally followed by `ON DUPLICATE KEY UPDATE` of the given columns,
+    which are either replaced or incremented by the inserted values,
+    and estimates the size the rows take in the statement.
+
+    Attributes:
+        __head (str): The statement text before the rows.
+        __tail (str): The statement text after the rows.
+        __row_placeholder (str): The placeholder group of a single row.
+        column_count (int): The number of values per row.
+    """
+
+    __head: str
+    __tail: str
+    __row_placeholder: str
+    column_count: int
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        table: str,
+        columns: Sequence[str],
+        update_columns: Optional[Sequence[str]] = None,
+        ignore_duplicates: bool = False,
+        increment_columns: Optional[Sequence[str]] = None,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            table (str): The name of the table to insert into.
+            columns (Sequence[str]): The names of the inserted columns.
+            update_columns (Optional[Sequence[str]], optional): Columns updated on a duplicate key.
+                                                                The default is None, an upsert is not performed.
+            ignore_duplicates (bool, optional): Whether rows with a duplicate key are skipped.
+                                                The default is False.
+            increment_columns (Optional[Sequence[str]], optional): Columns incremented by the inserted value on a duplicate key.
+                                                                   The default is None.
+
+        Raises:
+            ValueError: If no columns are given.
+        """
+        if not columns:
+            raise ValueError("Bulk insert requires at least one column!")
+
+        quoted_columns: str = ", ".join(map(quote_identifier, columns))
+        modifier: str = " IGNORE" if ignore_duplicates else ""
+
+        self.__head = (
+            f"INSERT{modifier} INTO {quote_identifier(table)} "
+            f"({quoted_columns}) VALUES "
+        )
+        self.__tail = ""
+
+        assignments: List[str] = [
+            f"{quote_identifier(column)} = VALUES({quote_identifier(column)})"
+            for column in update_columns or ()
+        ]
+        assignments.extend(
+            f"{quote_identifier(column)} = "
+            f"{quote_identifier(column)} + VALUES({quote_identifier(column)})"
+            for column in increment_columns or ()
+        )
+
+        if assignments:
+            self.__tail = f" ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+
+        self.__row_placeholder = f"({', '.join(['%s'] * len(columns))})"
+        self.column_count = len(columns)
+
+    # -------------------------------------------------------------------------
+    @property
+    def statement_overhead(self) -> int:
+        """statement_overhead returns the size of the statement text without rows."""
+        return len(self.__head) + len(self.__tail)
+
+    # -------------------------------------------------------------------------
+    def build(self, row_count: int) -> str:
+        """build returns the statement inserting the given number of rows.
+
+        Args:
+            row_count (int): The number of rows in the statement.
+
+        Returns:
+            str: The statement text with `%s` placeholders.
+        """
+        rows: str = ", ".join([self.__row_placeholder] * row_count)
+
+        return f"{self.__head}{rows}{self.__tail}"
+
+    # -------------------------------------------------------------------------
+    def estimate_row_size(self, row: Sequence[Any]) -> int:
+        """estimate_row_size returns the upper estimate of the row size in the statement.
+
+        *Escaping may double the length of text values, which the estimate accounts for.
+
+        Args:
+            row (Sequence[Any]): The values of the row.
+
+        Returns:
+            int: The estimated number of bytes.
+
+        Raises:
+            ValueError: If the row does not have a value for each column.
+        """
+        if len(row) != self.column_count:
+            raise ValueError(
+                f"Row has {len(row)} values, expected {self.column_count}!"
+            )
+
+        size: int = 4  # parentheses and the separator
+
+        for value in row:
+            if value is None:
+                size += 5
+            elif isinstance(value, (bytes, bytearray)):
+                size += 2 * len(value) + 3
+            elif isinstance(value, str):
+                size += 2 * len(value.encode()) + 3
+            else:
+                size += len(str(value)) + 3
+
+        return size
+
+
+# -----------------------------------------------------------------------------
+def quote_identifier(identifier: str) -> str:
+    """Quote a MySQL identifier with backticks.
+
+    Args:
+        identifier (str): The name of a table or a column, optionally qualified with a schema.
+
+    Returns:
+        str: The quoted identifier.
+    """
+    return ".".join(
+        "`" + part.replace("`", "``") + "`" for part in identifier.split(".")
+    )
+
+
+# -----------------------------------------------------------------------------
+async def iterate_rows(rows: RowsSourceType) -> AsyncIterator[Sequence[Any]]:
+    """Iterate rows from a synchronous or an asynchronous iterable.
+
+    Args:
+        rows (RowsSourceType): The source of the rows.
+
+    Yields:
+        Sequence[Any]: The next row.
+    """
+    if isinstance(rows, AsyncIterable):
+        async for row in rows:
+            yield row
+
+    else:
+        for row in rows:
+            yield row
+
+
+# -----------------------------------------------------------------------------
+async def iterate_batches(
+    rows: RowsSourceType,
+    max_rows: int,
+    max_size: Optional[int] = None,
+    builder: Optional[BulkInsertStatementBuilder] = None,
+) -> AsyncIterator[Tuple[List[Sequence[Any]], int]]:
+    """Split the rows into batches bounded by the row count and the statement size.
+
+    Args:
+        rows (RowsSourceType): The source of the rows.
+        max_rows (int): The maximum number of rows per batch.
+        max_size (Optional[int], optional): The maximum statement size in bytes.
+                                            The default is None, the size is not bounded.
+        builder (Optional[BulkInsertStatementBuilder], optional): The builder estimating the row size.
+                                                                  Required when `max_size` is given.
+
+    Yields:
+        Tuple[List[Sequence[Any]], int]: The rows of the batch and their estimated size.
+
+    Raises:
+        ValueError: If a single row does not fit `max_size`.
+    """
+    size_limit: Optional[int] = None
+
+    if max_size is not None and builder is not None:
+        size_limit = (
+            int(max_size * PACKET_SAFETY_MARGIN) - builder.statement_overhead
+        )
+
+    batch: List[Sequence[Any]] = []
+    batch_size: int = 0
+
+    async for row in iterate_rows(rows=rows):
+        row_size: int = 0
+
+        if size_limit is not None:
+            row_size = builder.estimate_row_size(row=row)  # type: ignore
+
+            if row_size > size_limit:
+                raise ValueError("Row does not fit into max_allowed_packet!")
+
+            if batch and batch_size + row_size > size_limit:
+                yield batch, batch_size
+                batch, batch_size = [], 0
+
+        batch.append(row)
+        batch_size += row_size
+
+        if len(batch) >= max_rows:
+            yield batch, batch_size
+            batch, batch_size = [], 0
+
+    if batch:
+        yield batch, batch_size
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `error_classification` module provides functions sorting the errors,
+raised by the connections to the database, DBMS-MySQL.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "CONNECTION_LOST_ERRNOS",
+    "RETRYABLE_TRANSACTION_ERRNOS",
+    "is_connection_lost",
+    "is_transaction_retryable",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+from typing import FrozenSet, Optional
+from mysql.connector import errorcode
+from mysql.connector.errors import Error as MySQLError
+
+
+# Error numbers of a connection dropped by the server or the network.
+CONNECTION_LOST_ERRNOS: FrozenSet[int] = frozenset(
+    {
+        errorcode.CR_SERVER_GONE_ERROR,
+        errorcode.CR_SERVER_LOST,
+        errorcode.CR_SERVER_LOST_EXTENDED,
+        errorcode.ER_CLIENT_INTERACTION_TIMEOUT,
+    }
+)
+
+# Error numbers of a transaction that lost a lock conflict and can be run again.
+RETRYABLE_TRANSACTION_ERRNOS: FrozenSet[int] = frozenset(
+    {
+        errorcode.ER_LOCK_DEADLOCK,
+        errorcode.ER_LOCK_WAIT_TIMEOUT,
+    }
+)
+
+
+# -----------------------------------------------------------------------------
+def is_connection_lost(error: BaseException) -> bool:
+    """Check whether the error means the connection to the server is lost.
+
+    *Such an error leaves no open transaction on the server,
+    so the work of the uncommitted transaction is discarded.
+
+    Args:
+        error (BaseException): The error raised by a connection.
+
+    Returns:
+        bool: True if the connection has to be reopened; otherwise False.
+    """
+    if not isinstance(error, MySQLError):
+        return False
+
+    errno: Optional[int] = error.errno
+
+    if errno in CONNECTION_LOST_ERRNOS:
+        return True
+
+    # Errors of a connection whose socket is already closed come without a number.
+    cause: Optional[BaseException] = error.__cause__
+
+    return errno in (None, -1) and cause is not None and is_connection_lost(cause)
+
+
+# -----------------------------------------------------------------------------
+def is_transaction_retryable(error: BaseException) -> bool:
+    """Check whether the error means the transaction can be run again as a whole.
+
+    *A deadlock rolls back the whole transaction on the server,
+    a lock wait timeout only the statement,
+    so the remaining work must be rolled back before the transaction is run again.
+
+    Args:
+        error (BaseException): The error raised by a connection.
+
+    Returns:
+        bool: True if the transaction lost a lock conflict; otherwise False.
+    """
+    return (
+        isinstance(error, MySQLError)
+        and error.errno in RETRYABLE_TRANSACTION_ERRNOS
+    )
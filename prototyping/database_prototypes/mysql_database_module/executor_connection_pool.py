@@ -0,0 +1,452 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `executor_connection_pool` module provides an asynchronous wrapper,
+over the synchronous connection pool `MySQLConnectionPool`.
+
+All blocking work of the pool connections is performed
+on a bounded worker-thread executor sized to the pool,
+so that the event loop is never blocked by MySQL round-trips.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "ExecutorMySQLConnectionPool",
+    "AsyncPooledMySQLConnection",
+    "AsyncPooledMySQLCursor",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.5.0"
+
+from ..database_module.pool_statistics import ConnectionPoolStatistics
+
+import asyncio
+import threading
+import time
+import weakref
+
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from mysql.connector.errors import PoolError
+from mysql.connector.pooling import MySQLConnectionPool
+from mysql.connector.cursor import MySQLCursorAbstract
+from mysql.connector.types import RowType
+
+from .types import MySQLPooledConnection
+
+
+# _____________________________________________________________________________
+class AsyncPooledMySQLCursor:
+    """AsyncPooledMySQLCursor class of an asynchronous cursor over a synchronous one.
+
+    This class mirrors the cursor interface of `mysql.connector.aio`,
+    delegating every blocking call to the executor of the pool.
+
+    Attributes:
+        __cursor (MySQLCursorAbstract): The wrapped synchronous cursor.
+        __run (Callable): The function running a blocking call on the executor.
+    """
+
+    __cursor: MySQLCursorAbstract
+    __run: Callable[..., Any]
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, cursor: MySQLCursorAbstract, run: Callable[..., Any]
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            cursor (MySQLCursorAbstract): The synchronous cursor to wrap.
+            run (Callable): The coroutine function running a blocking call on the executor.
+        """
+        self.__cursor = cursor
+        self.__run = run
+
+    # -------------------------------------------------------------------------
+    async def __aenter__(self) -> "AsyncPooledMySQLCursor":
+        return self
+
+    # -------------------------------------------------------------------------
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    # -------------------------------------------------------------------------
+    @property
+    def rowcount(self) -> int:
+        return self.__cursor.rowcount
+
+    # -------------------------------------------------------------------------
+    @property
+    def lastrowid(self) -> Optional[int]:
+        return self.__cursor.lastrowid
+
+    # -------------------------------------------------------------------------
+    @property
+    def description(self) -> Any:
+        return self.__cursor.description
+
+    # -------------------------------------------------------------------------
+    async def execute(
+        self, operation: str, params: Optional[Sequence[Any]] = None
+    ) -> None:
+        await self.__run(self.__cursor.execute, operation, params)
+
+    # -------------------------------------------------------------------------
+    async def executemany(
+        self, operation: str, seq_params: Sequence[Sequence[Any]]
+    ) -> None:
+        await self.__run(self.__cursor.executemany, operation, seq_params)
+
+    # -------------------------------------------------------------------------
+    async def fetchone(self) -> Optional[RowType]:
+        return await self.__run(self.__cursor.fetchone)
+
+    # -------------------------------------------------------------------------
+    async def fetchmany(self, size: int = 1) -> List[RowType]:
+        return await self.__run(self.__cursor.fetchmany, size)
+
+    # -------------------------------------------------------------------------
+    async def fetchall(self) -> List[RowType]:
+        return await self.__run(self.__cursor.fetchall)
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        await self.__run(self.__cursor.close)
+
+
+# _____________________________________________________________________________
+class AsyncPooledMySQLConnection:
+    """AsyncPooledMySQLConnection class of an asynchronous connection over a pooled one.
+
+    This class mirrors the connection interface of `mysql.connector.aio`,
+    so that the API can work with the pool connections the same way,
+    as with the independent asynchronous connection.
+
+    Attributes:
+        __connection (MySQLPooledConnection): The wrapped synchronous pool connection.
+        __run (Callable): The function running a blocking call on the executor.
+    """
+
+    __connection: MySQLPooledConnection
+    __run: Callable[..., Any]
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, connection: MySQLPooledConnection, run: Callable[..., Any]
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connection (MySQLPooledConnection): The synchronous pool connection to wrap.
+            run (Callable): The coroutine function running a blocking call on the executor.
+        """
+        self.__connection = connection
+        self.__run = run
+
+    # -------------------------------------------------------------------------
+    @property
+    def pooled_connection(self) -> MySQLPooledConnection:
+        """pooled_connection returns the wrapped synchronous pool connection."""
+        return self.__connection
+
+    # -------------------------------------------------------------------------
+    @property
+    def connection_id(self) -> Optional[int]:
+        """connection_id returns the server thread id of the connection."""
+        return self.__connection.connection_id
+
+    # -------------------------------------------------------------------------
+    def rebind(self, connection: MySQLPooledConnection) -> None:
+        """rebind wraps a new checkout of the same server connection.
+
+        Args:
+            connection (MySQLPooledConnection): The synchronous pool connection to wrap.
+        """
+        self.__connection = connection
+
+    # -------------------------------------------------------------------------
+    async def cursor(self, **kwargs: Any) -> AsyncPooledMySQLCursor:
+        cursor: MySQLCursorAbstract = await self.__run(
+            self.__connection.cursor, **kwargs
+        )
+
+        return AsyncPooledMySQLCursor(cursor=cursor, run=self.__run)
+
+    # -------------------------------------------------------------------------
+    async def commit(self) -> None:
+        await self.__run(self.__connection.commit)
+
+    # -------------------------------------------------------------------------
+    async def rollback(self) -> None:
+        await self.__run(self.__connection.rollback)
+
+    # -------------------------------------------------------------------------
+    async def is_connected(self) -> bool:
+        return await self.__run(self.__connection.is_connected)
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        await self.__run(self.__connection.close)
+
+
+# _____________________________________________________________________________
+class ExecutorMySQLConnectionPool:
+    """ExecutorMySQLConnectionPool class of a non-blocking synchronous connection pool.
+
+    This class wraps `MySQLConnectionPool`, running all of its blocking calls
+    on a worker-thread executor with as many threads as there are connections in the pool.
+
+    *Instead of `PoolError` on an exhausted pool,
+    tasks are queued on a semaphore until a connection is returned,
+    or until the acquire timeout runs out.
+
+    *Every checkout of the same server session is handed out in the same wrapper,
+    so the state its users keep by connection, e.g. the prepared statements,
+    outlives the checkout when the pool does not reset the sessions.
+
+    Attributes:
+        __pool (MySQLConnectionPool): The wrapped synchronous connection pool.
+        __executor (ThreadPoolExecutor): The executor for the blocking pool work.
+        __semaphore (asyncio.Semaphore): Limits checkouts to the pool size.
+        __missing_connections (int): The number of discarded connections not replaced yet.
+        __refill_lock (threading.Lock): Guards the replacement of the discarded connections.
+        __wrappers (weakref.WeakKeyDictionary): The session id and the wrapper of each server connection.
+        acquire_timeout (Optional[float]): Seconds to wait for a free connection.
+        statistics (ConnectionPoolStatistics): The pool load counters.
+    """
+
+    __pool: MySQLConnectionPool
+    __executor: ThreadPoolExecutor
+    __semaphore: asyncio.Semaphore
+    __missing_connections: int
+    __refill_lock: threading.Lock
+    __wrappers: "weakref.WeakKeyDictionary[Any, Tuple[Optional[int], AsyncPooledMySQLConnection]]"
+    acquire_timeout: Optional[float]
+    statistics: ConnectionPoolStatistics
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, pool: MySQLConnectionPool, acquire_timeout: Optional[float] = None
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            pool (MySQLConnectionPool): The synchronous connection pool to wrap.
+            acquire_timeout (Optional[float], optional): Seconds to wait for a free connection.
+                                                         The default is None, the wait is not limited.
+        """
+        self.__pool = pool
+        self.__executor = ThreadPoolExecutor(
+            max_workers=pool.pool_size, thread_name_prefix=pool.pool_name
+        )
+        self.__semaphore = asyncio.Semaphore(value=pool.pool_size)
+        self.__missing_connections = 0
+        self.__refill_lock = threading.Lock()
+        self.__wrappers = weakref.WeakKeyDictionary()
+        self.acquire_timeout = acquire_timeout
+        self.statistics = ConnectionPoolStatistics(size_limit=pool.pool_size)
+
+    # -------------------------------------------------------------------------
+    @property
+    def pool_name(self) -> str:
+        return self.__pool.pool_name
+
+    # -------------------------------------------------------------------------
+    @property
+    def pool_size(self) -> int:
+        return self.__pool.pool_size
+
+    # -------------------------------------------------------------------------
+    @property
+    def reset_session(self) -> bool:
+        """reset_session returns whether the session of a returned connection is reset."""
+        return self.__pool.reset_session
+
+    # -------------------------------------------------------------------------
+    async def run_in_executor(
+        self, function: Callable[..., Any], *args: Any, **kwargs: Any
+    ) -> Any:
+        """run_in_executor runs a blocking call on the pool executor.
+
+        Args:
+            function (Callable): The blocking function to call.
+            *args (Any): Positional arguments of the call.
+            **kwargs (Any): Keyword arguments of the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(
+            self.__executor, lambda: function(*args, **kwargs)
+        )
+
+    # -------------------------------------------------------------------------
+    async def get_connection(self) -> AsyncPooledMySQLConnection:
+        """get_connection returns a connection from the pool.
+
+        This method waits until the pool has a free connection,
+        then checks it out on the executor.
+        A connection discarded before is replaced by a new one first.
+
+        Returns:
+            AsyncPooledMySQLConnection: The asynchronous wrapper of the pool connection.
+
+        Raises:
+            PoolError: If no connection was freed within `acquire_timeout`.
+            MySQLError: If the replacement of a discarded connection could not be opened.
+        """
+        statistics: ConnectionPoolStatistics = self.statistics
+        started_at: float = time.perf_counter()
+
+        statistics.waiting += 1
+        statistics.max_waiting = max(statistics.max_waiting, statistics.waiting)
+
+        try:
+            await asyncio.wait_for(
+                self.__semaphore.acquire(), timeout=self.acquire_timeout
+            )
+
+        except asyncio.TimeoutError:
+            statistics.timeouts += 1
+
+            raise PoolError("Failed getting connection; pool exhausted") from None
+
+        finally:
+            statistics.waiting -= 1
+
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        checkout: asyncio.Future[MySQLPooledConnection] = loop.run_in_executor(
+            self.__executor, self.__check_out
+        )
+
+        try:
+            # The checkout is shielded, a cancelled caller must not lose the connection of the thread.
+            connection: MySQLPooledConnection = await asyncio.shield(checkout)
+
+        except asyncio.CancelledError:
+            checkout.add_done_callback(self.__return_abandoned_checkout)
+            raise
+
+        except BaseException:
+            self.__semaphore.release()
+            raise
+
+        wait_time: float = time.perf_counter() - started_at
+
+        statistics.in_use += 1
+        statistics.idle = self.pool_size - statistics.in_use
+        statistics.record_wait(wait_time=wait_time)
+
+        return self.__wrap(connection=connection)
+
+    # -------------------------------------------------------------------------
+    async def release_connection(
+        self, connection: AsyncPooledMySQLConnection
+    ) -> None:
+        """release_connection returns the connection back to the pool.
+
+        Args:
+            connection (AsyncPooledMySQLConnection): The connection to return.
+        """
+        try:
+            await connection.close()
+
+        finally:
+            self.statistics.in_use -= 1
+            self.statistics.idle = self.pool_size - self.statistics.in_use
+            self.__semaphore.release()
+
+    # -------------------------------------------------------------------------
+    async def discard_connection(
+        self, connection: AsyncPooledMySQLConnection
+    ) -> None:
+        """discard_connection closes a broken connection instead of returning it.
+
+        A worker thread may still be running a query on the connection,
+        so it is shut down without a QUIT command, which fails such a query at once,
+        and it never goes back into the pool.
+        The next checkout opens a new connection in its place.
+
+        Args:
+            connection (AsyncPooledMySQLConnection): The connection to close.
+        """
+        try:
+            # Closes the socket only, without a round-trip, so it does not block.
+            connection.pooled_connection.shutdown()
+
+        finally:
+            with self.__refill_lock:
+                self.__missing_connections += 1
+
+            self.statistics.discarded += 1
+            self.statistics.in_use -= 1
+            self.statistics.idle = self.pool_size - self.statistics.in_use
+            self.__semaphore.release()
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close stops the pool executor after the pending work is done."""
+        await asyncio.to_thread(self.__executor.shutdown, wait=True)
+
+    # -------------------------------------------------------------------------
+    def __wrap(self, connection: MySQLPooledConnection) -> AsyncPooledMySQLConnection:
+        # The pooled connection is a new object per checkout, unlike the server connection;
+        # the latter has no public accessor.
+        server_connection: Any = connection._cnx
+        session_id: Optional[int] = connection.connection_id
+        wrapper_entry: Optional[Tuple[Optional[int], AsyncPooledMySQLConnection]] = (
+            self.__wrappers.get(server_connection)
+        )
+
+        # A reconnected connection has a new session, without the state of the old one.
+        if wrapper_entry is not None and wrapper_entry[0] == session_id:
+            wrapper: AsyncPooledMySQLConnection = wrapper_entry[1]
+            wrapper.rebind(connection=connection)
+
+            return wrapper
+
+        wrapper = AsyncPooledMySQLConnection(
+            connection=connection, run=self.run_in_executor
+        )
+        self.__wrappers[server_connection] = (session_id, wrapper)
+
+        return wrapper
+
+    # -------------------------------------------------------------------------
+    def __check_out(self) -> MySQLPooledConnection:
+        with self.__refill_lock:
+            if self.__missing_connections:
+                self.__pool.add_connection()
+                self.__missing_connections -= 1
+                self.statistics.created += 1
+
+        return self.__pool.get_connection()
+
+    # -------------------------------------------------------------------------
+    def __return_abandoned_checkout(
+        self, checkout: "asyncio.Future[MySQLPooledConnection]"
+    ) -> None:
+        if checkout.cancelled() or checkout.exception() is not None:
+            self.__semaphore.release()
+
+            return
+
+        # Closing a pooled connection puts it back into the pool.
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        returning: asyncio.Future[None] = loop.run_in_executor(
+            self.__executor, checkout.result().close
+        )
+        returning.add_done_callback(self.__release_returned_slot)
+
+    # -------------------------------------------------------------------------
+    def __release_returned_slot(self, returning: "asyncio.Future[None]") -> None:
+        if not returning.cancelled():
+            returning.exception()
+
+        self.__semaphore.release()
@@ -0,0 +1,574 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `index_advisor` module provides the diagnostic hook,
+finding the captured queries that scan whole tables or sort without an index,
+and suggesting the composite indexes to add, DBMS-MySQL.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "IndexAdvisor",
+    "IndexAdvice",
+    "QueryProfile",
+    "TableAccess",
+    "build_index_advice",
+    "format_index_report",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.1"
+
+import logging
+import re
+
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    FrozenSet,
+    List,
+    Optional,
+    Pattern,
+    Sequence,
+    Tuple,
+)
+from mysql.connector.errors import Error as MySQLError
+
+from ..database_module.query_instrumentation import (
+    AbstractQueryHook,
+    QueryTimings,
+)
+
+if TYPE_CHECKING:
+    from .async_mysql_database_api import AsyncMySQLAPI
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+# Access types reading every row of a table or of an index.
+FULL_SCAN_ACCESS_TYPES: FrozenSet[str] = frozenset({"ALL", "index"})
+
+_EXPLAINABLE_PATTERN: Pattern[str] = re.compile(
+    r"[\s(]*(?:select|update|delete|with)\b", re.IGNORECASE
+)
+# A column of a plan condition, qualified by the optional schema and the table,
+# followed by its comparison operator.
+_CONDITION_COLUMN_PATTERN: Pattern[str] = re.compile(
+    r"(?:`[^`]*`\.)?`(?P<table>[^`]+)`\.`(?P<column>[^`]+)`\s*"
+    r"(?P<operator><=>|>=|<=|<>|!=|=|>|<|\bin\b|\bbetween\b|\blike\b|\bis\b)",
+    re.IGNORECASE,
+)
+# A column on the right side of an equality, e.g. of a join condition.
+_CONDITION_JOINED_COLUMN_PATTERN: Pattern[str] = re.compile(
+    r"(?:<=>|[^<>!]=)\s*(?:`[^`]*`\.)?`(?P<table>[^`]+)`\.`(?P<column>[^`]+)`"
+)
+_ORDER_BY_PATTERN: Pattern[str] = re.compile(
+    r"\border\s+by\s+(.+?)(?:\s+limit\b|\s+for\s+update\b|\s+lock\b|\)|$)",
+    re.IGNORECASE,
+)
+_GROUP_BY_PATTERN: Pattern[str] = re.compile(
+    r"\bgroup\s+by\s+(.+?)"
+    r"(?:\s+with\s+rollup\b|\s+having\b|\s+order\b|\s+limit\b|\)|$)",
+    re.IGNORECASE,
+)
+_SORT_COLUMN_PATTERN: Pattern[str] = re.compile(
+    r"(?:`?(?P<table>\w+)`?\.)?`?(?P<column>\w+)`?(?:\s+(?:asc|desc))?",
+    re.IGNORECASE,
+)
+_TABLE_ALIAS_PATTERN: Pattern[str] = re.compile(
+    r"\b(?:from|join|update)\s+(?:`?\w+`?\.)?`?(?P<table>\w+)`?"
+    r"(?:\s+(?:as\s+)?`?(?P<alias>\w+)`?)?",
+    re.IGNORECASE,
+)
+
+_EQUALITY_OPERATORS: FrozenSet[str] = frozenset({"=", "<=>", "in", "is"})
+_RANGE_OPERATORS: FrozenSet[str] = frozenset(
+    {">", "<", ">=", "<=", "between", "like"}
+)
+_NOT_ALIASES: FrozenSet[str] = frozenset(
+    {
+        "where",
+        "join",
+        "inner",
+        "left",
+        "right",
+        "cross",
+        "straight_join",
+        "natural",
+        "on",
+        "using",
+        "set",
+        "order",
+        "group",
+        "having",
+        "limit",
+        "for",
+        "lock",
+        "force",
+        "use",
+        "ignore",
+        "union",
+        "window",
+    }
+)
+
+
+# _____________________________________________________________________________
+@dataclass
+class QueryProfile:
+    """QueryProfile data class of a captured query fingerprint.
+
+    *The sample is the slowest successful execution of the fingerprint,
+    as its parameters are the most likely to show a bad plan.
+
+    Attributes:
+        fingerprint (str): The fingerprint of the query.
+        calls (int): The number of executions.
+        total_time (float): The sum of the whole durations, in seconds.
+        query (str): The query text of the sample, with its placeholders.
+        parameters (Tuple[Any, ...]): The values bound to the placeholders of the sample.
+        sample_time (float): The whole duration of the sample, in seconds.
+    """
+
+    fingerprint: str
+    calls: int = 0
+    total_time: float = 0.0
+    query: str = ""
+    parameters: Tuple[Any, ...] = ()
+    sample_time: float = -1.0
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_explainable(self) -> bool:
+        """is_explainable returns whether the sample can be explained."""
+        return bool(
+            self.query
+            and _EXPLAINABLE_PATTERN.match(self.query)
+            and self.query.count("%s") == len(self.parameters)
+        )
+
+
+# _____________________________________________________________________________
+@dataclass
+class TableAccess:
+    """TableAccess data class of the access to a table in a plan.
+
+    Attributes:
+        table_name (str): The name of the table in the query, the alias if it has one.
+        access_type (str): The access type, e.g. `ALL` for a full table scan.
+        key (Optional[str]): The index used; None if no index is used.
+        rows_examined (int): The estimated number of rows read per scan.
+        attached_condition (str): The condition filtering the read rows.
+    """
+
+    table_name: str
+    access_type: str
+    key: Optional[str] = None
+    rows_examined: int = 0
+    attached_condition: str = ""
+
+    # -------------------------------------------------------------------------
+    @property
+    def is_full_scan(self) -> bool:
+        """is_full_scan returns whether every row of the table or of an index is read."""
+        return self.access_type in FULL_SCAN_ACCESS_TYPES
+
+
+# _____________________________________________________________________________
+@dataclass
+class IndexAdvice:
+    """IndexAdvice data class of the plan problems of a query fingerprint.
+
+    Attributes:
+        fingerprint (str): The fingerprint of the query.
+        calls (int): The number of executions.
+        total_time (float): The sum of the whole durations, in seconds.
+        full_scans (List[TableAccess]): The tables read entirely.
+        using_filesort (bool): Whether the result is sorted without an index.
+        using_temporary_table (bool): Whether the result is built in a temporary table.
+        suggested_indexes (List[str]): The `CREATE INDEX` statements that may fix the plan.
+    """
+
+    fingerprint: str
+    calls: int
+    total_time: float
+    full_scans: List[TableAccess] = field(default_factory=list)
+    using_filesort: bool = False
+    using_temporary_table: bool = False
+    suggested_indexes: List[str] = field(default_factory=list)
+
+    # -------------------------------------------------------------------------
+    @property
+    def has_problems(self) -> bool:
+        """has_problems returns whether the plan has a full scan, a filesort or a temporary table."""
+        return bool(
+            self.full_scans or self.using_filesort or self.using_temporary_table
+        )
+
+
+# _____________________________________________________________________________
+class IndexAdvisor(AbstractQueryHook):
+    """IndexAdvisor class of a hook finding the queries that need an index.
+
+    This class keeps the total time and a sample of each query fingerprint,
+    and on demand explains the samples of the most expensive fingerprints,
+    reporting the full scans, filesorts and temporary tables of their plans,
+    together with the composite indexes that may remove them.
+
+    *The suggested index of a table lists the columns compared for equality first,
+    then the sorting columns, then a single column compared by range,
+    as the columns after a range can not be used by the index.
+    The suggestions are built from the plan conditions and the query text,
+    so they are a starting point to review, not a ready migration.
+
+    *The samples keep the parameter values, so the reports never include them.
+    The sample texts keep the optimizer hints, so a sample is explained with the hints it ran with.
+
+    Attributes:
+        max_fingerprints (int): The maximum number of tracked fingerprints.
+        __profiles (OrderedDict): The profiles by fingerprint, the least recently used first.
+    """
+
+    max_fingerprints: int
+    __profiles: "OrderedDict[str, QueryProfile]"
+
+    # -------------------------------------------------------------------------
+    def __init__(self, max_fingerprints: int = 1000) -> None:
+        """__init__ constructor.
+
+        Args:
+            max_fingerprints (int, optional): The maximum number of tracked fingerprints,
+                                              the least recently executed ones are forgotten.
+                                              The default is 1000.
+        """
+        self.max_fingerprints = max_fingerprints
+        self.__profiles = OrderedDict()
+
+    # -------------------------------------------------------------------------
+    def record_query(self, timings: QueryTimings) -> None:
+        """record_query accounts a finished query and keeps it as a sample if it is the slowest.
+
+        Args:
+            timings (QueryTimings): The durations of the query.
+        """
+        profile: Optional[QueryProfile] = self.__profiles.get(timings.fingerprint)
+
+        if profile is None:
+            profile = QueryProfile(fingerprint=timings.fingerprint)
+            self.__profiles[timings.fingerprint] = profile
+
+            if len(self.__profiles) > self.max_fingerprints:
+                self.__profiles.popitem(last=False)
+
+        else:
+            self.__profiles.move_to_end(timings.fingerprint)
+
+        total: float = timings.total
+        profile.calls += 1
+        profile.total_time += total
+
+        if not timings.failed and timings.query and total > profile.sample_time:
+            profile.query = timings.query
+            profile.parameters = timings.parameters
+            profile.sample_time = total
+
+    # -------------------------------------------------------------------------
+    def get_profiles(self, limit: int = 10) -> List[QueryProfile]:
+        """get_profiles returns the fingerprints with the largest total time.
+
+        Args:
+            limit (int, optional): The number of fingerprints.
+                                   The default is 10.
+
+        Returns:
+            List[QueryProfile]: The profiles, the largest total time first.
+        """
+        return sorted(
+            self.__profiles.values(),
+            key=lambda profile: profile.total_time,
+            reverse=True,
+        )[:limit]
+
+    # -------------------------------------------------------------------------
+    async def analyze(
+        self,
+        api: "AsyncMySQLAPI",
+        limit: int = 20,
+        timeout: Optional[float] = 10.0,
+    ) -> List[IndexAdvice]:
+        """analyze explains the samples of the most expensive fingerprints.
+
+        *Only SELECT, UPDATE and DELETE samples are explained.
+        A sample the server can not explain is logged and skipped.
+
+        Args:
+            api (AsyncMySQLAPI): The API running the `EXPLAIN` statements.
+            limit (int, optional): The number of the most expensive explainable fingerprints to explain.
+                                   The default is 20.
+            timeout (Optional[float], optional): Seconds each `EXPLAIN` may take.
+                                                 The default is 10.0.
+
+        Returns:
+            List[IndexAdvice]: The fingerprints with plan problems, the largest total time first.
+        """
+        profiles: List[QueryProfile] = [
+            profile
+            for profile in self.get_profiles(limit=len(self.__profiles))
+            if profile.is_explainable
+        ][:limit]
+        advices: List[IndexAdvice] = []
+
+        for profile in profiles:
+            try:
+                plan: Optional[Dict[str, Any]] = await api.explain_query(
+                    query=profile.query,
+                    parameters=profile.parameters,
+                    timeout=timeout,
+                )
+
+            except (MySQLError, TimeoutError, ValueError) as error:
+                logger.warning(
+                    msg=f"Failed to explain {profile.fingerprint}! {error}"
+                )
+                continue
+
+            if plan is None:
+                continue
+
+            advice: IndexAdvice = build_index_advice(profile=profile, plan=plan)
+
+            if advice.has_problems:
+                advices.append(advice)
+
+        return advices
+
+    # -------------------------------------------------------------------------
+    def reset(self) -> None:
+        """reset forgets all profiles."""
+        self.__profiles.clear()
+
+
+# -----------------------------------------------------------------------------
+def build_index_advice(profile: QueryProfile, plan: Dict[str, Any]) -> IndexAdvice:
+    """Find the problems of a plan and suggest the indexes of the tables involved.
+
+    Args:
+        profile (QueryProfile): The profile of the explained query.
+        plan (Dict[str, Any]): The decoded plan of `EXPLAIN FORMAT=JSON`.
+
+    Returns:
+        IndexAdvice: The problems and the suggested indexes.
+    """
+    accesses: List[TableAccess] = []
+    flags: Dict[str, bool] = {"using_filesort": False, "using_temporary_table": False}
+    _walk_plan(node=plan, accesses=accesses, flags=flags)
+
+    advice = IndexAdvice(
+        fingerprint=profile.fingerprint,
+        calls=profile.calls,
+        total_time=profile.total_time,
+        full_scans=[access for access in accesses if access.is_full_scan],
+        using_filesort=flags["using_filesort"],
+        using_temporary_table=flags["using_temporary_table"],
+    )
+
+    if not accesses:
+        return advice
+
+    aliases: Dict[str, str] = _get_table_aliases(query=profile.query)
+    is_sorted: bool = advice.using_filesort or advice.using_temporary_table
+
+    for position, access in enumerate(accesses):
+        # Only the first table of the join order can deliver the rows sorted.
+        needs_sorting: bool = is_sorted and position == 0
+
+        if not (access.is_full_scan or needs_sorting):
+            continue
+
+        columns: List[str] = _suggest_columns(
+            access=access,
+            query=profile.query,
+            is_only_table=len(accesses) == 1,
+            needs_sorting=needs_sorting,
+        )
+
+        if not columns:
+            continue
+
+        table: str = aliases.get(access.table_name, access.table_name)
+        statement: str = (
+            f"CREATE INDEX idx_{table}_{'_'.join(columns)} "
+            f"ON `{table}` ({', '.join(f'`{column}`' for column in columns)})"
+        )
+
+        if statement not in advice.suggested_indexes:
+            advice.suggested_indexes.append(statement)
+
+    return advice
+
+
+# -----------------------------------------------------------------------------
+def format_index_report(advices: Sequence[IndexAdvice]) -> str:
+    """Format the advices as a plain text report.
+
+    Args:
+        advices (Sequence[IndexAdvice]): The advices, in the order of the report.
+
+    Returns:
+        str: The report, one block per fingerprint.
+    """
+    if not advices:
+        return "No full scans, filesorts or temporary tables found."
+
+    blocks: List[str] = []
+
+    for rank, advice in enumerate(advices, start=1):
+        problems: List[str] = [
+            f"full scan of `{access.table_name}` "
+            f"({access.access_type}, ~{access.rows_examined} rows)"
+            for access in advice.full_scans
+        ]
+
+        if advice.using_filesort:
+            problems.append("filesort")
+
+        if advice.using_temporary_table:
+            problems.append("temporary table")
+
+        lines: List[str] = [
+            f"{rank}. {advice.total_time:.3f} s total, {advice.calls} calls: "
+            f"{advice.fingerprint}",
+            f"   problems: {', '.join(problems)}",
+        ]
+        lines.extend(
+            f"   suggest: {statement};" for statement in advice.suggested_indexes
+        )
+        blocks.append("\n".join(lines))
+
+    return "\n".join(blocks)
+
+
+# -----------------------------------------------------------------------------
+def _walk_plan(
+    node: Any, accesses: List[TableAccess], flags: Dict[str, bool]
+) -> None:
+    if isinstance(node, list):
+        for item in node:
+            _walk_plan(node=item, accesses=accesses, flags=flags)
+
+        return
+
+    if not isinstance(node, dict):
+        return
+
+    for flag in flags:
+        if node.get(flag) is True:
+            flags[flag] = True
+
+    if "table_name" in node and "access_type" in node:
+        accesses.append(
+            TableAccess(
+                table_name=node["table_name"],
+                access_type=node["access_type"],
+                key=node.get("key"),
+                rows_examined=int(node.get("rows_examined_per_scan", 0)),
+                attached_condition=node.get("attached_condition", ""),
+            )
+        )
+
+    for value in node.values():
+        if isinstance(value, (dict, list)):
+            _walk_plan(node=value, accesses=accesses, flags=flags)
+
+
+# -----------------------------------------------------------------------------
+def _get_table_aliases(query: str) -> Dict[str, str]:
+    aliases: Dict[str, str] = {}
+
+    for match in _TABLE_ALIAS_PATTERN.finditer(query):
+        table: str = match.group("table")
+        alias: Optional[str] = match.group("alias")
+
+        if alias is not None and alias.lower() not in _NOT_ALIASES:
+            aliases[alias] = table
+
+    return aliases
+
+
+# -----------------------------------------------------------------------------
+def _get_sort_columns(query: str, table_name: str, is_only_table: bool) -> List[str]:
+    columns: List[str] = []
+
+    for pattern in (_GROUP_BY_PATTERN, _ORDER_BY_PATTERN):
+        match = pattern.search(query)
+
+        if match is None:
+            continue
+
+        for item in match.group(1).split(","):
+            column_match = _SORT_COLUMN_PATTERN.fullmatch(item.strip())
+
+            # Neither an expression nor the columns after it can use a plain index.
+            if column_match is None:
+                break
+
+            table: Optional[str] = column_match.group("table")
+
+            if (table is None and not is_only_table) or table not in (
+                None,
+                table_name,
+            ):
+                break
+
+            if column_match.group("column") not in columns:
+                columns.append(column_match.group("column"))
+
+    return columns
+
+
+# -----------------------------------------------------------------------------
+def _suggest_columns(
+    access: TableAccess, query: str, is_only_table: bool, needs_sorting: bool
+) -> List[str]:
+    equality_columns: List[str] = []
+    range_columns: List[str] = []
+
+    for match in _CONDITION_COLUMN_PATTERN.finditer(access.attached_condition):
+        if match.group("table") != access.table_name:
+            continue
+
+        column: str = match.group("column")
+        operator: str = match.group("operator").lower()
+
+        if operator in _EQUALITY_OPERATORS and column not in equality_columns:
+            equality_columns.append(column)
+
+        elif operator in _RANGE_OPERATORS and column not in range_columns:
+            range_columns.append(column)
+
+    for match in _CONDITION_JOINED_COLUMN_PATTERN.finditer(access.attached_condition):
+        if (
+            match.group("table") == access.table_name
+            and match.group("column") not in equality_columns
+        ):
+            equality_columns.append(match.group("column"))
+
+    columns: List[str] = list(equality_columns)
+
+    if needs_sorting:
+        columns.extend(
+            column
+            for column in _get_sort_columns(
+                query=query, table_name=access.table_name, is_only_table=is_only_table
+            )
+            if column not in columns
+        )
+
+    columns.extend(column for column in range_columns[:1] if column not in columns)
+
+    return columns
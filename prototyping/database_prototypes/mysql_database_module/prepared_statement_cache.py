@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `prepared_statement_cache` module provides a bounded LRU cache,
+of server-side prepared statements of a single connection to the database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "PreparedStatementCache",
+    "PreparedStatementStatistics",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any
+from mysql.connector.errors import Error as MySQLError
+
+
+# _____________________________________________________________________________
+@dataclass
+class PreparedStatementStatistics:
+    """PreparedStatementStatistics data class with the statement cache counters.
+
+    Attributes:
+        hits (int): The number of queries executed with an already prepared statement.
+        misses (int): The number of queries that had to be prepared.
+        evictions (int): The number of statements deallocated to free space in a cache.
+    """
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    # -------------------------------------------------------------------------
+    @property
+    def hit_ratio(self) -> float:
+        """hit_ratio returns the share of queries served by a prepared statement."""
+        lookups: int = self.hits + self.misses
+
+        if lookups == 0:
+            return 0.0
+
+        return self.hits / lookups
+
+
+# _____________________________________________________________________________
+class PreparedStatementCache:
+    """PreparedStatementCache class of the prepared statements of one connection.
+
+    This class keeps up to `max_size` prepared cursors of a connection,
+    one per distinct query text, so a repeated query skips the parse step on the server.
+    The least recently used statement is deallocated when the cache is full.
+
+    *A prepared statement lives in the server session of its connection,
+    so the cache must be closed before the session is reset.
+
+    Attributes:
+        __connection (Any): The connection owning the prepared statements.
+        __cursors (OrderedDict[str, Any]): The prepared cursors by query text.
+        max_size (int): The maximum number of prepared statements.
+        statistics (PreparedStatementStatistics): The counters shared with the other caches.
+    """
+
+    __connection: Any
+    __cursors: "OrderedDict[str, Any]"
+    max_size: int
+    statistics: PreparedStatementStatistics
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        connection: Any,
+        max_size: int,
+        statistics: PreparedStatementStatistics,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connection (Any): The connection owning the prepared statements.
+            max_size (int): The maximum number of prepared statements.
+            statistics (PreparedStatementStatistics): The counters to account the lookups in.
+        """
+        self.__connection = connection
+        self.__cursors = OrderedDict()
+        self.max_size = max_size
+        self.statistics = statistics
+
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self.__cursors)
+
+    # -------------------------------------------------------------------------
+    async def get_cursor(self, query: str) -> Any:
+        """get_cursor returns the prepared cursor for the query.
+
+        This method returns the cached cursor of the query,
+        or creates a new prepared cursor, deallocating the least recently used one if needed.
+
+        Args:
+            query (str): The query text with placeholders.
+
+        Returns:
+            Any: The prepared cursor of the connection.
+        """
+        cursor: Any = self.__cursors.get(query)
+
+        if cursor is not None:
+            self.__cursors.move_to_end(query)
+            self.statistics.hits += 1
+
+            return cursor
+
+        self.statistics.misses += 1
+
+        while len(self.__cursors) >= self.max_size:
+            _, evicted_cursor = self.__cursors.popitem(last=False)
+            self.statistics.evictions += 1
+
+            await self.__close_cursor(cursor=evicted_cursor)
+
+        cursor = await self.__connection.cursor(prepared=True)
+        self.__cursors[query] = cursor
+
+        return cursor
+
+    # -------------------------------------------------------------------------
+    async def discard(self, query: str) -> None:
+        """discard deallocates the prepared statement of the query, if cached.
+
+        Args:
+            query (str): The query text with placeholders.
+        """
+        cursor: Any = self.__cursors.pop(query, None)
+
+        if cursor is not None:
+            await self.__close_cursor(cursor=cursor)
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close deallocates all prepared statements of the cache."""
+        while self.__cursors:
+            _, cursor = self.__cursors.popitem(last=False)
+
+            await self.__close_cursor(cursor=cursor)
+
+    # -------------------------------------------------------------------------
+    @staticmethod
+    async def __close_cursor(cursor: Any) -> None:
+        try:
+            await cursor.close()
+
+        except MySQLError:
+            # The statement dies with the session anyway.
+            pass
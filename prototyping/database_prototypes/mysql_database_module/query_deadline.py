@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `query_deadline` module provides the deadlines of the queries,
+and the interruption of the queries running on the server, DBMS-MySQL.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "QueryDeadline",
+    "QueryDeadlineStatistics",
+    "QueryKiller",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import asyncio
+import logging
+import time
+
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional
+from mysql.connector import errorcode
+from mysql.connector.errors import Error as MySQLError
+
+from .types import AsyncMySQLConnectionType
+from .error_classification import is_connection_lost
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+# _____________________________________________________________________________
+@dataclass
+class QueryDeadlineStatistics:
+    """QueryDeadlineStatistics data class with the query interruption counters.
+
+    Attributes:
+        timeouts (int): The number of queries stopped by their deadline.
+        cancellations (int): The number of queries stopped by the cancellation of their task.
+        kills (int): The number of `KILL QUERY` statements sent to the server.
+        kill_failures (int): The number of queries that could not be killed.
+        discarded_connections (int): The number of connections left unusable by an interrupted query.
+    """
+
+    timeouts: int = 0
+    cancellations: int = 0
+    kills: int = 0
+    kill_failures: int = 0
+    discarded_connections: int = 0
+
+
+# _____________________________________________________________________________
+@dataclass(frozen=True)
+class QueryDeadline:
+    """QueryDeadline data class of the limits of the queries of a connection scope.
+
+    Attributes:
+        expires_at (Optional[float]): The `time.monotonic` value the queries must finish by;
+                                      None if the queries are not limited in time.
+        query_killer (Optional[QueryKiller]): Kills the queries on the server of the connection;
+                                              None if the queries can not be killed.
+    """
+
+    expires_at: Optional[float]
+    query_killer: Optional["QueryKiller"]
+
+    # -------------------------------------------------------------------------
+    def get_remaining_time(self) -> Optional[float]:
+        """get_remaining_time returns the seconds left until the deadline.
+
+        Returns:
+            Optional[float]: The seconds left, negative once expired; None if there is no deadline.
+        """
+        if self.expires_at is None:
+            return None
+
+        return self.expires_at - time.monotonic()
+
+
+# _____________________________________________________________________________
+class QueryKiller:
+    """QueryKiller class of the interruption of queries over a side connection.
+
+    This class sends `KILL QUERY` for the thread of a connection running a query,
+    over a connection of its own to the same server,
+    as the connection running the query is busy until the query ends.
+
+    *The server stops the statement with `ER_QUERY_INTERRUPTED`,
+    the transaction and the connection of the killed query are kept.
+
+    *The side connection is opened on the first kill and kept open.
+    A side connection lost meanwhile is reopened once.
+
+    Attributes:
+        __connect_method (Callable[[], Awaitable[AsyncMySQLConnectionType]]): Opens the side connection.
+        __connection (Optional[AsyncMySQLConnectionType]): The side connection.
+        __lock (asyncio.Lock): Serializes the use of the side connection.
+    """
+
+    __connect_method: Callable[[], Awaitable[AsyncMySQLConnectionType]]
+    __connection: Optional[AsyncMySQLConnectionType]
+    __lock: asyncio.Lock
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, connect_method: Callable[[], Awaitable[AsyncMySQLConnectionType]]
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connect_method (Callable[[], Awaitable[AsyncMySQLConnectionType]]): Opens the side connection,
+                                                                                 e.g. the connect method bound to the connection data.
+        """
+        self.__connect_method = connect_method
+        self.__connection = None
+        self.__lock = asyncio.Lock()
+
+    # -------------------------------------------------------------------------
+    async def kill_query(self, connection_id: int) -> bool:
+        """kill_query stops the query running on the connection with the thread id.
+
+        Args:
+            connection_id (int): The server thread id of the connection running the query.
+
+        Returns:
+            bool: True if the server accepted the kill, or the thread is already gone; otherwise False.
+        """
+        async with self.__lock:
+            for attempt in (1, 2):
+                try:
+                    connection: AsyncMySQLConnectionType = (
+                        await self.__get_connection()
+                    )
+
+                    async with await connection.cursor() as cursor:
+                        await cursor.execute(f"KILL QUERY {int(connection_id)}")
+
+                    return True
+
+                except MySQLError as error:
+                    if error.errno == errorcode.ER_NO_SUCH_THREAD:
+                        return True
+
+                    await self.__drop_connection()
+
+                    if attempt == 1 and is_connection_lost(error):
+                        continue
+
+                    logger.error(
+                        msg=f"Failed to kill the query of {connection_id}! {error}"
+                    )
+
+                    return False
+
+        return False
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close closes the side connection."""
+        async with self.__lock:
+            await self.__drop_connection()
+
+    # -------------------------------------------------------------------------
+    async def __get_connection(self) -> AsyncMySQLConnectionType:
+        if self.__connection is None:
+            self.__connection = await self.__connect_method()
+
+        return self.__connection
+
+    # -------------------------------------------------------------------------
+    async def __drop_connection(self) -> None:
+        connection: Optional[Any] = self.__connection
+
+        if connection is None:
+            return
+
+        self.__connection = None
+
+        try:
+            await connection.close()
+
+        except MySQLError:
+            pass
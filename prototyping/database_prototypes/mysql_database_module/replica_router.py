@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `replica_router` module provides a class routing the queries,
+between the primary connection pool and the replica connection pools.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["ReplicaRouter"]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import time
+
+from typing import Any, Dict, Hashable, List, Optional, Sequence
+
+
+# _____________________________________________________________________________
+class ReplicaRouter:
+    """ReplicaRouter class of read/write splitting between connection pools.
+
+    This class sends the writes to the primary pool,
+    and balances the reads between the replica pools by the least number of in-flight queries.
+
+    *Read-your-writes: after a write made with a sticky key (e.g. a chat id),
+    the reads with the same key go to the primary pool for `sticky_window` seconds,
+    so they do not observe a replica lagging behind the write.
+
+    Attributes:
+        primary_pool (Any): The connection pool of the primary server.
+        replica_pools (List[Any]): The connection pools of the replica servers.
+        sticky_window (float): Seconds the reads of a key stay on the primary after its write.
+        __in_flight (Dict[int, int]): The number of in-flight queries by pool identity.
+        __last_writes (Dict[Hashable, float]): The time of the last write by sticky key.
+        __prune_at (int): The number of tracked keys that triggers forgetting the expired ones.
+    """
+
+    primary_pool: Any
+    replica_pools: List[Any]
+    sticky_window: float
+    __in_flight: Dict[int, int]
+    __last_writes: Dict[Hashable, float]
+    __prune_at: int
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        primary_pool: Any,
+        replica_pools: Sequence[Any] = (),
+        sticky_window: float = 5.0,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            primary_pool (Any): The connection pool of the primary server.
+            replica_pools (Sequence[Any], optional): The connection pools of the replica servers.
+                                                     The default is an empty tuple, all queries go to the primary.
+            sticky_window (float, optional): Seconds the reads of a key stay on the primary after its write.
+                                             The default is 5.0.
+        """
+        self.primary_pool = primary_pool
+        self.replica_pools = list(replica_pools)
+        self.sticky_window = sticky_window
+        self.__in_flight = {id(pool): 0 for pool in self.pools}
+        self.__last_writes = {}
+        self.__prune_at = 1024
+
+    # -------------------------------------------------------------------------
+    @property
+    def pools(self) -> List[Any]:
+        """pools returns the primary pool followed by the replica pools."""
+        return [self.primary_pool, *self.replica_pools]
+
+    # -------------------------------------------------------------------------
+    def get_in_flight(self, pool: Any) -> int:
+        """get_in_flight returns the number of in-flight queries of the pool.
+
+        Args:
+            pool (Any): One of the routed pools.
+
+        Returns:
+            int: The number of connections of the pool checked out by the router.
+        """
+        return self.__in_flight.get(id(pool), 0)
+
+    # -------------------------------------------------------------------------
+    def choose_pool(
+        self, read_only: bool, sticky_key: Optional[Hashable] = None
+    ) -> Any:
+        """choose_pool returns the pool for the next query.
+
+        Args:
+            read_only (bool): Whether the query only reads data.
+            sticky_key (Optional[Hashable], optional): The key of the read-your-writes stickiness.
+                                                       The default is None.
+
+        Returns:
+            Any: The pool to take the connection from.
+        """
+        if not read_only or not self.replica_pools:
+            return self.primary_pool
+
+        if self.is_sticky(sticky_key=sticky_key):
+            return self.primary_pool
+
+        return min(self.replica_pools, key=self.get_in_flight)
+
+    # -------------------------------------------------------------------------
+    def mark_acquired(self, pool: Any) -> None:
+        """mark_acquired accounts a connection checked out from the pool.
+
+        Args:
+            pool (Any): The pool the connection was taken from.
+        """
+        self.__in_flight[id(pool)] = self.get_in_flight(pool) + 1
+
+    # -------------------------------------------------------------------------
+    def mark_released(self, pool: Any) -> None:
+        """mark_released accounts a connection returned to the pool.
+
+        Args:
+            pool (Any): The pool the connection was returned to.
+        """
+        self.__in_flight[id(pool)] = max(self.get_in_flight(pool) - 1, 0)
+
+    # -------------------------------------------------------------------------
+    def mark_write(self, sticky_key: Optional[Hashable]) -> None:
+        """mark_write starts the read-your-writes window of the key.
+
+        Args:
+            sticky_key (Optional[Hashable]): The key of the write; None is ignored.
+        """
+        if sticky_key is None or not self.replica_pools:
+            return
+
+        now: float = time.monotonic()
+
+        self.__last_writes[sticky_key] = now
+
+        if len(self.__last_writes) >= self.__prune_at:
+            self.__forget_expired(now=now)
+
+    # -------------------------------------------------------------------------
+    def is_sticky(self, sticky_key: Optional[Hashable]) -> bool:
+        """is_sticky checks whether the reads of the key are kept on the primary.
+
+        Args:
+            sticky_key (Optional[Hashable]): The key of the read-your-writes stickiness.
+
+        Returns:
+            bool: True if a write of the key was made within the sticky window; otherwise False.
+        """
+        if sticky_key is None:
+            return False
+
+        last_write: Optional[float] = self.__last_writes.get(sticky_key)
+
+        if last_write is None:
+            return False
+
+        if time.monotonic() - last_write > self.sticky_window:
+            del self.__last_writes[sticky_key]
+
+            return False
+
+        return True
+
+    # -------------------------------------------------------------------------
+    def __forget_expired(self, now: float) -> None:
+        self.__last_writes = {
+            key: last_write
+            for key, last_write in self.__last_writes.items()
+            if now - last_write <= self.sticky_window
+        }
+        self.__prune_at = max(1024, 2 * len(self.__last_writes))
@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `transaction` module provides a class representing an explicit transaction,
+on a connection to the database, DBMS-MySQL.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "AsyncMySQLTransaction",
+    "IsolationLevel",
+    "execute_statement",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+from enum import Enum
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from mysql.connector.types import RowType
+
+from .bulk_write import quote_identifier
+
+
+# Annotation for the function executing a prepared query on a connection.
+ExecutePreparedQueryType = Callable[
+    [Any, str, Sequence[Any]], Awaitable[Tuple[int, List[RowType]]]
+]
+
+# Annotation for the function streaming a query result from a connection.
+StreamQueryType = Callable[
+    [Any, str, Sequence[Any], int], AsyncIterator[List[RowType]]
+]
+
+# Annotation for the function executing a statement without parameters on a connection.
+ExecuteStatementType = Callable[[Any, str], Awaitable[None]]
+
+
+# _____________________________________________________________________________
+class IsolationLevel(str, Enum):
+    """IsolationLevel enumeration of the InnoDB transaction isolation levels."""
+
+    READ_UNCOMMITTED = "READ UNCOMMITTED"
+    READ_COMMITTED = "READ COMMITTED"
+    REPEATABLE_READ = "REPEATABLE READ"
+    SERIALIZABLE = "SERIALIZABLE"
+
+
+# -----------------------------------------------------------------------------
+async def execute_statement(connection: Any, statement: str) -> None:
+    """Execute a statement without parameters and results on the connection.
+
+    Args:
+        connection (Any): The asynchronous connection to the database.
+        statement (str): The statement text.
+    """
+    async with await connection.cursor() as cursor:
+        await cursor.execute(statement)
+
+
+# _____________________________________________________________________________
+class AsyncMySQLTransaction:
+    """AsyncMySQLTransaction class of an explicit transaction scope.
+
+    This class runs the queries of a transaction on the connection reserved for it.
+    None of the queries is committed separately,
+    the whole transaction is committed when its scope is left without an error.
+
+    *Instances are created by `AsyncMySQLAPI.transaction`.
+
+    Attributes:
+        __connection (Any): The connection reserved for the transaction.
+        __execute_prepared_query (ExecutePreparedQueryType): Executes a prepared query on the connection.
+        __stream_query (StreamQueryType): Streams a query result from the connection.
+        __execute_statement (ExecuteStatementType): Executes the transaction control statements on the connection.
+        __savepoint_counter (int): The counter used to name the savepoints.
+        isolation (Optional[IsolationLevel]): The isolation level of the transaction.
+        read_only (bool): Whether the transaction is read-only.
+    """
+
+    __connection: Any
+    __execute_prepared_query: ExecutePreparedQueryType
+    __stream_query: StreamQueryType
+    __execute_statement: ExecuteStatementType
+    __savepoint_counter: int
+    isolation: Optional[IsolationLevel]
+    read_only: bool
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        connection: Any,
+        execute_prepared_query: ExecutePreparedQueryType,
+        stream_query: StreamQueryType,
+        isolation: Optional[IsolationLevel] = None,
+        read_only: bool = False,
+        execute_statement: ExecuteStatementType = execute_statement,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connection (Any): The connection reserved for the transaction.
+            execute_prepared_query (ExecutePreparedQueryType): Executes a prepared query on the connection.
+            stream_query (StreamQueryType): Streams a query result from the connection.
+            isolation (Optional[IsolationLevel], optional): The isolation level of the transaction.
+                                                            The default is None, the session level is used.
+            read_only (bool, optional): Whether the transaction is read-only.
+                                        The default is False.
+            execute_statement (ExecuteStatementType, optional): Executes the transaction control statements,
+                                                                e.g. under the deadline of the transaction.
+                                                                The default is `execute_statement`.
+        """
+        self.__connection = connection
+        self.__execute_prepared_query = execute_prepared_query
+        self.__stream_query = stream_query
+        self.__execute_statement = execute_statement
+        self.__savepoint_counter = 0
+        self.isolation = isolation
+        self.read_only = read_only
+
+    # -------------------------------------------------------------------------
+    @property
+    def connection(self) -> Any:
+        """connection returns the connection reserved for the transaction."""
+        return self.__connection
+
+    # -------------------------------------------------------------------------
+    async def begin(self) -> None:
+        """begin starts the transaction with its isolation level and access mode."""
+        if self.isolation is not None:
+            await self.__execute_statement(
+                self.__connection,
+                f"SET TRANSACTION ISOLATION LEVEL {self.isolation.value}",
+            )
+
+        access_mode: str = " READ ONLY" if self.read_only else ""
+
+        await self.__execute_statement(
+            self.__connection, f"START TRANSACTION{access_mode}"
+        )
+
+    # -------------------------------------------------------------------------
+    async def execute(self, query: str, parameters: Sequence[Any] = ()) -> int:
+        """execute executes a query within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            int: The number of rows affected by the query.
+        """
+        affected_rows, _ = await self.__execute_prepared_query(
+            self.__connection, query, parameters
+        )
+
+        return affected_rows
+
+    # -------------------------------------------------------------------------
+    async def fetch_one(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> Optional[RowType]:
+        """fetch_one returns the first row of a query result within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Optional[RowType]: The first row of the result; None if the result is empty.
+        """
+        rows: List[RowType] = await self.fetch_all(
+            query=query, parameters=parameters
+        )
+
+        return rows[0] if rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetch_all(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> List[RowType]:
+        """fetch_all returns all rows of a query result within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            List[RowType]: The rows of the result.
+        """
+        _, rows = await self.__execute_prepared_query(
+            self.__connection, query, parameters
+        )
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    def stream(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[List[RowType]]:
+        """stream yields a query result in chunks of rows within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Returns:
+            AsyncIterator[List[RowType]]: The chunks of rows of the result.
+        """
+        return self.__stream_query(
+            self.__connection, query, parameters, chunk_size
+        )
+
+    # -------------------------------------------------------------------------
+    async def create_savepoint(self, name: Optional[str] = None) -> str:
+        """create_savepoint marks a savepoint within the transaction.
+
+        Args:
+            name (Optional[str], optional): The name of the savepoint.
+                                            The default is None, a name is generated.
+
+        Returns:
+            str: The name of the savepoint.
+        """
+        if name is None:
+            self.__savepoint_counter += 1
+            name = f"savepoint_{self.__savepoint_counter}"
+
+        await self.__execute_statement(
+            self.__connection, f"SAVEPOINT {quote_identifier(name)}"
+        )
+
+        return name
+
+    # -------------------------------------------------------------------------
+    async def rollback_to_savepoint(self, name: str) -> None:
+        """rollback_to_savepoint undoes the changes made after the savepoint.
+
+        Args:
+            name (str): The name of the savepoint.
+        """
+        await self.__execute_statement(
+            self.__connection, f"ROLLBACK TO SAVEPOINT {quote_identifier(name)}"
+        )
+
+    # -------------------------------------------------------------------------
+    async def release_savepoint(self, name: str) -> None:
+        """release_savepoint removes the savepoint, keeping the changes made after it.
+
+        Args:
+            name (str): The name of the savepoint.
+        """
+        await self.__execute_statement(
+            self.__connection, f"RELEASE SAVEPOINT {quote_identifier(name)}"
+        )
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def savepoint(self, name: Optional[str] = None) -> AsyncIterator[str]:
+        """savepoint runs a nested scope of the transaction.
+
+        The changes of the scope are rolled back to the savepoint if the scope fails,
+        and the error is propagated; the rest of the transaction is kept.
+
+        Args:
+            name (Optional[str], optional): The name of the savepoint.
+                                            The default is None, a name is generated.
+
+        Yields:
+            str: The name of the savepoint.
+        """
+        savepoint_name: str = await self.create_savepoint(name=name)
+
+        try:
+            yield savepoint_name
+
+        except BaseException:
+            await self.rollback_to_savepoint(name=savepoint_name)
+            raise
+
+        await self.release_savepoint(name=savepoint_name)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `transaction_retry` module provides the retries of the transactions,
+that lost a lock conflict on the server, DBMS-MySQL.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "TransactionRetryPolicy",
+    "TransactionRetryStatistics",
+    "run_with_retries",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import asyncio
+import logging
+import random
+
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from mysql.connector import errorcode
+from mysql.connector.errors import Error as MySQLError
+
+from .error_classification import is_transaction_retryable
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+# _____________________________________________________________________________
+@dataclass(frozen=True)
+class TransactionRetryPolicy:
+    """TransactionRetryPolicy data class of the retries of a transaction.
+
+    The delay before the n-th retry is drawn uniformly,
+    between zero and `base_delay * multiplier ** (n - 1)`, capped at `max_delay`,
+    so the transactions of a conflict do not collide again at the same moment.
+
+    Attributes:
+        max_attempts (int): The number of times a transaction is run at most, the first run included.
+        base_delay (float): The upper bound of the delay before the first retry, in seconds.
+        max_delay (float): The cap of the upper bound of the delays, in seconds.
+        multiplier (float): The growth of the upper bound of the delays, per retry.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.05
+    max_delay: float = 1.0
+    multiplier: float = 2.0
+
+    # -------------------------------------------------------------------------
+    def __post_init__(self) -> None:
+        if self.max_attempts < 1:
+            raise ValueError("Transaction retry policy needs at least one attempt!")
+
+    # -------------------------------------------------------------------------
+    def get_delay(self, attempt: int) -> float:
+        """get_delay returns the delay before the next run of a transaction.
+
+        Args:
+            attempt (int): The number of the failed run, starting from 1.
+
+        Returns:
+            float: The delay, in seconds.
+        """
+        upper_bound: float = min(
+            self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)
+        )
+
+        return random.uniform(0.0, upper_bound)
+
+
+# _____________________________________________________________________________
+@dataclass
+class TransactionRetryStatistics:
+    """TransactionRetryStatistics data class with the transaction retry counters.
+
+    Attributes:
+        deadlocks (int): The number of runs failed with a deadlock.
+        lock_wait_timeouts (int): The number of runs failed with a lock wait timeout.
+        retries (int): The number of runs repeated after a lock conflict.
+        recoveries (int): The number of transactions succeeded after at least one retry.
+        give_ups (int): The number of transactions failed after using up their attempts.
+        total_backoff_time (float): The total delay before the retries, in seconds.
+    """
+
+    deadlocks: int = 0
+    lock_wait_timeouts: int = 0
+    retries: int = 0
+    recoveries: int = 0
+    give_ups: int = 0
+    total_backoff_time: float = 0.0
+
+
+# -----------------------------------------------------------------------------
+async def run_with_retries[ResultType](
+    function: Callable[[], Awaitable[ResultType]],
+    policy: TransactionRetryPolicy,
+    statistics: TransactionRetryStatistics,
+) -> ResultType:
+    """Run a transaction, running it again while it loses lock conflicts.
+
+    *Only deadlocks and lock wait timeouts are retried, any other error is raised at once.
+    The function must roll back its transaction on an error, as the connection scopes do,
+    and should have no effects outside of the database, as they are repeated too.
+
+    Args:
+        function (Callable[[], Awaitable[ResultType]]): Runs the whole transaction.
+        policy (TransactionRetryPolicy): The attempt budget and the delays of the retries.
+        statistics (TransactionRetryStatistics): The counters to update.
+
+    Returns:
+        ResultType: The result of the first successful run.
+
+    Raises:
+        MySQLError: If the transaction fails with an error that is not retried,
+                    or still loses a lock conflict on its last attempt.
+    """
+    attempt: int = 1
+
+    while True:
+        try:
+            result: ResultType = await function()
+
+        except MySQLError as error:
+            if not is_transaction_retryable(error):
+                raise
+
+            if error.errno == errorcode.ER_LOCK_DEADLOCK:
+                statistics.deadlocks += 1
+            else:
+                statistics.lock_wait_timeouts += 1
+
+            if attempt >= policy.max_attempts:
+                statistics.give_ups += 1
+                logger.error(
+                    msg=f"Transaction failed after {attempt} attempts! {error}"
+                )
+
+                raise
+
+            delay: float = policy.get_delay(attempt=attempt)
+            statistics.retries += 1
+            statistics.total_backoff_time += delay
+            logger.warning(
+                msg=(
+                    f"Transaction lost a lock conflict, "
+                    f"retrying in {delay:.3f} s! {error}"
+                )
+            )
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+            continue
+
+        if attempt > 1:
+            statistics.recoveries += 1
+
+        return result
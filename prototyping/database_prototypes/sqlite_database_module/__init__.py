@@ -0,0 +1,16 @@
+__all__: list[str] = [
+    "AsyncSQLiteAPI",
+    "AsyncSQLiteDataBase",
+    "AsyncSQLiteConnection",
+    "AsyncSQLiteConnectionPool",
+    "AsyncSQLiteTransaction",
+    "InjectedLatency",
+    "connect_sqlite",
+]
+
+from .async_sqlite_database import AsyncSQLiteDataBase
+from .async_sqlite_database_api import AsyncSQLiteAPI
+from .async_sqlite_connection import AsyncSQLiteConnection, connect_sqlite
+from .async_sqlite_connection_pool import AsyncSQLiteConnectionPool
+from .transaction import AsyncSQLiteTransaction
+from .injected_latency import InjectedLatency
@@ -0,0 +1,385 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `async_sqlite_connection` module provides an asynchronous connection,
+to an embedded SQLite database, with injected round-trip latency.
+
+The blocking work of each connection runs on a worker thread of its own,
+so that the event loop is never blocked by the database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = [
+    "AsyncSQLiteConnection",
+    "connect_sqlite",
+    "convert_placeholders",
+]
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+from ..database_module.row_mapping import ResultRows
+
+import asyncio
+import sqlite3
+
+from functools import lru_cache
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from concurrent.futures import ThreadPoolExecutor
+
+from .injected_latency import InjectedLatency
+
+
+# -----------------------------------------------------------------------------
+@lru_cache(maxsize=256)
+def convert_placeholders(query: str) -> str:
+    """Convert the `%s` placeholders of a query into the SQLite `?` ones.
+
+    *Placeholders within quoted literals and identifiers are kept,
+    so the queries written for the MySQL API run unchanged.
+
+    Args:
+        query (str): The query text with `%s` placeholders.
+
+    Returns:
+        str: The query text with `?` placeholders.
+    """
+    parts: List[str] = []
+    quote: Optional[str] = None
+    index: int = 0
+
+    while index < len(query):
+        character: str = query[index]
+
+        if quote is not None:
+            if character == quote:
+                quote = None
+
+        elif character in "'\"`":
+            quote = character
+
+        elif query.startswith("%s", index):
+            parts.append("?")
+            index += 2
+
+            continue
+
+        parts.append(character)
+        index += 1
+
+    return "".join(parts)
+
+
+# _____________________________________________________________________________
+class AsyncSQLiteConnection:
+    """AsyncSQLiteConnection class of an asynchronous SQLite connection.
+
+    This class runs the calls of a `sqlite3` connection on a single worker thread,
+    and sleeps for the injected latency before every round-trip:
+    an execution, a fetched chunk of a stream, a commit and a rollback.
+
+    *Changes are committed only by `commit`;
+    a write opens the transaction implicitly, `begin` opens it explicitly.
+
+    Attributes:
+        database (str): The path or the URI of the database.
+        latency (InjectedLatency): The delay added to every round-trip.
+        __connect_arguments (Dict[str, Any]): The extra arguments of `sqlite3.connect`.
+        __connection (Optional[sqlite3.Connection]): The open connection.
+        __executor (ThreadPoolExecutor): The worker thread of the connection.
+    """
+
+    database: str
+    latency: InjectedLatency
+    __connect_arguments: Dict[str, Any]
+    __connection: Optional[sqlite3.Connection]
+    __executor: ThreadPoolExecutor
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        database: str,
+        latency: Optional[InjectedLatency] = None,
+        **connect_arguments: Any,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            database (str): The path or the URI of the database.
+            latency (Optional[InjectedLatency], optional): The delay added to every round-trip.
+                                                           The default is None, no delay is added.
+            **connect_arguments (Any): The extra arguments of `sqlite3.connect`, e.g. `timeout`.
+        """
+        self.database = database
+        self.latency = latency or InjectedLatency()
+        self.__connect_arguments = connect_arguments
+        self.__connection = None
+        self.__executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="sqlite_connection"
+        )
+
+    # -------------------------------------------------------------------------
+    @property
+    def in_transaction(self) -> bool:
+        """in_transaction returns whether a transaction is open."""
+        return self.__connection is not None and self.__connection.in_transaction
+
+    # -------------------------------------------------------------------------
+    async def open(self) -> None:
+        """open connects to the database.
+
+        Raises:
+            sqlite3.Error: If the database can not be opened.
+        """
+        await self.latency.wait()
+
+        self.__connection = await self.__run(
+            lambda: sqlite3.connect(
+                self.database, check_same_thread=False, **self.__connect_arguments
+            )
+        )
+
+    # -------------------------------------------------------------------------
+    async def is_connected(self) -> bool:
+        """is_connected checks whether the connection is open.
+
+        Returns:
+            bool: True if the connection is open; otherwise False.
+        """
+        return self.__connection is not None
+
+    # -------------------------------------------------------------------------
+    async def execute(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> Tuple[int, ResultRows]:
+        """execute executes a query and reads its whole result.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Tuple[int, ResultRows]: The number of affected rows, -1 for a read, and the rows with their column names.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        connection: sqlite3.Connection = self.__get_connection()
+
+        def execute() -> Tuple[int, ResultRows]:
+            cursor: sqlite3.Cursor = connection.execute(
+                convert_placeholders(query), tuple(parameters)
+            )
+
+            try:
+                return cursor.rowcount, ResultRows(
+                    cursor.fetchall(), column_names=_get_column_names(cursor)
+                )
+
+            finally:
+                cursor.close()
+
+        await self.latency.wait()
+
+        return await self.__run(execute)
+
+    # -------------------------------------------------------------------------
+    async def execute_many(
+        self, query: str, parameter_rows: Iterable[Sequence[Any]]
+    ) -> int:
+        """execute_many executes a query once per row of parameters, in one round-trip.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameter_rows (Iterable[Sequence[Any]]): The rows of values bound to the placeholders.
+
+        Returns:
+            int: The number of affected rows.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        connection: sqlite3.Connection = self.__get_connection()
+        rows: List[Sequence[Any]] = list(parameter_rows)
+
+        def execute_many() -> int:
+            cursor: sqlite3.Cursor = connection.executemany(
+                convert_placeholders(query), rows
+            )
+
+            try:
+                return cursor.rowcount
+
+            finally:
+                cursor.close()
+
+        await self.latency.wait()
+
+        return await self.__run(execute_many)
+
+    # -------------------------------------------------------------------------
+    async def stream(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[ResultRows]:
+        """stream yields the query result in chunks of rows.
+
+        *Every chunk is a round-trip of its own.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Yields:
+            ResultRows: The next chunk of rows of the result, with the column names.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        connection: sqlite3.Connection = self.__get_connection()
+
+        await self.latency.wait()
+
+        cursor: sqlite3.Cursor = await self.__run(
+            lambda: connection.execute(
+                convert_placeholders(query), tuple(parameters)
+            )
+        )
+        column_names: Tuple[str, ...] = _get_column_names(cursor)
+
+        try:
+            while True:
+                await self.latency.wait()
+
+                chunk: List[Tuple[Any, ...]] = await self.__run(
+                    lambda: cursor.fetchmany(chunk_size)
+                )
+
+                if not chunk:
+                    break
+
+                yield ResultRows(chunk, column_names=column_names)
+
+        finally:
+            await self.__run(cursor.close)
+
+    # -------------------------------------------------------------------------
+    async def begin(self) -> None:
+        """begin opens a transaction explicitly.
+
+        Raises:
+            sqlite3.Error: If a transaction is already open.
+        """
+        await self.execute(query="BEGIN")
+
+    # -------------------------------------------------------------------------
+    async def commit(self) -> None:
+        """commit commits the open transaction.
+
+        *Without an open transaction, there is no round-trip.
+        """
+        if not self.in_transaction:
+            return
+
+        await self.latency.wait()
+        await self.__run(self.__get_connection().commit)
+
+    # -------------------------------------------------------------------------
+    async def rollback(self) -> None:
+        """rollback rolls back the open transaction.
+
+        *Without an open transaction, there is no round-trip.
+        """
+        if not self.in_transaction:
+            return
+
+        await self.latency.wait()
+        await self.__run(self.__get_connection().rollback)
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close closes the connection and stops its worker thread.
+
+        *The uncommitted changes are discarded.
+        """
+        connection: Optional[sqlite3.Connection] = self.__connection
+
+        if connection is not None:
+            self.__connection = None
+            await self.__run(connection.close)
+
+        self.__executor.shutdown(wait=False)
+
+    # -------------------------------------------------------------------------
+    def __get_connection(self) -> sqlite3.Connection:
+        if self.__connection is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+
+        return self.__connection
+
+    # -------------------------------------------------------------------------
+    async def __run[ResultType](self, function: Callable[[], ResultType]) -> ResultType:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.__executor, function
+        )
+
+
+# -----------------------------------------------------------------------------
+def _get_column_names(cursor: sqlite3.Cursor) -> Tuple[str, ...]:
+    return tuple(column[0] for column in cursor.description or ())
+
+
+# -----------------------------------------------------------------------------
+async def connect_sqlite(
+    database: str,
+    latency: float = 0.0,
+    jitter: float = 0.0,
+    seed: Optional[int] = None,
+    **connect_arguments: Any,
+) -> AsyncSQLiteConnection:
+    """Open an asynchronous connection to a SQLite database.
+
+    *An in-memory database is private to its connection;
+    the connections of a pool share one through a URI,
+    e.g. `file:shop?mode=memory&cache=shared` with `uri=True`.
+
+    Args:
+        database (str): The path or the URI of the database.
+        latency (float, optional): The base delay of a round-trip, in seconds.
+                                   The default is 0.0.
+        jitter (float, optional): The maximum extra delay of a round-trip, in seconds.
+                                  The default is 0.0.
+        seed (Optional[int], optional): The seed of the jitter generator.
+                                        The default is None, the delays are not reproducible.
+        **connect_arguments (Any): The extra arguments of `sqlite3.connect`, e.g. `uri` or `timeout`.
+
+    Returns:
+        AsyncSQLiteConnection: The open connection.
+
+    Raises:
+        sqlite3.Error: If the database can not be opened.
+    """
+    connection = AsyncSQLiteConnection(
+        database=database,
+        latency=InjectedLatency(latency=latency, jitter=jitter, seed=seed),
+        **connect_arguments,
+    )
+
+    await connection.open()
+
+    return connection
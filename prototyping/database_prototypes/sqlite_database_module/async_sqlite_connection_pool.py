@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `async_sqlite_connection_pool` module provides a fixed-size asynchronous pool,
+of connections to an embedded SQLite database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["AsyncSQLiteConnectionPool"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from ..database_module.pool_statistics import ConnectionPoolStatistics
+
+import asyncio
+import sqlite3
+import time
+
+from collections import deque
+from typing import Any, Deque, Dict, Set
+
+from .async_sqlite_connection import AsyncSQLiteConnection
+from .types import AsyncSQLiteConnectMethodType
+
+
+# _____________________________________________________________________________
+class AsyncSQLiteConnectionPool:
+    """AsyncSQLiteConnectionPool class of a fixed-size asynchronous connection pool.
+
+    This class opens `pool_size` connections with the assigned connect method,
+    and hands them out to the tasks,
+    which wait for a returned connection up to `acquire_timeout` seconds.
+
+    *The pool keeps the load counters of the MySQL pools,
+    so the benchmarks of both backends are read the same way.
+
+    Attributes:
+        __connect_method (AsyncSQLiteConnectMethodType): The function used to open the connections.
+        __connection_data (Dict[str, Any]): The arguments of the connect method.
+        __idle (Deque[AsyncSQLiteConnection]): Connections waiting in the pool.
+        __in_use (Set[AsyncSQLiteConnection]): Connections currently checked out.
+        __condition (asyncio.Condition): Notifies the waiting tasks about returned connections.
+        __closed (bool): Whether the pool has been closed.
+        pool_name (str): The name identifier of the pool.
+        pool_size (int): The number of connections of the pool.
+        acquire_timeout (float): Seconds to wait for a free connection.
+        statistics (ConnectionPoolStatistics): The pool load counters.
+    """
+
+    __connect_method: AsyncSQLiteConnectMethodType
+    __connection_data: Dict[str, Any]
+    __idle: Deque[AsyncSQLiteConnection]
+    __in_use: Set[AsyncSQLiteConnection]
+    __condition: asyncio.Condition
+    __closed: bool
+    pool_name: str
+    pool_size: int
+    acquire_timeout: float
+    statistics: ConnectionPoolStatistics
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        connect_method: AsyncSQLiteConnectMethodType,
+        connection_data: Dict[str, Any],
+        pool_name: str = "sqlite_pool",
+        pool_size: int = 3,
+        acquire_timeout: float = 10.0,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connect_method (AsyncSQLiteConnectMethodType): The function used to open the connections.
+            connection_data (Dict[str, Any]): The arguments of the connect method.
+            pool_name (str, optional): The name identifier of the pool.
+                                       The default is “sqlite_pool”.
+            pool_size (int, optional): The number of connections of the pool.
+                                       The default is 3.
+            acquire_timeout (float, optional): Seconds to wait for a free connection.
+                                               The default is 10.0.
+
+        Raises:
+            ValueError: If the pool size is not positive.
+        """
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1!")
+
+        self.__connect_method = connect_method
+        self.__connection_data = connection_data
+        self.__idle = deque()
+        self.__in_use = set()
+        self.__condition = asyncio.Condition()
+        self.__closed = False
+        self.pool_name = pool_name
+        self.pool_size = pool_size
+        self.acquire_timeout = acquire_timeout
+        self.statistics = ConnectionPoolStatistics(size_limit=pool_size)
+
+    # -------------------------------------------------------------------------
+    async def open(self) -> None:
+        """open opens the connections of the pool.
+
+        Raises:
+            sqlite3.Error: If a connection can not be opened.
+        """
+        while len(self.__idle) + len(self.__in_use) < self.pool_size:
+            connection: AsyncSQLiteConnection = await self.__connect_method(
+                **self.__connection_data
+            )
+
+            self.__idle.append(connection)
+            self.statistics.created += 1
+
+        self.__update_counters()
+
+    # -------------------------------------------------------------------------
+    async def get_connection(self) -> AsyncSQLiteConnection:
+        """get_connection returns a connection from the pool.
+
+        This method hands out an idle connection,
+        or waits for a connection to be returned.
+
+        Returns:
+            AsyncSQLiteConnection: The asynchronous connection to the database.
+
+        Raises:
+            sqlite3.OperationalError: If the pool is closed or no connection was freed within `acquire_timeout`.
+        """
+        statistics: ConnectionPoolStatistics = self.statistics
+        started_at: float = time.perf_counter()
+
+        statistics.waiting += 1
+        statistics.max_waiting = max(statistics.max_waiting, statistics.waiting)
+
+        try:
+            async with self.__condition:
+                await asyncio.wait_for(
+                    self.__condition.wait_for(
+                        lambda: bool(self.__idle) or self.__closed
+                    ),
+                    timeout=self.acquire_timeout,
+                )
+
+                if self.__closed:
+                    raise sqlite3.OperationalError(
+                        "Failed getting connection; pool is closed"
+                    )
+
+                connection: AsyncSQLiteConnection = self.__idle.popleft()
+
+        except asyncio.TimeoutError:
+            statistics.timeouts += 1
+
+            raise sqlite3.OperationalError(
+                "Failed getting connection; pool exhausted"
+            ) from None
+
+        finally:
+            statistics.waiting -= 1
+
+        self.__in_use.add(connection)
+        statistics.record_wait(wait_time=time.perf_counter() - started_at)
+        self.__update_counters()
+
+        return connection
+
+    # -------------------------------------------------------------------------
+    async def release_connection(self, connection: AsyncSQLiteConnection) -> None:
+        """release_connection returns the connection back to the pool.
+
+        *An open transaction of the connection is rolled back,
+        and connections returned to a closed pool are closed.
+
+        Args:
+            connection (AsyncSQLiteConnection): The connection to return.
+        """
+        self.__in_use.discard(connection)
+
+        try:
+            await connection.rollback()
+
+        except sqlite3.Error:
+            pass
+
+        if self.__closed:
+            await connection.close()
+            self.statistics.discarded += 1
+
+        else:
+            self.__idle.append(connection)
+
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify()
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        """close closes the idle connections of the pool.
+
+        *Connections still in use are closed when they are returned.
+        """
+        self.__closed = True
+
+        while self.__idle:
+            await self.__idle.popleft().close()
+            self.statistics.discarded += 1
+
+        self.__update_counters()
+
+        async with self.__condition:
+            self.__condition.notify_all()
+
+    # -------------------------------------------------------------------------
+    def __update_counters(self) -> None:
+        self.statistics.in_use = len(self.__in_use)
+        self.statistics.idle = len(self.__idle)
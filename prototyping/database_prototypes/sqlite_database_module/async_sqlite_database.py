@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `async_sqlite_database` module implements a class,
+which provides an abstraction for working with an embedded SQLite database.
+
+It stands in for the MySQL database in the benchmarks and tests,
+which have to run without a database server.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["AsyncSQLiteDataBase"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from ..database_module.abstract_async_database import AbstractAsyncDataBase
+
+from typing import Any, Dict
+
+from .async_sqlite_connection import AsyncSQLiteConnection, connect_sqlite
+from .async_sqlite_connection_pool import AsyncSQLiteConnectionPool
+from .async_sqlite_database_api import AsyncSQLiteAPI
+from .types import AsyncSQLiteConnectMethodType
+
+
+# _____________________________________________________________________________
+class AsyncSQLiteDataBase(
+    AbstractAsyncDataBase[
+        AsyncSQLiteAPI, AsyncSQLiteConnectMethodType, AsyncSQLiteConnection
+    ]
+):
+    """AsyncSQLiteDataBase class for representing an embedded SQLite database.
+
+    This class is used to represent a SQLite database.
+    It provides asynchronous methods for managing database connections and for API integration,
+    which will be used to perform operations on the database.
+
+    *The connection data are the arguments of `connect_sqlite`,
+    e.g. `{"database": "shop.db", "latency": 0.002, "jitter": 0.001, "seed": 1}`,
+    so the connections behave like the connections to a server behind a network.
+
+    Args:
+        AbstractAsyncDataBase: Base class for implementing a specific type of database.
+
+    Attributes:
+        __pool (AsyncSQLiteConnectionPool): The active pool of connections to the database.
+    """
+
+    __pool: AsyncSQLiteConnectionPool
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        connection_data: Dict[str, Any],
+        api: AsyncSQLiteAPI,
+        connect_method: AsyncSQLiteConnectMethodType = connect_sqlite,
+        pool_name: str = "sqlite_pool",
+        pool_size: int = 3,
+        pool_acquire_timeout: float = 10.0,
+    ) -> None:
+        """__init__ constructor.
+
+        Initializes an instance of the AsyncSQLiteDataBase class.
+
+        Args:
+            connection_data (Dict[str, Any]): The arguments of the connect method.
+            api (AsyncSQLiteAPI): API object for performing operations on the database.
+            connect_method (AsyncSQLiteConnectMethodType, optional): The function used to open the connections.
+                                                                     The default is `connect_sqlite`.
+            pool_name (str, optional): The name identifier of the connection pool.
+                                       The default is “sqlite_pool”.
+            pool_size (int, optional): The number of connections of the pool.
+                                       The default is 3.
+            pool_acquire_timeout (float, optional): Seconds to wait for a free connection of the pool.
+                                                    The default is 10.0.
+        """
+        super().__init__(
+            connect_method=connect_method,
+            connection_data=connection_data,
+            api=api,
+        )
+
+        self.__pool = AsyncSQLiteConnectionPool(
+            connect_method=connect_method,
+            connection_data=connection_data,
+            pool_name=pool_name,
+            pool_size=pool_size,
+            acquire_timeout=pool_acquire_timeout,
+        )
+
+    # -------------------------------------------------------------------------
+    async def get_connect_method(self) -> AsyncSQLiteConnectMethodType:
+        """get_connect_method returns a function for a single connection to the database.
+
+        Returns:
+            AsyncSQLiteConnectMethodType: The function used to connect to the database.
+        """
+        return self._connect_method
+
+    # -------------------------------------------------------------------------
+    async def create_connection_with_database(self) -> None:
+        """create_connection_with_database establishes an independent connection to the database.
+
+        *The established connection is stored in the `_connection_with_database` attribute.
+        """
+        connect_method: AsyncSQLiteConnectMethodType = (
+            await self.get_connect_method()
+        )
+
+        self._connection_with_database = await connect_method(
+            **self._connection_data
+        )
+
+    # -------------------------------------------------------------------------
+    async def get_connection_with_database(self) -> AsyncSQLiteConnection:
+        """get_connection_with_database returns an independent database connection object.
+
+        *If the connection has not been created,
+        then the corresponding method is called to create the database connection.
+
+        Returns:
+            AsyncSQLiteConnection: DB Connection Object.
+        """
+        if self._connection_with_database is None:
+            await self.create_connection_with_database()
+
+        return self._connection_with_database  # type: ignore
+
+    # -------------------------------------------------------------------------
+    async def close_connection_with_database(self) -> None:
+        """close_connection_with_database closes the current independent connection to the database."""
+        connection: AsyncSQLiteConnection = await self.get_connection_with_database()
+
+        await connection.close()
+
+    # -------------------------------------------------------------------------
+    async def close_connection_pool(self) -> None:
+        """close_connection_pool closes the connection pool.
+
+        *Connections still in use are closed when they are returned.
+        """
+        await self.__pool.close()
+
+    # -------------------------------------------------------------------------
+    async def connect_api_to_database(self) -> None:
+        """connect_api_to_database sets up the API connection to the database.
+
+        This method configures the API connection to the database,
+        passing a connection pool and an independent connection,
+        allowing the API to communicate over the database.
+
+        *The independent connection is opened first,
+        so an in-memory database shared through a URI outlives the pool connections.
+        """
+        connection_with_database: AsyncSQLiteConnection = (
+            await self.get_connection_with_database()
+        )
+
+        await self.__pool.open()
+
+        await self.api.set_up(
+            separate_connection=connection_with_database, pool=self.__pool
+        )
@@ -0,0 +1,958 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `async_sqlite_database_api` module provides an API for working with an embedded SQLite database,
+using the asynchronous connections and the connection pool.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["AsyncSQLiteAPI"]
+
+__author__ = "4-proxy"
+__version__ = "1.4.0"
+
+from ..database_module.async_sql_database_api import (
+    AsyncSQLDataBaseAPI,
+)
+from ..database_module.async_sql_database_pool_api import (
+    AsyncSQLDataBasePoolAPI,
+)
+from ..database_module.bulk_write_statistics import BulkWriteStatistics
+from ..database_module.query_instrumentation import AbstractQueryHook
+from ..database_module.query_result_cache import (
+    QueryResultCache,
+    QueryResultCacheStatistics,
+)
+from ..database_module.single_flight import SingleFlight, SingleFlightStatistics
+from ..database_module.pool_statistics import ConnectionPoolStatistics
+from ..database_module.row_mapping import ResultRows, RowMapper, to_columns
+from ..database_module.query_scope_tracking import QueryScopeTracker
+
+import asyncio
+import logging
+import sqlite3
+import time
+
+from array import array
+from contextlib import asynccontextmanager
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from string import Template
+
+from .async_sqlite_connection import AsyncSQLiteConnection
+from .async_sqlite_connection_pool import AsyncSQLiteConnectionPool
+from .transaction import AsyncSQLiteTransaction
+from .types import SQLiteRowType
+
+
+logger: logging.Logger = logging.getLogger(name=__name__)
+
+
+# _____________________________________________________________________________
+class AsyncSQLiteAPI(
+    AsyncSQLDataBaseAPI[AsyncSQLiteConnection],
+    AsyncSQLDataBasePoolAPI[AsyncSQLiteConnectionPool, AsyncSQLiteConnection],
+):
+    """AsyncSQLiteAPI class of an API for working with an embedded SQLite database.
+
+    It provides the asynchronous methods of the MySQL API,
+    over an independent connection and a connection pool to a SQLite database,
+    so that the data path of the application can be run and measured without a server.
+
+    *The queries use the `%s` placeholders of the MySQL API,
+    but the SQL itself must be understood by SQLite.
+
+    *With a result cache set, the pool reads given a `cache_ttl` are answered from the cache.
+    Writes made through the API drop the cached results of the tables they change,
+    once they are committed.
+
+    *With a read coalescer set, identical pool reads running at the same time
+    share a single query and its result or error.
+    A read started after a write is committed never joins a read started before it.
+
+    *The query hooks receive the connection wait, execution, fetch and commit times,
+    of every query executed by the API, keyed by the query fingerprint.
+
+    *The read rows keep the names of the result columns, see `ResultRows`,
+    so they can be mapped into typed records or transposed into columns.
+
+    *Every query outside of a `transaction` scope is committed on its own.
+    Queries of the independent connection are serialized, as it is shared by all tasks.
+
+    Args:
+        AsyncSQLDataBaseAPI: Interface for implementing the single connection API.
+        AsyncSQLDataBasePoolAPI: Interface to implement the connection pool API.
+
+    Attributes:
+        __pool (AsyncSQLiteConnectionPool): The active database connection pool.
+        __connection_with_database (AsyncSQLiteConnection): Active independent connection to the database.
+        __connection_lock (asyncio.Lock): Serializes the use of the independent connection.
+        __scope_tracker (QueryScopeTracker): Shares the pool reads and reports the query timings of the scopes.
+    """
+
+    __pool: AsyncSQLiteConnectionPool
+    __connection_with_database: AsyncSQLiteConnection
+    __connection_lock: asyncio.Lock
+    __scope_tracker: QueryScopeTracker
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        result_cache: Optional[QueryResultCache] = None,
+        query_hooks: Sequence[AbstractQueryHook] = (),
+        read_coalescer: Optional[SingleFlight[ResultRows]] = None,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            result_cache (Optional[QueryResultCache], optional): The cache of the pool read results.
+                                                                 The default is None, the results are not cached.
+            query_hooks (Sequence[AbstractQueryHook], optional): The hooks receiving the query timings.
+                                                                 The default is an empty tuple.
+            read_coalescer (Optional[SingleFlight], optional): Coalesces the identical concurrent pool reads.
+                                                               The default is None, every read runs its own query.
+        """
+        self.__connection_lock = asyncio.Lock()
+        self.__scope_tracker = QueryScopeTracker(
+            result_cache=result_cache,
+            query_hooks=query_hooks,
+            read_coalescer=read_coalescer,
+        )
+
+    # -------------------------------------------------------------------------
+    @property
+    def result_cache(self) -> Optional[QueryResultCache]:
+        """result_cache returns the cache of the pool read results, if the API has one."""
+        return self.__scope_tracker.result_cache
+
+    # -------------------------------------------------------------------------
+    @property
+    def read_coalescer(self) -> Optional[SingleFlight[ResultRows]]:
+        """read_coalescer returns the coalescer of the pool reads, if the API has one."""
+        return self.__scope_tracker.read_coalescer
+
+    # -------------------------------------------------------------------------
+    async def set_up(
+        self,
+        separate_connection: AsyncSQLiteConnection,
+        pool: AsyncSQLiteConnectionPool,
+    ) -> None:
+        """set_up configures the API.
+
+        This method is used for the initial configuration of the API.
+        Calling the appropriate methods to set independent and pool connections.
+
+        Args:
+            separate_connection (AsyncSQLiteConnection): Independent connection to the database.
+            pool (AsyncSQLiteConnectionPool): A pool of connections to the database.
+        """
+        await self.set_connection_with_database(connection=separate_connection)
+        await self.set_connection_to_pool(pool=pool)
+
+    # -------------------------------------------------------------------------
+    async def set_connection_to_pool(self, pool: AsyncSQLiteConnectionPool) -> None:
+        """set_connection_to_pool connects the connection pool to the API.
+
+        Args:
+            pool (AsyncSQLiteConnectionPool): The database connection pool.
+        """
+        self.__pool = pool
+
+    # -------------------------------------------------------------------------
+    async def set_connection_with_database(
+        self, connection: AsyncSQLiteConnection
+    ) -> None:
+        """set_connection_with_database sets the connection to the database for the API.
+
+        Args:
+            connection (AsyncSQLiteConnection): Independent connection to the database.
+        """
+        self.__connection_with_database = connection
+
+    # -------------------------------------------------------------------------
+    async def add_query_hook(self, hook: AbstractQueryHook) -> None:
+        """add_query_hook adds a hook receiving the timings of the queries.
+
+        Args:
+            hook (AbstractQueryHook): The hook, e.g. a `QueryLatencyRecorder`.
+        """
+        self.__scope_tracker.add_query_hook(hook=hook)
+
+    # -------------------------------------------------------------------------
+    async def get_connection_with_database(self) -> AsyncSQLiteConnection:
+        """get_connection_with_database returns an independent connection to the database.
+
+        Returns:
+            AsyncSQLiteConnection: Database connection object.
+        """
+        return self.__connection_with_database
+
+    # -------------------------------------------------------------------------
+    async def get_connection_from_pool(self) -> AsyncSQLiteConnection:
+        """get_connection_from_pool returns a database connection object from the pool.
+
+        If all pool connections are busy, the call waits for one to be returned.
+
+        Returns:
+            AsyncSQLiteConnection: database connection object from the pool.
+        """
+        return await self.__pool.get_connection()
+
+    # -------------------------------------------------------------------------
+    async def get_pool_statistics(self) -> ConnectionPoolStatistics:
+        """get_pool_statistics returns the load counters of the connection pool.
+
+        Returns:
+            ConnectionPoolStatistics: Queue depth and wait-time counters of the pool.
+        """
+        return self.__pool.statistics
+
+    # -------------------------------------------------------------------------
+    async def check_connection_with_database(self) -> bool:
+        """check_connection_with_database checks for direct database connection activity.
+
+        Returns:
+            bool: True if the connection is active; otherwise False.
+        """
+        connection: AsyncSQLiteConnection = await self.get_connection_with_database()
+
+        return await connection.is_connected()
+
+    # -------------------------------------------------------------------------
+    async def close_connection_from_pool(
+        self, connection: AsyncSQLiteConnection
+    ) -> None:
+        """close_connection_from_pool returns the connection back to the pool.
+
+        Args:
+            connection (AsyncSQLiteConnection): pooled connection object.
+        """
+        await self.__pool.release_connection(connection=connection)
+
+    # -------------------------------------------------------------------------
+    async def execute_sql_query_use_pool(
+        self,
+        query_template: Template,
+        query_data: Dict[str, str],
+    ) -> None:
+        """execute_sql_query_use_pool executes a database query.
+
+        This method executes a query to the database using a connection from the pool.
+        The query template and the data to be substituted into the query are used to generate the query.
+
+        *A failed query is rolled back, logged and raised.
+
+        Args:
+            query_template (Template): query string template.
+            query_data (Dict[str, str]): Data to substitute into the template.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        try:
+            async with self.__use_pool_connection() as connection:
+                await self.__execute_query(
+                    connection, query_template.substitute(**query_data), ()
+                )
+
+        except sqlite3.Error as error:
+            logger.error(msg=f"An error occurred while executing a query! {error}")
+
+            raise
+
+    # -------------------------------------------------------------------------
+    async def execute_sql_query_to_database(
+        self, query_template: Template, query_data: Dict[str, str]
+    ) -> None:
+        """execute_sql_query_to_database executes a query to the database.
+
+        This method executes a query to the database using an independent connection.
+        The query template and the data to be substituted into the query are used to generate the query.
+
+        *A failed query is rolled back, logged and raised.
+
+        Args:
+            query_template (Template): query string template.
+            query_data (Dict[str, str]): The data to substitute into the template.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        try:
+            async with self.__use_independent_connection() as connection:
+                await self.__execute_query(
+                    connection, query_template.substitute(**query_data), ()
+                )
+
+        except sqlite3.Error as error:
+            logger.error(msg=f"An error occurred while executing a query! {error}")
+
+            raise
+
+    # -------------------------------------------------------------------------
+    async def execute_parameterized_query_use_pool(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> int:
+        """execute_parameterized_query_use_pool executes a parameterized database query.
+
+        This method executes a query with placeholders using a connection from the pool.
+        The changes are committed, or rolled back if the query fails.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            int: The number of rows affected by the query.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        async with self.__use_pool_connection() as connection:
+            affected_rows, _ = await self.__execute_query(
+                connection, query, parameters
+            )
+
+        return affected_rows
+
+    # -------------------------------------------------------------------------
+    async def execute_parameterized_query_to_database(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> int:
+        """execute_parameterized_query_to_database executes a parameterized query to the database.
+
+        This method executes a query with placeholders using an independent connection.
+        The changes are committed, or rolled back if the query fails.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            int: The number of rows affected by the query.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        async with self.__use_independent_connection() as connection:
+            affected_rows, _ = await self.__execute_query(
+                connection, query, parameters
+            )
+
+        return affected_rows
+
+    # -------------------------------------------------------------------------
+    async def fetch_one_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        cache_ttl: Optional[float] = None,
+    ) -> Optional[SQLiteRowType]:
+        """fetch_one_use_pool returns the first row of the query result.
+
+        *The whole result is read, so the query should limit it.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+
+        Returns:
+            Optional[SQLiteRowType]: The first row of the result; None if the result is empty.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        rows: List[SQLiteRowType] = await self.fetch_all_use_pool(
+            query=query, parameters=parameters, cache_ttl=cache_ttl
+        )
+
+        return rows[0] if rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetch_all_use_pool(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        cache_ttl: Optional[float] = None,
+    ) -> List[SQLiteRowType]:
+        """fetch_all_use_pool returns all rows of the query result.
+
+        *With `cache_ttl` given, a cached result is returned without querying the database,
+        and a new result is cached, tagged with the tables of the query.
+
+        *With a read coalescer set, a read identical to one in flight waits for its result.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+
+        Returns:
+            List[SQLiteRowType]: The rows of the result.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        async def fetch_all() -> ResultRows:
+            async with self.__use_pool_connection() as connection:
+                _, rows = await self.__execute_query(connection, query, parameters)
+
+            return rows
+
+        return await self.__scope_tracker.fetch_all(
+            query=query,
+            parameters=parameters,
+            fetch_all=fetch_all,
+            cache_ttl=cache_ttl,
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_records_use_pool[RecordType](
+        self,
+        query: str,
+        row_mapper: RowMapper[RecordType],
+        parameters: Sequence[Any] = (),
+        cache_ttl: Optional[float] = None,
+    ) -> List[RecordType]:
+        """fetch_records_use_pool returns the rows of the query result as typed records.
+
+        *A cached result is kept as rows, and mapped on every hit.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            row_mapper (RowMapper[RecordType]): The mapper of the records declared for the query.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+
+        Returns:
+            List[RecordType]: The records, in the order of the rows.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+            ValueError: If a field of the records has no column in the result.
+        """
+        rows: List[SQLiteRowType] = await self.fetch_all_use_pool(
+            query=query, parameters=parameters, cache_ttl=cache_ttl
+        )
+
+        return row_mapper.map_rows(rows=rows)
+
+    # -------------------------------------------------------------------------
+    async def fetch_columns_use_pool(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> Dict[str, Union[array, List[Any]]]:
+        """fetch_columns_use_pool returns the query result as columns.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Dict[str, Union[array, List[Any]]]: The values of each column by its name, in the order of the rows.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        rows: List[SQLiteRowType] = await self.fetch_all_use_pool(
+            query=query, parameters=parameters
+        )
+
+        return to_columns(rows=rows)
+
+    # -------------------------------------------------------------------------
+    async def stream_use_pool(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[List[SQLiteRowType]]:
+        """stream_use_pool yields the query result in chunks of rows.
+
+        The connection stays checked out until the stream is exhausted or closed.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Yields:
+            List[SQLiteRowType]: The next chunk of rows of the result.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        async with self.__use_pool_connection() as connection:
+            async for chunk in self.__stream_query(
+                connection, query, parameters, chunk_size
+            ):
+                yield chunk
+
+    # -------------------------------------------------------------------------
+    async def fetch_one_from_database(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> Optional[SQLiteRowType]:
+        """fetch_one_from_database returns the first row of the query result.
+
+        *The whole result is read, so the query should limit it.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Optional[SQLiteRowType]: The first row of the result; None if the result is empty.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        rows: List[SQLiteRowType] = await self.fetch_all_from_database(
+            query=query, parameters=parameters
+        )
+
+        return rows[0] if rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetch_all_from_database(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> List[SQLiteRowType]:
+        """fetch_all_from_database returns all rows of the query result.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            List[SQLiteRowType]: The rows of the result.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        async with self.__use_independent_connection() as connection:
+            _, rows = await self.__execute_query(connection, query, parameters)
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    async def stream_from_database(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[List[SQLiteRowType]]:
+        """stream_from_database yields the query result in chunks of rows.
+
+        *The independent connection can not run other queries until the stream is exhausted or closed.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Yields:
+            List[SQLiteRowType]: The next chunk of rows of the result.
+
+        Raises:
+            sqlite3.Error: If the query fails.
+        """
+        async with self.__use_independent_connection() as connection:
+            async for chunk in self.__stream_query(
+                connection, query, parameters, chunk_size
+            ):
+                yield chunk
+
+    # -------------------------------------------------------------------------
+    async def execute_many_use_pool(
+        self,
+        query: str,
+        parameter_rows: Iterable[Sequence[Any]],
+        batch_size: int = 1000,
+    ) -> BulkWriteStatistics:
+        """execute_many_use_pool executes a query once per row of parameters.
+
+        This method sends the rows in batches, each batch in a single round-trip,
+        using a single connection from the pool,
+        and commits once after all of the batches, or rolls back if one of them fails.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameter_rows (Iterable[Sequence[Any]]): The rows of values bound to the placeholders.
+            batch_size (int, optional): The number of rows sent per round-trip.
+                                        The default is 1000.
+
+        Returns:
+            BulkWriteStatistics: Row, statement and throughput counters of the write.
+
+        Raises:
+            sqlite3.Error: If a batch fails.
+        """
+        statistics = BulkWriteStatistics()
+        started_at: float = time.perf_counter()
+        batch: List[Sequence[Any]] = []
+
+        async with self.__use_pool_connection() as connection:
+            for row in parameter_rows:
+                batch.append(row)
+
+                if len(batch) >= batch_size:
+                    await self.__execute_batch(
+                        connection=connection,
+                        query=query,
+                        batch=batch,
+                        statistics=statistics,
+                    )
+                    batch = []
+
+            if batch:
+                await self.__execute_batch(
+                    connection=connection,
+                    query=query,
+                    batch=batch,
+                    statistics=statistics,
+                )
+
+        statistics.elapsed_time = time.perf_counter() - started_at
+
+        return statistics
+
+    # -------------------------------------------------------------------------
+    async def execute(self, query: str, parameters: Sequence[Any] = ()) -> int:
+        """execute executes an application query using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            int: The number of rows affected by the query.
+        """
+        return await self.execute_parameterized_query_use_pool(
+            query=query, parameters=parameters
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_one(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        cache_ttl: Optional[float] = None,
+    ) -> Optional[SQLiteRowType]:
+        """fetch_one returns the first row of an application query using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+
+        Returns:
+            Optional[SQLiteRowType]: The first row of the result; None if the result is empty.
+        """
+        return await self.fetch_one_use_pool(
+            query=query, parameters=parameters, cache_ttl=cache_ttl
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_all(
+        self,
+        query: str,
+        parameters: Sequence[Any] = (),
+        cache_ttl: Optional[float] = None,
+    ) -> List[SQLiteRowType]:
+        """fetch_all returns all rows of an application query using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            cache_ttl (Optional[float], optional): Seconds the result is kept in the result cache, if the API has one.
+                                                   The default is None, the result is not cached.
+
+        Returns:
+            List[SQLiteRowType]: The rows of the result.
+        """
+        return await self.fetch_all_use_pool(
+            query=query, parameters=parameters, cache_ttl=cache_ttl
+        )
+
+    # -------------------------------------------------------------------------
+    def stream(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[List[SQLiteRowType]]:
+        """stream yields the result of an application query in chunks, using the connection pool.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Returns:
+            AsyncIterator[List[SQLiteRowType]]: The chunks of rows of the result.
+        """
+        return self.stream_use_pool(
+            query=query, parameters=parameters, chunk_size=chunk_size
+        )
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def transaction(
+        self, use_pool: bool = True
+    ) -> AsyncIterator[AsyncSQLiteTransaction]:
+        """transaction runs an explicit transaction scope.
+
+        This method reserves a connection for the scope and starts a transaction on it.
+        All queries of the scope are committed at once when the scope is left,
+        or rolled back if the scope fails, in which case the error is propagated.
+
+        *A transaction on the independent connection blocks its other users until the scope is left.
+
+        Args:
+            use_pool (bool, optional): Whether to use a connection from the pool,
+                                       otherwise the independent connection is used.
+                                       The default is True.
+
+        Yields:
+            AsyncSQLiteTransaction: The transaction running the queries of the scope.
+        """
+        connection_scope = (
+            self.__use_pool_connection()
+            if use_pool
+            else self.__use_independent_connection()
+        )
+
+        async with connection_scope as connection:
+            transaction = AsyncSQLiteTransaction(
+                connection=connection,
+                execute_query=self.__execute_query,
+                stream_query=self.__stream_query,
+            )
+
+            await transaction.begin()
+
+            yield transaction
+
+    # -------------------------------------------------------------------------
+    async def get_result_cache_statistics(
+        self,
+    ) -> Optional[QueryResultCacheStatistics]:
+        """get_result_cache_statistics returns the result cache counters.
+
+        Returns:
+            Optional[QueryResultCacheStatistics]: Hit ratio and memory usage counters;
+                                                  None if the API has no result cache.
+        """
+        result_cache: Optional[QueryResultCache] = self.result_cache
+
+        if result_cache is None:
+            return None
+
+        return result_cache.statistics
+
+    # -------------------------------------------------------------------------
+    async def get_read_coalescer_statistics(
+        self,
+    ) -> Optional[SingleFlightStatistics]:
+        """get_read_coalescer_statistics returns the read coalescer counters.
+
+        Returns:
+            Optional[SingleFlightStatistics]: Shared and executed read counters;
+                                              None if the API has no read coalescer.
+        """
+        read_coalescer: Optional[SingleFlight[ResultRows]] = self.read_coalescer
+
+        if read_coalescer is None:
+            return None
+
+        return read_coalescer.statistics
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __use_pool_connection(self) -> AsyncIterator[AsyncSQLiteConnection]:
+        wait_started_at: float = time.perf_counter()
+        connection: AsyncSQLiteConnection = await self.get_connection_from_pool()
+
+        try:
+            async with self.__commit_scope(
+                connection=connection,
+                connection_wait=time.perf_counter() - wait_started_at,
+            ):
+                yield connection
+
+        finally:
+            await self.close_connection_from_pool(connection=connection)
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __use_independent_connection(
+        self,
+    ) -> AsyncIterator[AsyncSQLiteConnection]:
+        wait_started_at: float = time.perf_counter()
+
+        async with self.__connection_lock:
+            connection: AsyncSQLiteConnection = (
+                await self.get_connection_with_database()
+            )
+
+            async with self.__commit_scope(
+                connection=connection,
+                connection_wait=time.perf_counter() - wait_started_at,
+            ):
+                yield connection
+
+    # -------------------------------------------------------------------------
+    @asynccontextmanager
+    async def __commit_scope(
+        self, connection: AsyncSQLiteConnection, connection_wait: float
+    ) -> AsyncIterator[None]:
+        commit_time: float = 0.0
+
+        try:
+            yield
+
+            commit_started_at: float = time.perf_counter()
+            await connection.commit()
+            commit_time = time.perf_counter() - commit_started_at
+
+        except BaseException:
+            # Also covers a stream closed early, which must not leave a transaction open.
+            try:
+                await connection.rollback()
+
+            except sqlite3.Error:
+                pass
+
+            raise
+
+        finally:
+            self.__scope_tracker.finish_scope(
+                connection=connection,
+                connection_wait=connection_wait,
+                commit_time=commit_time,
+            )
+
+    # -------------------------------------------------------------------------
+    async def __execute_query(
+        self, connection: AsyncSQLiteConnection, query: str, parameters: Sequence[Any]
+    ) -> Tuple[int, ResultRows]:
+        started_at: float = time.perf_counter()
+
+        try:
+            affected_rows, rows = await connection.execute(
+                query=query, parameters=parameters
+            )
+
+        except sqlite3.Error:
+            self.__scope_tracker.add_timings(
+                connection=connection,
+                query=query,
+                parameters=parameters,
+                execute=time.perf_counter() - started_at,
+                failed=True,
+            )
+            raise
+
+        self.__scope_tracker.note_write(connection=connection, query=query)
+        # The rows are read on the worker thread together with the execution.
+        self.__scope_tracker.add_timings(
+            connection=connection,
+            query=query,
+            parameters=parameters,
+            execute=time.perf_counter() - started_at,
+            rows=len(rows) if rows else max(affected_rows, 0),
+        )
+
+        return affected_rows, rows
+
+    # -------------------------------------------------------------------------
+    async def __execute_batch(
+        self,
+        connection: AsyncSQLiteConnection,
+        query: str,
+        batch: List[Sequence[Any]],
+        statistics: BulkWriteStatistics,
+    ) -> None:
+        started_at: float = time.perf_counter()
+
+        try:
+            affected_rows: int = await connection.execute_many(
+                query=query, parameter_rows=batch
+            )
+
+        except sqlite3.Error:
+            self.__scope_tracker.add_timings(
+                connection=connection,
+                query=query,
+                execute=time.perf_counter() - started_at,
+                failed=True,
+            )
+            raise
+
+        self.__scope_tracker.note_write(connection=connection, query=query)
+        # Bulk parameters are not kept, the fingerprint and the row count describe them.
+        self.__scope_tracker.add_timings(
+            connection=connection,
+            query=query,
+            execute=time.perf_counter() - started_at,
+            rows=max(affected_rows, 0),
+        )
+
+        statistics.rows += len(batch)
+        statistics.statements += 1
+        statistics.affected_rows += max(affected_rows, 0)
+
+    # -------------------------------------------------------------------------
+    async def __stream_query(
+        self,
+        connection: AsyncSQLiteConnection,
+        query: str,
+        parameters: Sequence[Any],
+        chunk_size: int,
+    ) -> AsyncIterator[List[SQLiteRowType]]:
+        started_at: float = time.perf_counter()
+        row_count: int = 0
+        failed: bool = True
+
+        try:
+            async for chunk in connection.stream(
+                query=query, parameters=parameters, chunk_size=chunk_size
+            ):
+                row_count += len(chunk)
+
+                yield chunk
+
+            failed = False
+
+        finally:
+            self.__scope_tracker.note_write(connection=connection, query=query)
+            self.__scope_tracker.add_timings(
+                connection=connection,
+                query=query,
+                parameters=parameters,
+                fetch=time.perf_counter() - started_at,
+                rows=row_count,
+                failed=failed,
+            )
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `injected_latency` module provides a class delaying the round-trips,
+of the embedded database, to imitate a database server behind a network.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["InjectedLatency"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import asyncio
+import random
+
+from typing import Optional
+
+
+# _____________________________________________________________________________
+class InjectedLatency:
+    """InjectedLatency class of the delay added to every round-trip.
+
+    Each delay is the base latency plus a uniformly distributed jitter.
+    The jitter is drawn from a generator of its own,
+    so a seeded instance produces the same delays on every run.
+
+    Attributes:
+        latency (float): The base delay of a round-trip, in seconds.
+        jitter (float): The maximum extra delay of a round-trip, in seconds.
+        __random (random.Random): The generator of the jitter.
+    """
+
+    latency: float
+    jitter: float
+    __random: random.Random
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self, latency: float = 0.0, jitter: float = 0.0, seed: Optional[int] = None
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            latency (float, optional): The base delay of a round-trip, in seconds.
+                                       The default is 0.0.
+            jitter (float, optional): The maximum extra delay of a round-trip, in seconds.
+                                      The default is 0.0.
+            seed (Optional[int], optional): The seed of the jitter generator.
+                                            The default is None, the delays are not reproducible.
+
+        Raises:
+            ValueError: If the latency or the jitter is negative.
+        """
+        if latency < 0 or jitter < 0:
+            raise ValueError("Injected latency and jitter must not be negative!")
+
+        self.latency = latency
+        self.jitter = jitter
+        self.__random = random.Random(seed)
+
+    # -------------------------------------------------------------------------
+    def next_delay(self) -> float:
+        """next_delay returns the delay of the next round-trip.
+
+        Returns:
+            float: The delay, in seconds.
+        """
+        if not self.jitter:
+            return self.latency
+
+        return self.latency + self.__random.uniform(0.0, self.jitter)
+
+    # -------------------------------------------------------------------------
+    async def wait(self) -> None:
+        """wait sleeps for the delay of the next round-trip.
+
+        *Without any latency the event loop is not entered at all,
+        so the embedded database runs at its own speed.
+        """
+        delay: float = self.next_delay()
+
+        if delay > 0:
+            await asyncio.sleep(delay)
@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+"""
+The `transaction` module provides a class representing an explicit transaction,
+on a connection to an embedded SQLite database.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__all__: list[str] = ["AsyncSQLiteTransaction"]
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .async_sqlite_connection import AsyncSQLiteConnection
+from .types import SQLiteRowType
+
+
+# Annotation for the function executing a query on a connection.
+ExecuteQueryType = Callable[
+    [AsyncSQLiteConnection, str, Sequence[Any]],
+    Awaitable[Tuple[int, List[SQLiteRowType]]],
+]
+
+# Annotation for the function streaming a query result from a connection.
+StreamQueryType = Callable[
+    [AsyncSQLiteConnection, str, Sequence[Any], int],
+    AsyncIterator[List[SQLiteRowType]],
+]
+
+
+# _____________________________________________________________________________
+class AsyncSQLiteTransaction:
+    """AsyncSQLiteTransaction class of an explicit transaction scope.
+
+    This class runs the queries of a transaction on the connection reserved for it.
+    None of the queries is committed separately,
+    the whole transaction is committed when its scope is left without an error.
+
+    *Instances are created by `AsyncSQLiteAPI.transaction`.
+
+    Attributes:
+        __connection (AsyncSQLiteConnection): The connection reserved for the transaction.
+        __execute_query (ExecuteQueryType): Executes a query on the connection.
+        __stream_query (StreamQueryType): Streams a query result from the connection.
+    """
+
+    __connection: AsyncSQLiteConnection
+    __execute_query: ExecuteQueryType
+    __stream_query: StreamQueryType
+
+    # -------------------------------------------------------------------------
+    def __init__(
+        self,
+        connection: AsyncSQLiteConnection,
+        execute_query: ExecuteQueryType,
+        stream_query: StreamQueryType,
+    ) -> None:
+        """__init__ constructor.
+
+        Args:
+            connection (AsyncSQLiteConnection): The connection reserved for the transaction.
+            execute_query (ExecuteQueryType): Executes a query on the connection.
+            stream_query (StreamQueryType): Streams a query result from the connection.
+        """
+        self.__connection = connection
+        self.__execute_query = execute_query
+        self.__stream_query = stream_query
+
+    # -------------------------------------------------------------------------
+    @property
+    def connection(self) -> AsyncSQLiteConnection:
+        """connection returns the connection reserved for the transaction."""
+        return self.__connection
+
+    # -------------------------------------------------------------------------
+    async def begin(self) -> None:
+        """begin starts the transaction."""
+        await self.__connection.begin()
+
+    # -------------------------------------------------------------------------
+    async def execute(self, query: str, parameters: Sequence[Any] = ()) -> int:
+        """execute executes a query within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            int: The number of rows affected by the query.
+        """
+        affected_rows, _ = await self.__execute_query(
+            self.__connection, query, parameters
+        )
+
+        return affected_rows
+
+    # -------------------------------------------------------------------------
+    async def fetch_one(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> Optional[SQLiteRowType]:
+        """fetch_one returns the first row of a query result within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            Optional[SQLiteRowType]: The first row of the result; None if the result is empty.
+        """
+        rows: List[SQLiteRowType] = await self.fetch_all(
+            query=query, parameters=parameters
+        )
+
+        return rows[0] if rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetch_all(
+        self, query: str, parameters: Sequence[Any] = ()
+    ) -> List[SQLiteRowType]:
+        """fetch_all returns all rows of a query result within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+
+        Returns:
+            List[SQLiteRowType]: The rows of the result.
+        """
+        _, rows = await self.__execute_query(self.__connection, query, parameters)
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    def stream(
+        self, query: str, parameters: Sequence[Any] = (), chunk_size: int = 1000
+    ) -> AsyncIterator[List[SQLiteRowType]]:
+        """stream yields a query result in chunks of rows within the transaction.
+
+        Args:
+            query (str): The query text with `%s` placeholders.
+            parameters (Sequence[Any], optional): The values bound to the placeholders.
+                                                  The default is an empty tuple.
+            chunk_size (int, optional): The maximum number of rows per chunk.
+                                        The default is 1000.
+
+        Returns:
+            AsyncIterator[List[SQLiteRowType]]: The chunks of rows of the result.
+        """
+        return self.__stream_query(
+            self.__connection, query, parameters, chunk_size
+        )
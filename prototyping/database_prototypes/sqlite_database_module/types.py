@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+
+"""
+The module is designed to store custom types,
+to ensure correct annotation in the code used.
+"""
+
+__all__: list[str] = ["AsyncSQLiteConnectMethodType", "SQLiteRowType"]
+
+from typing import Any, Callable, Coroutine, Tuple
+
+from .async_sqlite_connection import AsyncSQLiteConnection
+
+
+# Annotation for the function used to open an asynchronous connection to SQLite.
+AsyncSQLiteConnectMethodType = Callable[
+    ..., Coroutine[Any, Any, AsyncSQLiteConnection]
+]
+
+# Annotation for a row of a SQLite query result.
+SQLiteRowType = Tuple[Any, ...]
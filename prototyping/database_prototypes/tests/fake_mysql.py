@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `fake_mysql`, in-memory stand-ins of the MySQL connections,
+used by the test cases of the MySQL API without a server.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.2.0"
+
+import asyncio
+import itertools
+
+from prototyping.database_prototypes.mysql_database_module import (
+    AsyncMySQLAPI,
+    AsyncMySQLConnectionPool,
+)
+
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+
+# The handler of the executed queries, returning the result rows or raising an error.
+QueryHandlerType = Callable[[str, Sequence[Any]], Any]
+
+
+# _____________________________________________________________________________
+class FakeServer:
+    def __init__(self, handle_query: Optional[QueryHandlerType] = None) -> None:
+        self.handle_query: QueryHandlerType = handle_query or (lambda query, parameters: [])
+        self.executed: List[Tuple[str, Tuple[Any, ...]]] = []
+        self.commits: int = 0
+        self.rollbacks: int = 0
+        self.commit_time: float = 0.0
+        self.unread_rows_at_close: List[int] = []
+        self.connection_ids: Iterator[int] = itertools.count(start=1)
+
+    # -------------------------------------------------------------------------
+    async def connect(self, **kwargs: Any) -> "FakeConnection":
+        return FakeConnection(server=self)
+
+
+# _____________________________________________________________________________
+class FakeCursor:
+    def __init__(self, server: FakeServer) -> None:
+        self.server = server
+        self.rows: List[Any] = []
+        self.description: Optional[List[Tuple[str]]] = None
+        self.rowcount: int = -1
+        self.lastrowid: Optional[int] = None
+
+    # -------------------------------------------------------------------------
+    async def __aenter__(self) -> "FakeCursor":
+        return self
+
+    # -------------------------------------------------------------------------
+    async def __aexit__(self, *args: Any) -> None:
+        await self.close()
+
+    # -------------------------------------------------------------------------
+    async def execute(self, query: str, parameters: Optional[Sequence[Any]] = None) -> None:
+        self.server.executed.append((query, tuple(parameters or ())))
+
+        result: Any = self.server.handle_query(query, tuple(parameters or ()))
+
+        if asyncio.iscoroutine(result):
+            result = await result
+
+        self.rows = list(result or [])
+        self.description = [("value",)] if self.rows else None
+        self.rowcount = len(self.rows)
+
+    # -------------------------------------------------------------------------
+    async def fetchone(self) -> Optional[Any]:
+        return self.rows.pop(0) if self.rows else None
+
+    # -------------------------------------------------------------------------
+    async def fetchmany(self, size: int = 1) -> List[Any]:
+        rows, self.rows = self.rows[:size], self.rows[size:]
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    async def fetchall(self) -> List[Any]:
+        rows, self.rows = self.rows, []
+
+        return rows
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        self.server.unread_rows_at_close.append(len(self.rows))
+
+
+# _____________________________________________________________________________
+class FakeConnection:
+    def __init__(self, server: FakeServer) -> None:
+        self.server = server
+        self.connection_id: int = next(server.connection_ids)
+        self.is_closed: bool = False
+
+    # -------------------------------------------------------------------------
+    async def cursor(self, **kwargs: Any) -> FakeCursor:
+        return FakeCursor(server=self.server)
+
+    # -------------------------------------------------------------------------
+    async def commit(self) -> None:
+        await asyncio.sleep(self.server.commit_time)
+
+        self.server.commits += 1
+
+    # -------------------------------------------------------------------------
+    async def rollback(self) -> None:
+        self.server.rollbacks += 1
+
+    # -------------------------------------------------------------------------
+    async def is_connected(self) -> bool:
+        return not self.is_closed
+
+    # -------------------------------------------------------------------------
+    async def reconnect(self) -> None:
+        self.is_closed = False
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        self.is_closed = True
+
+
+# _____________________________________________________________________________
+class FakeQueryKiller:
+    def __init__(self, handle_kill: Callable[[int], Any]) -> None:
+        self.handle_kill = handle_kill
+        self.killed: List[int] = []
+
+    # -------------------------------------------------------------------------
+    async def kill_query(self, connection_id: int) -> bool:
+        self.killed.append(connection_id)
+
+        result: Any = self.handle_kill(connection_id)
+
+        if asyncio.iscoroutine(result):
+            result = await result
+
+        return result
+
+
+# -----------------------------------------------------------------------------
+async def create_api(
+    server: FakeServer, query_killer: Optional[FakeQueryKiller] = None, **kwargs: Any
+) -> AsyncMySQLAPI:
+    api = AsyncMySQLAPI(**kwargs)
+    pool = AsyncMySQLConnectionPool(
+        connect_method=server.connect, connection_data={}, max_size=4
+    )
+
+    await api.set_up(separate_connection=await server.connect(), pool=pool)
+
+    if query_killer is not None:
+        await api.set_query_killers(query_killers={pool: query_killer})
+
+    return api
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_async_mysql_connection_pool`, a set of test cases used to control the performance
+and quality of the `async_mysql_connection_pool` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.1"
+
+import unittest
+
+import asyncio
+
+from prototyping.database_prototypes.mysql_database_module import (
+    async_mysql_connection_pool,
+)
+
+from typing import Any, List
+
+
+# _____________________________________________________________________________
+class FakeConnection:
+    async def is_connected(self) -> bool:
+        return True
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        pass
+
+
+# -----------------------------------------------------------------------------
+async def connect(**kwargs: Any) -> FakeConnection:
+    return FakeConnection()
+
+
+# _____________________________________________________________________________
+class TestAdaptivePool(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.pool = async_mysql_connection_pool.AsyncMySQLConnectionPool(
+            connect_method=connect,
+            connection_data={},
+            min_size=1,
+            max_size=4,
+            acquire_timeout=1.0,
+            target_wait_time=0.01,
+            resize_interval=60.0,
+        )
+
+    # -------------------------------------------------------------------------
+    async def asyncTearDown(self) -> None:
+        await self.pool.close()
+        await super().asyncTearDown()
+
+    # -------------------------------------------------------------------------
+    async def test_burst_after_start_is_not_queued(self) -> None:
+        # Build
+        await self.pool.open()
+
+        # Operate
+        connections: List[Any] = await asyncio.gather(
+            *(self.pool.get_connection() for _ in range(4))
+        )
+
+        # Check
+        self.assertEqual(first=len(set(connections)), second=4)
+        self.assertEqual(first=self.pool.statistics.timeouts, second=0)
+
+    # -------------------------------------------------------------------------
+    async def test_shrunk_pool_grows_at_once_for_waiting_tasks(self) -> None:
+        # Build
+        await self.pool.open()
+
+        for _ in range(3):
+            await self.pool.adjust_size()
+
+        shrunk_size_limit: int = self.pool.size_limit
+        held: List[Any] = [await self.pool.get_connection()]
+
+        # Operate
+        held.extend(
+            await asyncio.wait_for(
+                asyncio.gather(*(self.pool.get_connection() for _ in range(2))),
+                timeout=0.5,
+            )
+        )
+
+        # Check
+        self.assertEqual(first=shrunk_size_limit, second=1)
+        self.assertEqual(first=self.pool.size_limit, second=3)
+        self.assertEqual(first=len(set(held)), second=3)
+
+    # -------------------------------------------------------------------------
+    async def test_many_waiting_tasks_do_not_grow_past_max_size(self) -> None:
+        # Build
+        await self.pool.open()
+
+        for _ in range(3):
+            await self.pool.adjust_size()
+
+        self.pool.acquire_timeout = 0.2
+        held: List[Any] = [await self.pool.get_connection()]
+
+        # Operate
+        results: List[Any] = await asyncio.gather(
+            *(self.pool.get_connection() for _ in range(10)), return_exceptions=True
+        )
+
+        # Check
+        held.extend(result for result in results if not isinstance(result, Exception))
+
+        self.assertEqual(first=self.pool.size_limit, second=self.pool.max_size)
+        self.assertLessEqual(a=self.pool.pool_size, b=self.pool.max_size)
+        self.assertEqual(first=len(set(held)), second=self.pool.max_size)
@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_async_mysql_database_api`, a set of test cases used to control the performance
+and quality of the `async_mysql_database_api` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.2.0"
+
+import unittest
+
+import asyncio
+
+from mysql.connector import errorcode
+from mysql.connector.errors import OperationalError, ProgrammingError
+from string import Template
+
+from prototyping.database_prototypes.database_module import SingleFlight
+from prototyping.database_prototypes.tests.fake_mysql import FakeServer, create_api
+
+from typing import Any, List, Sequence
+
+
+# _____________________________________________________________________________
+class TestTemplateQueryReconnect(unittest.IsolatedAsyncioTestCase):
+    async def test_lost_connection_is_retried_once(self) -> None:
+        for use_pool in (True, False):
+            with self.subTest(use_pool=use_pool):
+                # Build
+                failures: List[int] = [errorcode.CR_SERVER_LOST]
+
+                def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+                    if failures:
+                        raise OperationalError(errno=failures.pop())
+
+                    return []
+
+                server = FakeServer(handle_query=handle_query)
+                api = await create_api(server=server)
+                execute_sql_query = (
+                    api.execute_sql_query_use_pool
+                    if use_pool
+                    else api.execute_sql_query_to_database
+                )
+
+                # Operate
+                await execute_sql_query(
+                    query_template=Template("DELETE FROM orders WHERE id = $id"),
+                    query_data={"id": "1"},
+                )
+
+                # Check
+                self.assertEqual(
+                    first=[query for query, _ in server.executed],
+                    second=["DELETE FROM orders WHERE id = 1"] * 2,
+                )
+                self.assertEqual(first=server.rollbacks, second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_failed_query_is_raised(self) -> None:
+        for use_pool in (True, False):
+            with self.subTest(use_pool=use_pool):
+                # Build
+                def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+                    raise ProgrammingError(errno=errorcode.ER_NO_SUCH_TABLE)
+
+                server = FakeServer(handle_query=handle_query)
+                api = await create_api(server=server)
+                execute_sql_query = (
+                    api.execute_sql_query_use_pool
+                    if use_pool
+                    else api.execute_sql_query_to_database
+                )
+
+                # Check
+                with self.assertRaises(expected_exception=ProgrammingError):
+                    # Operate
+                    await execute_sql_query(
+                        query_template=Template("DELETE FROM orders WHERE id = $id"),
+                        query_data={"id": "1"},
+                    )
+
+                self.assertEqual(first=server.commits, second=0)
+
+
+# _____________________________________________________________________________
+class TestReadCoalescing(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        async def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+            await asyncio.sleep(0.01)
+
+            return [(query.split("'")[1],)]
+
+        self.server = FakeServer(handle_query=handle_query)
+
+    # -------------------------------------------------------------------------
+    async def test_identical_reads_share_one_query(self) -> None:
+        # Build
+        api = await create_api(server=self.server, read_coalescer=SingleFlight())
+        query = "SELECT name FROM products WHERE tag = 'a#1'"
+
+        # Operate
+        results = await asyncio.gather(
+            api.fetch_all(query=query), api.fetch_all(query=query)
+        )
+
+        # Check
+        self.assertEqual(first=results, second=[[("a#1",)], [("a#1",)]])
+        self.assertEqual(first=len(self.server.executed), second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_reads_differing_after_a_comment_marker_are_not_merged(self) -> None:
+        # Build
+        api = await create_api(server=self.server, read_coalescer=SingleFlight())
+
+        # Operate
+        results = await asyncio.gather(
+            api.fetch_all(query="SELECT name FROM products WHERE tag = 'a#1'"),
+            api.fetch_all(query="SELECT name FROM products WHERE tag = 'a#2'"),
+            api.fetch_all(query="SELECT name FROM products WHERE tag = 'a -- 3'"),
+        )
+
+        # Check
+        self.assertEqual(
+            first=results, second=[[("a#1",)], [("a#2",)], [("a -- 3",)]]
+        )
+        self.assertEqual(first=len(self.server.executed), second=3)
+
+
+# _____________________________________________________________________________
+class TestStream(unittest.IsolatedAsyncioTestCase):
+    async def test_stream_closed_early_drains_its_cursor_first(self) -> None:
+        for use_pool in (True, False):
+            with self.subTest(use_pool=use_pool):
+                # Build
+                server = FakeServer(
+                    handle_query=lambda query, parameters: [(0,), (1,), (2,), (3,), (4,)]
+                )
+                api = await create_api(server=server)
+                stream = (
+                    api.stream_use_pool(query="SELECT id FROM orders", chunk_size=2)
+                    if use_pool
+                    else api.stream_from_database(
+                        query="SELECT id FROM orders", chunk_size=2
+                    )
+                )
+
+                # Operate
+                async for chunk in stream:
+                    break
+
+                await stream.aclose()
+
+                # Check
+                self.assertEqual(first=list(chunk), second=[(0,), (1,)])
+                self.assertEqual(first=server.unread_rows_at_close, second=[0])
+                self.assertEqual(first=server.rollbacks, second=1)
@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_async_sqlite_database_api`, a set of test cases used to control the performance
+and quality of the `async_sqlite_database_api` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import unittest
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from dataclasses import dataclass
+from string import Template
+
+from prototyping.database_prototypes.database_module import (
+    KeysetPaginator,
+    QueryResultCache,
+    RowMapper,
+    SingleFlight,
+)
+from prototyping.database_prototypes.database_module.bulk_write_statistics import (
+    BulkWriteStatistics,
+)
+from prototyping.database_prototypes.sqlite_database_module import (
+    AsyncSQLiteAPI,
+    AsyncSQLiteConnection,
+    AsyncSQLiteConnectionPool,
+    connect_sqlite,
+)
+
+from typing import Any, List
+
+
+# _____________________________________________________________________________
+@dataclass(slots=True)
+class Product:
+    product_id: int
+    name: str
+    price: float
+
+
+# _____________________________________________________________________________
+class SQLiteTestCase(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.database: str = os.path.join(directory.name, "shop.db")
+
+        with sqlite3.connect(self.database) as connection:
+            connection.execute(
+                "CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT, price REAL)"
+            )
+            connection.executemany(
+                "INSERT INTO products VALUES (?, ?, ?)",
+                [(index, f"product {index}", index * 10.0) for index in range(1, 6)],
+            )
+
+        connection.close()
+
+    # -------------------------------------------------------------------------
+    async def create_api(self, latency: float = 0.0, **kwargs: Any) -> AsyncSQLiteAPI:
+        separate_connection: AsyncSQLiteConnection = await connect_sqlite(
+            database=self.database
+        )
+        pool = AsyncSQLiteConnectionPool(
+            connect_method=connect_sqlite,
+            connection_data={"database": self.database, "latency": latency},
+            pool_size=3,
+        )
+        await pool.open()
+        self.addAsyncCleanup(separate_connection.close)
+        self.addAsyncCleanup(pool.close)
+
+        api = AsyncSQLiteAPI(**kwargs)
+        await api.set_up(separate_connection=separate_connection, pool=pool)
+
+        return api
+
+    # -------------------------------------------------------------------------
+    def update_behind_api(self, query: str, parameters: Any = ()) -> None:
+        with sqlite3.connect(self.database) as connection:
+            connection.execute(query, parameters)
+
+        connection.close()
+
+
+# _____________________________________________________________________________
+class TestTemplateQuery(SQLiteTestCase):
+    async def test_failed_query_is_raised(self) -> None:
+        # Build
+        api = await self.create_api()
+
+        for execute_sql_query in (
+            api.execute_sql_query_use_pool,
+            api.execute_sql_query_to_database,
+        ):
+            with self.subTest(method=execute_sql_query.__name__):
+                # Check
+                with self.assertRaises(expected_exception=sqlite3.Error):
+                    # Operate
+                    await execute_sql_query(
+                        query_template=Template("DELETE FROM orders WHERE id = $id"),
+                        query_data={"id": "1"},
+                    )
+
+
+# _____________________________________________________________________________
+class TestResultCache(SQLiteTestCase):
+    async def test_cached_read_is_served_until_the_table_is_written(self) -> None:
+        # Build
+        api = await self.create_api(result_cache=QueryResultCache())
+        query = "SELECT name FROM products WHERE id = %s"
+
+        # Operate
+        first_rows = await api.fetch_all(query=query, parameters=(1,), cache_ttl=60)
+        self.update_behind_api(
+            query="UPDATE products SET name = 'renamed' WHERE id = 1"
+        )
+        cached_rows = await api.fetch_all(query=query, parameters=(1,), cache_ttl=60)
+        await api.execute(query="UPDATE products SET price = 0 WHERE id = 2")
+        fresh_rows = await api.fetch_all(query=query, parameters=(1,), cache_ttl=60)
+
+        # Check
+        self.assertEqual(first=first_rows, second=[("product 1",)])
+        self.assertEqual(first=cached_rows, second=[("product 1",)])
+        self.assertEqual(first=fresh_rows, second=[("renamed",)])
+        self.assertEqual(first=api.result_cache.statistics.hits, second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_cached_rows_are_not_changed_by_the_caller(self) -> None:
+        # Build
+        api = await self.create_api(result_cache=QueryResultCache())
+        query = "SELECT id FROM products WHERE id <= %s"
+        rows = await api.fetch_all(query=query, parameters=(2,), cache_ttl=60)
+
+        # Operate
+        rows.clear()
+
+        # Check
+        self.assertEqual(
+            first=await api.fetch_all(query=query, parameters=(2,), cache_ttl=60),
+            second=[(1,), (2,)],
+        )
+
+
+# _____________________________________________________________________________
+class TestReadCoalescing(SQLiteTestCase):
+    async def test_identical_reads_share_one_query(self) -> None:
+        # Build
+        api = await self.create_api(latency=0.01, read_coalescer=SingleFlight())
+        query = "SELECT name FROM products WHERE name = 'product 1' OR name = 'a#1'"
+
+        # Operate
+        results = await asyncio.gather(
+            api.fetch_all(query=query), api.fetch_all(query=query)
+        )
+
+        # Check
+        self.assertEqual(first=results, second=[[("product 1",)]] * 2)
+        self.assertEqual(first=api.read_coalescer.statistics.executions, second=1)
+        self.assertEqual(first=api.read_coalescer.statistics.shared, second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_reads_differing_in_a_literal_are_not_merged(self) -> None:
+        # Build
+        api = await self.create_api(latency=0.01, read_coalescer=SingleFlight())
+
+        # Operate
+        results = await asyncio.gather(
+            api.fetch_all(query="SELECT 'a#1' AS tag"),
+            api.fetch_all(query="SELECT 'a#2' AS tag"),
+            api.fetch_all(query="SELECT 'a -- 3' AS tag"),
+        )
+
+        # Check
+        self.assertEqual(
+            first=results, second=[[("a#1",)], [("a#2",)], [("a -- 3",)]]
+        )
+        self.assertEqual(first=api.read_coalescer.statistics.shared, second=0)
+
+
+# _____________________________________________________________________________
+class TestTransaction(SQLiteTestCase):
+    async def test_queries_of_a_scope_are_committed_together(self) -> None:
+        for use_pool in (True, False):
+            with self.subTest(use_pool=use_pool):
+                # Build
+                api = await self.create_api()
+                product_id: int = 1 if use_pool else 2
+
+                # Operate
+                async with api.transaction(use_pool=use_pool) as transaction:
+                    await transaction.execute(
+                        query="UPDATE products SET price = price - 5 WHERE id = %s",
+                        parameters=(product_id,),
+                    )
+                    await transaction.execute(
+                        query="UPDATE products SET price = price + 5 WHERE id = %s",
+                        parameters=(product_id + 2,),
+                    )
+
+                # Check
+                self.assertEqual(
+                    first=await api.fetch_all(
+                        query="SELECT price FROM products WHERE id IN (%s, %s) ORDER BY id",
+                        parameters=(product_id, product_id + 2),
+                    ),
+                    second=[
+                        (product_id * 10.0 - 5,),
+                        ((product_id + 2) * 10.0 + 5,),
+                    ],
+                )
+
+    # -------------------------------------------------------------------------
+    async def test_failed_scope_is_rolled_back(self) -> None:
+        # Build
+        api = await self.create_api()
+
+        # Operate
+        with self.assertRaises(expected_exception=sqlite3.IntegrityError):
+            async with api.transaction() as transaction:
+                await transaction.execute(
+                    query="UPDATE products SET name = 'changed' WHERE id = %s",
+                    parameters=(1,),
+                )
+                await transaction.execute(
+                    query="INSERT INTO products VALUES (%s, %s, %s)",
+                    parameters=(2, "duplicate", 0.0),
+                )
+
+        # Check
+        self.assertEqual(
+            first=await api.fetch_one(
+                query="SELECT name FROM products WHERE id = %s", parameters=(1,)
+            ),
+            second=("product 1",),
+        )
+
+
+# _____________________________________________________________________________
+class TestExecuteMany(SQLiteTestCase):
+    async def test_statistics_count_the_rows_and_batches(self) -> None:
+        # Build
+        api = await self.create_api()
+
+        # Operate
+        statistics: BulkWriteStatistics = await api.execute_many_use_pool(
+            query="INSERT INTO products VALUES (%s, %s, %s)",
+            parameter_rows=[(index, "bulk", 1.0) for index in range(6, 11)],
+            batch_size=2,
+        )
+
+        # Check
+        self.assertEqual(
+            first=(statistics.rows, statistics.statements, statistics.affected_rows),
+            second=(5, 3, 5),
+        )
+        self.assertEqual(
+            first=await api.fetch_one(query="SELECT COUNT(*) FROM products"),
+            second=(10,),
+        )
+
+
+# _____________________________________________________________________________
+class TestKeysetPagination(SQLiteTestCase):
+    async def test_pages_are_read_forward_and_back(self) -> None:
+        # Build
+        api = await self.create_api()
+        paginator = KeysetPaginator(
+            select_query="SELECT id, name, price FROM products",
+            id_column="id",
+            sort_column="price",
+            sort_position=2,
+            page_size=2,
+            descending=True,
+        )
+
+        # Operate
+        first_page = await paginator.fetch_page(fetch_method=api.fetch_all)
+        second_page = await paginator.fetch_page(
+            fetch_method=api.fetch_all, cursor=first_page.next_cursor
+        )
+        last_page = await paginator.fetch_page(
+            fetch_method=api.fetch_all, cursor=second_page.next_cursor
+        )
+        previous_page = await paginator.fetch_page(
+            fetch_method=api.fetch_all, cursor=last_page.prev_cursor
+        )
+
+        # Check
+        self.assertEqual(
+            first=[
+                [row[0] for row in page.rows]
+                for page in (first_page, second_page, last_page, previous_page)
+            ],
+            second=[[5, 4], [3, 2], [1], [3, 2]],
+        )
+        self.assertIsNone(obj=first_page.prev_cursor)
+        self.assertIsNone(obj=last_page.next_cursor)
+
+
+# _____________________________________________________________________________
+class TestRowMapping(SQLiteTestCase):
+    async def test_rows_are_mapped_by_column_name(self) -> None:
+        # Build
+        api = await self.create_api()
+        row_mapper = RowMapper(record_type=Product, columns={"product_id": "id"})
+
+        # Operate
+        products: List[Product] = await api.fetch_records_use_pool(
+            query="SELECT price, name, id FROM products WHERE id <= %s ORDER BY id",
+            row_mapper=row_mapper,
+            parameters=(2,),
+        )
+
+        # Check
+        self.assertEqual(
+            first=products,
+            second=[Product(1, "product 1", 10.0), Product(2, "product 2", 20.0)],
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_columns_are_transposed(self) -> None:
+        # Build
+        api = await self.create_api()
+
+        # Operate
+        columns = await api.fetch_columns_use_pool(
+            query="SELECT id, name FROM products WHERE id <= %s ORDER BY id",
+            parameters=(3,),
+        )
+
+        # Check
+        self.assertEqual(first=list(columns["id"]), second=[1, 2, 3])
+        self.assertEqual(
+            first=columns["name"], second=["product 1", "product 2", "product 3"]
+        )
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_bulk_write`, a set of test cases used to control the performance
+and quality of the `bulk_write` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+from prototyping.database_prototypes.mysql_database_module import bulk_write
+from prototyping.database_prototypes.tests.fake_mysql import FakeServer, create_api
+
+from typing import Any, List, Sequence, Tuple
+
+
+# The packet limit of the tests, fitting three rows of `ROW`.
+MAX_PACKET_SIZE: int = 200
+ROW: Tuple[str] = ("x" * 20,)
+
+
+# _____________________________________________________________________________
+class TestIterateBatches(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.builder = bulk_write.BulkInsertStatementBuilder(
+            table="products", columns=["name"]
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_rows_are_split_at_the_packet_size(self) -> None:
+        # Build
+        rows: List[Sequence[Any]] = [ROW] * 7
+
+        # Operate
+        batches: List[Tuple[List[Sequence[Any]], int]] = [
+            batch
+            async for batch in bulk_write.iterate_batches(
+                rows=rows,
+                max_rows=100,
+                max_size=MAX_PACKET_SIZE,
+                builder=self.builder,
+            )
+        ]
+
+        # Check
+        self.assertEqual(
+            first=[len(batch_rows) for batch_rows, _ in batches], second=[3, 3, 1]
+        )
+
+        for _, size in batches:
+            self.assertLessEqual(
+                a=self.builder.statement_overhead + size, b=MAX_PACKET_SIZE
+            )
+
+    # -------------------------------------------------------------------------
+    async def test_rows_are_split_at_the_row_count(self) -> None:
+        # Build
+        rows: List[Sequence[Any]] = [ROW] * 5
+
+        # Operate
+        batches: List[Tuple[List[Sequence[Any]], int]] = [
+            batch
+            async for batch in bulk_write.iterate_batches(
+                rows=rows,
+                max_rows=2,
+                max_size=MAX_PACKET_SIZE,
+                builder=self.builder,
+            )
+        ]
+
+        # Check
+        self.assertEqual(
+            first=[len(batch_rows) for batch_rows, _ in batches], second=[2, 2, 1]
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_oversized_row_is_rejected(self) -> None:
+        # Build
+        rows: List[Sequence[Any]] = [ROW, ("x" * MAX_PACKET_SIZE,)]
+
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            async for _ in bulk_write.iterate_batches(
+                rows=rows,
+                max_rows=100,
+                max_size=MAX_PACKET_SIZE,
+                builder=self.builder,
+            ):
+                pass
+
+
+# _____________________________________________________________________________
+class TestBulkInsert(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+
+        def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+            if query == "SELECT @@max_allowed_packet":
+                return [(MAX_PACKET_SIZE,)]
+
+            return []
+
+        self.server = FakeServer(handle_query=handle_query)
+
+    # -------------------------------------------------------------------------
+    def get_inserts(self) -> List[Tuple[str, Tuple[Any, ...]]]:
+        return [
+            (query, parameters)
+            for query, parameters in self.server.executed
+            if query.startswith("INSERT")
+        ]
+
+    # -------------------------------------------------------------------------
+    async def test_statements_fit_max_allowed_packet(self) -> None:
+        # Build
+        api = await create_api(server=self.server)
+
+        # Operate
+        statistics = await api.bulk_insert_use_pool(
+            table="products", columns=["name"], rows=[ROW] * 7
+        )
+
+        # Check
+        self.assertEqual(
+            first=[len(parameters) for _, parameters in self.get_inserts()],
+            second=[3, 3, 1],
+        )
+        self.assertEqual(first=(statistics.rows, statistics.statements), second=(7, 3))
+        self.assertEqual(first=self.server.commits, second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_oversized_row_rolls_back_the_write(self) -> None:
+        # Build
+        api = await create_api(server=self.server)
+        rows: List[Sequence[Any]] = [ROW] * 4 + [("x" * MAX_PACKET_SIZE,)]
+
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            await api.bulk_insert_use_pool(
+                table="products", columns=["name"], rows=rows
+            )
+
+        self.assertEqual(first=len(self.get_inserts()), second=1)
+        self.assertEqual(
+            first=(self.server.commits, self.server.rollbacks), second=(0, 1)
+        )
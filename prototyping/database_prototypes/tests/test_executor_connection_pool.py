@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_executor_connection_pool`, a set of test cases used to control the performance
+and quality of the `executor_connection_pool` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.2.0"
+
+import unittest
+
+import asyncio
+import threading
+
+from prototyping.database_prototypes.mysql_database_module import (
+    executor_connection_pool,
+)
+
+from typing import List
+
+
+# _____________________________________________________________________________
+class FakeServerConnection:
+    def __init__(self) -> None:
+        self.connection_id: int = 1
+
+
+# _____________________________________________________________________________
+class FakePooledConnection:
+    def __init__(self, pool: "FakeConnectionPool") -> None:
+        self.pool = pool
+        self._cnx = pool.server_connection
+        self.connection_id: int = pool.server_connection.connection_id
+
+    # -------------------------------------------------------------------------
+    def close(self) -> None:
+        self.pool.free += 1
+
+    # -------------------------------------------------------------------------
+    def shutdown(self) -> None:
+        self.pool.shut_down += 1
+
+
+# _____________________________________________________________________________
+class FakeConnectionPool:
+    def __init__(self, pool_size: int) -> None:
+        self.pool_name = "test_pool"
+        self.pool_size = pool_size
+        self.free = pool_size
+        self.shut_down = 0
+        self.reset_session = False
+        self.server_connection = FakeServerConnection()
+        self.checkout_started = threading.Event()
+        self.checkout_allowed = threading.Event()
+
+    # -------------------------------------------------------------------------
+    def get_connection(self) -> FakePooledConnection:
+        self.checkout_started.set()
+        self.checkout_allowed.wait()
+        self.free -= 1
+
+        return FakePooledConnection(pool=self)
+
+    # -------------------------------------------------------------------------
+    def add_connection(self) -> None:
+        self.free += 1
+
+
+# _____________________________________________________________________________
+class TestGetConnection(unittest.IsolatedAsyncioTestCase):
+    async def test_cancelled_checkout_returns_the_connection(self) -> None:
+        # Build
+        fake_pool = FakeConnectionPool(pool_size=1)
+        pool = executor_connection_pool.ExecutorMySQLConnectionPool(
+            pool=fake_pool, acquire_timeout=1.0
+        )
+        getting = asyncio.create_task(pool.get_connection())
+        await asyncio.to_thread(fake_pool.checkout_started.wait)
+
+        # Operate
+        getting.cancel()
+        fake_pool.checkout_allowed.set()
+
+        with self.assertRaises(expected_exception=asyncio.CancelledError):
+            await getting
+
+        connection = await pool.get_connection()
+        await pool.release_connection(connection=connection)
+        await pool.close()
+
+        # Check
+        self.assertEqual(first=fake_pool.free, second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_connections_are_limited_to_pool_size(self) -> None:
+        # Build
+        fake_pool = FakeConnectionPool(pool_size=1)
+        fake_pool.checkout_allowed.set()
+        pool = executor_connection_pool.ExecutorMySQLConnectionPool(
+            pool=fake_pool, acquire_timeout=0.05
+        )
+        connections: List[executor_connection_pool.AsyncPooledMySQLConnection] = [
+            await pool.get_connection()
+        ]
+
+        # Check
+        with self.assertRaises(
+            expected_exception=executor_connection_pool.PoolError
+        ):
+            # Operate
+            connections.append(await pool.get_connection())
+
+        await pool.release_connection(connection=connections[0])
+        await pool.close()
+
+
+# _____________________________________________________________________________
+class TestDiscardConnection(unittest.IsolatedAsyncioTestCase):
+    async def test_discarded_connection_is_replaced_not_returned(self) -> None:
+        # Build
+        fake_pool = FakeConnectionPool(pool_size=1)
+        fake_pool.checkout_allowed.set()
+        pool = executor_connection_pool.ExecutorMySQLConnectionPool(
+            pool=fake_pool, acquire_timeout=0.05
+        )
+        connection = await pool.get_connection()
+
+        # Operate
+        await pool.discard_connection(connection=connection)
+
+        replacement = await pool.get_connection()
+        await pool.release_connection(connection=replacement)
+        await pool.close()
+
+        # Check
+        self.assertEqual(first=fake_pool.shut_down, second=1)
+        self.assertEqual(first=fake_pool.free, second=1)
+        self.assertEqual(
+            first=(pool.statistics.discarded, pool.statistics.created), second=(1, 1)
+        )
+
+
+# _____________________________________________________________________________
+class TestConnectionWrapper(unittest.IsolatedAsyncioTestCase):
+    async def test_same_session_is_handed_out_in_the_same_wrapper(self) -> None:
+        # Build
+        fake_pool = FakeConnectionPool(pool_size=1)
+        fake_pool.checkout_allowed.set()
+        pool = executor_connection_pool.ExecutorMySQLConnectionPool(pool=fake_pool)
+        wrappers: List[executor_connection_pool.AsyncPooledMySQLConnection] = []
+
+        # Operate
+        for connection_id in (1, 1, 2):
+            fake_pool.server_connection.connection_id = connection_id
+            connection = await pool.get_connection()
+            wrappers.append(connection)
+
+            await pool.release_connection(connection=connection)
+
+        await pool.close()
+
+        # Check
+        self.assertIs(expr1=wrappers[0], expr2=wrappers[1])
+        self.assertIsNot(expr1=wrappers[1], expr2=wrappers[2])
@@ -0,0 +1,292 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_index_advisor`, a set of test cases used to control the performance
+and quality of the `index_advisor` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+from prototyping.database_prototypes.mysql_database_module import index_advisor
+from prototyping.database_prototypes.mysql_database_module.index_advisor import (
+    IndexAdvice,
+    QueryProfile,
+    TableAccess,
+)
+
+from typing import Any, Dict, List
+
+
+# The plan of `EXPLAIN FORMAT=JSON` reading a whole table.
+FULL_SCAN_PLAN: Dict[str, Any] = {
+    "query_block": {
+        "select_id": 1,
+        "table": {
+            "table_name": "products",
+            "access_type": "ALL",
+            "rows_examined_per_scan": 12000,
+            "attached_condition": (
+                "((`shop`.`products`.`category_id` = 3)"
+                " and (`shop`.`products`.`price` > 10))"
+            ),
+        },
+    }
+}
+
+# The plan of `EXPLAIN FORMAT=JSON` sorting the rows without an index.
+FILESORT_PLAN: Dict[str, Any] = {
+    "query_block": {
+        "select_id": 1,
+        "ordering_operation": {
+            "using_filesort": True,
+            "table": {
+                "table_name": "orders",
+                "access_type": "ref",
+                "key": "idx_orders_user_id",
+                "rows_examined_per_scan": 40,
+                "attached_condition": "(`shop`.`orders`.`status` = 'paid')",
+            },
+        },
+    }
+}
+
+# The plan of `EXPLAIN FORMAT=JSON` joining two aliased tables.
+JOIN_PLAN: Dict[str, Any] = {
+    "query_block": {
+        "select_id": 1,
+        "nested_loop": [
+            {
+                "table": {
+                    "table_name": "u",
+                    "access_type": "const",
+                    "key": "PRIMARY",
+                    "rows_examined_per_scan": 1,
+                }
+            },
+            {
+                "table": {
+                    "table_name": "o",
+                    "access_type": "ALL",
+                    "rows_examined_per_scan": 50000,
+                    "attached_condition": (
+                        "((`shop`.`o`.`user_id` = `shop`.`u`.`id`)"
+                        " and (`shop`.`o`.`status` = 'paid'))"
+                    ),
+                }
+            },
+        ],
+    }
+}
+
+
+# _____________________________________________________________________________
+class TestBuildIndexAdvice(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tested_function = index_advisor.build_index_advice
+
+    # -------------------------------------------------------------------------
+    def test_full_scan_gets_equality_then_range_columns(self) -> None:
+        # Build
+        profile = QueryProfile(
+            fingerprint="select * from products where category_id = ? and price > ?",
+            calls=10,
+            total_time=2.5,
+            query="SELECT * FROM products WHERE category_id = %s AND price > %s",
+        )
+
+        # Operate
+        advice: IndexAdvice = self.tested_function(profile=profile, plan=FULL_SCAN_PLAN)
+
+        # Check
+        self.assertEqual(
+            first=[access.table_name for access in advice.full_scans],
+            second=["products"],
+        )
+        self.assertFalse(expr=advice.using_filesort)
+        self.assertEqual(
+            first=advice.suggested_indexes,
+            second=[
+                "CREATE INDEX idx_products_category_id_price "
+                "ON `products` (`category_id`, `price`)"
+            ],
+        )
+
+    # -------------------------------------------------------------------------
+    def test_filesort_gets_the_sort_columns_after_the_equality_ones(self) -> None:
+        # Build
+        profile = QueryProfile(
+            fingerprint="select id from orders where user_id = ? and status = ?",
+            query=(
+                "SELECT id FROM orders WHERE user_id = %s AND status = %s"
+                " ORDER BY created_at DESC LIMIT 10"
+            ),
+        )
+
+        # Operate
+        advice: IndexAdvice = self.tested_function(profile=profile, plan=FILESORT_PLAN)
+
+        # Check
+        self.assertEqual(first=advice.full_scans, second=[])
+        self.assertTrue(expr=advice.using_filesort)
+        self.assertEqual(
+            first=advice.suggested_indexes,
+            second=[
+                "CREATE INDEX idx_orders_status_created_at "
+                "ON `orders` (`status`, `created_at`)"
+            ],
+        )
+
+    # -------------------------------------------------------------------------
+    def test_join_alias_is_resolved_to_its_table(self) -> None:
+        # Build
+        profile = QueryProfile(
+            fingerprint="select o.id from users as u join orders o ...",
+            query=(
+                "SELECT o.id FROM users AS u JOIN orders o ON o.user_id = u.id"
+                " WHERE u.id = %s AND o.status = %s"
+            ),
+        )
+
+        # Operate
+        advice: IndexAdvice = self.tested_function(profile=profile, plan=JOIN_PLAN)
+
+        # Check
+        self.assertEqual(
+            first=[access.table_name for access in advice.full_scans], second=["o"]
+        )
+        self.assertEqual(
+            first=advice.suggested_indexes,
+            second=[
+                "CREATE INDEX idx_orders_user_id_status "
+                "ON `orders` (`user_id`, `status`)"
+            ],
+        )
+
+    # -------------------------------------------------------------------------
+    def test_plan_without_problems_has_no_advice(self) -> None:
+        # Build
+        profile = QueryProfile(
+            fingerprint="select * from users where id = ?",
+            query="SELECT * FROM users WHERE id = %s",
+        )
+        plan: Dict[str, Any] = {
+            "query_block": {
+                "table": {"table_name": "users", "access_type": "const"}
+            }
+        }
+
+        # Operate
+        advice: IndexAdvice = self.tested_function(profile=profile, plan=plan)
+
+        # Check
+        self.assertFalse(expr=advice.has_problems)
+        self.assertEqual(first=advice.suggested_indexes, second=[])
+
+
+# _____________________________________________________________________________
+class TestSuggestColumns(unittest.TestCase):
+    def test_range_column_comes_last_and_alone(self) -> None:
+        # Build
+        access = TableAccess(
+            table_name="p",
+            access_type="ALL",
+            attached_condition=(
+                "((`p`.`price` > 10) and (`p`.`category_id` = 3)"
+                " and (`p`.`stock` < 5))"
+            ),
+        )
+
+        # Operate
+        columns: List[str] = index_advisor._suggest_columns(
+            access=access,
+            query="SELECT * FROM products p WHERE ... ORDER BY p.name",
+            is_only_table=True,
+            needs_sorting=True,
+        )
+
+        # Check
+        self.assertEqual(first=columns, second=["category_id", "name", "price"])
+
+    # -------------------------------------------------------------------------
+    def test_columns_of_other_tables_are_skipped(self) -> None:
+        # Build
+        access = TableAccess(
+            table_name="o",
+            access_type="ALL",
+            attached_condition="((`u`.`name` = 'x') and (`o`.`status` in ('a','b')))",
+        )
+
+        # Operate
+        columns: List[str] = index_advisor._suggest_columns(
+            access=access, query="", is_only_table=False, needs_sorting=False
+        )
+
+        # Check
+        self.assertEqual(first=columns, second=["status"])
+
+
+# _____________________________________________________________________________
+class TestGetSortColumns(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tested_function = index_advisor._get_sort_columns
+
+    # -------------------------------------------------------------------------
+    def test_sort_columns_are_listed_in_order(self) -> None:
+        # Operate
+        columns: List[str] = self.tested_function(
+            query="SELECT * FROM orders ORDER BY created_at DESC, id LIMIT 10",
+            table_name="orders",
+            is_only_table=True,
+        )
+
+        # Check
+        self.assertEqual(first=columns, second=["created_at", "id"])
+
+    # -------------------------------------------------------------------------
+    def test_group_by_columns_come_first(self) -> None:
+        # Operate
+        columns: List[str] = self.tested_function(
+            query="SELECT category_id, COUNT(*) FROM products"
+            " GROUP BY category_id ORDER BY category_id",
+            table_name="products",
+            is_only_table=True,
+        )
+
+        # Check
+        self.assertEqual(first=columns, second=["category_id"])
+
+    # -------------------------------------------------------------------------
+    def test_listing_stops_at_an_expression_or_another_table(self) -> None:
+        for query, table_name, is_only_table, expected_columns in (
+            ("SELECT * FROM products ORDER BY LOWER(name), id", "products", True, []),
+            (
+                "SELECT * FROM orders o JOIN users u ON u.id = o.user_id"
+                " ORDER BY o.created_at, u.name",
+                "o",
+                False,
+                ["created_at"],
+            ),
+            (
+                "SELECT * FROM orders o JOIN users u ON u.id = o.user_id"
+                " ORDER BY created_at",
+                "o",
+                False,
+                [],
+            ),
+        ):
+            with self.subTest(query=query):
+                # Operate
+                columns: List[str] = self.tested_function(
+                    query=query, table_name=table_name, is_only_table=is_only_table
+                )
+
+                # Check
+                self.assertEqual(first=columns, second=expected_columns)
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_keyset_pagination`, a set of test cases used to control the performance
+and quality of the `keyset_pagination` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.1.0"
+
+import unittest
+
+import datetime
+import decimal
+import sqlite3
+
+from prototyping.database_prototypes.database_module import keyset_pagination
+
+from typing import Any, List, Sequence
+
+
+# _____________________________________________________________________________
+class PaginationTestCase(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.connection = sqlite3.connect(":memory:")
+        self.addCleanup(self.connection.close)
+        self.connection.execute(
+            "CREATE TABLE products (id INTEGER PRIMARY KEY, name TEXT NOT NULL)"
+        )
+
+    # -------------------------------------------------------------------------
+    def insert_products(self, names: Sequence[str]) -> None:
+        self.connection.executemany(
+            "INSERT INTO products (name) VALUES (?)", [(name,) for name in names]
+        )
+
+    # -------------------------------------------------------------------------
+    async def fetch_all(self, query: str, parameters: Sequence[Any]) -> List[Any]:
+        return self.connection.execute(query.replace("%s", "?"), parameters).fetchall()
+
+
+# _____________________________________________________________________________
+class TestCursorTokens(unittest.TestCase):
+    def test_keys_of_every_type_survive_a_round_trip(self) -> None:
+        for sort_value in (
+            None,
+            True,
+            -42,
+            19.99,
+            decimal.Decimal("19.99"),
+            datetime.datetime(2024, 5, 1, 12, 30),
+            datetime.date(2024, 5, 1),
+            "кошка ~>",
+        ):
+            with self.subTest(sort_value=sort_value):
+                # Build
+                cursor = keyset_pagination.KeysetCursor(
+                    sort_value=sort_value, row_id=7, forward=False
+                )
+
+                # Operate
+                decoded_cursor = keyset_pagination.decode_cursor(
+                    token=keyset_pagination.encode_cursor(cursor=cursor)
+                )
+
+                # Check
+                self.assertEqual(first=decoded_cursor, second=cursor)
+                self.assertIs(
+                    expr1=type(decoded_cursor.sort_value), expr2=type(sort_value)
+                )
+
+    # -------------------------------------------------------------------------
+    def test_token_of_the_pages_sorted_by_id_holds_the_id_alone(self) -> None:
+        # Build
+        cursor = keyset_pagination.KeysetCursor(sort_value=12345, row_id=12345)
+
+        # Operate
+        token: str = keyset_pagination.encode_cursor(cursor=cursor, sorted_by_id=True)
+
+        # Check
+        self.assertEqual(first=token, second=">i9ix")
+        self.assertEqual(
+            first=keyset_pagination.decode_cursor(token=token), second=cursor
+        )
+
+    # -------------------------------------------------------------------------
+    def test_malformed_tokens_are_rejected(self) -> None:
+        for token in (
+            "",
+            "i7",
+            ">",
+            ">i7~i8~i9",
+            ">q7",
+            ">i7!",
+            ">n1",
+            ">b2",
+            ">d2024-13-01",
+        ):
+            with self.subTest(token=token):
+                # Check
+                with self.assertRaises(expected_exception=ValueError):
+                    # Operate
+                    keyset_pagination.decode_cursor(token=token)
+
+    # -------------------------------------------------------------------------
+    def test_key_of_an_unsupported_type_is_rejected(self) -> None:
+        # Build
+        cursor = keyset_pagination.KeysetCursor(sort_value=b"bytes", row_id=1)
+
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            keyset_pagination.encode_cursor(cursor=cursor)
+
+
+# _____________________________________________________________________________
+class TestPages(PaginationTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.insert_products(names=[f"product {index}" for index in range(1, 6)])
+        self.paginator = keyset_pagination.KeysetPaginator(
+            select_query="SELECT id, name FROM products", id_column="id", page_size=2
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_backward_pages_lead_to_the_first_page(self) -> None:
+        # Build
+        page = await self.paginator.fetch_page(fetch_method=self.fetch_all)
+
+        while page.next_cursor is not None:
+            page = await self.paginator.fetch_page(
+                fetch_method=self.fetch_all, cursor=page.next_cursor
+            )
+
+        # Operate
+        pages: List[keyset_pagination.KeysetPage] = [page]
+
+        while pages[-1].prev_cursor is not None:
+            pages.append(
+                await self.paginator.fetch_page(
+                    fetch_method=self.fetch_all, cursor=pages[-1].prev_cursor
+                )
+            )
+
+        # Check
+        self.assertEqual(
+            first=[[row[0] for row in page.rows] for page in pages],
+            second=[[5], [3, 4], [1, 2]],
+        )
+        self.assertEqual(
+            first=[page.next_cursor is not None for page in pages],
+            second=[False, True, True],
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_malformed_token_is_rejected(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            await self.paginator.fetch_page(fetch_method=self.fetch_all, cursor=">q7")
+
+
+# _____________________________________________________________________________
+class TestLongSortKeys(PaginationTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.insert_products(names=[f"{letter * 45} product" for letter in "edcba"])
+        self.paginator = keyset_pagination.KeysetPaginator(
+            select_query="SELECT id, name FROM products",
+            id_column="id",
+            sort_column="name",
+            sort_position=1,
+            page_size=2,
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_pages_sorted_by_a_long_text_are_served(self) -> None:
+        # Build
+        pages: List[keyset_pagination.KeysetPage] = [
+            await self.paginator.fetch_page(fetch_method=self.fetch_all)
+        ]
+
+        # Operate
+        while pages[-1].next_cursor is not None:
+            pages.append(
+                await self.paginator.fetch_page(
+                    fetch_method=self.fetch_all, cursor=pages[-1].next_cursor
+                )
+            )
+
+        previous_page = await self.paginator.fetch_page(
+            fetch_method=self.fetch_all, cursor=pages[-1].prev_cursor
+        )
+
+        # Check
+        self.assertEqual(
+            first=[[row[0] for row in page.rows] for page in pages],
+            second=[[5, 4], [3, 2], [1]],
+        )
+        self.assertEqual(first=[row[0] for row in previous_page.rows], second=[3, 2])
+
+        for page in pages:
+            for token in (page.next_cursor, page.prev_cursor):
+                if token is not None:
+                    self.assertLessEqual(
+                        a=len(token.encode()), b=keyset_pagination.CALLBACK_DATA_LIMIT
+                    )
+
+    # -------------------------------------------------------------------------
+    async def test_cursor_of_a_deleted_row_is_rejected(self) -> None:
+        # Build
+        first_page = await self.paginator.fetch_page(fetch_method=self.fetch_all)
+        self.connection.execute("DELETE FROM products WHERE id = 4")
+
+        # Operate
+        with self.assertRaises(expected_exception=ValueError):
+            await self.paginator.fetch_page(
+                fetch_method=self.fetch_all, cursor=first_page.next_cursor
+            )
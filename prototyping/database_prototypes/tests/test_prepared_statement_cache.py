@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_prepared_statement_cache`, a set of test cases used to control the performance
+and quality of the `prepared_statement_cache` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+from mysql.connector.errors import OperationalError
+
+from prototyping.database_prototypes.mysql_database_module import (
+    prepared_statement_cache,
+)
+
+from typing import Any, List
+
+
+# _____________________________________________________________________________
+class FakePreparedCursor:
+    def __init__(self, fail_on_close: bool = False) -> None:
+        self.fail_on_close = fail_on_close
+        self.is_closed: bool = False
+
+    # -------------------------------------------------------------------------
+    async def close(self) -> None:
+        self.is_closed = True
+
+        if self.fail_on_close:
+            raise OperationalError(msg="Lost connection to MySQL server")
+
+
+# _____________________________________________________________________________
+class FakeConnection:
+    def __init__(self) -> None:
+        self.cursors: List[FakePreparedCursor] = []
+        self.fail_on_close: bool = False
+
+    # -------------------------------------------------------------------------
+    async def cursor(self, prepared: bool = False) -> FakePreparedCursor:
+        cursor = FakePreparedCursor(fail_on_close=self.fail_on_close)
+        self.cursors.append(cursor)
+
+        return cursor
+
+
+# _____________________________________________________________________________
+class TestPreparedStatementCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.connection = FakeConnection()
+        self.statistics = prepared_statement_cache.PreparedStatementStatistics()
+        self.cache = prepared_statement_cache.PreparedStatementCache(
+            connection=self.connection, max_size=2, statistics=self.statistics
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_repeated_query_reuses_its_statement(self) -> None:
+        # Operate
+        first_cursor: Any = await self.cache.get_cursor(query="SELECT %s")
+        second_cursor: Any = await self.cache.get_cursor(query="SELECT %s")
+
+        # Check
+        self.assertIs(expr1=first_cursor, expr2=second_cursor)
+        self.assertEqual(
+            first=(self.statistics.hits, self.statistics.misses), second=(1, 1)
+        )
+        self.assertEqual(first=self.statistics.hit_ratio, second=0.5)
+
+    # -------------------------------------------------------------------------
+    async def test_least_recently_used_statement_is_deallocated(self) -> None:
+        # Build
+        products_cursor: Any = await self.cache.get_cursor(query="SELECT products")
+        orders_cursor: Any = await self.cache.get_cursor(query="SELECT orders")
+        await self.cache.get_cursor(query="SELECT products")
+
+        # Operate
+        await self.cache.get_cursor(query="SELECT users")
+
+        # Check
+        self.assertTrue(expr=orders_cursor.is_closed)
+        self.assertFalse(expr=products_cursor.is_closed)
+        self.assertEqual(first=len(self.cache), second=2)
+        self.assertEqual(first=self.statistics.evictions, second=1)
+        self.assertIs(
+            expr1=await self.cache.get_cursor(query="SELECT products"),
+            expr2=products_cursor,
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_discarded_statement_is_deallocated(self) -> None:
+        # Build
+        cursor: Any = await self.cache.get_cursor(query="SELECT %s")
+
+        # Operate
+        await self.cache.discard(query="SELECT %s")
+
+        # Check
+        self.assertTrue(expr=cursor.is_closed)
+        self.assertEqual(first=len(self.cache), second=0)
+
+    # -------------------------------------------------------------------------
+    async def test_close_deallocates_all_statements(self) -> None:
+        # Build
+        self.connection.fail_on_close = True
+        await self.cache.get_cursor(query="SELECT products")
+        await self.cache.get_cursor(query="SELECT orders")
+
+        # Operate
+        await self.cache.close()
+
+        # Check
+        self.assertEqual(
+            first=[cursor.is_closed for cursor in self.connection.cursors],
+            second=[True, True],
+        )
+        self.assertEqual(first=len(self.cache), second=0)
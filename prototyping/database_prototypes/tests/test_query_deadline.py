@@ -0,0 +1,336 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_query_deadline`, a set of test cases used to control the performance
+and quality of the `query_deadline` module components,
+and of the interruption of the queries by the MySQL API.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.2.0"
+
+import unittest
+
+import asyncio
+import time
+
+from mysql.connector import errorcode
+from mysql.connector.errors import OperationalError
+
+from prototyping.database_prototypes.mysql_database_module import AsyncMySQLAPI
+from prototyping.database_prototypes.database_module.row_mapping import RowMapper
+from prototyping.database_prototypes.mysql_database_module.query_deadline import (
+    QueryDeadline,
+)
+from prototyping.database_prototypes.tests.fake_mysql import (
+    FakeQueryKiller,
+    FakeServer,
+    create_api,
+)
+
+from typing import Any, NamedTuple, Sequence
+
+
+# _____________________________________________________________________________
+class Product(NamedTuple):
+    value: int
+
+
+# _____________________________________________________________________________
+class TestQueryDeadline(unittest.TestCase):
+    def test_remaining_time_is_negative_once_expired(self) -> None:
+        # Build
+        deadline = QueryDeadline(expires_at=time.monotonic() - 1, query_killer=None)
+
+        # Operate
+        remaining_time = deadline.get_remaining_time()
+
+        # Check
+        self.assertLess(a=remaining_time, b=0)
+
+    # -------------------------------------------------------------------------
+    def test_no_expiry_has_no_remaining_time(self) -> None:
+        # Build
+        deadline = QueryDeadline(expires_at=None, query_killer=None)
+
+        # Operate
+        remaining_time = deadline.get_remaining_time()
+
+        # Check
+        self.assertIsNone(obj=remaining_time)
+
+
+# _____________________________________________________________________________
+class TestQueryInterruption(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.killed = asyncio.Event()
+
+        async def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+            # A slow query ends only when it is killed.
+            await self.killed.wait()
+
+            raise OperationalError(errno=errorcode.ER_QUERY_INTERRUPTED)
+
+        self.server = FakeServer(handle_query=handle_query)
+
+        def kill(connection_id: int) -> bool:
+            self.killed.set()
+
+            return True
+
+        self.query_killer = FakeQueryKiller(handle_kill=kill)
+
+    # -------------------------------------------------------------------------
+    async def test_expired_query_is_killed_and_raises_TimeoutError(self) -> None:
+        # Build
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server, query_killer=self.query_killer, query_timeout=0.05
+        )
+
+        # Check
+        with self.assertRaises(expected_exception=TimeoutError):
+            # Operate
+            await api.fetch_all(query="SELECT SLEEP(10)")
+
+        statistics = await api.get_query_deadline_statistics()
+
+        self.assertEqual(first=(statistics.timeouts, statistics.kills), second=(1, 1))
+        self.assertEqual(first=statistics.discarded_connections, second=0)
+        self.assertEqual(
+            first=(await api.get_pool_statistics()).discarded, second=0
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_typed_reads_take_a_timeout(self) -> None:
+        # Build
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server, query_killer=self.query_killer
+        )
+
+        for read in (
+            lambda: api.fetch_records_use_pool(
+                query="SELECT SLEEP(10)",
+                row_mapper=RowMapper(record_type=Product),
+                timeout=0.05,
+            ),
+            lambda: api.fetch_columns_use_pool(query="SELECT SLEEP(10)", timeout=0.05),
+        ):
+            with self.subTest(read=read):
+                self.killed.clear()
+
+                # Check
+                with self.assertRaises(expected_exception=TimeoutError):
+                    # Operate
+                    await read()
+
+        statistics = await api.get_query_deadline_statistics()
+
+        self.assertEqual(first=(statistics.timeouts, statistics.kills), second=(2, 2))
+
+    # -------------------------------------------------------------------------
+    async def test_cancelled_query_is_killed(self) -> None:
+        # Build
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server, query_killer=self.query_killer
+        )
+        task = asyncio.create_task(api.fetch_all(query="SELECT SLEEP(10)"))
+        await asyncio.sleep(0.02)
+
+        # Operate
+        task.cancel()
+
+        # Check
+        with self.assertRaises(expected_exception=asyncio.CancelledError):
+            await task
+
+        statistics = await api.get_query_deadline_statistics()
+
+        self.assertEqual(
+            first=(statistics.cancellations, statistics.kills), second=(1, 1)
+        )
+        self.assertEqual(first=self.server.commits, second=0)
+
+    # -------------------------------------------------------------------------
+    async def test_failed_kill_discards_the_connection(self) -> None:
+        # Build
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server,
+            query_killer=FakeQueryKiller(handle_kill=lambda connection_id: False),
+            query_timeout=0.05,
+            kill_grace_period=0.05,
+        )
+
+        # Check
+        with self.assertRaises(expected_exception=TimeoutError):
+            # Operate
+            await api.fetch_all(query="SELECT SLEEP(10)")
+
+        statistics = await api.get_query_deadline_statistics()
+
+        self.assertEqual(
+            first=(statistics.kill_failures, statistics.discarded_connections),
+            second=(1, 1),
+        )
+        self.assertEqual(first=self.server.rollbacks, second=0)
+        self.assertEqual(
+            first=(await api.get_pool_statistics()).discarded, second=1
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_query_finished_before_the_kill_keeps_its_connection(self) -> None:
+        # Build
+        async def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+            await asyncio.sleep(0.08)
+
+            return [(1,)]
+
+        async def kill(connection_id: int) -> bool:
+            # The kill reaches the server after the query has ended.
+            await asyncio.sleep(0.06)
+
+            return True
+
+        server = FakeServer(handle_query=handle_query)
+        api: AsyncMySQLAPI = await create_api(
+            server=server,
+            query_killer=FakeQueryKiller(handle_kill=kill),
+            query_timeout=0.05,
+        )
+
+        # Check
+        with self.assertRaises(expected_exception=TimeoutError):
+            # Operate
+            await api.fetch_all(query="SELECT 1")
+
+        statistics = await api.get_query_deadline_statistics()
+
+        self.assertEqual(
+            first=(statistics.kills, statistics.kill_failures), second=(1, 0)
+        )
+        self.assertEqual(first=server.rollbacks, second=1)
+        self.assertEqual(
+            first=(await api.get_pool_statistics()).discarded, second=0
+        )
+
+
+# _____________________________________________________________________________
+class TestCommitInterruption(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.server = FakeServer()
+        self.server.commit_time = 10.0
+
+    # -------------------------------------------------------------------------
+    async def test_commit_past_the_deadline_discards_the_connection(self) -> None:
+        # Build
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server, query_timeout=0.05
+        )
+
+        # Check
+        with self.assertRaises(expected_exception=TimeoutError):
+            # Operate
+            await api.execute(query="UPDATE products SET price = 0")
+
+        self.assertEqual(first=self.server.rollbacks, second=0)
+        self.assertEqual(
+            first=(await api.get_pool_statistics()).discarded, second=1
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_cancelled_commit_is_not_rolled_back_meanwhile(self) -> None:
+        # Build
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server, kill_grace_period=0.05
+        )
+        task = asyncio.create_task(
+            api.execute(query="UPDATE products SET price = 0")
+        )
+        await asyncio.sleep(0.02)
+
+        # Operate
+        task.cancel()
+
+        # Check
+        with self.assertRaises(expected_exception=asyncio.CancelledError):
+            await task
+
+        self.assertEqual(first=self.server.rollbacks, second=0)
+        self.assertEqual(
+            first=(await api.get_pool_statistics()).discarded, second=1
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_cancelled_commit_finishing_in_the_grace_period_is_kept(
+        self,
+    ) -> None:
+        # Build
+        self.server.commit_time = 0.05
+        api: AsyncMySQLAPI = await create_api(
+            server=self.server, kill_grace_period=1.0
+        )
+        task = asyncio.create_task(
+            api.execute(query="UPDATE products SET price = 0")
+        )
+        await asyncio.sleep(0.02)
+
+        # Operate
+        task.cancel()
+
+        # Check
+        with self.assertRaises(expected_exception=asyncio.CancelledError):
+            await task
+
+        self.assertEqual(first=self.server.commits, second=1)
+        self.assertEqual(
+            first=(await api.get_pool_statistics()).discarded, second=0
+        )
+
+
+# _____________________________________________________________________________
+class TestTransactionStatementDeadline(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.killed = asyncio.Event()
+        self.blocked_statement: str = ""
+
+        async def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+            if query.startswith(self.blocked_statement):
+                # The statement waits for a lock until it is killed.
+                await self.killed.wait()
+
+                raise OperationalError(errno=errorcode.ER_QUERY_INTERRUPTED)
+
+            return []
+
+        def kill(connection_id: int) -> bool:
+            self.killed.set()
+
+            return True
+
+        self.server = FakeServer(handle_query=handle_query)
+        self.query_killer = FakeQueryKiller(handle_kill=kill)
+
+    # -------------------------------------------------------------------------
+    async def test_blocked_statements_are_killed_at_the_deadline(self) -> None:
+        for blocked_statement in ("START TRANSACTION", "SAVEPOINT", "RELEASE SAVEPOINT"):
+            with self.subTest(statement=blocked_statement):
+                # Build
+                self.blocked_statement = blocked_statement
+                self.killed.clear()
+                api: AsyncMySQLAPI = await create_api(
+                    server=self.server, query_killer=self.query_killer
+                )
+
+                # Check
+                with self.assertRaises(expected_exception=TimeoutError):
+                    # Operate
+                    async with api.transaction(timeout=0.05) as transaction:
+                        async with transaction.savepoint():
+                            pass
+
+                self.assertTrue(expr=self.killed.is_set())
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_query_fingerprint`, a set of test cases used to control the performance
+and quality of the `query_fingerprint` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+from prototyping.database_prototypes.database_module import query_fingerprint
+from prototyping.database_prototypes.database_module.query_result_cache import (
+    QueryResultCache,
+)
+
+
+# _____________________________________________________________________________
+class TestNormalizeQuery(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.tested_function = query_fingerprint.normalize_query
+
+    # -------------------------------------------------------------------------
+    def test_comments_and_whitespace_are_removed(self) -> None:
+        # Build
+        query = "SELECT *  /* all */\n  FROM products -- list\n WHERE id = %s # by id"
+
+        # Operate
+        normalized_query: str = self.tested_function(query)
+
+        # Check
+        self.assertEqual(
+            first=normalized_query, second="SELECT * FROM products WHERE id = %s"
+        )
+
+    # -------------------------------------------------------------------------
+    def test_comment_markers_inside_literals_are_kept(self) -> None:
+        for query in (
+            "SELECT * FROM products WHERE tag = 'a#1' AND id = %s",
+            "SELECT * FROM products WHERE tag = 'a -- 1' AND id = %s",
+            'SELECT * FROM products WHERE tag = "a /* 1 */" AND id = %s',
+            "SELECT `a#1` FROM products WHERE id = %s",
+            "SELECT * FROM products WHERE tag = 'it''s #1' AND id = %s",
+        ):
+            with self.subTest(query=query):
+                # Operate
+                normalized_query: str = self.tested_function(query)
+
+                # Check
+                self.assertEqual(first=normalized_query, second=query)
+
+    # -------------------------------------------------------------------------
+    def test_optimizer_hints_are_kept(self) -> None:
+        # Build
+        query = (
+            "SELECT /*+ INDEX(p idx_category) */ *   /* note */ FROM products p"
+            " /*!50700 FORCE INDEX (idx_category) */ WHERE category_id = %s"
+        )
+
+        # Operate
+        normalized_query: str = self.tested_function(query)
+
+        # Check
+        self.assertEqual(
+            first=normalized_query,
+            second=(
+                "SELECT /*+ INDEX(p idx_category) */ * FROM products p"
+                " /*!50700 FORCE INDEX (idx_category) */ WHERE category_id = %s"
+            ),
+        )
+
+    # -------------------------------------------------------------------------
+    def test_whitespace_inside_literals_is_kept(self) -> None:
+        # Build
+        query = "SELECT * FROM products WHERE tag = 'a  b'"
+
+        # Operate
+        normalized_query: str = self.tested_function(query)
+
+        # Check
+        self.assertEqual(first=normalized_query, second=query)
+
+    # -------------------------------------------------------------------------
+    def test_queries_with_different_literals_get_different_cache_keys(self) -> None:
+        # Operate
+        first_key = QueryResultCache.make_key(
+            query="SELECT * FROM products WHERE tag = 'a#1' AND id = %s",
+            parameters=(1,),
+        )
+        second_key = QueryResultCache.make_key(
+            query="SELECT * FROM products WHERE tag = 'a#2' AND id = %s",
+            parameters=(1,),
+        )
+
+        # Check
+        self.assertNotEqual(first=first_key, second=second_key)
+
+
+# _____________________________________________________________________________
+class TestFingerprintQuery(unittest.TestCase):
+    def test_literals_share_the_fingerprint(self) -> None:
+        # Operate
+        first_fingerprint: str = query_fingerprint.fingerprint_query(
+            "SELECT * FROM products WHERE tag = 'a#1' AND id IN (1, 2)"
+        )
+        second_fingerprint: str = query_fingerprint.fingerprint_query(
+            "select * from products where tag = 'b' and id in (3)"
+        )
+
+        # Check
+        self.assertEqual(
+            first=first_fingerprint,
+            second="select * from products where tag = ? and id in (?+)",
+        )
+        self.assertEqual(first=second_fingerprint, second=first_fingerprint)
+
+
+# _____________________________________________________________________________
+class TestExtractTables(unittest.TestCase):
+    def test_joined_tables_are_extracted(self) -> None:
+        # Operate
+        tables = query_fingerprint.extract_tables(
+            "SELECT * FROM shop.`orders` o JOIN users u ON u.id = o.user_id"
+        )
+
+        # Check
+        self.assertEqual(first=tables, second=frozenset({"orders", "users"}))
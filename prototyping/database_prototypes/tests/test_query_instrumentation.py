@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_query_instrumentation`, a set of test cases used to control the performance
+and quality of the `query_instrumentation` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+from mysql.connector import errorcode
+from mysql.connector.errors import ProgrammingError
+
+from prototyping.database_prototypes.database_module import query_instrumentation
+from prototyping.database_prototypes.tests.fake_mysql import FakeServer, create_api
+
+from typing import Any, List, Sequence
+
+
+# _____________________________________________________________________________
+class CollectingHook(query_instrumentation.AbstractQueryHook):
+    def __init__(self) -> None:
+        self.timings: List[query_instrumentation.QueryTimings] = []
+
+    # -------------------------------------------------------------------------
+    def record_query(self, timings: query_instrumentation.QueryTimings) -> None:
+        self.timings.append(timings)
+
+
+# -----------------------------------------------------------------------------
+def handle_query(query: str, parameters: Sequence[Any]) -> Any:
+    if "missing_table" in query:
+        raise ProgrammingError(errno=errorcode.ER_NO_SUCH_TABLE)
+
+    return [(1,), (2,)]
+
+
+# _____________________________________________________________________________
+class TestQueryHooks(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.hook = CollectingHook()
+        self.api = await create_api(
+            server=FakeServer(handle_query=handle_query), query_hooks=[self.hook]
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_hook_receives_a_succeeded_query(self) -> None:
+        # Operate
+        await self.api.fetch_all_use_pool(
+            query="SELECT id FROM products WHERE price > %s", parameters=(10,)
+        )
+
+        # Check
+        self.assertEqual(first=len(self.hook.timings), second=1)
+        self.assertEqual(
+            first=self.hook.timings[0].query,
+            second="SELECT id FROM products WHERE price > %s",
+        )
+        self.assertEqual(first=self.hook.timings[0].parameters, second=(10,))
+        self.assertEqual(first=self.hook.timings[0].rows, second=2)
+        self.assertFalse(expr=self.hook.timings[0].failed)
+
+    # -------------------------------------------------------------------------
+    async def test_hook_receives_a_failed_query(self) -> None:
+        # Operate
+        with self.assertRaises(expected_exception=ProgrammingError):
+            await self.api.fetch_all_use_pool(
+                query="SELECT id FROM missing_table WHERE id = %s", parameters=(1,)
+            )
+
+        # Check
+        self.assertEqual(first=len(self.hook.timings), second=1)
+        self.assertTrue(expr=self.hook.timings[0].failed)
+
+
+# _____________________________________________________________________________
+class TestSlowQueryLog(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.recorder = query_instrumentation.QueryLatencyRecorder(
+            slow_query_threshold=0.1
+        )
+
+    # -------------------------------------------------------------------------
+    def test_slow_query_is_logged_with_redacted_parameters(self) -> None:
+        for failed in (False, True):
+            with self.subTest(failed=failed):
+                # Build
+                timings = query_instrumentation.QueryTimings(
+                    fingerprint="SELECT * FROM users WHERE phone = ?",
+                    parameters=("+10000000000",),
+                    execute=0.2,
+                    failed=failed,
+                )
+
+                # Operate
+                with self.assertLogs(
+                    logger=query_instrumentation.logger, level="WARNING"
+                ) as logs:
+                    self.recorder.record_query(timings=timings)
+
+                # Check
+                self.assertEqual(first=len(logs.output), second=1)
+                self.assertIn(member="parameters=['<str>']", container=logs.output[0])
+                self.assertNotIn(member="+10000000000", container=logs.output[0])
+
+        statistics = self.recorder.get_statistics(fingerprint=timings.fingerprint)
+
+        self.assertEqual(first=(statistics.calls, statistics.errors), second=(2, 1))
+
+    # -------------------------------------------------------------------------
+    def test_fast_query_is_not_logged(self) -> None:
+        # Build
+        timings = query_instrumentation.QueryTimings(
+            fingerprint="SELECT * FROM users WHERE id = ?", execute=0.01
+        )
+
+        # Operate
+        with self.assertNoLogs(logger=query_instrumentation.logger, level="WARNING"):
+            self.recorder.record_query(timings=timings)
+
+        # Check
+        self.assertEqual(
+            first=self.recorder.get_statistics(fingerprint=timings.fingerprint).calls,
+            second=1,
+        )
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_replica_router`, a set of test cases used to control the performance
+and quality of the `replica_router` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+import unittest.mock as UnitMock
+
+from prototyping.database_prototypes.mysql_database_module import (
+    AsyncMySQLAPI,
+    AsyncMySQLConnectionPool,
+    replica_router,
+)
+from prototyping.database_prototypes.tests.fake_mysql import FakeServer
+
+from typing import Any, List
+
+
+# _____________________________________________________________________________
+class TestReplicaRouter(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.primary_pool = object()
+        self.replica_pools: List[Any] = [object(), object()]
+        self.router = replica_router.ReplicaRouter(
+            primary_pool=self.primary_pool,
+            replica_pools=self.replica_pools,
+            sticky_window=5.0,
+        )
+
+    # -------------------------------------------------------------------------
+    def test_writes_go_to_the_primary(self) -> None:
+        # Operate
+        pool: Any = self.router.choose_pool(read_only=False)
+
+        # Check
+        self.assertIs(expr1=pool, expr2=self.primary_pool)
+
+    # -------------------------------------------------------------------------
+    def test_reads_go_to_the_least_loaded_replica(self) -> None:
+        # Build
+        self.router.mark_acquired(pool=self.replica_pools[0])
+        self.router.mark_acquired(pool=self.replica_pools[0])
+        self.router.mark_acquired(pool=self.replica_pools[1])
+
+        # Operate
+        busy_pool: Any = self.router.choose_pool(read_only=True)
+        self.router.mark_released(pool=self.replica_pools[0])
+        self.router.mark_released(pool=self.replica_pools[0])
+        idle_pool: Any = self.router.choose_pool(read_only=True)
+
+        # Check
+        self.assertIs(expr1=busy_pool, expr2=self.replica_pools[1])
+        self.assertIs(expr1=idle_pool, expr2=self.replica_pools[0])
+
+    # -------------------------------------------------------------------------
+    def test_reads_stay_on_the_primary_within_the_window_of_a_write(self) -> None:
+        # Build
+        now: List[float] = [100.0]
+
+        with UnitMock.patch.object(
+            target=replica_router.time,
+            attribute="monotonic",
+            side_effect=lambda: now[0],
+        ):
+            self.router.mark_write(sticky_key=42)
+
+            # Operate
+            sticky_pool: Any = self.router.choose_pool(read_only=True, sticky_key=42)
+            other_pool: Any = self.router.choose_pool(read_only=True, sticky_key=7)
+            now[0] += 6.0
+            expired_pool: Any = self.router.choose_pool(read_only=True, sticky_key=42)
+
+        # Check
+        self.assertIs(expr1=sticky_pool, expr2=self.primary_pool)
+        self.assertIn(member=other_pool, container=self.replica_pools)
+        self.assertIn(member=expired_pool, container=self.replica_pools)
+
+
+# _____________________________________________________________________________
+class TestReadYourWrites(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self) -> None:
+        await super().asyncSetUp()
+        self.primary = FakeServer(handle_query=lambda query, parameters: [("primary",)])
+        self.replica = FakeServer(handle_query=lambda query, parameters: [("replica",)])
+        self.api = AsyncMySQLAPI()
+
+        await self.api.set_up(
+            separate_connection=await self.primary.connect(),
+            pool=AsyncMySQLConnectionPool(
+                connect_method=self.primary.connect, connection_data={}
+            ),
+            replica_pools=[
+                AsyncMySQLConnectionPool(
+                    connect_method=self.replica.connect, connection_data={}
+                )
+            ],
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_read_after_a_write_of_the_key_is_served_by_the_primary(self) -> None:
+        # Build
+        query = "SELECT status FROM orders WHERE chat_id = %s"
+
+        # Operate
+        read_before_write = await self.api.fetch_all_use_pool(
+            query=query, parameters=(42,), sticky_key=42
+        )
+        await self.api.execute_parameterized_query_use_pool(
+            query="UPDATE orders SET status = 'paid' WHERE chat_id = %s",
+            parameters=(42,),
+            sticky_key=42,
+        )
+        read_after_write = await self.api.fetch_all_use_pool(
+            query=query, parameters=(42,), sticky_key=42
+        )
+        read_of_other_key = await self.api.fetch_all_use_pool(
+            query=query, parameters=(7,), sticky_key=7
+        )
+
+        # Check
+        self.assertEqual(first=read_before_write, second=[("replica",)])
+        self.assertEqual(first=read_after_write, second=[("primary",)])
+        self.assertEqual(first=read_of_other_key, second=[("replica",)])
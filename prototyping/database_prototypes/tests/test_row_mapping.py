@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_row_mapping`, a set of test cases used to control the performance
+and quality of the `row_mapping` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+from array import array
+from dataclasses import dataclass
+
+from prototyping.database_prototypes.database_module import row_mapping
+
+from typing import Any, NamedTuple
+
+
+# _____________________________________________________________________________
+@dataclass(slots=True)
+class Product:
+    product_id: int
+    name: str
+
+
+# _____________________________________________________________________________
+class Price(NamedTuple):
+    value: float
+
+
+# _____________________________________________________________________________
+class TestRowMapper(unittest.TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.row_mapper = row_mapping.RowMapper(
+            record_type=Product, columns={"product_id": "id"}
+        )
+
+    # -------------------------------------------------------------------------
+    def test_fields_are_matched_with_the_columns_by_name(self) -> None:
+        # Build
+        rows = row_mapping.ResultRows(
+            rows=[(10.0, "milk", 1), (20.0, "bread", 2)],
+            column_names=("price", "name", "id"),
+        )
+
+        # Operate
+        products = self.row_mapper.map_rows(rows=rows)
+
+        # Check
+        self.assertEqual(
+            first=products, second=[Product(1, "milk"), Product(2, "bread")]
+        )
+
+    # -------------------------------------------------------------------------
+    def test_single_field_record_is_mapped(self) -> None:
+        # Build
+        row_mapper = row_mapping.RowMapper(
+            record_type=Price, columns={"value": "price"}
+        )
+
+        # Operate
+        price = row_mapper.map_row(row=(1, 9.5), column_names=("id", "price"))
+
+        # Check
+        self.assertEqual(first=price, second=Price(9.5))
+
+    # -------------------------------------------------------------------------
+    def test_missing_column_is_rejected(self) -> None:
+        # Build
+        rows = row_mapping.ResultRows(rows=[("milk",)], column_names=("name",))
+
+        # Check
+        with self.assertRaisesRegex(
+            expected_exception=ValueError, expected_regex="'id'"
+        ):
+            # Operate
+            self.row_mapper.map_rows(rows=rows)
+
+    # -------------------------------------------------------------------------
+    def test_rows_without_column_names_are_rejected(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            self.row_mapper.map_rows(rows=[(1, "milk")])
+
+    # -------------------------------------------------------------------------
+    def test_unsupported_record_type_is_rejected(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=TypeError):
+            # Operate
+            row_mapping.RowMapper(record_type=dict)
+
+
+# _____________________________________________________________________________
+class TestToColumns(unittest.TestCase):
+    def test_numeric_columns_become_arrays(self) -> None:
+        # Build
+        rows = row_mapping.ResultRows(
+            rows=[(1, 10.0, "milk", 2**64), (2, 20.0, "bread", 1)],
+            column_names=("id", "price", "name", "big"),
+        )
+
+        # Operate
+        columns: Any = row_mapping.to_columns(rows=rows)
+
+        # Check
+        self.assertEqual(first=columns["id"], second=array("q", [1, 2]))
+        self.assertEqual(first=columns["price"], second=array("d", [10.0, 20.0]))
+        self.assertEqual(first=columns["name"], second=["milk", "bread"])
+        self.assertEqual(first=columns["big"], second=[2**64, 1])
@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_transaction_retry`, a set of test cases used to control the performance
+and quality of the `transaction_retry` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+import unittest.mock as UnitMock
+
+from mysql.connector import errorcode
+from mysql.connector.errors import DatabaseError, ProgrammingError
+
+from prototyping.database_prototypes.mysql_database_module import transaction_retry
+from prototyping.database_prototypes.mysql_database_module.transaction_retry import (
+    TransactionRetryPolicy,
+    TransactionRetryStatistics,
+)
+
+from typing import List
+
+
+# _____________________________________________________________________________
+class TestTransactionRetryPolicy(unittest.TestCase):
+    def test_delay_bound_grows_up_to_the_cap(self) -> None:
+        # Build
+        policy = TransactionRetryPolicy(base_delay=0.1, max_delay=0.5, multiplier=2.0)
+
+        # Operate
+        with UnitMock.patch.object(
+            target=transaction_retry.random,
+            attribute="uniform",
+            side_effect=lambda lower, upper: upper,
+        ):
+            delays: List[float] = [
+                policy.get_delay(attempt=attempt) for attempt in range(1, 6)
+            ]
+
+        # Check
+        for delay, expected_delay in zip(delays, [0.1, 0.2, 0.4, 0.5, 0.5]):
+            self.assertAlmostEqual(first=delay, second=expected_delay)
+
+    # -------------------------------------------------------------------------
+    def test_delay_is_drawn_below_the_bound(self) -> None:
+        # Build
+        policy = TransactionRetryPolicy(base_delay=0.1, max_delay=1.0)
+
+        # Operate
+        delays: List[float] = [policy.get_delay(attempt=2) for _ in range(100)]
+
+        # Check
+        self.assertTrue(expr=all(0.0 <= delay <= 0.2 for delay in delays))
+
+    # -------------------------------------------------------------------------
+    def test_no_attempts_raises_ValueError(self) -> None:
+        # Check
+        with self.assertRaises(expected_exception=ValueError):
+            # Operate
+            TransactionRetryPolicy(max_attempts=0)
+
+
+# _____________________________________________________________________________
+class TestRunWithRetries(unittest.IsolatedAsyncioTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.policy = TransactionRetryPolicy(max_attempts=3, base_delay=0.0)
+        self.statistics = TransactionRetryStatistics()
+        self.attempts: int = 0
+
+    # -------------------------------------------------------------------------
+    async def test_deadlock_is_retried_until_the_run_succeeds(self) -> None:
+        # Build
+        async def function() -> str:
+            self.attempts += 1
+
+            if self.attempts == 1:
+                raise DatabaseError(errno=errorcode.ER_LOCK_DEADLOCK)
+
+            return "done"
+
+        # Operate
+        result: str = await transaction_retry.run_with_retries(
+            function=function, policy=self.policy, statistics=self.statistics
+        )
+
+        # Check
+        self.assertEqual(first=result, second="done")
+        self.assertEqual(
+            first=self.statistics,
+            second=TransactionRetryStatistics(deadlocks=1, retries=1, recoveries=1),
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_lock_wait_timeout_is_raised_after_the_last_attempt(self) -> None:
+        # Build
+        async def function() -> None:
+            self.attempts += 1
+
+            raise DatabaseError(errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+
+        # Check
+        with self.assertRaises(expected_exception=DatabaseError):
+            # Operate
+            await transaction_retry.run_with_retries(
+                function=function, policy=self.policy, statistics=self.statistics
+            )
+
+        self.assertEqual(first=self.attempts, second=3)
+        self.assertEqual(
+            first=self.statistics,
+            second=TransactionRetryStatistics(
+                lock_wait_timeouts=3, retries=2, give_ups=1
+            ),
+        )
+
+    # -------------------------------------------------------------------------
+    async def test_other_error_is_raised_at_once(self) -> None:
+        # Build
+        async def function() -> None:
+            self.attempts += 1
+
+            raise ProgrammingError(errno=errorcode.ER_NO_SUCH_TABLE)
+
+        # Check
+        with self.assertRaises(expected_exception=ProgrammingError):
+            # Operate
+            await transaction_retry.run_with_retries(
+                function=function, policy=self.policy, statistics=self.statistics
+            )
+
+        self.assertEqual(first=self.attempts, second=1)
+        self.assertEqual(first=self.statistics, second=TransactionRetryStatistics())
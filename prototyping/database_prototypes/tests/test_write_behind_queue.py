@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+
+"""
+Module `test_write_behind_queue`, a set of test cases used to control the performance
+and quality of the `write_behind_queue` module components.
+
+Copyright 2024 4-proxy
+Apache license, version 2.0 (Apache-2.0 license)
+"""
+
+__author__ = "4-proxy"
+__version__ = "1.0.0"
+
+import unittest
+
+import asyncio
+
+from prototyping.database_prototypes.database_module import write_behind_queue
+
+from typing import List, Tuple
+
+
+# -----------------------------------------------------------------------------
+def add_increments(old_value: int, new_value: int) -> int:
+    return old_value + new_value
+
+
+# _____________________________________________________________________________
+class TestFlush(unittest.IsolatedAsyncioTestCase):
+    async def test_failed_flush_restores_the_batch(self) -> None:
+        # Build
+        written: List[List[Tuple[str, int]]] = []
+        failures: List[Exception] = [RuntimeError("lost")]
+
+        async def flush_entries(batch: List[Tuple[str, int]]) -> None:
+            if failures:
+                raise failures.pop()
+
+            written.append(batch)
+
+        queue = write_behind_queue.WriteBehindQueue(
+            flush_method=flush_entries, merge_method=add_increments
+        )
+        await queue.put(key="views", value=1)
+
+        # Operate
+        with self.assertRaises(expected_exception=RuntimeError):
+            await queue.flush()
+
+        await queue.put(key="views", value=2)
+        await queue.flush()
+
+        # Check
+        self.assertEqual(first=written, second=[[("views", 3)]])
+
+    # -------------------------------------------------------------------------
+    async def test_batch_failing_after_its_commit_is_not_restored(self) -> None:
+        # Build
+        written: List[List[Tuple[str, int]]] = []
+
+        async def flush_entries(batch: List[Tuple[str, int]]) -> None:
+            written.append(batch)
+
+            raise write_behind_queue.CommittedFlushError("release failed")
+
+        queue = write_behind_queue.WriteBehindQueue(
+            flush_method=flush_entries, merge_method=add_increments
+        )
+        await queue.put(key="views", value=1)
+
+        # Operate
+        await queue.flush()
+        await queue.flush()
+
+        # Check
+        self.assertEqual(first=written, second=[[("views", 1)]])
+        self.assertEqual(first=len(queue), second=0)
+        self.assertEqual(first=queue.statistics.flushes, second=1)
+
+    # -------------------------------------------------------------------------
+    async def test_cancelled_flush_keeps_the_written_batch(self) -> None:
+        # Build
+        written: List[List[Tuple[str, int]]] = []
+        write_started = asyncio.Event()
+
+        async def flush_entries(batch: List[Tuple[str, int]]) -> None:
+            write_started.set()
+            await asyncio.sleep(0.01)
+            written.append(batch)
+
+        queue = write_behind_queue.WriteBehindQueue(
+            flush_method=flush_entries, merge_method=add_increments
+        )
+        await queue.put(key="views", value=1)
+        flushing = asyncio.create_task(queue.flush())
+        await write_started.wait()
+
+        # Operate
+        flushing.cancel()
+
+        with self.assertRaises(expected_exception=asyncio.CancelledError):
+            await flushing
+
+        await queue.flush()
+
+        # Check
+        self.assertEqual(first=written, second=[[("views", 1)]])
+        self.assertEqual(first=len(queue), second=0)